@@ -4,6 +4,7 @@ Helper semplificato per la gestione delle dipendenze - DSA Assistant
 Versione semplificata che funziona correttamente
 """
 
+import importlib.util
 import logging
 import sys
 import os
@@ -17,55 +18,30 @@ print("=" * 50)
 # Test dipendenze critiche
 dependencies_status = {}
 
-# PyQt6
-try:
-    from PyQt6.QtWidgets import QApplication
-
-    dependencies_status["PyQt6"] = "✅ Disponibile"
-    print("PyQt6: ✅ Disponibile")
-except ImportError:
-    dependencies_status["PyQt6"] = "❌ Non disponibile"
-    print("PyQt6: ❌ Non disponibile")
-
-# OpenCV
-try:
-    import cv2
-
-    dependencies_status["OpenCV"] = "✅ Disponibile"
-    print("OpenCV: ✅ Disponibile")
-except ImportError:
-    dependencies_status["OpenCV"] = "❌ Non disponibile"
-    print("OpenCV: ❌ Non disponibile")
-
-# Numpy
-try:
-    import numpy as np
-
-    dependencies_status["NumPy"] = "✅ Disponibile"
-    print("NumPy: ✅ Disponibile")
-except ImportError:
-    dependencies_status["NumPy"] = "❌ Non disponibile"
-    print("NumPy: ❌ Non disponibile")
-
-# Pillow
-try:
-    from PIL import Image
-
-    dependencies_status["Pillow"] = "✅ Disponibile"
-    print("Pillow: ✅ Disponibile")
-except ImportError:
-    dependencies_status["Pillow"] = "❌ Non disponibile"
-    print("Pillow: ❌ Non disponibile")
-
-# Requests
-try:
-    import requests
-
-    dependencies_status["Requests"] = "✅ Disponibile"
-    print("Requests: ✅ Disponibile")
-except ImportError:
-    dependencies_status["Requests"] = "❌ Non disponibile"
-    print("Requests: ❌ Non disponibile")
+def _check(name, module):
+    """Registra se ``module`` è installato, senza importarlo (find_spec).
+
+    Importare OpenCV, NumPy, Pillow e requests solo per verificarli
+    costava all'avvio più di tutto il resto del controllo: vengono
+    importati davvero al primo uso.
+    """
+    try:
+        available = importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        available = False
+    status = "✅ Disponibile" if available else "❌ Non disponibile"
+    dependencies_status[name] = status
+    print(f"{name}: {status}")
+
+
+for _name, _module in (
+    ("PyQt6", "PyQt6.QtWidgets"),
+    ("OpenCV", "cv2"),
+    ("NumPy", "numpy"),
+    ("Pillow", "PIL"),
+    ("Requests", "requests"),
+):
+    _check(_name, _module)
 
 print("=" * 50)
 print("Controllo dipendenze completato!")
@@ -6,11 +6,21 @@ import logging
 import os
 import subprocess
 import requests
+import threading
 import time
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from PyQt6.QtCore import QThread, pyqtSignal
 
+# Latenza e richieste in corso verso Ollama (core/performance_monitor.py)
+try:
+    from core.performance_monitor import performance_monitor
+except ImportError:
+    try:
+        from assistente_dsa.core.performance_monitor import performance_monitor
+    except ImportError:
+        performance_monitor = None
+
 
 class OllamaManager:
     """Gestore centralizzato per Ollama e i suoi modelli."""
@@ -301,12 +311,45 @@ class OllamaThread(QThread):
     ollama_response = pyqtSignal(str)
     ollama_error = pyqtSignal(str)
 
+    # Richieste in corso su tutti i thread, per le metriche
+    _in_flight = 0
+    _in_flight_lock = threading.Lock()
+
     def __init__(self, prompt, model="llava:7b", parent=None):
         super().__init__(parent)
         self.prompt = prompt
         self.model = model
 
+    @classmethod
+    def _track_in_flight(cls, delta):
+        with cls._in_flight_lock:
+            cls._in_flight += delta
+            count = cls._in_flight
+        if performance_monitor is not None:
+            performance_monitor.record_metric("ai.requests_in_flight", count)
+
     def run(self):
+        """Esegue la richiesta misurandone la durata.
+
+        La durata va nella serie di tutte le richieste
+        (ai.request.execution_time) e in quella del modello
+        (ai.request.<modello>.execution_time), così le latenze di modelli
+        diversi non si mescolano nei percentili.
+        """
+        self._track_in_flight(1)
+        start_ns = time.perf_counter_ns()
+        try:
+            self._request()
+        finally:
+            self._track_in_flight(-1)
+            if performance_monitor is not None:
+                elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+                performance_monitor.record_metric("ai.request.execution_time", elapsed)
+                performance_monitor.record_metric(
+                    f"ai.request.{self.model}.execution_time", elapsed
+                )
+
+    def _request(self):
         try:
             logging.info(f"Invio prompt a Ollama con il modello '{self.model}'...")
 
@@ -69,6 +69,16 @@ class TextReadingHandlers:
         self.main_window.is_reading = False
         logging.info("Lettura testo interrotta.")
 
+    def skip_sentence_forward(self):
+        """Salta alla frase successiva della lettura in corso."""
+        if self.main_window.tts_thread and self.main_window.tts_thread.isRunning():
+            self.main_window.tts_thread.skip_forward()
+
+    def skip_sentence_back(self):
+        """Torna alla frase precedente della lettura in corso."""
+        if self.main_window.tts_thread and self.main_window.tts_thread.isRunning():
+            self.main_window.tts_thread.skip_back()
+
     def on_reading_started(self):
         """Gestisce l'inizio della lettura."""
         logging.info("Lettura del testo iniziata.")
@@ -0,0 +1,177 @@
+# sentence_stream.py - Lettura a frasi con sintesi "in pipeline"
+
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Una frase del testo originale, con la sua posizione (per evidenziarla)
+Sentence = namedtuple("Sentence", ["index", "start", "end", "text"])
+
+# Fine frase: punteggiatura forte seguita da spazio/fine testo, oppure a capo
+_SENTENCE_END_RE = re.compile(r"[.!?…;]+[\"'»)\]]*(?=\s|$)|\n+")
+
+# Frasi più lunghe di così vengono spezzate sulle virgole o sugli spazi:
+# una frase enorme senza punteggiatura annullerebbe il vantaggio della pipeline
+MAX_SENTENCE_CHARS = 300
+
+
+def _split_long(start, end, text, max_chars):
+    """Spezza un intervallo troppo lungo preferendo virgole, poi spazi."""
+    pieces = []
+    while end - start > max_chars:
+        window = text[start:start + max_chars]
+        cut = max(window.rfind(", "), window.rfind(": "))
+        if cut <= 0:
+            cut = window.rfind(" ")
+        cut = start + (cut + 1 if cut > 0 else max_chars)
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def split_into_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+    """Divide il testo in frasi, conservando gli offset nel testo originale.
+
+    Restituisce una lista di ``Sentence``; le frasi vuote (solo spazi o
+    punteggiatura) vengono scartate.
+    """
+    if not text:
+        return []
+
+    spans = []
+    pos = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        spans.append((pos, match.end()))
+        pos = match.end()
+    if pos < len(text):
+        spans.append((pos, len(text)))
+
+    sentences = []
+    for span_start, span_end in spans:
+        for start, end in _split_long(span_start, span_end, text, max_chars):
+            # Togli gli spazi ai bordi mantenendo gli offset corretti
+            chunk = text[start:end]
+            stripped = chunk.strip()
+            if not any(c.isalnum() for c in stripped):
+                continue
+            start += len(chunk) - len(chunk.lstrip())
+            end = start + len(stripped)
+            sentences.append(Sentence(len(sentences), start, end, stripped))
+    return sentences
+
+
+class SentencePipeline:
+    """Riproduce una lista di frasi sintetizzando la successiva mentre suona l'attuale.
+
+    - ``render(text)`` produce l'audio di una frase (chiamata su un worker);
+    - ``play(audio)`` lo riproduce ed è bloccante;
+    - ``interrupt()`` (facoltativa) deve far terminare subito ``play``.
+
+    L'audio già prodotto resta in cache per indice, quindi tornare indietro
+    o ripetere una frase non richiede una nuova sintesi.
+    """
+
+    def __init__(self, sentences, render, play, interrupt=None, prefetch=1,
+                 on_sentence=None):
+        self.sentences = list(sentences)
+        self._render = render
+        self._play = play
+        self._interrupt = interrupt
+        self._prefetch = max(0, int(prefetch))
+        self._on_sentence = on_sentence
+
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._executor = None
+        self._stopped = False
+        self._jump = None
+        self.current_index = 0
+
+    # ------------------------------------------------------------------
+    # Controllo dall'esterno (thread della GUI)
+    # ------------------------------------------------------------------
+    def stop(self):
+        """Interrompe la lettura (anche a metà di una frase)."""
+        with self._lock:
+            self._stopped = True
+        self._call_interrupt()
+
+    def seek(self, index):
+        """Salta alla frase ``index`` (limitato all'intervallo valido)."""
+        if not self.sentences:
+            return
+        index = max(0, min(int(index), len(self.sentences) - 1))
+        with self._lock:
+            self._jump = index
+        self._call_interrupt()
+
+    def skip(self, delta):
+        """Avanza (delta > 0) o torna indietro (delta < 0) di alcune frasi."""
+        with self._lock:
+            base = self._jump if self._jump is not None else self.current_index
+        self.seek(base + delta)
+
+    def is_stopped(self):
+        with self._lock:
+            return self._stopped
+
+    # ------------------------------------------------------------------
+    # Esecuzione (da chiamare nel thread di lettura)
+    # ------------------------------------------------------------------
+    def run(self):
+        """Legge tutte le frasi; ritorna a fine testo o dopo ``stop()``.
+
+        Gli errori di sintesi vengono rilanciati al chiamante.
+        """
+        if not self.sentences:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="tts-render")
+        try:
+            index = 0
+            while index < len(self.sentences):
+                with self._lock:
+                    if self._stopped:
+                        return
+                    if self._jump is not None:
+                        index, self._jump = self._jump, None
+                    self.current_index = index
+
+                future = self._schedule(index)
+                last = min(len(self.sentences), index + 1 + self._prefetch)
+                for ahead in range(index + 1, last):
+                    self._schedule(ahead)
+
+                audio = future.result()
+
+                with self._lock:
+                    if self._stopped:
+                        return
+                    if self._jump is not None:
+                        continue  # seek arrivato durante la sintesi
+
+                if self._on_sentence is not None:
+                    self._on_sentence(self.sentences[index])
+                self._play(audio)
+                index += 1
+        finally:
+            for future in self._futures.values():
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _schedule(self, index):
+        future = self._futures.get(index)
+        if future is None or future.cancelled():
+            future = self._executor.submit(self._render, self.sentences[index].text)
+            self._futures[index] = future
+        return future
+
+    def _call_interrupt(self):
+        if self._interrupt is not None:
+            try:
+                self._interrupt()
+            except Exception:
+                pass
@@ -3,13 +3,14 @@
 import pyttsx3
 import threading
 import logging
-import os
 import gtts
 import subprocess
 from io import BytesIO
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from .sentence_stream import SentencePipeline, split_into_sentences
+
 # ==============================================================================
 # Configurazione Voci e Motori TTS
 # ==============================================================================
@@ -107,11 +108,17 @@ GTTS_LANGUAGES = {
 class TTSThread(QThread):
     """
     Thread per la sintesi vocale asincrona, supporta diversi motori TTS.
+
+    Il testo viene letto una frase alla volta: mentre suona la frase N la
+    N+1 è già in sintesi, così l'audio parte subito anche per testi lunghi
+    e si può saltare avanti/indietro senza sintetizzare di nuovo.
     """
 
     finished_reading = pyqtSignal()
     started_reading = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    # indice frase, offset inizio, offset fine (nel testo originale)
+    sentence_started = pyqtSignal(int, int, int)
 
     def __init__(
         self, text, engine_name="pyttsx3", voice_or_lang="it", speed=1.0, pitch=1.0
@@ -123,6 +130,9 @@ class TTSThread(QThread):
         self.speed = speed
         self.pitch = pitch
         self._is_running = True
+        self.sentences = split_into_sentences(text)
+        self._pipeline = None
+        self._player = None
 
     def run(self):
         """Esegue il processo di sintesi vocale in base al motore scelto."""
@@ -144,12 +154,43 @@ class TTSThread(QThread):
             logging.error("Errore nella sintesi vocale: {e}")
             self.error_occurred.emit("Errore: {str(e)}")
         finally:
+            self._pipeline = None
             if self._is_running:
                 self.finished_reading.emit()
 
     def stop(self):
         """Segnala al thread di fermarsi in modo sicuro."""
         self._is_running = False
+        if self._pipeline is not None:
+            self._pipeline.stop()
+
+    def skip_forward(self):
+        """Passa alla frase successiva."""
+        if self._pipeline is not None:
+            self._pipeline.skip(1)
+
+    def skip_back(self):
+        """Torna alla frase precedente (riusa l'audio già sintetizzato)."""
+        if self._pipeline is not None:
+            self._pipeline.skip(-1)
+
+    def seek_sentence(self, index):
+        """Salta direttamente alla frase ``index``."""
+        if self._pipeline is not None:
+            self._pipeline.seek(index)
+
+    def _run_pipeline(self, render, play, interrupt):
+        """Legge le frasi con ``SentencePipeline`` emettendo sentence_started."""
+        self._pipeline = SentencePipeline(
+            self.sentences,
+            render,
+            play,
+            interrupt=interrupt,
+            on_sentence=lambda s: self.sentence_started.emit(s.index, s.start, s.end),
+        )
+        if not self._is_running:
+            return
+        self._pipeline.run()
 
     def _speak_pyttsx3(self):
         """Gestisce la sintesi vocale con pyttsx3."""
@@ -175,8 +216,12 @@ class TTSThread(QThread):
                     "Impossibile impostare la voce '{self.voice_or_lang}': {e}. Verrà usata la voce di default."
                 )
 
-            engine.say(self.text_to_speak)
-            engine.runAndWait()
+            # pyttsx3 sintetizza e riproduce insieme: la "resa" è il testo stesso
+            def play(sentence_text):
+                engine.say(sentence_text)
+                engine.runAndWait()
+
+            self._run_pipeline(lambda text: text, play, engine.stop)
 
         except Exception:
             self.error_occurred.emit("Errore con pyttsx3: {str(e)}")
@@ -192,22 +237,33 @@ class TTSThread(QThread):
             # Estrai il codice lingua dal testo del combobox (es. 'Italiano (it)' -> 'it')
             lang_code = self.voice_or_lang.split("(")[-1].replace(")", "")
 
-            tts = gtts.gTTS(self.text_to_speak, lang=lang_code)
+            def render(sentence_text):
+                # gTTS salva in memoria (BytesIO): nessun file temporaneo
+                mp3_fp = BytesIO()
+                gtts.gTTS(sentence_text, lang=lang_code).write_to_fp(mp3_fp)
+                return mp3_fp.getvalue()
 
-            # gTTS salva in un file temporaneo in memoria (BytesIO)
-            mp3_fp = BytesIO()
-            tts.write_to_fp(mp3_fp)
-            mp3_fp.seek(0)
+            def play(mp3_bytes):
+                # Usa un processo esterno per riprodurre l'mp3 letto da stdin.
+                self._player = subprocess.Popen(
+                    ["mpg123", "-q", "-"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                try:
+                    self._player.communicate(mp3_bytes)
+                except (BrokenPipeError, ValueError):
+                    pass  # riproduzione interrotta da stop/salto
+                finally:
+                    self._player = None
 
-            # Usa un processo esterno per riprodurre il file mp3.
-            os.makedirs("Audio", exist_ok=True)
-            file_name = "Audio/temp_gtts.mp3"
-            tts.save(file_name)
+            def interrupt():
+                player = self._player
+                if player is not None and player.poll() is None:
+                    player.terminate()
 
-            # Usa un processo esterno per riprodurre il file mp3.
-            subprocess.run(["mpg123", file_name])
-            if os.path.exists(file_name):
-                os.remove(file_name)
+            self._run_pipeline(render, play, interrupt)
 
         except Exception:
             self.error_occurred.emit("Errore con gTTS: {str(e)}")
@@ -55,6 +55,12 @@ except ImportError:
         get_vlm_manager = None
         logging.warning(f"VLM Manager non disponibile: {e}")
 
+# Tempi per fase di ogni frame (spento per default)
+try:
+    from core.frame_tracer import get_frame_tracer
+except ImportError:
+    from assistente_dsa.core.frame_tracer import get_frame_tracer
+
 # Import MediaPipe client - MANTIENI COME FALLBACK
 try:
     from .mediapipe.client.mediapipe_client import MediaPipeClient
@@ -375,14 +381,18 @@ class VideoThread(QThread):
 
         self.status_signal.emit("Webcam avviata. Caricamento...")
 
+        tracer = get_frame_tracer()
         while self._run_flag:
-            ret, frame = self.cap.read()
+            tracer.begin_frame()
+            with tracer.span("capture"):
+                ret, frame = self.cap.read()
             if ret:
                 # ==========================================================
                 # Modifica qui per invertire orizzontalmente l'immagine
                 # Il valore 1 indica l'inversione orizzontale.
                 # ==========================================================
-                frame = cv2.flip(frame, 1)
+                with tracer.span("flip"):
+                    frame = cv2.flip(frame, 1)
 
                 # ==========================================================
                 # Logica di rilevamento faccia, mani, gesti ed espressioni
@@ -393,100 +403,109 @@ class VideoThread(QThread):
 
                 # Applica i rilevamenti nell'ordine corretto
                 if self.face_detection_enabled:
-                    frame = self.detect_faces(frame)
+                    with tracer.span("faces"):
+                        frame = self.detect_faces(frame)
 
                 if self.hand_detection_enabled:
-                    frame = self.detect_hands(frame)
+                    with tracer.span("hands"):
+                        frame = self.detect_hands(frame)
 
                 if self.gesture_recognition_enabled:
-                    frame = self.detect_hand_gestures(frame)
+                    with tracer.span("gestures"):
+                        frame = self.detect_hand_gestures(frame)
 
                 if self.facial_expression_enabled:
-                    frame = self.detect_facial_expressions(frame)
+                    with tracer.span("expressions"):
+                        frame = self.detect_facial_expressions(frame)
 
                 if self.human_detection_enabled:
-                    frame = self.detect_humans(frame)
+                    with tracer.span("humans"):
+                        frame = self.detect_humans(frame)
 
                 # ===========================================
                 # Integrazione VLM Manager per analisi avanzata
                 # ===========================================
                 if self.vlm_manager and self.vlm_manager.is_initialized:
-                    try:
-                        # Analizza il frame con VLM per gesture, OCR, etc.
-                        vlm_results = self.vlm_manager.analyze_frame(frame)
+                    with tracer.span("vlm"):
+                        try:
+                            # Analizza il frame con VLM per gesture, OCR, etc.
+                            vlm_results = self.vlm_manager.analyze_frame(frame)
 
-                        # Elabora risultati gesture
-                        if "gestures" in vlm_results and vlm_results["gestures"]:
-                            gesture = vlm_results["gestures"][0]
-                            gesture_type = gesture.get("gesture", "unknown")
+                            # Elabora risultati gesture
+                            if "gestures" in vlm_results and vlm_results["gestures"]:
+                                gesture = vlm_results["gestures"][0]
+                                gesture_type = gesture.get("gesture", "unknown")
 
-                            # Invia segnale gesture rilevata
-                            self.gesture_detected_signal.emit(gesture_type)
+                                # Invia segnale gesture rilevata
+                                self.gesture_detected_signal.emit(gesture_type)
+
+                                # Aggiungi testo informativo al frame
+                                cv2.putText(
+                                    frame,
+                                    f"VLM Gesture: {gesture_type}",
+                                    (10, frame.shape[0] - 60),
+                                    cv2.FONT_HERSHEY_SIMPLEX,
+                                    0.7,
+                                    (0, 255, 0),
+                                    2,
+                                )
 
-                            # Aggiungi testo informativo al frame
+                            # Elabora risultati umani
+                            if "humans" in vlm_results and vlm_results["humans"]:
+                                humans_count = len(vlm_results["humans"])
+                                self.human_detected_signal.emit(vlm_results["humans"])
+
+                                # Aggiungi testo informativo al frame
+                                cv2.putText(
+                                    frame,
+                                    f"VLM Humans: {humans_count}",
+                                    (10, frame.shape[0] - 100),
+                                    cv2.FONT_HERSHEY_SIMPLEX,
+                                    0.7,
+                                    (255, 0, 255),
+                                    2,
+                                )
+
+                            # Aggiungi indicatore VLM attivo
                             cv2.putText(
                                 frame,
-                                f"VLM Gesture: {gesture_type}",
-                                (10, frame.shape[0] - 60),
+                                "VLM: ACTIVE",
+                                (frame.shape[1] - 120, 30),
                                 cv2.FONT_HERSHEY_SIMPLEX,
-                                0.7,
-                                (0, 255, 0),
+                                0.6,
+                                (0, 255, 255),
                                 2,
                             )
 
-                        # Elabora risultati umani
-                        if "humans" in vlm_results and vlm_results["humans"]:
-                            humans_count = len(vlm_results["humans"])
-                            self.human_detected_signal.emit(vlm_results["humans"])
-
-                            # Aggiungi testo informativo al frame
+                        except Exception as e:
+                            logging.warning(f"Errore analisi VLM: {e}")
+                            # Aggiungi indicatore errore VLM
                             cv2.putText(
                                 frame,
-                                f"VLM Humans: {humans_count}",
-                                (10, frame.shape[0] - 100),
+                                "VLM: ERROR",
+                                (frame.shape[1] - 120, 30),
                                 cv2.FONT_HERSHEY_SIMPLEX,
-                                0.7,
-                                (255, 0, 255),
+                                0.6,
+                                (0, 0, 255),
                                 2,
                             )
 
-                        # Aggiungi indicatore VLM attivo
-                        cv2.putText(
-                            frame,
-                            "VLM: ACTIVE",
-                            (frame.shape[1] - 120, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            (0, 255, 255),
-                            2,
-                        )
-
-                    except Exception as e:
-                        logging.warning(f"Errore analisi VLM: {e}")
-                        # Aggiungi indicatore errore VLM
-                        cv2.putText(
-                            frame,
-                            "VLM: ERROR",
-                            (frame.shape[1] - 120, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            (0, 0, 255),
-                            2,
-                        )
-
                 # Converti il frame in QPixmap per efficienza
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w = rgb_image.shape[:2]
-                # Converti in bytes per QImage
-                bytes_per_line = 3 * w
-                # Converti esplicitamente in bytes
-                image_bytes = bytes(rgb_image.tobytes())
-                q_image = QImage(
-                    image_bytes, w, h, bytes_per_line, QImage.Format.Format_RGB888
-                )
-                pixmap = QPixmap.fromImage(q_image)
+                with tracer.span("convert"):
+                    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    h, w = rgb_image.shape[:2]
+                    # Converti in bytes per QImage
+                    bytes_per_line = 3 * w
+                    # Converti esplicitamente in bytes
+                    image_bytes = bytes(rgb_image.tobytes())
+                    q_image = QImage(
+                        image_bytes, w, h, bytes_per_line, QImage.Format.Format_RGB888
+                    )
+                    pixmap = QPixmap.fromImage(q_image)
                 # Invia QPixmap invece di dati raw per ridurre uso memoria
-                self.change_pixmap_signal.emit(pixmap)
+                with tracer.span("emit"):
+                    self.change_pixmap_signal.emit(pixmap)
+                tracer.end_frame()
             else:
                 self.status_signal.emit("Errore di lettura del frame dalla webcam.")
                 break
@@ -574,7 +593,8 @@ class VideoThread(QThread):
             if timestamp_ms <= self._mp_face_last_ts:
                 timestamp_ms = self._mp_face_last_ts + 1
             self._mp_face_last_ts = timestamp_ms
-            result = landmarker.detect_for_video(mp_image, timestamp_ms)
+            with get_frame_tracer().span("faces.model"):
+                result = landmarker.detect_for_video(mp_image, timestamp_ms)
         except Exception as e:
             logging.warning(f"Errore FaceLandmarker: {e}")
             return frame
@@ -920,7 +940,8 @@ class VideoThread(QThread):
             if timestamp_ms <= self._mp_last_ts:
                 timestamp_ms = self._mp_last_ts + 1  # deve crescere sempre
             self._mp_last_ts = timestamp_ms
-            result = landmarker.detect_for_video(mp_image, timestamp_ms)
+            with get_frame_tracer().span("hands.model"):
+                result = landmarker.detect_for_video(mp_image, timestamp_ms)
         except Exception as e:
             logging.warning(f"Errore HandLandmarker: {e}")
             return frame
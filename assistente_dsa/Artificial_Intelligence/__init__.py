@@ -1,20 +1,25 @@
 """
 Modulo AI unificato per l'Assistente DSA
 Contiene tutti i moduli di intelligenza artificiale organizzati
+
+I sottopacchetti e le classi principali vengono importati al primo
+accesso: importare il pacchetto (es. per il bridge Ollama) non carica
+riconoscimento vocale, sintesi vocale e video.
 """
 
-# Esporta i moduli unificati
-from . import Sintesi_Vocale
-from . import Riconoscimento_Vocale
-from . import Ollama
+import importlib
+
+_SUBPACKAGES = ("Sintesi_Vocale", "Riconoscimento_Vocale", "Ollama")
 
-# Esporta le classi principali per accesso diretto
-from .Sintesi_Vocale.managers.tts_manager import TTSThread
-from .Sintesi_Vocale.managers.tts_engine_manager import TTSManager
-from .Riconoscimento_Vocale.managers.speech_recognition_manager import (
-    SpeechRecognitionThread,
-)
-from .Ollama.ollama_manager import OllamaManager, OllamaThread, OllamaModelsThread
+# Classi principali per accesso diretto -> modulo che le definisce
+_EXPORTS = {
+    "TTSThread": ".Sintesi_Vocale.managers.tts_manager",
+    "TTSManager": ".Sintesi_Vocale.managers.tts_engine_manager",
+    "SpeechRecognitionThread": ".Riconoscimento_Vocale.managers.speech_recognition_manager",
+    "OllamaManager": ".Ollama.ollama_manager",
+    "OllamaThread": ".Ollama.ollama_manager",
+    "OllamaModelsThread": ".Ollama.ollama_manager",
+}
 
 __all__ = [
     "Sintesi_Vocale",
@@ -27,3 +32,13 @@ __all__ = [
     "OllamaThread",
     "OllamaModelsThread",
 ]
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module("." + name, __name__)
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -75,15 +75,17 @@ def test_imports():
         print(f"Application theme: {get_setting('application.theme', 'Chiaro')}")
 
         try:
-            import importlib.util
-            aircraft_path = os.path.join(os.path.dirname(__file__), "main_01_Aircraft.py")
-            spec = importlib.util.spec_from_file_location("main_01_Aircraft", aircraft_path)
-            if spec is None or spec.loader is None:
-                print("⚠️  Could not load main_01_Aircraft spec, but continuing...")
+            # Solo la specifica: il modulo verrà eseguito una volta, all'avvio
+            try:
+                from ..core.system_checks_module import check_module_spec
+            except ImportError:
+                from core.system_checks_module import check_module_spec
+            aircraft_path = os.path.join(os.path.dirname(current_dir), "main_01_Aircraft.py")
+            found, detail = check_module_spec("main_01_Aircraft", aircraft_path)
+            if not found:
+                print(f"⚠️  Could not load main_01_Aircraft spec ({detail}), but continuing...")
                 return True  # Continue anyway
-            main_01_Aircraft = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(main_01_Aircraft)
-            print("✅ Main module (main_01_Aircraft) imported successfully")
+            print("✅ Main module (main_01_Aircraft) found")
         except Exception as e:
             print(f"⚠️  Main module import failed: {e}, but continuing...")
             return True  # Continue anyway
@@ -4,10 +4,17 @@ Modulo per la gestione centralizzata delle impostazioni dell'applicazione.
 Tutte le costanti e configurazioni vengono caricate dal file settings.json.
 """
 
-import json
 import os
+import sys
 from typing import Dict, Any, Optional
 
+# Backend unico delle impostazioni: questo modulo ne è solo una "vista"
+try:
+    from core.config_module import get_settings_backend
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from core.config_module import get_settings_backend
+
 
 class SettingsManager:
     """Gestore centralizzato delle impostazioni dell'applicazione."""
@@ -95,12 +102,12 @@ class SettingsManager:
     }
 
     def __init__(self):
-        self._settings = {}
         self._settings_file = None
+        self._store = None
         self._load_settings()
 
     def _load_settings(self) -> None:
-        """Carica le impostazioni dal file JSON."""
+        """Collega il gestore allo store condiviso (il file è letto una volta sola)."""
         # Usa il percorso assoluto del file settings principale
         self._settings_file = os.path.join(
             os.path.dirname(
@@ -110,62 +117,33 @@ class SettingsManager:
             "SETUP_TOOLS_&_Data",
             "settings.json",
         )
-
-        try:
-            if os.path.exists(self._settings_file):
-                with open(self._settings_file, "r", encoding="utf-8") as f:
-                    loaded_settings = json.load(f)
-                # Unisci le impostazioni caricate con quelle di default
-                self._settings = {**self.DEFAULT_SETTINGS, **loaded_settings}
-                print("✓ Impostazioni caricate da: {self._settings_file}")
-            else:
-                print("⚠️ File impostazioni non trovato: {self._settings_file}")
-                print("   Creazione impostazioni di default...")
-                self._settings = self.DEFAULT_SETTINGS.copy()
-                self._save_settings()
-        except json.JSONDecodeError as e:
-            print("✗ Errore parsing settings.json: {e}")
-            print("   Utilizzo impostazioni di default...")
-            self._settings = self.DEFAULT_SETTINGS.copy()
-        except Exception:
-            print("✗ Errore caricamento impostazioni: {e}")
-            print("   Utilizzo impostazioni di default...")
-            self._settings = self.DEFAULT_SETTINGS.copy()
+        self._store = get_settings_backend()
 
     def _save_settings(self) -> None:
-        """Salva le impostazioni nel file JSON."""
-        if not self._settings_file:
-            return
-
-        try:
-            os.makedirs(os.path.dirname(self._settings_file), exist_ok=True)
-            with open(self._settings_file, "w", encoding="utf-8") as f:
-                json.dump(self._settings, f, indent=4, ensure_ascii=False)
-            print("✓ Impostazioni salvate in: {self._settings_file}")
-        except Exception:
-            print("✗ Errore salvataggio impostazioni: {e}")
+        """Salva subito le modifiche in sospeso (scrittura atomica)."""
+        if self._store is not None and self._store.flush():
+            print(f"✓ Impostazioni salvate in: {self._settings_file}")
 
     def get(self, key: str, default: Any = None) -> Any:
-        """Ottiene il valore di una impostazione."""
-        return self._settings.get(key, default)
+        """Ottiene il valore di una impostazione (i default coprono le chiavi mancanti)."""
+        return self._store.get(key, self.DEFAULT_SETTINGS.get(key, default))
 
     def set(self, key: str, value: Any) -> None:
-        """Imposta il valore di una impostazione."""
-        self._settings[key] = value
-        self._save_settings()
+        """Imposta il valore di una impostazione (salvataggio raggruppato)."""
+        self._store.set(key, value)
 
     def get_all(self) -> Dict[str, Any]:
         """Restituisce tutte le impostazioni."""
-        return self._settings.copy()
+        return {**self.DEFAULT_SETTINGS, **self._store.snapshot()}
 
     def update(self, settings: Dict[str, Any]) -> None:
         """Aggiorna multiple impostazioni."""
-        self._settings.update(settings)
-        self._save_settings()
+        for key, value in settings.items():
+            self._store.set(key, value)
 
     def reset_to_defaults(self) -> None:
         """Ripristina le impostazioni di default."""
-        self._settings = self.DEFAULT_SETTINGS.copy()
+        self._store.replace(self.DEFAULT_SETTINGS.copy())
         self._save_settings()
 
     # Proprietà specifiche per accesso diretto
@@ -1,6 +1,12 @@
+import hashlib
+import html
 import logging
 import os
-import pyttsx3
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt6.QtCore import Qt, QMimeData, QTimer
 from PyQt6.QtGui import QDrag
 from PyQt6.QtWidgets import (
@@ -19,28 +25,74 @@ BUTTON_DEFAULT_SIZE = (25, 25)
 DEFAULT_FONT_SIZE = 12
 DRAG_DISTANCE_THRESHOLD = 10
 
-WIDGET_STYLE_SHEET = """
-    QFrame {
-        background: rgba(255, 255, 255, 0.7);
-        border-radius: 15px;
-        margin: 5px;
-        color: black;
-    }
-    QPushButton {
-        background-color: rgba(0, 0, 0, 0.2);
-        border: 1px solid rgba(0, 0, 0, 0.3);
-        border-radius: 12px;
-        padding: 5px 10px;
-        color: white;
-        font-weight: bold;
-    }
-    QPushButton:hover {
-        background-color: rgba(0, 0, 0, 0.3);
-    }
-    QLabel {
-        color: black;
-    }
-"""
+# Analisi del contenuto: calcolata solo quando serve (click sul pensierino),
+# memorizzata per testo e condivisa da tutti i widget (duplicati e progetti
+# ricaricati non vengono rianalizzati); i testi lunghi in un thread a parte.
+ANALYSIS_CACHE_SIZE = 256
+LONG_TEXT_ANALYSIS_CHARS = 2000
+_analysis_cache = OrderedDict()
+_analysis_lock = threading.Lock()
+_analysis_executor = None
+analysis_stats = {"computed": 0, "hits": 0, "background": 0, "dropped": 0}
+# Ultima richiesta per il pannello dettagli: (widget, chiave dell'analisi).
+# Un risultato in background che non corrisponde più viene scartato.
+_details_request = (None, None)
+# Letture a frasi fermate ma con run() ancora in uscita
+_finishing_tts_threads = set()
+
+
+def _analysis_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _cached_analysis(key):
+    with _analysis_lock:
+        result = _analysis_cache.get(key)
+        if result is not None:
+            _analysis_cache.move_to_end(key)
+            analysis_stats["hits"] += 1
+        return result
+
+
+def _store_analysis(key, result):
+    with _analysis_lock:
+        _analysis_cache[key] = result
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+
+def _claim_details(widget, key):
+    """Il widget diventa il proprietario del pannello dettagli.
+
+    L'analisi in attesa del proprietario precedente viene annullata, così
+    il suo risultato non sovrascrive quello del nuovo click.
+    """
+    global _details_request
+    previous = _details_request[0]() if _details_request[0] is not None else None
+    if previous is not None:
+        try:
+            previous._cancel_analysis()
+        except RuntimeError:
+            pass  # widget già distrutto lato Qt
+    _details_request = (weakref.ref(widget), key)
+
+
+def _owns_details(widget, key):
+    owner, owner_key = _details_request
+    return owner is not None and owner() is widget and owner_key == key
+
+
+def _get_analysis_executor():
+    global _analysis_executor
+    if _analysis_executor is None:
+        _analysis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+    return _analysis_executor
+
+try:
+    from UI.theme_engine import get_theme_engine
+except ImportError:
+    from assistente_dsa.UI.theme_engine import get_theme_engine
 
 
 class DraggableTextWidget(QFrame):
@@ -52,6 +104,9 @@ class DraggableTextWidget(QFrame):
         self.setFrameShape(QFrame.Shape.StyledPanel)
         self.setFrameShadow(QFrame.Shadow.Raised)
         self.setMinimumHeight(WIDGET_MIN_HEIGHT)
+        # Stile normale e selezionato nel foglio dell'applicazione
+        # (QFrame#pensierino[selected=...], vedi UI/theme_engine.py)
+        self.setObjectName("pensierino")
 
         self.settings = settings
         self.original_text = text
@@ -109,6 +164,12 @@ class DraggableTextWidget(QFrame):
 
         self._tts_proc = None
         self._tts_timer = None
+        self._tts_thread = None  # lettura a frasi in corso (TTSThread)
+        self._reading_text = ""
+        self._reading_label_text = None
+        self._analysis_future = None
+        self._analysis_key = None
+        self._analysis_timer = None
 
         self.setAcceptDrops(True)
         self.start_pos = None
@@ -214,7 +275,11 @@ class DraggableTextWidget(QFrame):
             self._start_reading()
 
     def _start_reading(self):
-        """Legge il testo (solo testo, non l'HTML) in modo non bloccante."""
+        """Legge il testo (solo testo, non l'HTML) in modo non bloccante.
+
+        I testi di più frasi passano da TTSThread: lettura a frasi in
+        pipeline, frase corrente evidenziata e salto avanti/indietro.
+        """
         import shutil
         import subprocess
 
@@ -222,36 +287,102 @@ class DraggableTextWidget(QFrame):
         if not text:
             return
 
-        exe = shutil.which("espeak-ng") or shutil.which("espeak")
-        if not exe:
-            # Fallback: pyttsx3 (bloccante) se espeak non è disponibile
+        if self._start_sentence_reading(text):
+            self.read_button.setToolTip(
+                "Pausa/Ferma la lettura (Alt+← / Alt+→: frase precedente/successiva)"
+            )
+        else:
+            exe = shutil.which("espeak-ng") or shutil.which("espeak")
+            if not exe:
+                # Fallback: pyttsx3 (bloccante) se espeak non è disponibile
+                try:
+                    if self.tts_engine is None:
+                        import pyttsx3
+
+                        self.tts_engine = pyttsx3.init()
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
+                except Exception:
+                    pass
+                return
+
             try:
-                if self.tts_engine is None:
-                    self.tts_engine = pyttsx3.init()
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                self._tts_proc = subprocess.Popen(
+                    [exe, "-v", "it", "-s", "150", text],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
             except Exception:
-                pass
-            return
+                return
 
-        try:
-            self._tts_proc = subprocess.Popen(
-                [exe, "-v", "it", "-s", "150", text],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        except Exception:
-            return
+            self._tts_timer = QTimer(self)
+            self._tts_timer.timeout.connect(self._check_reading_done)
+            self._tts_timer.start(300)
+            self.read_button.setToolTip("Pausa/Ferma la lettura")
 
         self.is_reading = True
         self.read_button.setText("⏸️")
-        self.read_button.setToolTip("Pausa/Ferma la lettura")
 
-        from PyQt6.QtCore import QTimer
+    def _start_sentence_reading(self, text):
+        """Avvia TTSThread per i testi di più frasi; False se non serve o non c'è."""
+        try:
+            from Artificial_Intelligence.Sintesi_Vocale.managers.tts_manager import TTSThread
+        except ImportError:
+            try:
+                from assistente_dsa.Artificial_Intelligence.Sintesi_Vocale.managers.tts_manager import (
+                    TTSThread,
+                )
+            except ImportError:
+                return False
+
+        tts = self.settings.get("tts", {})
+        thread = TTSThread(
+            text,
+            engine_name=tts.get("tts_engine", "pyttsx3"),
+            voice_or_lang=tts.get("tts_voice_or_lang", "it"),
+            speed=tts.get("tts_speed", 1.0),
+            pitch=tts.get("tts_pitch", 1.0),
+        )
+        if len(thread.sentences) < 2:
+            return False
+
+        self._tts_thread = thread
+        self._reading_text = text
+        self._reading_label_text = self.text_label.text()
+        thread.sentence_started.connect(self._highlight_sentence)
+        thread.finished_reading.connect(self._stop_reading)
+        thread.error_occurred.connect(
+            lambda message: logging.warning(f"Lettura del pensierino: {message}")
+        )
+        thread.start()
+        return True
+
+    def _highlight_sentence(self, index, start, end):
+        """Evidenzia nel pensierino la frase che si sta leggendo."""
+        if self._tts_thread is None or "<" in self._reading_label_text:
+            return  # lettura finita, o testo formattato (offset non validi nell'HTML)
+        text = self._reading_text
+
+        def piece(t):
+            return html.escape(t).replace("\n", "<br>")
+
+        self.text_label.setText(
+            piece(text[:start])
+            + '<span style="background-color: #fff59d;">'
+            + piece(text[start:end])
+            + "</span>"
+            + piece(text[end:])
+        )
 
-        self._tts_timer = QTimer(self)
-        self._tts_timer.timeout.connect(self._check_reading_done)
-        self._tts_timer.start(300)
+    def skip_sentence(self, step):
+        """Salta avanti (step > 0) o indietro di una frase; False se non sta leggendo a frasi."""
+        if self._tts_thread is None:
+            return False
+        if step > 0:
+            self._tts_thread.skip_forward()
+        else:
+            self._tts_thread.skip_back()
+        return True
 
     def _check_reading_done(self):
         if self._tts_proc is None or self._tts_proc.poll() is not None:
@@ -268,6 +399,17 @@ class DraggableTextWidget(QFrame):
         if self._tts_timer is not None:
             self._tts_timer.stop()
             self._tts_timer = None
+        thread = self._tts_thread
+        if thread is not None:
+            self._tts_thread = None
+            thread.stop()
+            if thread.isRunning():
+                # Riferimento tenuto finché run() non esce (niente wait nella UI)
+                _finishing_tts_threads.add(thread)
+                thread.finished.connect(lambda: _finishing_tts_threads.discard(thread))
+        if self._reading_label_text is not None:
+            self.text_label.setText(self._reading_label_text)
+            self._reading_label_text = None
         if self.tts_engine:
             try:
                 self.tts_engine.stop()
@@ -324,57 +466,20 @@ class DraggableTextWidget(QFrame):
         return None
 
     def update_selection_style(self):
-        """Aggiorna lo stile del widget in base allo stato di selezione."""
-        base_style = WIDGET_STYLE_SHEET
+        """Aggiorna lo stile del widget in base allo stato di selezione.
 
+        Cambia solo la proprietà "selected": le regole sono già nel foglio
+        di stile dell'applicazione, vengono rilucidati il widget e i figli.
+        """
+        get_theme_engine().set_state(self, "selected", self.is_selected, descendants=True)
+
+        original_text = self.original_text
         if self.is_selected:
-            # Stile per widget selezionato - MOLTO EVIDENTE
-            selected_style = """
-                QFrame {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(0, 123, 255, 0.3), stop:1 rgba(0, 123, 255, 0.15));
-                    border-radius: 18px;
-                    margin: 3px;
-                    color: black;
-                    border: 6px solid #007bff;
-                    box-shadow: 0 0 40px rgba(0, 123, 255, 1.0),
-                               0 0 80px rgba(0, 123, 255, 0.8),
-                               inset 0 0 20px rgba(0, 123, 255, 0.4);
-                    transform: scale(1.02);
-                }
-                QPushButton {
-                    background-color: rgba(0, 123, 255, 0.6);
-                    border: 3px solid rgba(0, 123, 255, 0.8);
-                    border-radius: 15px;
-                    padding: 8px 16px;
-                    color: white;
-                    font-weight: bold;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: rgba(0, 123, 255, 0.7);
-                    border-color: rgba(0, 123, 255, 1.0);
-                    box-shadow: 0 0 15px rgba(0, 123, 255, 0.8);
-                }
-                QLabel {
-                    color: #0056b3;
-                    font-weight: bold;
-                    font-size: 14px;
-                    text-shadow: 0 0 8px rgba(0, 123, 255, 0.6);
-                }
-            """
-            self.setStyleSheet(selected_style)
-
-            # Modifica il testo per indicare selezione attiva con icona più prominente
-            original_text = self.original_text
+            # Icona per indicare la selezione attiva
             if not original_text.startswith("⭐ "):
-                self.text_label.setText("⭐ {original_text}")
+                self.text_label.setText(f"⭐ {original_text}")
         else:
-            # Stile normale
-            self.setStyleSheet(base_style)
-
             # Ripristina il testo originale
-            original_text = self.original_text
             if original_text.startswith("⭐ "):
                 self.text_label.setText(original_text[2:])  # Rimuovi "⭐ "
             else:
@@ -389,11 +494,63 @@ class DraggableTextWidget(QFrame):
         if not main_window:
             return
 
-        # Analizza il contenuto
+        # Analisi già fatta (anche da un altro widget con lo stesso testo)
+        key = _analysis_key(text)
+        _claim_details(self, key)
+        metadata = _cached_analysis(key)
+        if metadata is not None:
+            main_window.show_text_in_details(metadata)
+            return
+
+        if len(text) < LONG_TEXT_ANALYSIS_CHARS:
+            main_window.show_text_in_details(self._compute_analysis(key, text))
+            return
+
+        # Testo lungo: analisi in background, la UI resta reattiva
+        main_window.show_text_in_details("⏳ Analisi del contenuto in corso...")
+        analysis_stats["background"] += 1
+        self._analysis_key = key
+        self._analysis_future = _get_analysis_executor().submit(
+            self._compute_analysis, key, text
+        )
+        if self._analysis_timer is None:
+            self._analysis_timer = QTimer(self)
+            self._analysis_timer.timeout.connect(self._check_analysis_done)
+        self._analysis_timer.start(50)
+
+    def _compute_analysis(self, key, text):
+        """Esegue l'analisi e la memorizza; i percorsi file non vanno in cache."""
         metadata = self._analyze_content(text)
+        analysis_stats["computed"] += 1
+        if not metadata.startswith("📁"):
+            _store_analysis(key, metadata)
+        return metadata
 
-        # Mostra i metadati nei dettagli
-        main_window.show_text_in_details(metadata)
+    def _cancel_analysis(self):
+        """Ferma l'attesa dell'analisi in background (se non è ancora partita, la annulla)."""
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+        if self._analysis_future is not None:
+            self._analysis_future.cancel()
+            self._analysis_future = None
+
+    def _check_analysis_done(self):
+        future = self._analysis_future
+        if future is None or not future.done():
+            return
+        self._analysis_timer.stop()
+        self._analysis_future = None
+        if not _owns_details(self, self._analysis_key):
+            # Nel frattempo il pannello è passato a un altro pensierino
+            analysis_stats["dropped"] += 1
+            return
+        main_window = self._find_main_window()
+        if main_window is None:
+            return
+        try:
+            main_window.show_text_in_details(future.result())
+        except Exception as e:
+            logging.error(f"Errore analisi contenuto: {e}")
 
     def _find_main_window(self):
         """Trova la finestra principale risalendo la gerarchia dei widget."""
@@ -17,11 +17,19 @@ Regole:
 Funziona nella finestra principale (l'anello è un figlio del
 centralWidget, come il cursore del mano-mouse); nelle finestre di
 dialogo modali il puntatore resta gestito da mouse/mano come sempre.
+
+La ricerca del widget sotto il puntatore gira a ogni tick: con il
+mano-mouse il puntatore trema di un pixel ma non sta mai fermo. Per
+questo il risultato viene memorizzato: entro pochi pixel dall'ultimo
+punto vale quello di prima, e per i widget già incontrati il loro
+rettangolo porta direttamente al bersaglio. Spostamenti, ridimensionamenti
+e cambi di layout della finestra azzerano la cache.
 """
 
 import time
+from collections import OrderedDict, deque
 
-from PyQt6.QtCore import QObject, QPoint, QPointF, Qt, QTimer, QEvent
+from PyQt6.QtCore import QObject, QPoint, QPointF, QRect, Qt, QTimer, QEvent
 from PyQt6.QtGui import QColor, QCursor, QMouseEvent, QPainter, QPen
 from PyQt6.QtWidgets import (
     QAbstractButton,
@@ -49,6 +57,20 @@ INTERACTIVE_TYPES = (
     QTextEdit,
 )
 
+# Eventi che cambiano la posizione dei widget sullo schermo
+_LAYOUT_EVENTS = frozenset(
+    (
+        QEvent.Type.LayoutRequest,
+        QEvent.Type.Move,
+        QEvent.Type.Resize,
+        QEvent.Type.Show,
+        QEvent.Type.Hide,
+        QEvent.Type.ChildAdded,
+        QEvent.Type.ChildRemoved,
+        QEvent.Type.WindowStateChange,
+    )
+)
+
 
 class DwellProgressRing(QWidget):
     """Anello che si riempie accanto al puntatore durante la sosta."""
@@ -88,6 +110,9 @@ class GlobalDwellClicker(QObject):
     DWELL_MS = 900  # come la tastiera virtuale
     TICK_MS = 100
     MOVE_RESET_PX = 14  # spostarsi oltre questo raggio riparte il conteggio
+    HIT_JITTER_PX = 3  # tremolio del puntatore: entro questo raggio stesso bersaglio
+    HIT_CACHE_SIZE = 32  # widget ricordati con il loro rettangolo
+    TICK_SAMPLES = 200  # durate dei tick tenute per il resoconto
 
     def __init__(self, main_window, pointer_provider=None):
         super().__init__(main_window)
@@ -104,6 +129,36 @@ class GlobalDwellClicker(QObject):
         self._since = 0.0
         self._fired = False
 
+        # Cache della ricerca del bersaglio
+        self._hits = OrderedDict()  # widget profondo -> (rettangolo globale, àncora)
+        self._last_hit = None  # (punto, àncora, widget profondo, epoca, rettangolo)
+        self._epoch = 0  # cresce a ogni cambio di layout: invalida _last_hit
+        self.stats = {"ticks": 0, "hit_tests": 0, "cache_hits": 0, "jitter_skips": 0}
+        self.tick_costs = deque(maxlen=self.TICK_SAMPLES)  # ms per tick
+        main_window.installEventFilter(self)
+        central = main_window.centralWidget()
+        if central is not None:
+            central.installEventFilter(self)
+
+    def eventFilter(self, a0, a1):
+        if a1.type() in _LAYOUT_EVENTS:
+            self.invalidate_hits()
+        return False
+
+    def invalidate_hits(self):
+        """Dimentica i bersagli memorizzati (il layout è cambiato)."""
+        self._epoch += 1
+        self._last_hit = None
+        self._hits.clear()
+
+    def tick_report(self):
+        """Contatori della cache e costo dei tick (ms, medio e massimo)."""
+        costs = list(self.tick_costs)
+        report = dict(self.stats)
+        report["mean_ms"] = sum(costs) / len(costs) if costs else 0.0
+        report["max_ms"] = max(costs) if costs else 0.0
+        return report
+
     def set_enabled(self, on):
         if on:
             self._timer.start()
@@ -164,6 +219,72 @@ class GlobalDwellClicker(QObject):
             w = w.parentWidget()
         return None, None
 
+    def _cached_target(self, global_pos):
+        """Come _target_at, ma senza rifare la ricerca quando non serve.
+
+        Nei popup (tendine, menù: aperti per poco) si cerca sempre. Per il
+        resto: entro HIT_JITTER_PX dall'ultimo punto vale l'ultimo
+        risultato (se il suo widget non si è spostato); altrimenti, se il punto cade nel rettangolo di un widget
+        già incontrato (ancora visibile e nello stesso posto), vale la sua
+        àncora. Si memorizzano solo widget "foglia", senza figli visibili
+        che potrebbero coprirne una parte.
+        """
+        if QApplication.activePopupWidget() is not None:
+            self.stats["hit_tests"] += 1
+            return self._target_at(global_pos)
+
+        last = self._last_hit
+        if (
+            last is not None
+            and last[3] == self._epoch
+            and (global_pos - last[0]).manhattanLength() <= self.HIT_JITTER_PX
+            and (
+                last[2] is None
+                # ancora visibile e nello stesso posto: uno scorrimento o un
+                # pannello interno che si risistema non avvisano l'event filter
+                or (self._visible(last[2]) and self._global_rect(last[2]) == last[4])
+            )
+        ):
+            self.stats["jitter_skips"] += 1
+            return last[1], last[2]
+
+        found = None
+        for deep, (rect, anchor) in self._hits.items():
+            if rect.contains(global_pos):
+                found = deep, rect, anchor
+                break
+        if found is not None:
+            deep, rect, anchor = found
+            if self._visible(deep) and self._global_rect(deep) == rect:
+                self._hits.move_to_end(deep)
+                self.stats["cache_hits"] += 1
+                self._last_hit = (global_pos, anchor, deep, self._epoch, rect)
+                return anchor, deep
+            del self._hits[deep]  # spostato, nascosto o distrutto senza avvisare
+
+        self.stats["hit_tests"] += 1
+        anchor, deep = self._target_at(global_pos)
+        rect = self._global_rect(deep) if deep is not None else None
+        self._last_hit = (global_pos, anchor, deep, self._epoch, rect)
+        if deep is not None and not deep.findChildren(
+            QWidget, options=Qt.FindChildOption.FindDirectChildrenOnly
+        ):
+            self._hits[deep] = (rect, anchor)
+            while len(self._hits) > self.HIT_CACHE_SIZE:
+                self._hits.popitem(last=False)
+        return anchor, deep
+
+    @staticmethod
+    def _visible(widget):
+        try:
+            return widget.isVisible()
+        except RuntimeError:  # widget distrutto nel frattempo
+            return False
+
+    @staticmethod
+    def _global_rect(widget):
+        return QRect(widget.mapToGlobal(QPoint(0, 0)), widget.size())
+
     def _keyboard_handles_it(self, widget):
         """True se il widget è nella tastiera virtuale con la SUA sosta accesa."""
         kb = getattr(self.win, "virtual_keyboard", None)
@@ -180,6 +301,14 @@ class GlobalDwellClicker(QObject):
         return False
 
     def _tick(self):
+        start = time.perf_counter()
+        try:
+            self._tick_step()
+        finally:
+            self.stats["ticks"] += 1
+            self.tick_costs.append((time.perf_counter() - start) * 1000.0)
+
+    def _tick_step(self):
         # Mentre il mano-mouse trascina o tiene premuto, la sosta tace
         hand = getattr(self.win, "hand_mouse", None)
         if hand is not None and getattr(hand, "pressed", False):
@@ -187,7 +316,7 @@ class GlobalDwellClicker(QObject):
             return
 
         pos = self._pointer_pos()
-        target, deep = self._target_at(pos)
+        target, deep = self._cached_target(pos)
         if target is not None and self._keyboard_handles_it(target):
             target = None
         if target is None:
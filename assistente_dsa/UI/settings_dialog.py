@@ -195,6 +195,34 @@ class SettingsDialog(QDialog):
         )
         app_layout.addWidget(self.bypass_login_checkbox)
 
+        # Preriscaldamento all'avvio (core/startup_scheduler.py): a finestra
+        # già pronta carica in background i moduli di webcam e voce
+        self.warmup_vision_checkbox = QCheckBox("Prepara la webcam all'avvio")
+        self.warmup_vision_checkbox.setToolTip(
+            "Dopo l'apertura carica in background i moduli della webcam:\n"
+            "il primo avvio della webcam è più rapido (più memoria usata)"
+        )
+        app_layout.addWidget(self.warmup_vision_checkbox)
+        self.warmup_speech_checkbox = QCheckBox("Prepara il riconoscimento vocale all'avvio")
+        self.warmup_speech_checkbox.setToolTip(
+            "Dopo l'apertura carica in background i moduli della voce"
+        )
+        app_layout.addWidget(self.warmup_speech_checkbox)
+
+        # Metriche locali per le postazioni sempre accese (core/metrics_exporter.py)
+        self.metrics_exporter_checkbox = QCheckBox("Esporta metriche in locale (Prometheus)")
+        self.metrics_exporter_checkbox.setToolTip(
+            "Pubblica prestazioni, memoria e cache su http://127.0.0.1:9464/metrics\n"
+            "e nel file debug_logs/metrics.prom, aggiornati ogni 15 secondi"
+        )
+        app_layout.addWidget(self.metrics_exporter_checkbox)
+        self.memory_watch_checkbox = QCheckBox("Cerca le crescite di memoria (più lento)")
+        self.memory_watch_checkbox.setToolTip(
+            "Confronta ogni minuto le allocazioni con quelle iniziali e, se la memoria\n"
+            "cresce di 50 MB, salva in debug_logs/ le righe di codice responsabili"
+        )
+        app_layout.addWidget(self.memory_watch_checkbox)
+
         layout.addWidget(app_group)
 
         # Gruppo voce: parola d'ordine per l'ascolto continuo
@@ -1210,6 +1238,18 @@ class SettingsDialog(QDialog):
             self.bypass_login_checkbox.setChecked(
                 get_setting("startup.bypass_login", False)
             )
+            self.warmup_vision_checkbox.setChecked(
+                get_setting("startup.warmup_vision", False)
+            )
+            self.warmup_speech_checkbox.setChecked(
+                get_setting("startup.warmup_speech", False)
+            )
+            self.metrics_exporter_checkbox.setChecked(
+                get_setting("diagnostics.metrics_exporter_enabled", False)
+            )
+            self.memory_watch_checkbox.setChecked(
+                get_setting("diagnostics.memory_watch_enabled", False)
+            )
             self.wake_word_edit.setText(get_setting("wake_word", "scrivi"))
 
             # AI
@@ -1241,6 +1281,15 @@ class SettingsDialog(QDialog):
             set_setting("application.app_name", self.app_name_edit.text())
             set_setting("application.theme", self.theme_combo.currentText())
             set_setting("startup.bypass_login", self.bypass_login_checkbox.isChecked())
+            set_setting("startup.warmup_vision", self.warmup_vision_checkbox.isChecked())
+            set_setting("startup.warmup_speech", self.warmup_speech_checkbox.isChecked())
+            set_setting(
+                "diagnostics.metrics_exporter_enabled",
+                self.metrics_exporter_checkbox.isChecked(),
+            )
+            set_setting(
+                "diagnostics.memory_watch_enabled", self.memory_watch_checkbox.isChecked()
+            )
             set_setting(
                 "wake_word", self.wake_word_edit.text().strip().lower() or "scrivi"
             )
@@ -1294,6 +1343,13 @@ class SettingsDialog(QDialog):
             win = self._main_window()
             if win is not None and hasattr(win, "refresh_difficulty_observer"):
                 win.refresh_difficulty_observer()
+            if win is not None and hasattr(win, "refresh_metrics_exporter"):
+                win.refresh_metrics_exporter()
+            if win is not None and hasattr(win, "refresh_memory_watch"):
+                win.refresh_memory_watch()
+            # Nuovo tema: un solo foglio di stile per l'applicazione
+            if win is not None and hasattr(win, "apply_theme"):
+                win.apply_theme(self.theme_combo.currentText())
             # Ricolora subito il cursore della mano se esiste
             if win is not None:
                 hm = getattr(win, "hand_mouse", None)
@@ -0,0 +1,361 @@
+"""
+Colonna di testi virtualizzata (pensierini / area di lavoro)
+
+Per progetti con molti elementi creare un ``DraggableTextWidget`` per ogni
+testo (layout, pulsanti, stile, analisi) rende caricamento e scorrimento
+lentissimi. Qui i testi vivono in un modello (``TextColumnModel``), la
+vista (``TextColumnView``) disegna solo le righe visibili tramite un
+delegate e costruisce il widget completo, con i suoi pulsanti, solo per
+l'elemento su cui si sta lavorando (quello selezionato).
+"""
+
+import logging
+import re
+
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QMimeData,
+    QModelIndex,
+    QPersistentModelIndex,
+    QRectF,
+    QSize,
+    Qt,
+)
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QTextDocument
+from PyQt6.QtWidgets import QAbstractItemView, QListView, QStyle, QStyledItemDelegate
+
+# Stessi valori del DraggableTextWidget, così le righe disegnate e il widget
+# aperto per la modifica hanno lo stesso aspetto
+DEFAULT_FONT_SIZE = 12
+ITEM_MIN_HEIGHT = 60
+ITEM_MARGIN = 5
+ITEM_PADDING = 10
+ITEM_RADIUS = 15
+MAX_PAINTED_LINES = 6
+# Colonne con almeno questo numero di elementi vengono caricate nella vista
+VIRTUAL_THRESHOLD = 50
+
+# I pensierini formattati contengono HTML (colori, dimensioni)
+_HTML_TAG = re.compile(r"<[a-zA-Z/][^>]*>")
+
+
+def _set_document_text(doc, text):
+    if _HTML_TAG.search(text):
+        doc.setHtml(text)
+    else:
+        doc.setPlainText(text)
+
+
+class TextColumnModel(QAbstractListModel):
+    """Elenco dei testi di una colonna."""
+
+    def __init__(self, texts=None, parent=None):
+        super().__init__(parent)
+        self._texts = list(texts or [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._texts)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._texts):
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self._texts[index.row()]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._texts[index.row()][:500]
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        if self._texts[index.row()] == value:
+            return True
+        self._texts[index.row()] = value
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+        return True
+
+    def flags(self, index):
+        base = super().flags(index)
+        if not index.isValid():
+            return base | Qt.ItemFlag.ItemIsDropEnabled
+        return base | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsDragEnabled
+
+    # ------------------------------------------------------------------
+    # Modifiche all'elenco
+    # ------------------------------------------------------------------
+    def texts(self):
+        return list(self._texts)
+
+    def set_texts(self, texts):
+        self.beginResetModel()
+        self._texts = list(texts)
+        self.endResetModel()
+
+    def append_text(self, text):
+        row = len(self._texts)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._texts.append(text)
+        self.endInsertRows()
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or row + count > len(self._texts):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self._texts[row:row + count]
+        self.endRemoveRows()
+        return True
+
+    def moveRows(self, source_parent, source_row, count, dest_parent, dest_row):
+        if source_parent.isValid() or dest_parent.isValid():
+            return False
+        if source_row <= dest_row <= source_row + count:
+            return False  # spostamento su se stesso
+        if not self.beginMoveRows(
+            source_parent, source_row, source_row + count - 1, dest_parent, dest_row
+        ):
+            return False
+        moved = self._texts[source_row:source_row + count]
+        del self._texts[source_row:source_row + count]
+        if dest_row > source_row:
+            dest_row -= count
+        self._texts[dest_row:dest_row] = moved
+        self.endMoveRows()
+        return True
+
+    # ------------------------------------------------------------------
+    # Trascinamento (stesso formato dei DraggableTextWidget)
+    # ------------------------------------------------------------------
+    def mimeTypes(self):
+        return ["text/plain", "application/x-draggable-widget"]
+
+    def mimeData(self, indexes):
+        mime = QMimeData()
+        mime.setText("\n".join(self._texts[i.row()] for i in indexes if i.isValid()))
+        mime.setData("application/x-draggable-widget", b"widget")
+        return mime
+
+    def supportedDragActions(self):
+        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
+
+    def supportedDropActions(self):
+        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
+
+    def dropMimeData(self, data, action, row, column, parent):
+        """Testo trascinato da fuori: diventa un nuovo elemento."""
+        if not data.hasText() or not data.text().strip():
+            return False
+        row = row if row >= 0 else len(self._texts)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._texts.insert(row, data.text())
+        self.endInsertRows()
+        return True
+
+
+class TextItemDelegate(QStyledItemDelegate):
+    """Disegna i testi come "schede" e apre il widget completo per la modifica."""
+
+    def __init__(self, settings, widget_factory=None, parent=None):
+        super().__init__(parent)
+        self.settings = settings or {}
+        self.widget_factory = widget_factory
+        font_size = self.settings.get("fonts", {}).get(
+            "pensierini_font_size", DEFAULT_FONT_SIZE
+        )
+        self.font = QFont()
+        self.font.setBold(True)
+        self.font.setPixelSize(int(font_size))
+        self._metrics = QFontMetrics(self.font)
+        # Altezza calcolata per (testo, larghezza): lo scorrimento non
+        # ricalcola l'impaginazione delle righe già viste
+        self._size_cache = {}
+
+    def _text_height(self, text, width):
+        key = (hash(text), width)
+        height = self._size_cache.get(key)
+        if height is None:
+            doc = QTextDocument()
+            doc.setDefaultFont(self.font)
+            doc.setTextWidth(max(width, 50))
+            _set_document_text(doc, text)
+            max_height = self._metrics.lineSpacing() * MAX_PAINTED_LINES
+            height = int(min(doc.size().height(), max_height))
+            if len(self._size_cache) > 10000:
+                self._size_cache.clear()
+            self._size_cache[key] = height
+        return height
+
+    def sizeHint(self, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        width = option.rect.width() or 250
+        height = self._text_height(text, width - 2 * (ITEM_MARGIN + ITEM_PADDING))
+        height = max(ITEM_MIN_HEIGHT, height + 2 * (ITEM_MARGIN + ITEM_PADDING))
+        # La riga con il widget aperto deve contenerne anche i pulsanti
+        view = self.parent()
+        editor = view.indexWidget(index) if isinstance(view, QListView) else None
+        if editor is not None:
+            height = max(height, editor.sizeHint().height())
+        return QSize(width, height)
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        card = QRectF(option.rect).adjusted(ITEM_MARGIN, ITEM_MARGIN, -ITEM_MARGIN, -ITEM_MARGIN)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor(74, 144, 226), 2) if selected else Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(255, 255, 255, 180))
+        painter.drawRoundedRect(card, ITEM_RADIUS, ITEM_RADIUS)
+
+        text_rect = card.adjusted(ITEM_PADDING, ITEM_PADDING, -ITEM_PADDING, -ITEM_PADDING)
+        painter.translate(text_rect.topLeft())
+        doc = QTextDocument()
+        doc.setDefaultFont(self.font)
+        doc.setTextWidth(text_rect.width())
+        _set_document_text(doc, text)
+        painter.setClipRect(QRectF(0, 0, text_rect.width(), text_rect.height()))
+        doc.drawContents(painter)
+        painter.restore()
+
+    # ------------------------------------------------------------------
+    # Widget completo per l'elemento su cui si lavora
+    # ------------------------------------------------------------------
+    def createEditor(self, parent, option, index):
+        if self.widget_factory is None:
+            return None
+        text = index.data(Qt.ItemDataRole.EditRole) or ""
+        editor = self.widget_factory(text, self.settings, parent)
+        # "Elimina" deve togliere la riga dal modello, non solo il widget
+        delete_button = getattr(editor, "delete_button", None)
+        if delete_button is not None:
+            delete_button.clicked.disconnect()
+            persistent = QPersistentModelIndex(index)
+            delete_button.clicked.connect(lambda: self._delete_row(editor, persistent))
+        return editor
+
+    def _delete_row(self, editor, persistent):
+        if hasattr(editor, "stop_reading"):
+            editor.stop_reading()
+        view = self.parent()
+        if persistent.isValid() and hasattr(view, "remove_row"):
+            view.remove_row(persistent.row())
+
+    def setEditorData(self, editor, index):
+        pass  # il testo è già passato al costruttore del widget
+
+    def setModelData(self, editor, model, index):
+        text_label = getattr(editor, "text_label", None)
+        if text_label is not None:
+            model.setData(index, text_label.text(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+class TextColumnView(QListView):
+    """Vista virtualizzata di una colonna di testi."""
+
+    def __init__(self, settings, texts=None, widget_factory=None, parent=None):
+        super().__init__(parent)
+        self._active = None  # QPersistentModelIndex con il widget aperto
+        self._fit_target = None
+        self.setModel(TextColumnModel(texts, self))
+        self.setItemDelegate(TextItemDelegate(settings, widget_factory, self))
+
+        # Le righe vengono impaginate a blocchi, non tutte all'apertura
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(50)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setWordWrap(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.selectionModel().currentChanged.connect(self._on_current_changed)
+
+    # ------------------------------------------------------------------
+    # Un solo widget completo: quello dell'elemento corrente
+    # ------------------------------------------------------------------
+    def _on_current_changed(self, current, _previous):
+        self.close_active_editor()
+        if current.isValid() and self.itemDelegate().widget_factory is not None:
+            self._active = QPersistentModelIndex(current)
+            self.openPersistentEditor(current)
+            self.itemDelegate().sizeHintChanged.emit(current)
+
+    def close_active_editor(self):
+        """Riporta nel modello il testo del widget aperto e lo distrugge."""
+        active, self._active = self._active, None
+        if active is None or not active.isValid():
+            return
+        index = self.model().index(active.row(), 0)
+        editor = self.indexWidget(index)
+        if editor is not None:
+            self.itemDelegate().setModelData(editor, self.model(), index)
+            if hasattr(editor, "stop_reading"):
+                editor.stop_reading()
+        self.closePersistentEditor(index)
+
+    def active_editor(self):
+        """Il widget aperto (o None)."""
+        if self._active is None or not self._active.isValid():
+            return None
+        return self.indexWidget(self.model().index(self._active.row(), 0))
+
+    # ------------------------------------------------------------------
+    # API della colonna
+    # ------------------------------------------------------------------
+    def texts(self):
+        """Testi della colonna, compresa la modifica in corso nel widget aperto."""
+        editor = self.active_editor()
+        if editor is not None:
+            self.itemDelegate().setModelData(
+                editor, self.model(), self.model().index(self._active.row(), 0)
+            )
+        return self.model().texts()
+
+    def count(self):
+        return self.model().rowCount()
+
+    def add_text(self, text):
+        self.model().append_text(text)
+
+    def remove_row(self, row):
+        if self._active is not None and self._active.row() == row:
+            index = self.model().index(row, 0)
+            self._active = None
+            self.closePersistentEditor(index)
+        self.model().removeRows(row, 1)
+
+    # ------------------------------------------------------------------
+    # Dimensioni: la vista occupa l'area visibile della colonna
+    # ------------------------------------------------------------------
+    def fit_to(self, scroll_area):
+        """Adatta l'altezza all'area di scorrimento che contiene la colonna."""
+        self._fit_target = scroll_area.viewport()
+        self._fit_target.installEventFilter(self)
+        self._fit()
+
+    def _fit(self):
+        if self._fit_target is not None:
+            self.setFixedHeight(max(ITEM_MIN_HEIGHT * 3, self._fit_target.height() - 20))
+
+    def eventFilter(self, obj, event):
+        if obj is self._fit_target and event.type() == QEvent.Type.Resize:
+            self._fit()
+        return super().eventFilter(obj, event)
+
+
+def make_text_column(settings, texts, widget_factory=None, scroll_area=None):
+    """Crea una colonna virtualizzata già popolata (comodo per i caricamenti)."""
+    view = TextColumnView(settings, texts, widget_factory)
+    if scroll_area is not None:
+        try:
+            view.fit_to(scroll_area)
+        except Exception as e:
+            logging.debug(f"Adattamento colonna virtualizzata non riuscito: {e}")
+    return view
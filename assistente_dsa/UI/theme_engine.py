@@ -0,0 +1,560 @@
+"""
+Theme Engine - Un solo foglio di stile per tutta l'applicazione
+
+Il foglio di stile viene costruito una volta dal tema scelto nelle
+Impostazioni (Chiaro, Scuro, Automatico) e impostato sull'applicazione
+prima di creare la finestra principale: i widget vengono "lucidati"
+(polish) una volta sola, alla creazione, invece di ricalcolare l'intero
+albero quando uno stylesheet viene aggiunto a finestra già costruita.
+
+Gli stati (pensierino selezionato, pulsante ON/OFF, ...) non cambiano lo
+stylesheet del widget: ``set_state`` imposta una proprietà dinamica, a
+cui il foglio di stile risponde con selettori come
+``QFrame#pensierino[selected="true"]``, e rilucida solo quel widget.
+
+``metrics`` riporta quante volte il foglio è stato costruito e applicato
+e quante rilucidature di stato sono state fatte; con ``enable_counter``
+(attivo con COGNIFLOW_PROFILE) conta anche gli eventi Polish, StyleChange
+e Paint di tutta l'applicazione, per confrontare prima e dopo.
+"""
+
+import logging
+from string import Template
+from typing import Any, Dict, Optional
+
+from PyQt6.QtCore import QEvent, QObject
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QApplication, QWidget
+
+THEMES = ("Chiaro", "Scuro", "Automatico")
+DEFAULT_THEME = "Chiaro"
+
+# Colori per tema: i nomi sono i segnaposto ($nome) di _STYLE_TEMPLATE
+PALETTES: Dict[str, Dict[str, str]] = {
+    "Chiaro": {
+        "bg_top": "#f8f9fa",
+        "bg_bottom": "#e9ecef",
+        "text": "#212529",
+        "muted": "#495057",
+        "border": "#dee2e6",
+        "surface": "rgba(255, 255, 255, 0.8)",
+        "surface_strong": "rgba(255, 255, 255, 0.95)",
+        "input_bg": "#ffffff",
+        "input_border": "#ced4da",
+        "accent": "#2196f3",
+        "accent_strong": "#007bff",
+        "button_top": "#ffffff",
+        "button_bottom": "#f8f9fa",
+        "button_text": "#495057",
+        "hover_top": "#e3f2fd",
+        "hover_bottom": "#bbdefb",
+        "hover_text": "#1976d2",
+        "pressed_top": "#bbdefb",
+        "pressed_bottom": "#90caf9",
+        "disabled_bg": "#f5f5f5",
+        "disabled_text": "#9e9e9e",
+        "disabled_border": "#e0e0e0",
+        "scroll_bg": "#f8f9fa",
+        "scroll_handle": "#dee2e6",
+        "scroll_handle_hover": "#adb5bd",
+    },
+    "Scuro": {
+        "bg_top": "#2b2f33",
+        "bg_bottom": "#212529",
+        "text": "#e9ecef",
+        "muted": "#ced4da",
+        "border": "#495057",
+        "surface": "rgba(52, 58, 64, 0.85)",
+        "surface_strong": "rgba(52, 58, 64, 0.95)",
+        "input_bg": "#343a40",
+        "input_border": "#6c757d",
+        "accent": "#64b5f6",
+        "accent_strong": "#4dabf7",
+        "button_top": "#3d434a",
+        "button_bottom": "#343a40",
+        "button_text": "#e9ecef",
+        "hover_top": "#1e3a5f",
+        "hover_bottom": "#1b4f80",
+        "hover_text": "#ffffff",
+        "pressed_top": "#1b4f80",
+        "pressed_bottom": "#1565c0",
+        "disabled_bg": "#2b2f33",
+        "disabled_text": "#6c757d",
+        "disabled_border": "#3d434a",
+        "scroll_bg": "#2b2f33",
+        "scroll_handle": "#495057",
+        "scroll_handle_hover": "#6c757d",
+    },
+}
+
+_STYLE_TEMPLATE = Template(
+    """
+/* Stili base */
+QWidget {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 $bg_top, stop:1 $bg_bottom);
+    color: $text;
+}
+
+QGroupBox {
+    font-weight: bold;
+    font-size: 14px;
+    color: $muted;
+    border: 2px solid $border;
+    border-radius: 8px;
+    margin-top: 12px;
+    padding-top: 20px;
+    background: $surface;
+}
+
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 12px;
+    padding: 4px 8px;
+    color: $muted;
+    font-weight: bold;
+    background: $surface_strong;
+    border-radius: 4px;
+}
+
+QGroupBox#pensierini_group {
+    font-size: 12px;
+    font-weight: bold;
+    margin-top: 6px;
+    padding-top: 12px;
+    min-height: 80px;
+    border: 1px solid $border;
+    border-radius: 6px;
+}
+
+QGroupBox#results_group {
+    font-size: 13px;
+    font-weight: bold;
+    margin-top: 6px;
+    padding-top: 12px;
+    border: 2px solid #28a745;
+    border-radius: 6px;
+    background: $surface_strong;
+}
+
+QGroupBox#results_group QTextEdit {
+    border: 1px solid #28a745;
+    border-radius: 4px;
+    font-family: 'Segoe UI', Arial, sans-serif;
+}
+
+/* Pulsanti compatti negli strumenti */
+QTabWidget QPushButton {
+    min-height: 32px;
+    font-size: 11px;
+    padding: 6px 12px;
+    margin: 2px;
+    border-radius: 4px;
+}
+
+/* Griglia delle materie nelle schede */
+QScrollArea QPushButton {
+    min-width: 90px;
+    max-width: 130px;
+    font-size: 10px;
+    padding: 4px 6px;
+    margin: 1px;
+}
+
+QListWidget {
+    background: $surface_strong;
+    border-radius: 6px;
+}
+
+QListWidget::item {
+    border-bottom: 1px solid $border;
+}
+
+QListWidget::item:selected {
+    border-left: 3px solid $accent;
+}
+
+QSplitter::handle {
+    background: rgba(108, 117, 125, 0.3);
+    border-radius: 3px;
+}
+
+QSplitter::handle:hover {
+    background: rgba(108, 117, 125, 0.6);
+}
+
+QSplitter::handle:vertical {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 rgba(74, 144, 226, 0.3),
+        stop:1 rgba(74, 144, 226, 0.5));
+    border: 1px solid rgba(74, 144, 226, 0.6);
+    border-radius: 2px;
+}
+
+QSplitter::handle:vertical:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 rgba(74, 144, 226, 0.6),
+        stop:1 rgba(74, 144, 226, 0.8));
+    border-color: rgba(74, 144, 226, 0.8);
+}
+
+QSplitter::handle:horizontal {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 rgba(74, 144, 226, 0.3),
+        stop:1 rgba(74, 144, 226, 0.5));
+    border: 1px solid rgba(74, 144, 226, 0.6);
+    border-radius: 2px;
+}
+
+QSplitter::handle:horizontal:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 rgba(74, 144, 226, 0.6),
+        stop:1 rgba(74, 144, 226, 0.8));
+    border-color: rgba(74, 144, 226, 0.8);
+}
+
+/* Pulsanti */
+QPushButton {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 $button_top, stop:1 $button_bottom);
+    border: 2px solid $border;
+    border-radius: 6px;
+    padding: 8px 16px;
+    font-weight: 500;
+    font-size: 13px;
+    color: $button_text;
+    min-height: 32px;
+}
+
+QPushButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 $hover_top, stop:1 $hover_bottom);
+    border-color: $accent;
+    color: $hover_text;
+}
+
+QPushButton:pressed {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 $pressed_top, stop:1 $pressed_bottom);
+}
+
+QPushButton:disabled {
+    background: $disabled_bg;
+    color: $disabled_text;
+    border-color: $disabled_border;
+}
+
+/* Pulsanti della barra in alto */
+QPushButton#options_button, QPushButton#toggle_tools_button,
+QPushButton#save_button, QPushButton#load_button {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 $button_top, stop:1 $button_bottom);
+    border: 2px solid #6c757d;
+    font-weight: bold;
+    min-width: 100px;
+}
+
+QPushButton#options_button:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #fff3cd, stop:1 #ffeaa7);
+    border-color: #ffc107;
+    color: #856404;
+}
+
+QPushButton#toggle_tools_button:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #d1ecf1, stop:1 #bee5eb);
+    border-color: #17a2b8;
+    color: #0c5460;
+}
+
+QPushButton#save_button:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #d4edda, stop:1 #c3e6cb);
+    border-color: #28a745;
+    color: #155724;
+}
+
+QPushButton#load_button:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #f8d7da, stop:1 #f5c6cb);
+    border-color: #dc3545;
+    color: #721c24;
+}
+
+/* Aree di testo */
+QTextEdit, QLineEdit {
+    border: 2px solid $input_border;
+    border-radius: 6px;
+    padding: 8px 12px;
+    background: $input_bg;
+    font-size: 13px;
+    selection-background-color: $accent_strong;
+}
+
+QTextEdit:focus, QLineEdit:focus {
+    border-color: $accent_strong;
+}
+
+QScrollArea {
+    border: 1px solid $border;
+    border-radius: 6px;
+    background: $surface;
+}
+
+QScrollBar:vertical {
+    background: $scroll_bg;
+    width: 12px;
+    border-radius: 6px;
+    margin: 2px;
+}
+
+QScrollBar::handle:vertical {
+    background: $scroll_handle;
+    border-radius: 6px;
+    min-height: 30px;
+}
+
+QScrollBar::handle:vertical:hover {
+    background: $scroll_handle_hover;
+}
+
+QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+    border: none;
+    background: none;
+}
+
+/* Footer */
+QLabel#status_footer_label {
+    background: $surface_strong;
+    border: 1px solid $border;
+    border-radius: 8px;
+    font-weight: 500;
+    color: $muted;
+}
+
+QLabel#click_status_label {
+    background: $surface;
+    border: 1px solid $border;
+    border-radius: 6px;
+    font-weight: 500;
+    color: $muted;
+}
+
+QLabel#click_status_label:hover {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 rgba(220, 237, 255, 0.9), stop:1 rgba(187, 222, 251, 0.9));
+    border-color: $accent;
+}
+
+/* ---- Stati (proprietà dinamiche, vedi set_state) ---- */
+
+/* Pensierino: stile normale dopo una deselezione, evidente se selezionato */
+QFrame#pensierino[selected="false"] {
+    background: rgba(255, 255, 255, 0.7);
+    border-radius: 15px;
+    margin: 5px;
+    color: black;
+}
+QFrame#pensierino[selected="false"] QPushButton {
+    background-color: rgba(0, 0, 0, 0.2);
+    border: 1px solid rgba(0, 0, 0, 0.3);
+    border-radius: 12px;
+    padding: 5px 10px;
+    color: white;
+    font-weight: bold;
+}
+QFrame#pensierino[selected="false"] QPushButton:hover {
+    background-color: rgba(0, 0, 0, 0.3);
+}
+QFrame#pensierino[selected="false"] QLabel {
+    color: black;
+}
+QFrame#pensierino[selected="true"] {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 rgba(0, 123, 255, 0.3), stop:1 rgba(0, 123, 255, 0.15));
+    border-radius: 18px;
+    margin: 3px;
+    color: black;
+    border: 6px solid #007bff;
+}
+QFrame#pensierino[selected="true"] QPushButton {
+    background-color: rgba(0, 123, 255, 0.6);
+    border: 3px solid rgba(0, 123, 255, 0.8);
+    border-radius: 15px;
+    padding: 8px 16px;
+    color: white;
+    font-weight: bold;
+    font-size: 12px;
+}
+QFrame#pensierino[selected="true"] QPushButton:hover {
+    background-color: rgba(0, 123, 255, 0.7);
+    border-color: rgba(0, 123, 255, 1.0);
+}
+QFrame#pensierino[selected="true"] QLabel {
+    color: #0056b3;
+    font-weight: bold;
+    font-size: 14px;
+}
+
+/* Selezione a due mani nell'Area di Lavoro */
+QWidget[twoHandSelected="true"], QFrame#pensierino[twoHandSelected="true"] {
+    border: 3px solid #00c8ff;
+    border-radius: 8px;
+}
+
+/* Pulsanti di rilevamento della finestra webcam: colore proprio,
+   grigio se spenti o disabilitati */
+QPushButton#hands_btn, QPushButton#gestures_btn, QPushButton#expressions_btn {
+    color: white;
+    border: none;
+    border-radius: 6px;
+    font-size: 12px;
+    font-weight: bold;
+    padding: 6px 12px;
+}
+QPushButton#hands_btn { background: #17a2b8; }
+QPushButton#hands_btn:hover { background: #138496; }
+QPushButton#hands_btn:pressed { background: #117a8b; }
+QPushButton#gestures_btn { background: #ffc107; color: black; }
+QPushButton#gestures_btn:hover { background: #e0a800; }
+QPushButton#gestures_btn:pressed { background: #d39e00; }
+QPushButton#expressions_btn { background: #fd7e14; }
+QPushButton#expressions_btn:hover { background: #e8590c; }
+QPushButton#expressions_btn:pressed { background: #d8430b; }
+QPushButton#hands_btn:disabled, QPushButton#gestures_btn:disabled,
+QPushButton#expressions_btn:disabled,
+QPushButton#hands_btn[toggleState="off"], QPushButton#gestures_btn[toggleState="off"],
+QPushButton#expressions_btn[toggleState="off"] {
+    background: #6c757d;
+    color: white;
+}
+QPushButton#hands_btn[toggleState="off"]:hover,
+QPushButton#gestures_btn[toggleState="off"]:hover,
+QPushButton#expressions_btn[toggleState="off"]:hover { background: #5a6268; }
+QPushButton#hands_btn[toggleState="off"]:pressed,
+QPushButton#gestures_btn[toggleState="off"]:pressed,
+QPushButton#expressions_btn[toggleState="off"]:pressed { background: #545b62; }
+"""
+)
+
+
+def resolve_theme(name: Optional[str], app: Optional[QApplication] = None) -> str:
+    """Nome del tema effettivo: "Automatico" segue la luminosità del sistema."""
+    if name in PALETTES:
+        return name
+    if name == "Automatico":
+        app = app or QApplication.instance()
+        if app is not None:
+            window = app.palette().color(QPalette.ColorRole.Window)
+            return "Scuro" if window.lightness() < 128 else "Chiaro"
+    return DEFAULT_THEME
+
+
+def build_stylesheet(theme: str) -> str:
+    """Foglio di stile completo per il tema (nome già risolto)."""
+    return _STYLE_TEMPLATE.substitute(PALETTES.get(theme, PALETTES[DEFAULT_THEME]))
+
+
+class PolishCounter(QObject):
+    """Conta gli eventi Polish, StyleChange e Paint dell'applicazione.
+
+    È un filtro su tutta l'applicazione, quindi costa un po' su ogni
+    evento: va acceso solo per misurare (COGNIFLOW_PROFILE).
+    """
+
+    _TYPES = {
+        QEvent.Type.Polish: "polish",
+        QEvent.Type.StyleChange: "style_change",
+        QEvent.Type.Paint: "paint",
+    }
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.counts = {name: 0 for name in self._TYPES.values()}
+
+    def eventFilter(self, obj, event):
+        name = self._TYPES.get(event.type())
+        if name is not None:
+            self.counts[name] += 1
+        return False
+
+
+class ThemeEngine:
+    """Costruisce e applica il foglio di stile; cambia gli stati dei widget."""
+
+    def __init__(self):
+        self.theme: Optional[str] = None
+        self.stylesheet = ""
+        self._built: Dict[str, str] = {}
+        self.counter: Optional[PolishCounter] = None
+        self.stats = {"builds": 0, "app_sets": 0, "state_polish": 0}
+
+    def stylesheet_for(self, theme: str) -> str:
+        if theme not in self._built:
+            self._built[theme] = build_stylesheet(theme)
+            self.stats["builds"] += 1
+        return self._built[theme]
+
+    def apply(self, theme: Optional[str] = None, app: Optional[QApplication] = None) -> str:
+        """Imposta il foglio di stile del tema sull'applicazione.
+
+        Va chiamata prima di creare i widget (o al cambio di tema): se il
+        tema effettivo non cambia non fa nulla.
+        """
+        app = app or QApplication.instance()
+        resolved = resolve_theme(theme, app)
+        sheet = self.stylesheet_for(resolved)
+        if app is not None and (resolved != self.theme or app.styleSheet() != sheet):
+            app.setStyleSheet(sheet)
+            self.stats["app_sets"] += 1
+            logging.info(f"🎨 Tema applicato: {resolved}")
+        self.theme = resolved
+        self.stylesheet = sheet
+        return resolved
+
+    def set_state(self, widget: QWidget, name: str, value: Any, descendants: bool = False) -> bool:
+        """Cambia lo stato ``name`` del widget e rilucida solo quello.
+
+        Con ``descendants`` rilucida anche i figli, per le regole che
+        dipendono dallo stato del contenitore (es. ``[selected="true"] QLabel``).
+        Restituisce False se lo stato era già quello. Non applica mai un
+        tema: se nessun tema è ancora impostato (lo fa MainWindow.apply_theme)
+        cambia solo la proprietà, che varrà quando il foglio arriva.
+        """
+        if widget.property(name) == value:
+            return False
+        widget.setProperty(name, value)
+        targets = [widget]
+        if descendants:
+            targets.extend(widget.findChildren(QWidget))
+        style = widget.style()
+        for target in targets:
+            style.unpolish(target)
+            style.polish(target)
+        widget.update()
+        self.stats["state_polish"] += 1
+        return True
+
+    def enable_counter(self, app: Optional[QApplication] = None) -> PolishCounter:
+        """Accende il conteggio degli eventi di stile e disegno."""
+        if self.counter is None:
+            app = app or QApplication.instance()
+            self.counter = PolishCounter(app)
+            app.installEventFilter(self.counter)
+        return self.counter
+
+    def metrics(self) -> Dict[str, Any]:
+        """Contatori per le metriche dell'interfaccia (log_ui_metrics)."""
+        data: Dict[str, Any] = {"theme": self.theme, **self.stats}
+        if self.counter is not None:
+            data["events"] = dict(self.counter.counts)
+        return data
+
+
+# Istanza condivisa da finestra principale e widget
+theme_engine = ThemeEngine()
+
+
+def get_theme_engine() -> ThemeEngine:
+    return theme_engine
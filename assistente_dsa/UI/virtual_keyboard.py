@@ -28,13 +28,18 @@ Caratteristiche:
    essere pronunciata dal TTS (callable "speak" passato dal chiamante).
 """
 
+import atexit
 import bisect
 import json
 import logging
 import os
 import re
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
 
-from PyQt6.QtCore import QEvent, Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtCore import QEvent, QObject, Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QCursor
 from PyQt6.QtWidgets import (
     QHBoxLayout,
@@ -46,6 +51,9 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from core.prefix_index import PrefixIndex
+from core.atomic_io import atomic_write
+
 # Parole più comuni, in ordine di frequenza: il peso decresce con la
 # posizione. Bastano per la partenza a freddo; poi la tastiera impara
 # le parole che l'utente scrive davvero.
@@ -117,21 +125,33 @@ class WordPredictor:
     """Suggerisce completamenti di parola da dizionari di frequenza offline.
 
     Tre livelli, in ordine di priorità: parole apprese dall'utente
-    (pesate per quanto le usa), liste di frequenza integrate (italiano +
-    inglese), dizionari di sistema se presenti (solo in coda).
+    (pesate per quanto le usa e, a parità, per quanto di recente),
+    liste di frequenza integrate (italiano + inglese), dizionari di
+    sistema se presenti (solo in coda). I primi due stanno in un indice
+    per prefisso (core/prefix_index.py): un suggerimento non scorre
+    tutto il vocabolario, anche con decine di migliaia di parole apprese.
     """
 
+    LEARNED_BONUS = 10_000  # le parole dell'utente vincono sulle liste
+    # Salvataggio delle parole apprese: le parole scritte in questo
+    # intervallo finiscono insieme, in background, in un registro delle
+    # sole modifiche (<file>.log); oltre COMPACT_AFTER righe il registro
+    # viene riassorbito nel file completo, riscritto in modo atomico.
+    SAVE_DELAY_S = 3.0
+    COMPACT_AFTER = 500
+
     def __init__(self, learned_path=None):
         self.learned_path = learned_path
         self.learned = {}
-        if learned_path and os.path.exists(learned_path):
-            try:
-                with open(learned_path, encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, dict):
-                    self.learned = {str(k): int(v) for k, v in data.items()}
-            except (OSError, ValueError):
-                self.learned = {}
+        self._lock = threading.Lock()  # dati in memoria
+        self._io_lock = threading.Lock()  # un salvataggio alla volta
+        self._pending = {}  # parole cambiate dall'ultimo salvataggio
+        self._save_timer = None
+        self._log_lines = 0
+        self.stats = {"saves": 0, "compactions": 0}
+        if learned_path:
+            self._load_learned()
+            _predictors.add(self)
 
         self.frequent = {}
         for rank, w in enumerate(PAROLE_ITALIANE):
@@ -142,6 +162,19 @@ class WordPredictor:
 
         self._system_words = None  # caricati pigramente al primo uso
 
+        # Ordine di utilizzo delle parole apprese in questa sessione
+        self._clock = 0
+        self._last_used = {}
+        self.index = PrefixIndex(
+            {w: self._score(w) for w in set(self.frequent) | set(self.learned)}
+        )
+
+    def _score(self, word):
+        """Punteggio per l'indice: (peso, ultimo utilizzo)."""
+        if word in self.learned:
+            return (self.learned[word] + self.LEARNED_BONUS, self._last_used.get(word, 0))
+        return (self.frequent.get(word, 0), 0)
+
     def _load_system_words(self):
         if self._system_words is not None:
             return self._system_words
@@ -165,20 +198,7 @@ class WordPredictor:
             return []
         low = prefix.lower()
 
-        scored = []
-        for word, weight in self.learned.items():
-            if word.startswith(low) and word != low:
-                scored.append((weight + 10_000, word))  # le sue parole vincono
-        for word, weight in self.frequent.items():
-            if word.startswith(low) and word != low:
-                scored.append((weight, word))
-        scored.sort(reverse=True)
-        out = []
-        for _w, word in scored:
-            if word not in out:
-                out.append(word)
-            if len(out) >= n:
-                break
+        out = self.index.top(low, n, exclude=low)
 
         # I dizionari di sistema (senza frequenza) solo come riserva: meglio
         # 3 suggerimenti buoni che 5 con parole rare in mezzo
@@ -199,18 +219,111 @@ class WordPredictor:
         return out
 
     def learn(self, word):
-        """Registra che l'utente ha scritto questa parola (e salva)."""
+        """Registra che l'utente ha scritto questa parola (salvata a breve)."""
         word = (word or "").strip().lower()
         if len(word) < 2 or not _WORD_RE.match(word):
             return
-        self.learned[word] = self.learned.get(word, 0) + 1
-        if self.learned_path:
+        with self._lock:
+            self.learned[word] = self.learned.get(word, 0) + 1
+            self._pending[word] = self.learned[word]
+        self._clock += 1
+        self._last_used[word] = self._clock
+        self.index.set_score(word, self._score(word))
+        self._schedule_save()
+
+    # ------------------------------------------------------------------
+    # Persistenza delle parole apprese
+    # ------------------------------------------------------------------
+    @property
+    def _log_path(self):
+        return self.learned_path + ".log"
+
+    def _load_learned(self):
+        """Legge il file completo e vi riapplica il registro delle modifiche."""
+        try:
+            with open(self.learned_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.learned = {str(k): int(v) for k, v in data.items()}
+        except (OSError, ValueError):
+            self.learned = {}
+        try:
+            with open(self._log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        break  # riga troncata (chiusura improvvisa)
+                    self.learned[str(delta["w"])] = int(delta["n"])
+                    self._log_lines += 1
+        except OSError:
+            pass
+
+    def _schedule_save(self):
+        if not self.learned_path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.SAVE_DELAY_S, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Salva subito le parole in sospeso (chiamato anche in chiusura)."""
+        if not self.learned_path:
+            return
+        with self._io_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
             try:
                 os.makedirs(os.path.dirname(self.learned_path), exist_ok=True)
-                with open(self.learned_path, "w", encoding="utf-8") as f:
-                    json.dump(self.learned, f, ensure_ascii=False)
-            except OSError:
-                pass
+                lines = "".join(
+                    json.dumps({"w": w, "n": n}, ensure_ascii=False) + "\n"
+                    for w, n in pending.items()
+                )
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                self._log_lines += len(pending)
+                self.stats["saves"] += 1
+                if self._log_lines >= self.COMPACT_AFTER:
+                    self._compact()
+            except OSError as e:
+                logging.warning(f"Parole apprese non salvate: {e}")
+                with self._lock:
+                    for w, n in pending.items():
+                        self._pending.setdefault(w, n)
+
+    def _compact(self):
+        """Riscrive il file completo (atomico) e svuota il registro."""
+        with self._lock:
+            payload = json.dumps(self.learned, ensure_ascii=False).encode("utf-8")
+        atomic_write(self.learned_path, payload)
+        try:
+            os.remove(self._log_path)
+        except FileNotFoundError:
+            pass
+        self._log_lines = 0
+        self.stats["compactions"] += 1
+
+
+# Predittori con un file di parole apprese: salvati anche all'uscita
+_predictors = weakref.WeakSet()
+
+
+@atexit.register
+def flush_all_predictors():
+    """Salva le parole in sospeso di tutti i predittori."""
+    for predictor in list(_predictors):
+        try:
+            predictor.flush()
+        except Exception as e:
+            logging.warning(f"Salvataggio parole apprese fallito: {e}")
 
 
 OLLAMA_URL = "http://localhost:11434"
@@ -249,25 +362,47 @@ def merge_ai_suggestions(prefix, ai_text, base_words, n=5):
 class _AiSuggestThread(QThread):
     """Chiede a Ollama i completamenti per il prefisso, con la frase.
 
-    Una richiesta sola alla volta (gestito dal chiamante); porta con sé
-    il prefisso per cui è partita, così una risposta arrivata "in
-    ritardo" (l'utente ha continuato a scrivere) viene scartata.
+    La risposta arriva in streaming: se nel frattempo la richiesta viene
+    superata (l'utente ha continuato a scrivere) il thread chiude la
+    connessione al primo pezzo utile, così Ollama smette di generare, e
+    non emette nulla. Porta con sé il prefisso e il numero di richiesta,
+    così una risposta "in ritardo" viene comunque riconosciuta e scartata.
     """
 
-    reply = pyqtSignal(str, str)  # prefisso richiesto, testo della risposta
-    failed = pyqtSignal(str)
+    reply = pyqtSignal(int, str, str)  # n. richiesta, prefisso, risposta
+    failed = pyqtSignal(int, str)
 
-    def __init__(self, context, prefix, model, parent=None):
+    def __init__(self, generation, context, prefix, model, parent=None):
         super().__init__(parent)
+        self.generation = generation
         self.context = context
         self.prefix = prefix
         self.model = model
+        self._cancelled = threading.Event()
+        self._response = None
+
+    def cancel(self):
+        """Segna la richiesta come superata e chiude la connessione.
+
+        Chiudere la risposta sblocca subito la lettura dello stream: il
+        thread esce senza aspettare il pezzo successivo o il timeout.
+        """
+        self._cancelled.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
 
     def run(self):
         try:
             import requests
         except ImportError as e:
-            self.failed.emit(f"requests non disponibile: {e}")
+            self.failed.emit(self.generation, f"requests non disponibile: {e}")
             return
         prompt = (
             "Tastiera predittiva. Frase scritta finora: "
@@ -283,15 +418,222 @@ class _AiSuggestThread(QThread):
                 json={
                     "model": self.model,
                     "prompt": prompt,
-                    "stream": False,
+                    "stream": True,
                     "options": {"temperature": 0, "num_predict": 30},
                 },
                 timeout=10,
+                stream=True,
             )
-            response.raise_for_status()
-            self.reply.emit(self.prefix, response.json().get("response", ""))
+            self._response = response
+            if self.is_cancelled():
+                response.close()  # annullata mentre si connetteva
+                return
+            with response:
+                response.raise_for_status()
+                parts = []
+                for line in response.iter_lines():
+                    if self.is_cancelled():
+                        return  # chiudere la risposta interrompe la generazione
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    parts.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+            if not self.is_cancelled():
+                self.reply.emit(self.generation, self.prefix, "".join(parts))
         except Exception as e:  # rete, JSON, server spento: mai bloccare
-            self.failed.emit(str(e))
+            if not self.is_cancelled():
+                self.failed.emit(self.generation, str(e))
+
+
+# Richieste AI di tutte le tastiere non ancora finite (anche annullate)
+_running_threads = set()
+
+
+class AiSuggestionService(QObject):
+    """Suggerimenti AI per la tastiera: attesa, annullamento e riuso.
+
+    - attende una pausa di scrittura prima di interpellare Ollama;
+    - una nuova richiesta annulla quella in corso, e solo la risposta
+      dell'ultima richiesta viene consegnata (mai fuori ordine);
+    - le risposte restano in una cache LRU per frase di contesto: lo
+      stesso prefisso non viene richiesto due volte, e se il prefisso
+      allunga uno già chiesto ("cas" -> "casa") si filtrano le parole
+      della risposta precedente senza nuova richiesta;
+    - misura la latenza dal tasto premuto ai suggerimenti mostrati.
+    """
+
+    # prefisso, testo della risposta, origine ("ai", "cache", "prefisso")
+    reply = pyqtSignal(str, str, str)
+    failed = pyqtSignal(str)
+
+    DEBOUNCE_MS = 600  # pausa di scrittura prima di interpellare l'AI
+    CACHE_CONTEXTS = 64  # frasi di contesto tenute in cache
+    CACHE_PREFIXES = 32  # prefissi per frase
+    LATENCY_SAMPLES = 200
+
+    def __init__(self, model_provider=None, parent=None):
+        super().__init__(parent)
+        self._model_provider = model_provider
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MS)
+        self.timer.timeout.connect(self._fire)
+
+        self._generation = 0
+        self._wanted = None  # (contesto, prefisso) dell'ultima richiesta
+        self._threads = set()  # richieste in corso (anche quelle annullate)
+        self.active_thread = None
+        self._cache = OrderedDict()  # contesto -> OrderedDict(prefisso -> risposta)
+
+        self._keystroke_t = None
+        self.latencies = deque(maxlen=self.LATENCY_SAMPLES)  # (origine, ms)
+        self.stats = {"requests": 0, "cancelled": 0, "cache_hits": 0, "prefix_reuse": 0}
+
+    # ------------------------------------------------------------------
+    # Richieste
+    # ------------------------------------------------------------------
+    def request(self, context, prefix):
+        """Nuovo prefisso da completare: dalla cache subito, altrimenti dopo la pausa."""
+        low = prefix.lower()
+        self._generation += 1  # le risposte per i prefissi precedenti non valgono più
+        self._wanted = (context, prefix)
+        cached = self._from_cache(context, low)
+        if cached is not None:
+            self.timer.stop()
+            self._cancel_active()
+            text, source = cached
+            self.stats["cache_hits" if source == "cache" else "prefix_reuse"] += 1
+            self.reply.emit(prefix, text, source)
+            return
+        self.timer.start()
+
+    def cancel(self):
+        """Niente più suggerimenti per la richiesta attuale (AI spenta, tastiera nascosta)."""
+        self.timer.stop()
+        self._generation += 1
+        self._wanted = None
+        self._cancel_active()
+
+    def _fire(self):
+        if self._wanted is None:
+            return
+        context, prefix = self._wanted
+        self._cancel_active()
+        model = "gemma:2b"
+        if self._model_provider is not None:
+            try:
+                model = self._model_provider() or model
+            except Exception:
+                pass
+        # Senza genitore: un thread annullato finisce per conto suo anche se
+        # la tastiera viene distrutta prima (niente "QThread: Destroyed while
+        # thread is still running"); il riferimento resta in _running_threads
+        thread = _AiSuggestThread(self._generation, context, prefix, model)
+        thread.reply.connect(self._on_reply)
+        thread.failed.connect(self._on_failed)
+        thread.finished.connect(lambda t=thread: self._thread_done(t))
+        self._threads.add(thread)
+        _running_threads.add(thread)
+        self.active_thread = thread
+        self.stats["requests"] += 1
+        thread.start()
+
+    def _cancel_active(self):
+        if self.active_thread is not None:
+            self.active_thread.cancel()
+            self.stats["cancelled"] += 1
+            self.active_thread = None
+
+    def _on_reply(self, generation, prefix, text):
+        thread = self.sender()
+        if thread is not None:
+            self._store(thread.context, prefix.lower(), text)
+        if generation != self._generation:
+            return  # superata da una richiesta più recente
+        self.active_thread = None
+        self.reply.emit(prefix, text, "ai")
+
+    def _on_failed(self, generation, message):
+        if generation != self._generation:
+            return
+        self.active_thread = None
+        self.failed.emit(message)
+
+    def _thread_done(self, thread):
+        self._threads.discard(thread)
+        _running_threads.discard(thread)
+        thread.deleteLater()
+
+    def wait_idle(self, msecs=2000):
+        """Attende la fine dei thread (chiusura della tastiera, test)."""
+        for thread in list(self._threads):
+            thread.wait(msecs)
+
+    # ------------------------------------------------------------------
+    # Cache per frase di contesto
+    # ------------------------------------------------------------------
+    def _store(self, context, low, text):
+        prefixes = self._cache.get(context)
+        if prefixes is None:
+            prefixes = self._cache[context] = OrderedDict()
+        self._cache.move_to_end(context)
+        prefixes[low] = text
+        prefixes.move_to_end(low)
+        while len(prefixes) > self.CACHE_PREFIXES:
+            prefixes.popitem(last=False)
+        while len(self._cache) > self.CACHE_CONTEXTS:
+            self._cache.popitem(last=False)
+
+    def _from_cache(self, context, low):
+        """(risposta, origine) se la cache basta per questo prefisso."""
+        prefixes = self._cache.get(context)
+        if not prefixes:
+            return None
+        self._cache.move_to_end(context)
+        if low in prefixes:
+            prefixes.move_to_end(low)
+            return prefixes[low], "cache"
+        # Un prefisso più corto già chiesto: le sue parole che continuano
+        # con quello attuale sono ancora valide
+        for length in range(len(low) - 1, 1, -1):
+            text = prefixes.get(low[:length])
+            if text is None:
+                continue
+            words = [w for w in _AI_WORD_RE.findall(text) if w.lower().startswith(low)]
+            if any(w.lower() != low for w in words):
+                return " ".join(words), "prefisso"
+            return None
+        return None
+
+    # ------------------------------------------------------------------
+    # Latenza: dal tasto ai suggerimenti mostrati
+    # ------------------------------------------------------------------
+    def keystroke(self):
+        """Da chiamare quando cambia il testo: inizio della misura."""
+        self._keystroke_t = time.perf_counter()
+
+    def mark_displayed(self, source):
+        """Suggerimenti mostrati: registra la latenza per origine."""
+        if self._keystroke_t is not None:
+            elapsed_ms = (time.perf_counter() - self._keystroke_t) * 1000.0
+            self.latencies.append((source, elapsed_ms))
+
+    def latency_summary(self):
+        """Per ogni origine: numero di campioni, mediana e 95° percentile (ms)."""
+        by_source = {}
+        for source, ms in self.latencies:
+            by_source.setdefault(source, []).append(ms)
+        summary = {}
+        for source, values in by_source.items():
+            values.sort()
+            summary[source] = {
+                "count": len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            }
+        return summary
 
 
 class VirtualKeyboardWidget(QWidget):
@@ -324,8 +666,6 @@ class VirtualKeyboardWidget(QWidget):
         ["ABC", ",", "spazio", ".", "📤"],
     ]
 
-    AI_DEBOUNCE_MS = 600  # pausa di scrittura prima di interpellare l'AI
-
     def __init__(
         self,
         target_edit=None,
@@ -432,15 +772,14 @@ class VirtualKeyboardWidget(QWidget):
         modes.addStretch()
         root.addLayout(modes)
 
-        # Raffinamento AI: una richiesta alla volta, dopo una pausa di
-        # scrittura; la risposta migliora i suggerimenti già mostrati
-        self._ai_thread = None
-        self._ai_rerun = False  # richiesta arrivata mentre un'altra girava
+        # Raffinamento AI: dopo una pausa di scrittura, annullando le
+        # richieste superate e riusando le risposte già avute; la risposta
+        # migliora i suggerimenti già mostrati
         self._base_words = []  # ultimi suggerimenti del dizionario
-        self._ai_timer = QTimer(self)
-        self._ai_timer.setSingleShot(True)
-        self._ai_timer.setInterval(self.AI_DEBOUNCE_MS)
-        self._ai_timer.timeout.connect(self._ai_request)
+        self.ai_service = AiSuggestionService(self._ai_model, parent=self)
+        self.ai_service.reply.connect(self._on_ai_reply)
+        self.ai_service.failed.connect(self._on_ai_failed)
+        self._ai_timer = self.ai_service.timer
 
         # Dwell: sonda periodica della posizione del puntatore
         self._dwell_timer = QTimer(self)
@@ -625,17 +964,20 @@ class VirtualKeyboardWidget(QWidget):
         self._echo(word)
 
     def _refresh_suggestions(self):
+        self.ai_service.keystroke()
         prefix = self._current_prefix()
         words = self.predictor.suggest(prefix, n=5)
         self._base_words = words
         for btn, word in zip(self.suggest_buttons, words + [""] * 5):
             btn.setText(word)
             btn.setVisible(bool(word))
-        # Il raffinamento AI parte solo dopo una pausa di scrittura
-        if self.ai_btn.isChecked() and len(prefix) >= 2:
-            self._ai_timer.start()
+        self.ai_service.mark_displayed("dizionario")
+        # Il raffinamento AI parte solo dopo una pausa di scrittura (o
+        # subito, se la risposta è già in cache)
+        if self.ai_btn.isChecked() and len(prefix) >= 2 and self.isVisible():
+            self.ai_service.request(self._sentence_context(), prefix)
         else:
-            self._ai_timer.stop()
+            self.ai_service.cancel()
 
     def _show_suggestions(self, words):
         for btn, word in zip(self.suggest_buttons, words + [""] * 5):
@@ -665,38 +1007,23 @@ class VirtualKeyboardWidget(QWidget):
                 return "gemma:2b"
         return "gemma:2b"
 
-    def _ai_request(self):
-        if not self.ai_btn.isChecked() or not self.isVisible():
-            return
-        if self._ai_thread is not None:
-            self._ai_rerun = True  # ripartirà quando questa risponde
-            return
-        prefix = self._current_prefix()
-        if len(prefix) < 2:
-            return
-        self._ai_thread = _AiSuggestThread(
-            self._sentence_context(), prefix, self._ai_model(), parent=self
-        )
-        self._ai_thread.reply.connect(self._on_ai_reply)
-        self._ai_thread.failed.connect(self._on_ai_failed)
-        self._ai_thread.start()
-
-    def _on_ai_reply(self, prefix, text):
-        self._ai_thread = None
-        if self._ai_rerun:
-            self._ai_rerun = False
-            self._ai_timer.start()
+    @property
+    def _ai_thread(self):
+        """Richiesta AI in corso (None se nessuna)."""
+        return self.ai_service.active_thread
+
+    def _on_ai_reply(self, prefix, text, source="ai"):
         # Risposta in ritardo? L'utente ha continuato a scrivere: si scarta
         if prefix != self._current_prefix() or not self.isVisible():
             return
         merged = merge_ai_suggestions(prefix, text, self._base_words)
         if merged:
             self._show_suggestions(merged)
+            self.ai_service.mark_displayed(source)
 
     def _on_ai_failed(self, message):
         """Ollama non raggiungibile o in errore: si spegne senza disturbare."""
-        self._ai_thread = None
-        self._ai_rerun = False
+        self.ai_service.cancel()
         logging.info(f"Suggerimenti AI non disponibili: {message}")
         self.ai_btn.setChecked(False)
 
@@ -722,9 +1049,10 @@ class VirtualKeyboardWidget(QWidget):
         """
         self._dwell_timer.stop()
         self._scan_timer.stop()
-        self._ai_timer.stop()
+        self.ai_service.cancel()
         self._set_dwell_mark(None)
         self._clear_scan_marks()
+        self.predictor.flush()  # poche righe: le parole scritte finora
         super().hideEvent(event)
 
     def showEvent(self, event):
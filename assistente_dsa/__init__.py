@@ -314,11 +314,25 @@ python test_qml_integration.py  # 🧪 Test componenti QML
 =================================================================================
 """
 
-# Import dei moduli di autenticazione per accesso facilitato
-try:
-    from .Autenticazione_e_Accesso import *
-    print("✅ Authentication module loaded")
-except ImportError as e:
-    print(f"⚠️  Authentication module not available: {e}")
+# Moduli di autenticazione per accesso facilitato (assistente_dsa.auth_manager,
+# ...): importati al primo accesso, così "python -m assistente_dsa" non carica
+# lo stack di sicurezza prima di aprire la finestra
+_AUTH_MODULES = (
+    "auth_manager",
+    "login_dialog",
+    "auth_flow",
+    "auth_module",
+    "app_launcher",
+    "gui_components",
+    "security_utils",
+)
+
+
+def __getattr__(name):
+    if name in _AUTH_MODULES:
+        import importlib
+
+        return importlib.import_module(f".Autenticazione_e_Accesso.{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # print ("ciao")
@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import sys
 import logging
+import os
 import traceback
 from pathlib import Path
 
@@ -26,10 +27,22 @@ current_dir = Path(__file__).parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
+# Primo import: da qui partono i tempi di avvio (COGNIFLOW_PROFILE)
+from core import startup_timer  # noqa: E402
+
 
 def test_critical_imports():
-    """Testa le importazioni critiche prima dell'avvio."""
+    """Testa le importazioni critiche prima dell'avvio.
+
+    Verifica che i moduli esistano senza eseguirli (find_spec): importare
+    qui "main_01_Aircraft" lo caricava una seconda volta, con un nome
+    diverso da quello usato poi per l'avvio. Con
+    COGNIFLOW_FULL_IMPORT_CHECK=1 i moduli vengono importati davvero.
+    """
+    from core.system_checks_module import check_module_spec, full_import_check_requested
+
     logger.info("🔍 Testando importazioni critiche...")
+    full_check = full_import_check_requested()
 
     critical_imports = [
         ("PyQt6.QtWidgets", "Interfaccia grafica"),
@@ -42,7 +55,12 @@ def test_critical_imports():
 
     for module_name, description in critical_imports:
         try:
-            __import__(module_name)
+            if full_check:
+                __import__(module_name)
+            else:
+                found, detail = check_module_spec(module_name)
+                if not found:
+                    raise ImportError(detail)
             logger.info(f"✅ {description}: OK")
         except ImportError as e:
             logger.error(f"❌ {description}: FALLITO - {e}")
@@ -50,6 +68,7 @@ def test_critical_imports():
         except Exception as e:
             logger.warning(f"⚠️  {description}: ERRORE - {e}")
 
+    startup_timer.mark("verifica importazioni critiche")
     if failed_imports:
         logger.error("❌ Importazioni critiche fallite:")
         for module, desc, error in failed_imports:
@@ -68,6 +87,7 @@ def start_application():
         # Import e avvio dell'interfaccia principale
         from .main_01_Aircraft import main
 
+        startup_timer.mark("import modulo principale")
         logger.info("✅ Interfaccia principale importata con successo")
         main()
 
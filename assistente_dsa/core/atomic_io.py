@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Atomic IO - Scrittura atomica dei file
+
+Il contenuto viene scritto in un file temporaneo nella stessa cartella,
+sincronizzato su disco e poi rinominato sopra la destinazione: un crash a
+metà scrittura lascia intatta la versione precedente. Usata dal
+salvataggio dei progetti e dalle parole imparate della tastiera virtuale.
+"""
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """Scrive ``payload`` in ``path`` in modo atomico (temporaneo + fsync + rename)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
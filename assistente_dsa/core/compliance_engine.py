@@ -15,6 +15,11 @@ import logging
 import threading
 import time
 
+try:
+    from core.metrics_sink import get_sink
+except ImportError:
+    from assistente_dsa.core.metrics_sink import get_sink
+
 logger = logging.getLogger(__name__)
 
 
@@ -202,12 +207,20 @@ class ComplianceEngine:
                 'hash_value': event.hash_value
             }
 
-            with open(self.audit_log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(event_dict) + '\n')
+            # Scrittura a lotti in un thread separato; l'audit non viene mai
+            # campionato, ruotato né scartato (core/metrics_sink.py)
+            self._audit_sink().write(event_dict, sample=False)
 
         except Exception as e:
             logger.error(f"Errore scrittura audit event: {e}")
 
+    def _audit_sink(self):
+        return get_sink(self.audit_log_path, max_bytes=0, max_queue=None)
+
+    def flush_audit_log(self, timeout: Optional[float] = None) -> bool:
+        """Attende che gli eventi di audit registrati siano sul file."""
+        return self._audit_sink().flush(timeout)
+
     def generate_compliance_report(self, framework: str, days: int = 30) -> ComplianceReport:
         """Genera un report di compliance per un framework specifico."""
         if framework not in self.compliance_frameworks:
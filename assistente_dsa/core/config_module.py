@@ -1,6 +1,11 @@
-import os, json
+import os
 from typing import cast, Any
 
+try:
+    from .settings_store import get_settings_store
+except ImportError:
+    from core.settings_store import get_settings_store
+
 # Percorso del file impostazioni condiviso con main_03_configurazione_e_opzioni.
 # __file__ è .../assistente_dsa/core/config_module.py: servono tre livelli
 # di dirname per risalire alla radice del progetto (Cogniflow), dove si trova
@@ -10,18 +15,8 @@ _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 SETTINGS_FILE = os.path.join(_PROJECT_ROOT, "Save", "SETUP_TOOLS_&_Data", "settings.json")
 
 
-def load_settings():
-    """Load settings from file or return defaults"""
-    settings_file = SETTINGS_FILE
-
-    if os.path.exists(settings_file):
-        try:
-            with open(settings_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-
-    # Default settings
+def _default_settings():
+    """Default settings, used when settings.json is missing or unreadable"""
     return {
         "application": {"theme": "Professionale"},
         "ui": {"window_width": 1200, "window_height": 800},
@@ -44,31 +39,30 @@ def load_settings():
         "startup": {"bypass_login": True}
     }
 
+def get_settings_backend():
+    """Process-wide in-memory settings (settings.json is parsed only once).
+
+    SettingsManager, SettingsModel and main_03's ConfigManager are views over
+    this same store, so there is a single cache and a single on-disk writer.
+    """
+    return get_settings_store(SETTINGS_FILE, _default_settings)
+
+
+def load_settings():
+    """Return a copy of the settings (served from memory, not re-read from disk)"""
+    return get_settings_backend().snapshot()
+
+
 def get_setting(key: str, default=None):
-    """Get a setting value"""
-    settings = load_settings()
-    keys = key.split(".")
-    value = settings
-    for k in keys:
-        if isinstance(value, dict) and k in value:
-            value = value[k]
-        else:
-            return default
-    return value
+    """Get a setting value (dot notation, e.g. "ai.selected_ai_model")"""
+    return get_settings_backend().get(key, default)
+
 
 def set_setting(key: str, value):
-    """Set a setting value"""
-    settings = load_settings()
-    keys = key.split(".")
-    current = settings
-    for k in keys[:-1]:
-        if k not in current:
-            current[k] = {}
-        current = current[k]
-    current[keys[-1]] = value
+    """Set a setting value; the file is written shortly after (debounced, atomic)"""
+    get_settings_backend().set(key, value)
+
 
-    # Save to file
-    settings_file = SETTINGS_FILE
-    os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-    with open(settings_file, "w", encoding="utf-8") as f:
-        json.dump(settings, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+def save_settings_now():
+    """Write pending setting changes to disk immediately"""
+    return get_settings_backend().flush()
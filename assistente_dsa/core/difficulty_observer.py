@@ -23,14 +23,33 @@ La funzione NON è una sorveglianza nascosta di terzi: presuppone che
 l'utente osservato sia sotto la responsabilità di chi attiva la funzione
 (un genitore/tutore) e che vi sia una relazione di cura. Per questo è
 giusto informare l'osservato, in modo adatto alla sua età.
+
+La cattura non deve rallentare l'interfaccia proprio mentre la persona è
+in difficoltà: sul thread della GUI si prende solo la schermata; codifica
+dell'immagine (WebP o JPEG, più leggeri del PNG) e ritenzione avvengono in
+un thread di lavoro, il registro passa dal sink di core/metrics_sink.py.
+La ritenzione usa un indice in memoria delle catture (letto dalla
+cartella una volta sola) con un limite di età e di spazio occupato.
 """
 
-import json
 import logging
 import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
+try:
+    from core.metrics_sink import get_sink
+except ImportError:
+    from assistente_dsa.core.metrics_sink import get_sink
+
+# Formati delle catture, dal preferito; si usa il primo supportato da Qt
+IMAGE_FORMATS = ("webp", "jpg", "png")
+IMAGE_EXTENSIONS = tuple("." + f for f in IMAGE_FORMATS)
+CAPTURE_PREFIX = "difficolta_"
+
 README = """CARTELLA RISERVATA — Osservazione dei momenti di difficoltà
 ============================================================
 
@@ -76,6 +95,9 @@ class DifficultyObserver:
         cooldown_s=20.0,
         retention_days=30,
         context_provider=None,
+        image_format="webp",
+        image_quality=80,
+        max_bytes=200 * 1024 * 1024,
     ):
         self.output_dir = output_dir
         self._screenshot = screenshot_provider
@@ -85,11 +107,40 @@ class DifficultyObserver:
         self.cooldown_s = cooldown_s  # pausa minima tra due catture
         self.retention_days = retention_days
         self._context = context_provider  # opzionale: descrive cosa fa l'utente
+        self.image_format = self._pick_format(image_format)
+        self.image_quality = int(image_quality)
+        self.max_bytes = max_bytes  # spazio massimo delle catture (0 = nessun limite)
 
         self._over_since = None
         self._last_capture = 0.0
         self._readme_done = False
 
+        # Codifica e salvataggio in un thread di lavoro, uno alla volta
+        # (le catture finiscono nel registro nell'ordine in cui avvengono)
+        self._executor = None
+        self._pending = set()
+        # Indice delle catture: (istante di creazione, nome, byte), dalla più vecchia
+        self._index = None
+        self._index_bytes = 0
+        self._index_lock = threading.Lock()
+        self.stats = {"captures": 0, "purged": 0, "grab_ms": 0.0, "encode_ms": 0.0}
+
+    @staticmethod
+    def _pick_format(requested):
+        """Il formato richiesto se Qt sa scriverlo, altrimenti il migliore disponibile."""
+        requested = (requested or "png").lower().replace("jpeg", "jpg")
+        try:
+            from PyQt6.QtGui import QImageWriter
+
+            supported = {bytes(f).decode().lower() for f in QImageWriter.supportedImageFormats()}
+        except Exception:
+            return "png"
+        candidates = [requested] + [f for f in IMAGE_FORMATS if f != requested]
+        for fmt in candidates:
+            if fmt in IMAGE_FORMATS and (fmt in supported or fmt == "png"):
+                return fmt
+        return "png"
+
     def on_difficulty(self, score):
         """Slot per VideoThread.difficulty_signal (indice 0..1)."""
         if not self.enabled:
@@ -123,52 +174,140 @@ class DifficultyObserver:
             self._readme_done = True
 
     def _capture(self, score):
-        """Salva lo screenshot dell'interfaccia e registra l'evento.
+        """Prende la schermata e ne affida il salvataggio al thread di lavoro.
 
         Silenzioso per l'utente: nessun pop-up, nessun suono. Gli errori
         vengono solo loggati, non devono mai disturbare la sessione.
         """
         try:
+            start = time.perf_counter()
             pixmap = self._screenshot() if self._screenshot else None
             if pixmap is None or pixmap.isNull():
                 return
-            self._ensure_dir()
-            self.purge_old()
-            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            img_name = f"difficolta_{stamp}.png"
-            if not pixmap.save(os.path.join(self.output_dir, img_name), "PNG"):
-                return
+            # QPixmap si usa solo nel thread della GUI: al lavoro va una QImage
+            to_image = getattr(pixmap, "toImage", None)
+            image = to_image() if to_image is not None else pixmap
+            self.stats["grab_ms"] = (time.perf_counter() - start) * 1000.0
             entry = {
                 "istante": datetime.now().isoformat(timespec="seconds"),
                 "indice_difficolta": round(float(score), 3),
-                "immagine": img_name,
             }
             if self._context is not None:
                 try:
                     entry["contesto"] = str(self._context())
                 except Exception:
                     pass
-            with open(
-                os.path.join(self.output_dir, "eventi.jsonl"),
-                "a",
-                encoding="utf-8",
-            ) as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-            logging.info("Osservazione difficoltà: momento registrato (riservato)")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="difficulty-capture"
+                )
+            future = self._executor.submit(self._save_capture, image, entry)
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
         except Exception as e:
             logging.warning(f"Osservazione difficoltà non riuscita: {e}")
 
-    def purge_old(self):
-        """Cancella gli screenshot più vecchi del periodo di ritenzione."""
-        if self.retention_days <= 0 or not os.path.isdir(self.output_dir):
-            return
-        limite = datetime.now() - timedelta(days=self.retention_days)
-        for name in os.listdir(self.output_dir):
-            if not name.startswith("difficolta_") or not name.endswith(".png"):
-                continue
-            path = os.path.join(self.output_dir, name)
+    def _save_capture(self, image, entry):
+        """Thread di lavoro: codifica l'immagine, registra l'evento, applica la ritenzione."""
+        try:
+            start = time.perf_counter()
+            self._ensure_dir()
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            img_name = f"{CAPTURE_PREFIX}{stamp}.{self.image_format}"
+            path = os.path.join(self.output_dir, img_name)
+            fmt = self.image_format.upper().replace("JPG", "JPEG")
+            quality = -1 if self.image_format == "png" else self.image_quality
+            if not image.save(path, fmt, quality):
+                return
+            self.stats["encode_ms"] = (time.perf_counter() - start) * 1000.0
+            entry["immagine"] = img_name
+            self._events_sink().write(entry, sample=False)
             try:
-                if datetime.fromtimestamp(os.path.getmtime(path)) < limite:
-                    os.remove(path)
+                size = os.path.getsize(path)
             except OSError:
-                pass
+                size = 0
+            self._add_to_index(time.time(), img_name, size)
+            self.stats["captures"] += 1
+            self.purge_old()
+            logging.info("Osservazione difficoltà: momento registrato (riservato)")
+        except Exception as e:
+            logging.warning(f"Osservazione difficoltà non riuscita: {e}")
+
+    def _events_sink(self):
+        """Registro eventi.jsonl: mai campionato né ruotato, è il materiale da rileggere."""
+        return get_sink(os.path.join(self.output_dir, "eventi.jsonl"), max_bytes=0, max_queue=None)
+
+    def flush(self, timeout=None):
+        """Attende il salvataggio delle catture in corso (chiusura, test)."""
+        pending = list(self._pending)
+        if pending:
+            wait(pending, timeout=timeout)
+        self._events_sink().flush(timeout)
+
+    def close(self):
+        """Completa le catture in corso e ferma il thread di lavoro."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._events_sink().flush()
+
+    # ------------------------------------------------------------------
+    # Ritenzione: indice in memoria, nessuna scansione per cattura
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        """Legge la cartella una volta sola e costruisce l'indice."""
+        entries = []
+        if os.path.isdir(self.output_dir):
+            for name in os.listdir(self.output_dir):
+                if not name.startswith(CAPTURE_PREFIX) or not name.endswith(IMAGE_EXTENSIONS):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.output_dir, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, name, st.st_size))
+        entries.sort()
+        self._index = deque(entries)
+        self._index_bytes = sum(e[2] for e in entries)
+
+    def _add_to_index(self, created, name, size):
+        with self._index_lock:
+            if self._index is None:
+                self._load_index()
+                if any(e[1] == name for e in self._index):
+                    return  # appena salvata: già letta dalla cartella
+            self._index.append((created, name, size))
+            self._index_bytes += size
+
+    def purge_old(self):
+        """Cancella le catture oltre il periodo di ritenzione o il limite di spazio.
+
+        Le catture più vecchie sono in testa all'indice: si tolgono da lì
+        finché età e spazio occupato rientrano nei limiti.
+        """
+        with self._index_lock:
+            if self._index is None:
+                self._load_index()
+            limite = None
+            if self.retention_days > 0:
+                limite = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+            while self._index:
+                created, name, size = self._index[0]
+                too_old = limite is not None and created < limite
+                too_big = self.max_bytes and self._index_bytes > self.max_bytes
+                if not (too_old or too_big):
+                    break
+                self._index.popleft()
+                self._index_bytes -= size
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                    self.stats["purged"] += 1
+                except OSError:
+                    pass
+
+    def index_summary(self):
+        """Numero di catture e byte occupati, secondo l'indice."""
+        with self._index_lock:
+            if self._index is None:
+                self._load_index()
+            return {"captures": len(self._index), "bytes": self._index_bytes}
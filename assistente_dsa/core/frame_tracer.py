@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Frame Tracer - Tempi per fase di ogni frame del video
+
+Il ciclo di VideoThread.run divide ogni frame in fasi (lettura,
+specchiatura, volti, mani, gesti, espressioni, persone, VLM,
+conversione, invio) e apre per ognuna uno span con nome::
+
+    tracer.begin_frame()
+    with tracer.span("capture"):
+        ret, frame = cap.read()
+    ...
+    tracer.end_frame()
+
+Da spento (l'impostazione predefinita) ``span`` restituisce sempre lo
+stesso contesto vuoto: il costo è un controllo di un attributo per fase.
+Da acceso gli span del frame si accumulano in una lista del frame aperto
+dal thread corrente (stato in ``threading.local``: più thread video non si
+mescolano) e passano sotto lock una volta sola, a fine frame, in:
+
+ - una finestra mobile per fase (ultimi ROLLING_FRAMES frame), da cui
+   ``breakdown`` calcola media, p95 e ultimo valore;
+ - un anello limitato di eventi, che ``export_chrome_trace`` scrive nel
+   formato JSON "trace event" di Chrome, apribile offline in Perfetto
+   (ui.perfetto.dev) o in chrome://tracing.
+
+Gli span con un punto nel nome (es. "faces.model") sono figli di quello
+senza il suffisso: già compresi nel suo tempo, nella ripartizione sono
+mostrati rientrati sotto il padre e non contano nelle percentuali.
+
+Il tracer globale ha più utenti (la finestra di test della webcam, le
+metriche locali): ognuno lo accende con ``acquire(nome)`` e lo rilascia con
+``release(nome)``; resta acceso finché almeno uno lo tiene, e ``acquire``
+con ``fresh=True`` svuota i dati solo se nessun altro li sta usando.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+ROLLING_FRAMES = 120  # frame nella finestra mobile (~4 s a 30 fps)
+DEFAULT_MAX_EVENTS = 50000  # span tenuti per l'esportazione
+FRAME_SPAN = "frame"  # span che copre l'intero frame
+
+# (nome, frame, inizio ns, durata ns, id thread)
+SpanRecord = Tuple[str, int, int, int, int]
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """Uno span aperto: misura il blocco ``with`` con perf_counter_ns."""
+
+    __slots__ = ("_pending", "_name", "_start")
+
+    def __init__(self, pending: List[Tuple[str, int, int]], name: str):
+        self._pending = pending
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        start = self._start
+        self._pending.append((self._name, start, time.perf_counter_ns() - start))
+        return False
+
+
+class FrameTracer:
+    """Span per fase e per frame, con ripartizione mobile ed esportazione."""
+
+    def __init__(
+        self,
+        rolling_frames: int = ROLLING_FRAMES,
+        max_events: int = DEFAULT_MAX_EVENTS,
+    ):
+        self.enabled = False
+        self._users: set = set()  # chi tiene acceso il tracer (acquire)
+        self.rolling_frames = rolling_frames
+        self._lock = threading.Lock()
+        self._events: Deque[SpanRecord] = deque(maxlen=max_events)
+        self._stages: Dict[str, Deque[int]] = {}
+        self._frame = 0
+        # Frame aperto da ciascun thread: (generazione, inizio ns, span)
+        self._local = threading.local()
+        # Cresce a ogni spegnimento: i frame aperti prima non vengono registrati
+        self._generation = 0
+        self._origin_ns = time.perf_counter_ns()
+        self.stats = {"frames": 0, "spans": 0}
+
+    # ------------------------------------------------------------------
+    # Lato del thread del video
+    # ------------------------------------------------------------------
+    def begin_frame(self) -> None:
+        """Apre un nuovo frame (no-op da spento)."""
+        if not self.enabled:
+            return
+        self._local.frame = (self._generation, time.perf_counter_ns(), [])
+
+    def _open_frame(self) -> Optional[Tuple[int, int, List[Tuple[str, int, int]]]]:
+        frame = getattr(self._local, "frame", None)
+        if frame is None or frame[0] != self._generation:
+            return None
+        return frame
+
+    def span(self, name: str):
+        """Contesto che misura una fase del frame corrente (di questo thread)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        frame = self._open_frame()
+        if frame is None:
+            return _NULL_SPAN
+        return _Span(frame[2], name)
+
+    def end_frame(self) -> None:
+        """Chiude il frame: registra i suoi span e la durata totale."""
+        frame = self._open_frame()
+        self._local.frame = None
+        if frame is None or not self.enabled:
+            return
+        _, start, pending = frame
+        pending.append((FRAME_SPAN, start, time.perf_counter_ns() - start))
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._frame += 1
+            frame = self._frame
+            for name, span_start, duration in pending:
+                self._events.append((name, frame, span_start, duration, thread_id))
+                window = self._stages.get(name)
+                if window is None:
+                    window = self._stages[name] = deque(maxlen=self.rolling_frames)
+                window.append(duration)
+            self.stats["frames"] += 1
+            self.stats["spans"] += len(pending)
+
+    # ------------------------------------------------------------------
+    # Lettura (thread dell'interfaccia)
+    # ------------------------------------------------------------------
+    def enable(self, enabled: bool = True) -> None:
+        if not enabled:
+            self._generation += 1
+        self.enabled = enabled
+
+    def acquire(self, user: str, fresh: bool = False) -> None:
+        """Accende il tracer per ``user``.
+
+        Con ``fresh=True`` riparte da zero, ma solo se nessun altro utente
+        lo tiene acceso: i suoi dati (es. contatori esportati) restano.
+        """
+        if fresh and not self._users - {user}:
+            self.reset()
+        self._users.add(user)
+        self.enable()
+
+    def release(self, user: str) -> None:
+        """Rilascia il tracer per ``user``; si spegne quando nessuno lo tiene."""
+        self._users.discard(user)
+        if not self._users and self.enabled:
+            self.enable(False)
+
+    def reset(self) -> None:
+        """Svuota finestra mobile ed eventi registrati."""
+        with self._lock:
+            self._events.clear()
+            self._stages.clear()
+            self._frame = 0
+            self.stats = {"frames": 0, "spans": 0}
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Per fase, sugli ultimi frame: media, p95 e ultimo valore in ms.
+
+        Le fasi sono nell'ordine di prima apparizione; "frame" è il totale.
+        """
+        with self._lock:
+            windows = {name: list(values) for name, values in self._stages.items()}
+        result = {}
+        for name, values in windows.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            result[name] = {
+                "avg_ms": sum(values) / len(values) / 1e6,
+                "p95_ms": p95 / 1e6,
+                "last_ms": values[-1] / 1e6,
+                "frames": len(values),
+            }
+        return result
+
+    def format_breakdown(self) -> str:
+        """Ripartizione su una riga per fase, per un'etichetta.
+
+        Le percentuali sono sul frame e solo per le fasi principali: gli
+        span figli ("faces.model") sono rientrati sotto il padre.
+        """
+        data = self.breakdown()
+        if not data:
+            return "⏱️ Nessun frame tracciato"
+        total = data.get(FRAME_SPAN, {}).get("avg_ms", 0.0)
+
+        def line(label, values, share=""):
+            return f"{label:<12} {values['avg_ms']:6.2f} ms  p95 {values['p95_ms']:6.2f}{share}"
+
+        stages = [name for name in data if "." not in name and name != FRAME_SPAN]
+        children = [name for name in data if "." in name]
+        lines = []
+        for name in stages:
+            values = data[name]
+            share = f" {values['avg_ms'] / total * 100:3.0f}%" if total else ""
+            lines.append(line(name, values, share))
+            for child in [c for c in children if c.startswith(name + ".")]:
+                children.remove(child)
+                lines.append(line("  └ " + child[len(name) + 1:], data[child]))
+        # Figli di una fase che non compare (es. span aperto fuori dalla fase)
+        lines.extend(line(child, data[child]) for child in children)
+        if FRAME_SPAN in data:
+            values = data[FRAME_SPAN]
+            fps = 1000.0 / values["avg_ms"] if values["avg_ms"] else 0.0
+            lines.append(line("frame", values, f"  (~{fps:.0f} fps)"))
+        return "\n".join(lines)
+
+    def chrome_trace(self, pid: Optional[int] = None) -> Dict[str, Any]:
+        """Eventi registrati nel formato "trace event" di Chrome (tempi in µs)."""
+        pid = os.getpid() if pid is None else pid
+        with self._lock:
+            events = list(self._events)
+        trace = []
+        threads = set()
+        for name, frame, start, duration, thread_id in events:
+            threads.add(thread_id)
+            trace.append(
+                {
+                    "name": name,
+                    "cat": "video",
+                    "ph": "X",
+                    "ts": (start - self._origin_ns) / 1000.0,
+                    "dur": duration / 1000.0,
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"frame": frame},
+                }
+            )
+        for thread_id in threads:
+            trace.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": "VideoThread"},
+                }
+            )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Scrive la traccia su file; restituisce il numero di span esportati."""
+        data = self.chrome_trace()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        count = sum(1 for event in data["traceEvents"] if event["ph"] == "X")
+        logging.info(f"Traccia dei frame esportata in {path} ({count} span)")
+        return count
+
+
+# Istanza globale, condivisa dai thread video e dalla finestra di test
+frame_tracer = FrameTracer()
+
+
+def get_frame_tracer() -> FrameTracer:
+    """Restituisce il tracer dei frame dell'applicazione."""
+    return frame_tracer
@@ -1,22 +1,80 @@
 #!/usr/bin/env python3
 """
 Lazy Loader - Caricamento pigro dei moduli per ottimizzazione performance
+
+I sottosistemi pesanti (video, voce, sintesi vocale, OCR, PDF, traduzione,
+multimedia, sicurezza) non vengono importati all'avvio: la finestra
+principale ne tiene dei ``lazy_attr``, che importano il modulo al primo
+uso. La disponibilità si verifica con ``subsystem_available`` cercando le
+librerie richieste (find_spec), senza importarle.
 """
 
 import importlib
 import importlib.util
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sottosistemi pesanti: i moduli che li compongono (non devono comparire
+# nell'import della finestra principale) e le librerie esterne richieste
+SUBSYSTEMS: Dict[str, Dict[str, Any]] = {
+    'vision': {
+        'modules': ('Artificial_Intelligence.Video', 'cv2', 'mediapipe'),
+        'requires': ('cv2', 'numpy'),
+        'description': 'Webcam, gesti e sfondo video',
+    },
+    'speech': {
+        'modules': ('Artificial_Intelligence.Riconoscimento_Vocale', 'vosk', 'pyaudio'),
+        'requires': ('requests',),
+        'description': 'Riconoscimento vocale',
+    },
+    'tts': {
+        'modules': ('Artificial_Intelligence.Sintesi_Vocale', 'pyttsx3', 'gtts'),
+        'requires': ('pyttsx3', 'gtts'),
+        'description': 'Sintesi vocale',
+    },
+    'ocr': {
+        'modules': ('pytesseract', 'PIL'),
+        'requires': ('pytesseract', 'PIL'),
+        'description': 'OCR delle immagini',
+    },
+    'pdf': {
+        'modules': ('fitz', 'core.document_tools'),
+        'requires': ('fitz',),
+        'description': 'Lettura PDF',
+    },
+    'translation': {
+        'modules': ('argostranslate',),
+        'requires': ('argostranslate',),
+        'description': 'Traduzione offline',
+    },
+    'multimedia': {
+        'modules': ('PyQt6.QtMultimedia',),
+        'requires': ('PyQt6.QtMultimedia',),
+        'description': 'Riproduzione audio/video',
+    },
+    'security': {
+        'modules': (
+            'Autenticazione_e_Accesso',
+            'assistente_dsa.Autenticazione_e_Accesso',
+            'cryptography',
+            'core.security_dashboard',
+            'core.advanced_encryption',
+        ),
+        'requires': ('cryptography',),
+        'description': 'Autenticazione, crittografia e dashboard di sicurezza',
+    },
+}
+
 
 class LazyLoader:
     """Caricatore lazy per moduli pesanti con caching intelligente."""
 
     def __init__(self):
         self._loaded_modules: Dict[str, Any] = {}
+        self._available: Dict[str, bool] = {}
         self._module_specs: Dict[str, Dict[str, Any]] = {
             # Moduli pesanti da caricare lazy
             'cv2': {
@@ -101,12 +159,16 @@ class LazyLoader:
         if module_name in self._loaded_modules:
             return self._loaded_modules[module_name] is not None
 
-        # Controlla se il modulo può essere importato
-        try:
-            spec = importlib.util.find_spec(module_name)
-            return spec is not None
-        except Exception:
-            return False
+        if module_name in sys.modules:
+            return True
+        if module_name not in self._available:
+            # Controlla se il modulo può essere importato
+            try:
+                available = importlib.util.find_spec(module_name) is not None
+            except Exception:
+                available = False
+            self._available[module_name] = available
+        return self._available[module_name]
 
     def preload_critical_modules(self):
         """Precarica moduli critici all'avvio."""
@@ -142,6 +204,87 @@ class LazyLoader:
 lazy_loader = LazyLoader()
 
 
+class LazyAttribute:
+    """Modulo, o suo attributo, importato al primo uso.
+
+    Chiamarlo o leggerne un attributo importa il modulo (una volta sola);
+    il test di verità (``if SpeechRecognitionThread:``) controlla le
+    librerie richieste senza importare nulla, finché il modulo non è
+    stato caricato.
+    """
+
+    __slots__ = ('_module', '_attr', '_default', '_requires', '_resolved', '_target')
+
+    def __init__(self, module: str, attr: Optional[str] = None,
+                 default: Any = None, requires: Tuple[str, ...] = ()):
+        self._module = module
+        self._attr = attr
+        self._default = default
+        self._requires = tuple(requires)
+        self._resolved = False
+        self._target: Any = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._resolved
+
+    def resolve(self) -> Any:
+        """Importa il modulo e restituisce l'oggetto (o il default)."""
+        if not self._resolved:
+            module = lazy_loader.load_module(self._module)
+            if module is None:
+                target = self._default
+            elif self._attr is None:
+                target = module
+            else:
+                target = getattr(module, self._attr, self._default)
+            self._target = target
+            self._resolved = True
+        return self._target
+
+    def _name(self) -> str:
+        return self._module + ('.' + self._attr if self._attr else '')
+
+    def __call__(self, *args, **kwargs):
+        target = self.resolve()
+        if target is None:
+            raise ImportError(f"{self._name()} non disponibile")
+        return target(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        target = self.resolve()
+        if target is None:
+            raise AttributeError(f"{self._name()} non disponibile")
+        return getattr(target, name)
+
+    def __bool__(self) -> bool:
+        if self._resolved:
+            return self._target is not None
+        if self._requires:
+            return all(lazy_loader.is_module_available(m) for m in self._requires)
+        return self.resolve() is not None
+
+    def __repr__(self) -> str:
+        state = 'caricato' if self._resolved else 'non caricato'
+        return f"<LazyAttribute {self._name()} ({state})>"
+
+
+def lazy_attr(module: str, attr: Optional[str] = None, default: Any = None,
+              subsystem: Optional[str] = None) -> LazyAttribute:
+    """Riferimento pigro a ``module.attr`` (o al modulo se ``attr`` è None).
+
+    Con ``subsystem`` la disponibilità si ricava dalle librerie richieste
+    dal sottosistema (SUBSYSTEMS), senza importare il modulo.
+    """
+    requires = SUBSYSTEMS[subsystem]['requires'] if subsystem else ()
+    return LazyAttribute(module, attr, default, requires)
+
+
+def subsystem_available(name: str) -> bool:
+    """True se le librerie richieste dal sottosistema sono installate."""
+    return all(lazy_loader.is_module_available(m) for m in SUBSYSTEMS[name]['requires'])
+
+
 def lazy_import(module_name: str) -> Any:
     """Funzione di comodo per import lazy."""
     return lazy_loader.load_module(module_name)
@@ -152,9 +295,12 @@ def is_available(module_name: str) -> bool:
     return lazy_loader.is_module_available(module_name)
 
 
-# Inizializzazione all'import
 def initialize_lazy_loading():
-    """Inizializza il sistema di lazy loading."""
+    """Inizializza il sistema di lazy loading (precarica numpy e PIL).
+
+    Non viene più chiamata all'import del modulo: precaricare all'avvio è
+    proprio ciò che il caricamento pigro vuole evitare.
+    """
     logger.info("🚀 Inizializzazione lazy loading system")
     lazy_loader.preload_critical_modules()
 
@@ -170,8 +316,3 @@ def initialize_lazy_loading():
                     if spec.get('heavy', False) and lazy_loader.is_module_available(name)]
     if heavy_modules:
         logger.info(f"⚡ Moduli pesanti disponibili: {', '.join(heavy_modules)}")
-
-
-# Auto-inizializzazione quando il modulo viene importato
-if __name__ != '__main__':
-    initialize_lazy_loading()
\ No newline at end of file
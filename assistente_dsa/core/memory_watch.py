@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Memory Watch - Ricerca delle crescite di memoria nelle sessioni lunghe
+
+Modalità facoltativa (rallenta le allocazioni: si accende dalle
+impostazioni, diagnostics.memory_watch_*). Un thread in background, a
+intervalli fissi:
+
+ - prende uno snapshot di tracemalloc e lo confronta con quello di
+   partenza: le righe di codice le cui allocazioni vive sono cresciute di
+   più sono i primi sospettati;
+ - conta le istanze delle classi da tenere d'occhio (QPixmap, QImage,
+   DraggableTextWidget, ...) e la lunghezza dei contenitori noti per
+   crescere (VLMManager.ocr_cache, ThreatDetectionEngine.event_buffer);
+ - registra memoria residente e tracciata nel PerformanceMonitor
+   (memory.rss_mb, memory.traced_mb), quindi anche nelle metriche locali.
+
+Quando la memoria è cresciuta di almeno ``threshold_mb`` dall'ultimo
+resoconto (o dall'avvio) scrive un resoconto JSON compatto in
+debug_logs/memory_growth_<data>.json: un file per soglia superata, non
+uno per controllo.
+"""
+
+import gc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_INTERVAL = 60.0  # secondi tra due snapshot
+DEFAULT_THRESHOLD_MB = 50.0  # crescita che produce un resoconto
+DEFAULT_TOP = 15  # righe di codice riportate
+DEFAULT_FRAMES = 1  # profondità delle tracce di tracemalloc
+
+# Classi di cui contare le istanze (per nome, senza importarle)
+DEFAULT_TRACKED_CLASSES = (
+    "QPixmap",
+    "QImage",
+    "DraggableTextWidget",
+    "VideoThread",
+    "OllamaThread",
+)
+
+# Contenitori da misurare: (suffisso del modulo, istanza globale, attributo).
+# Si leggono solo se il modulo è già importato: nessun import dal watcher.
+DEFAULT_CONTAINERS = (
+    ("Ollama.vlm_manager", "vlm_manager", "ocr_cache"),
+    ("core.threat_detection", "threat_detection_engine", "event_buffer"),
+)
+
+# Allocazioni di tracemalloc stesso e dell'import dei moduli
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+Probe = Callable[[], Optional[int]]
+
+
+def container_probe(module_suffix: str, instance: str, attribute: str) -> Probe:
+    """Lunghezza di ``<modulo>.<istanza>.<attributo>``, se il modulo è caricato."""
+
+    def probe() -> Optional[int]:
+        for name, module in list(sys.modules.items()):
+            if name.endswith(module_suffix) and module is not None:
+                container = getattr(getattr(module, instance, None), attribute, None)
+                if container is not None:
+                    return len(container)
+        return None
+
+    return probe
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+class MemoryWatcher:
+    """Snapshot periodici di tracemalloc, conteggi di oggetti e resoconti."""
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        threshold_mb: float = DEFAULT_THRESHOLD_MB,
+        report_dir: Optional[str] = None,
+        top: int = DEFAULT_TOP,
+        frames: int = DEFAULT_FRAMES,
+        tracked_classes: Sequence[str] = DEFAULT_TRACKED_CLASSES,
+        probes: Optional[Dict[str, Probe]] = None,
+    ):
+        self.interval = interval
+        self.threshold_mb = threshold_mb
+        self.report_dir = report_dir
+        self.top = top
+        self.frames = frames
+        self.tracked_classes = frozenset(tracked_classes)
+        if probes is None:
+            probes = {
+                f"{instance}.{attribute}": container_probe(suffix, instance, attribute)
+                for suffix, instance, attribute in DEFAULT_CONTAINERS
+            }
+        self.probes = probes
+
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+        self._start_time = 0.0
+        self._start_memory = 0  # byte all'avvio (RSS, o tracciati senza psutil)
+        self._reported_memory = 0  # byte all'ultimo resoconto
+        self._start_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()  # un controllo alla volta
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_check: Dict[str, Any] = {}
+        self.reports: List[str] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    # ------------------------------------------------------------------
+    # Misure
+    # ------------------------------------------------------------------
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def _memory(self) -> Tuple[int, int]:
+        """(byte da confrontare con la soglia, byte tracciati)."""
+        traced = tracemalloc.get_traced_memory()[0]
+        rss = _rss_bytes()
+        return (rss if rss is not None else traced), traced
+
+    def count_objects(self) -> Dict[str, int]:
+        """Istanze vive delle classi tracciate e lunghezza dei contenitori.
+
+        Scorre gli oggetti del garbage collector: O(oggetti vivi), per
+        questo si fa solo a ogni controllo e mai nel thread dell'interfaccia.
+        """
+        counts = dict.fromkeys(sorted(self.tracked_classes), 0)
+        if self.tracked_classes:
+            for obj in gc.get_objects():
+                name = type(obj).__name__
+                if name in counts:
+                    counts[name] += 1
+        for name, probe in self.probes.items():
+            try:
+                size = probe()
+            except Exception as e:
+                logging.debug(f"Misura di {name} non riuscita: {e}")
+                continue
+            if size is not None:
+                counts[name] = size
+        return counts
+
+    # ------------------------------------------------------------------
+    # Controllo periodico
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Avvia tracemalloc (se spento) e il thread, che fissa il punto di partenza."""
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracemalloc = True
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="memory-watch", daemon=True
+        )
+        self._thread.start()
+        logging.info(
+            f"Osservazione della memoria attiva (ogni {self.interval:.0f} s, "
+            f"soglia {self.threshold_mb:.0f} MB)"
+        )
+
+    def reset_baseline(self) -> None:
+        """Nuovo punto di partenza per crescite e conteggi."""
+        with self._lock:
+            self._start_time = time.monotonic()
+            self._start_memory = self._reported_memory = self._memory()[0]
+            self._start_counts = self.count_objects()
+            self._baseline = self._snapshot()  # per ultimo: segna "pronto"
+
+    def _run(self) -> None:
+        self.reset_baseline()
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.warning(f"Controllo della memoria non riuscito: {e}")
+
+    def check(self) -> Optional[str]:
+        """Un controllo: misura, e se oltre soglia scrive il resoconto (percorso)."""
+        with self._lock:
+            if self._baseline is None:
+                return None
+            memory, traced = self._memory()
+            snapshot = self._snapshot()
+            growth = [
+                stat
+                for stat in snapshot.compare_to(self._baseline, "lineno")
+                if stat.size_diff > 0
+            ][: self.top]
+            counts = self.count_objects()
+            self.last_check = {
+                "memory_mb": memory / 2**20,
+                "traced_mb": traced / 2**20,
+                "growth_mb": (memory - self._start_memory) / 2**20,
+                "top": [(str(s.traceback), s.size_diff) for s in growth[:3]],
+                "objects": counts,
+            }
+            self._record_metrics(memory, traced)
+            if memory - self._reported_memory < self.threshold_mb * 2**20:
+                return None
+            self._reported_memory = memory
+            return self._write_report(memory, traced, growth, counts)
+
+    def _record_metrics(self, memory: int, traced: int) -> None:
+        try:
+            from core.performance_monitor import performance_monitor
+        except ImportError:
+            try:
+                from assistente_dsa.core.performance_monitor import performance_monitor
+            except ImportError:
+                return
+        performance_monitor.record_metric("memory.rss_mb", memory / 2**20)
+        performance_monitor.record_metric("memory.traced_mb", traced / 2**20)
+
+    def _write_report(self, memory, traced, growth, counts) -> Optional[str]:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "uptime_s": round(time.monotonic() - self._start_time),
+            "memory_mb": round(memory / 2**20, 1),
+            "growth_mb": round((memory - self._start_memory) / 2**20, 1),
+            "traced_mb": round(traced / 2**20, 1),
+            "top_growth": [
+                {
+                    "site": str(stat.traceback),
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                    "traceback": stat.traceback.format() if self.frames > 1 else None,
+                }
+                for stat in growth
+            ],
+            "objects": {
+                name: {"count": count, "delta": count - self._start_counts.get(name, 0)}
+                for name, count in counts.items()
+            },
+        }
+        if self.report_dir is None:
+            logging.warning(f"Crescita della memoria: {json.dumps(report)}")
+            return None
+        path = os.path.join(
+            self.report_dir,
+            f"memory_growth_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        )
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=1, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"Resoconto della memoria non scritto: {e}")
+            return None
+        self.reports.append(path)
+        logging.warning(
+            f"Memoria cresciuta di {report['growth_mb']} MB: resoconto in {path}"
+        )
+        return path
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Ferma il thread e, se l'aveva avviato, tracemalloc."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._baseline = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+# Istanza globale (spenta finché non viene abilitata nelle impostazioni)
+memory_watcher = MemoryWatcher()
+
+
+def get_memory_watcher() -> MemoryWatcher:
+    """Restituisce l'osservatore della memoria dell'applicazione."""
+    return memory_watcher
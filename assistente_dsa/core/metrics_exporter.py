@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Metrics Exporter - Metriche locali in formato Prometheus / OpenMetrics
+
+Per le postazioni che restano accese tutto il giorno: un thread in
+background raccoglie a intervalli fissi le metriche già tenute in memoria
+dall'applicazione e le rende disponibili
+
+ - su http://127.0.0.1:<porta>/metrics, nel formato testo di Prometheus
+   (o OpenMetrics, se il client lo chiede nell'header Accept);
+ - in un file OpenMetrics riscritto a ogni raccolta (debug_logs/metrics.prom),
+   da copiare o leggere anche senza un server Prometheus.
+
+Fonti: processo (RSS, memoria virtuale, CPU, thread), PerformanceMonitor
+(percentili, somma, conteggio e ultimo valore di ogni metrica: latenza
+delle richieste all'AI, richieste in corso, costo del filtro eventi, ...),
+FrameTracer (frame, fps e tempi per fase del video), CacheManager
+(hit, miss, hit rate, voci), sink JSON Lines (profondità delle code,
+record scartati) e HealthMonitor (controlli sani/non sani, alert).
+
+Il costo è limitato: la raccolta avviene solo ogni ``interval`` secondi,
+qualunque sia la frequenza delle richieste HTTP, che ricevono l'ultimo
+testo già pronto. I controlli di salute non vengono eseguiti qui, se ne
+leggono solo gli esiti. Il server ascolta solo su localhost ed è spento
+finché non viene abilitato nelle impostazioni (diagnostics.metrics_exporter_*).
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PORT = 9464
+DEFAULT_INTERVAL = 15.0  # secondi tra due raccolte
+PREFIX = "cogniflow"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class MetricFamily:
+    """Una famiglia di metriche: nome, tipo, descrizione e campioni."""
+
+    __slots__ = ("name", "kind", "help", "samples")
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = f"{PREFIX}_{name}"
+        self.kind = kind  # gauge, counter, summary
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels) -> "MetricFamily":
+        self.samples.append((suffix, labels, value))
+        return self
+
+
+Collector = Callable[[], List[MetricFamily]]
+
+
+# ----------------------------------------------------------------------
+# Fonti
+# ----------------------------------------------------------------------
+def _performance_monitor():
+    try:
+        from core.performance_monitor import performance_monitor
+    except ImportError:
+        from assistente_dsa.core.performance_monitor import performance_monitor
+    return performance_monitor
+
+
+def collect_process() -> List[MetricFamily]:
+    """Memoria, CPU e thread del processo."""
+    system = _performance_monitor().get_system_metrics()
+    families = [
+        MetricFamily("python_threads", "gauge", "Thread Python attivi").add(
+            threading.active_count()
+        )
+    ]
+    for key, name, help_text in (
+        ("memory_rss", "process_resident_memory_bytes", "Memoria residente (RSS)"),
+        ("memory_vms", "process_virtual_memory_bytes", "Memoria virtuale"),
+        ("cpu_percent", "process_cpu_percent", "CPU del processo dall'ultima lettura"),
+        ("num_threads", "process_threads", "Thread del sistema operativo"),
+        ("num_fds", "process_open_fds", "Descrittori di file aperti"),
+    ):
+        if system.get(key) is not None:
+            families.append(MetricFamily(name, "gauge", help_text).add(system[key]))
+    return families
+
+
+def collect_performance_monitor() -> List[MetricFamily]:
+    """Riassunto di ogni metrica del PerformanceMonitor."""
+    summaries = MetricFamily(
+        "monitor", "summary", "Metriche del PerformanceMonitor (unità nel nome)"
+    )
+    latest = MetricFamily("monitor_latest", "gauge", "Ultimo valore registrato")
+    for metric, data in sorted(_performance_monitor().summaries().items()):
+        if not data["count"]:
+            continue
+        for p in (50, 95, 99):
+            if f"p{p}" in data:
+                summaries.add(data[f"p{p}"], metric=metric, quantile=str(p / 100))
+        summaries.add(data["avg"] * data["count"], "_sum", metric=metric)
+        summaries.add(data["count"], "_count", metric=metric)
+        latest.add(data["latest"], metric=metric)
+    return [summaries, latest]
+
+
+def collect_video() -> List[MetricFamily]:
+    """Frame elaborati, fps e tempi per fase (se il tracer dei frame è acceso)."""
+    try:
+        from core.frame_tracer import FRAME_SPAN, get_frame_tracer
+    except ImportError:
+        from assistente_dsa.core.frame_tracer import FRAME_SPAN, get_frame_tracer
+
+    tracer = get_frame_tracer()
+    families = [
+        MetricFamily("video_tracing_enabled", "gauge", "Tracer dei frame acceso").add(
+            1 if tracer.enabled else 0
+        ),
+        MetricFamily("video_frames", "counter", "Frame tracciati").add(
+            tracer.stats["frames"]
+        ),
+    ]
+    breakdown = tracer.breakdown()
+    if not breakdown:
+        return families
+    avg = MetricFamily("video_stage_avg_seconds", "gauge", "Media per fase, ultimi frame")
+    p95 = MetricFamily("video_stage_p95_seconds", "gauge", "p95 per fase, ultimi frame")
+    for stage, values in breakdown.items():
+        avg.add(values["avg_ms"] / 1000.0, stage=stage)
+        p95.add(values["p95_ms"] / 1000.0, stage=stage)
+    families += [avg, p95]
+    frame_ms = breakdown.get(FRAME_SPAN, {}).get("avg_ms")
+    if frame_ms:
+        families.append(
+            MetricFamily("video_fps", "gauge", "Frame al secondo, ultimi frame").add(
+                1000.0 / frame_ms
+            )
+        )
+    return families
+
+
+def collect_caches() -> List[MetricFamily]:
+    """Hit, miss, hit rate e voci di ogni cache del CacheManager."""
+    try:
+        from core.cache_manager import get_cache_manager
+    except ImportError:
+        from assistente_dsa.core.cache_manager import get_cache_manager
+
+    hits = MetricFamily("cache_hits", "counter", "Letture trovate in cache")
+    misses = MetricFamily("cache_misses", "counter", "Letture non trovate in cache")
+    ratio = MetricFamily("cache_hit_ratio", "gauge", "Hit / (hit + miss)")
+    entries = MetricFamily("cache_entries", "gauge", "Voci in cache")
+    for cache, stats in sorted(get_cache_manager().get_all_stats().items()):
+        hits.add(stats["hits"], cache=cache)
+        misses.add(stats["misses"], cache=cache)
+        ratio.add(stats["hit_rate"], cache=cache)
+        entries.add(stats["total_entries"], cache=cache)
+    return [hits, misses, ratio, entries]
+
+
+def collect_sinks() -> List[MetricFamily]:
+    """Code dei file JSON Lines scritti in background."""
+    try:
+        from core.metrics_sink import all_stats
+    except ImportError:
+        from assistente_dsa.core.metrics_sink import all_stats
+
+    depth = MetricFamily("sink_queue_depth", "gauge", "Record in coda di scrittura")
+    written = MetricFamily("sink_written", "counter", "Record scritti su file")
+    dropped = MetricFamily("sink_dropped", "counter", "Record scartati a coda piena")
+    for path, stats in sorted(all_stats().items()):
+        name = os.path.basename(path)
+        depth.add(stats["queue_depth"], file=name)
+        written.add(stats["written"], file=name)
+        dropped.add(stats["dropped"], file=name)
+    return [depth, written, dropped]
+
+
+def collect_health() -> List[MetricFamily]:
+    """Esito degli ultimi controlli di salute (senza eseguirli)."""
+    try:
+        from core.health_monitor import get_health_status
+    except ImportError:
+        from assistente_dsa.core.health_monitor import get_health_status
+
+    status = get_health_status()
+    families = [
+        MetricFamily("health_active_alerts", "gauge", "Alert dell'ultima ora").add(
+            status["active_alerts"]
+        )
+    ]
+    if status["last_check"] is not None:  # prima del primo controllo: nessun esito
+        families.append(
+            MetricFamily("health_checks", "gauge", "Controlli di salute per esito")
+            .add(status["healthy_checks"], state="healthy")
+            .add(status["unhealthy_checks"], state="unhealthy")
+        )
+    return families
+
+
+DEFAULT_COLLECTORS: Tuple[Collector, ...] = (
+    collect_process,
+    collect_performance_monitor,
+    collect_video,
+    collect_caches,
+    collect_sinks,
+    collect_health,
+)
+
+
+# ----------------------------------------------------------------------
+# Formato testo
+# ----------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render(families: Sequence[MetricFamily], openmetrics: bool = False) -> str:
+    """Testo Prometheus 0.0.4, oppure OpenMetrics 1.0 (con ``# EOF``)."""
+    lines = []
+    for family in families:
+        if not family.samples:
+            continue
+        name = family.name
+        # In OpenMetrics il nome del contatore è senza _total, in Prometheus con
+        declared = name if openmetrics or family.kind != "counter" else name + "_total"
+        lines.append(f"# HELP {declared} {_escape(family.help)}")
+        lines.append(f"# TYPE {declared} {family.kind}")
+        for suffix, labels, value in family.samples:
+            if family.kind == "counter":
+                suffix = "_total"
+            label_text = ""
+            if labels:
+                label_text = (
+                    "{"
+                    + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    + "}"
+                )
+            lines.append(f"{name}{suffix}{label_text} {_number(value)}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Esportatore
+# ----------------------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    timeout = 5  # un client lento non blocca il server più di così
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.exporter.text(openmetrics).encode("utf-8")
+        # Contata prima di rispondere: il client vede già il valore aggiornato
+        self.server.exporter.stats["scrapes"] += 1
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("metrics %s - " + format, self.address_string(), *args)
+
+
+class MetricsExporter:
+    """Raccolta periodica in background, endpoint HTTP locale e file OpenMetrics."""
+
+    def __init__(
+        self,
+        port: Optional[int] = DEFAULT_PORT,
+        interval: float = DEFAULT_INTERVAL,
+        dump_path: Optional[str] = None,
+        collectors: Sequence[Collector] = DEFAULT_COLLECTORS,
+        host: str = "127.0.0.1",
+    ):
+        self.port = port  # None = nessun server HTTP, 0 = porta libera qualsiasi
+        self.interval = interval
+        self.dump_path = dump_path
+        self.collectors = tuple(collectors)
+        self.host = host
+
+        self._texts = ("", "")  # (Prometheus, OpenMetrics), sostituiti in blocco
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[HTTPServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+        self.stats = {
+            "collections": 0,
+            "collect_seconds": 0.0,
+            "errors": 0,
+            "scrapes": 0,
+            "dumps": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """(host, porta) su cui ascolta il server, se avviato."""
+        if self._server is None:
+            return None
+        return self._server.server_address[:2]
+
+    def text(self, openmetrics: bool = False) -> str:
+        """Ultimo testo raccolto."""
+        return self._texts[1 if openmetrics else 0]
+
+    def collect(self) -> List[MetricFamily]:
+        """Interroga tutte le fonti; una fonte in errore non ferma le altre."""
+        families = []
+        for collector in self.collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.debug(f"Metriche da {collector.__name__} non disponibili: {e}")
+        return families
+
+    def refresh(self) -> None:
+        """Raccoglie, prepara i due formati e riscrive il file."""
+        start = time.perf_counter()
+        families = self.collect()
+        self.stats["collections"] += 1
+        families += [
+            MetricFamily(
+                "exporter_collect_seconds", "gauge", "Durata della raccolta precedente"
+            ).add(self.stats["collect_seconds"]),
+            MetricFamily("exporter_scrapes", "counter", "Richieste HTTP servite").add(
+                self.stats["scrapes"]
+            ),
+            MetricFamily("exporter_errors", "counter", "Fonti non lette").add(
+                self.stats["errors"]
+            ),
+        ]
+        self._texts = (render(families), render(families, openmetrics=True))
+        self.stats["collect_seconds"] = time.perf_counter() - start
+        if self.dump_path:
+            self._dump()
+
+    def _dump(self) -> None:
+        tmp = self.dump_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.dump_path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self._texts[1])
+            os.replace(tmp, self.dump_path)  # chi legge non vede mai un file a metà
+            self.stats["dumps"] += 1
+        except OSError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Scrittura di {self.dump_path} non riuscita: {e}")
+
+    def start(self) -> bool:
+        """Avvia raccolta periodica e server; False se la porta non è disponibile."""
+        if self.running:
+            return True
+        self._stop.clear()
+        if self.port is not None:
+            try:
+                self._server = HTTPServer((self.host, self.port), _MetricsHandler)
+            except OSError as e:
+                logging.warning(f"Endpoint metriche su porta {self.port} non avviato: {e}")
+                return False
+            self._server.exporter = self
+            self._server_thread = threading.Thread(
+                target=self._server.serve_forever,
+                kwargs={"poll_interval": 0.5},
+                name="metrics-http",
+                daemon=True,
+            )
+            self._server_thread.start()
+            logging.info(f"Metriche su http://{self.host}:{self.address[1]}/metrics")
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Ferma server e raccolta."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in (self._server_thread, self._thread):
+            if thread is not None:
+                thread.join(timeout)
+        self._server_thread = None
+        self._thread = None
+
+
+# Istanza globale (spenta finché non viene abilitata nelle impostazioni)
+metrics_exporter = MetricsExporter()
+
+
+def get_metrics_exporter() -> MetricsExporter:
+    """Restituisce l'esportatore di metriche dell'applicazione."""
+    return metrics_exporter
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Metrics Sink - Scrittura asincrona a lotti di file JSON Lines
+
+Chi registra (metriche dell'interfaccia, registro delle difficoltà, audit)
+mette il record in una coda in memoria e torna subito: un thread di
+scrittura, uno per file, serializza i record e li aggiunge al file a lotti,
+con una sola apertura del file per lotto. Un trascinamento della finestra
+non produce più una raffica di scritture sul thread dell'interfaccia.
+
+Opzioni per file:
+ - rotazione per dimensione (max_bytes, backups): file.jsonl diventa
+   file.jsonl.1, .2, ... come RotatingFileHandler; 0 = nessuna rotazione,
+   per i registri che non vanno mai spezzati (audit);
+ - campionamento (sample_rate): si tiene solo una frazione dei record,
+   per le metriche frequenti; write(..., sample=False) li tiene sempre;
+ - coda limitata (max_queue): se il disco non tiene il passo i record
+   nuovi vengono scartati e contati, invece di far crescere la memoria.
+
+I record non vanno modificati dopo write: vengono serializzati dopo, nel
+thread di scrittura. Alla chiusura del programma le code vengono svuotate.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+DEFAULT_FLUSH_INTERVAL = 1.0  # secondi massimi di attesa di un record in coda
+DEFAULT_BATCH_SIZE = 256  # record per lotto (oltre, si scrive subito)
+DEFAULT_MAX_QUEUE = 10000
+
+
+class JsonlSink:
+    """Coda in memoria e thread di scrittura a lotti per un file JSON Lines."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        sample_rate: float = 1.0,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_queue: Optional[int] = DEFAULT_MAX_QUEUE,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+
+        self._queue: Deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._flush_requested = False
+        self._accepted = 0  # record accodati finora
+        self._done = 0  # record già scritti (o falliti)
+        self._random = random.Random()
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "sampled_out": 0,
+            "dropped": 0,
+            "batches": 0,
+            "rotations": 0,
+            "errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lato di chi registra (qualsiasi thread)
+    # ------------------------------------------------------------------
+    def write(self, record: Any, sample: bool = True) -> bool:
+        """Accoda un record; False se scartato (campionamento, coda piena, chiuso)."""
+        if sample and self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            self.stats["sampled_out"] += 1
+            return False
+        with self._cond:
+            if self._closed:
+                return False
+            if self.max_queue is not None and len(self._queue) >= self.max_queue:
+                self.stats["dropped"] += 1
+                return False
+            self._queue.append(record)
+            self._accepted += 1
+            self.stats["queued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"sink-{os.path.basename(self.path)}",
+                    daemon=True,
+                )
+                self._thread.start()
+            elif len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attende che i record accodati finora siano sul file."""
+        with self._cond:
+            target = self._accepted
+            if self._done >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._done >= target, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Scrive quanto resta in coda e ferma il thread di scrittura."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Thread di scrittura
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or self._flush_requested
+                    or len(self._queue) >= self.batch_size,
+                    self.flush_interval,
+                )
+                batch = list(self._queue)
+                self._queue.clear()
+                self._flush_requested = False
+                closing = self._closed
+            if batch:
+                self._write_batch(batch)
+                with self._cond:
+                    self._done += len(batch)
+                    self._cond.notify_all()
+            if closing:
+                with self._cond:
+                    if not self._queue:
+                        return
+
+    def _write_batch(self, batch) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+            except (TypeError, ValueError) as e:
+                self.stats["errors"] += 1
+                logging.warning(f"Record non serializzabile per {self.path}: {e}")
+        if not lines:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                size = f.tell()
+            self.stats["written"] += len(lines)
+            self.stats["batches"] += 1
+            if self.max_bytes and size >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Scrittura di {self.path} non riuscita: {e}")
+
+    def _rotate(self) -> None:
+        """file -> file.1 -> file.2 ...; oltre backups il più vecchio si perde."""
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.stats["rotations"] += 1
+
+
+# Un sink per file, condiviso da chi scrive sullo stesso percorso
+_sinks: Dict[str, JsonlSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_sink(path: str, **options) -> JsonlSink:
+    """Sink condiviso per il file; le opzioni valgono alla prima richiesta.
+
+    Un sink chiuso viene sostituito da uno nuovo.
+    """
+    key = os.path.abspath(path)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None or sink._closed:
+            sink = _sinks[key] = JsonlSink(path, **options)
+        return sink
+
+
+def flush_all(timeout: Optional[float] = None) -> None:
+    """Attende la scrittura di tutti i record accodati (test, chiusura)."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.flush(timeout)
+
+
+def all_stats() -> Dict[str, Dict[str, Any]]:
+    """Contatori e profondità della coda di ogni sink, per percorso."""
+    with _sinks_lock:
+        sinks = list(_sinks.items())
+    return {
+        path: {**sink.stats, "queue_depth": len(sink._queue)} for path, sink in sinks
+    }
+
+
+@atexit.register
+def close_all() -> None:
+    """Svuota e chiude tutti i sink (registrata anche all'uscita)."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
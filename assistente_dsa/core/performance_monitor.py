@@ -2,11 +2,20 @@
 """
 Performance Monitor - Sistema di monitoraggio prestazioni
 Analizza e ottimizza le performance dell'applicazione
+
+Ogni metrica occupa memoria costante, anche registrata a ogni frame del
+video: gli ultimi valori stanno in un buffer circolare di dimensione
+fissa (niente dict e datetime per campione) e la distribuzione completa
+in un istogramma logaritmico in stile HDR, da cui si leggono p50/p95/p99
+con un errore relativo di circa il 3%. I tempi si misurano con
+perf_counter_ns. Snapshot e report costano O(metriche), non O(campioni).
 """
 
+import math
 import time
 import psutil
 import threading
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional, Callable
 from functools import wraps
 from datetime import datetime
@@ -14,12 +23,145 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Valori recenti tenuti per metrica (buffer circolare)
+DEFAULT_RING_SIZE = 1024
+# Sotto-intervalli per potenza di 2 dell'istogramma: errore relativo ~1/(2*32)
+HISTOGRAM_SUB_BUCKETS = 32
+PERCENTILES = (50, 95, 99)
+
+SystemMetricsType = Dict[str, Any]
+
+
+class LogHistogram:
+    """Istogramma a intervalli logaritmici (stile HDR) con memoria limitata.
+
+    Un valore finisce nell'intervallo (esponente, sotto-intervallo) della
+    sua rappresentazione binaria: gli intervalli sono al più
+    HISTOGRAM_SUB_BUCKETS per ogni potenza di 2 effettivamente usata.
+    """
+
+    __slots__ = ("sub_buckets", "buckets", "zero", "count")
+
+    def __init__(self, sub_buckets: int = HISTOGRAM_SUB_BUCKETS):
+        self.sub_buckets = sub_buckets
+        self.buckets: Dict[tuple, int] = {}
+        self.zero = 0  # valori nulli (e non finiti)
+        self.count = 0
+
+    def _key(self, value: float) -> tuple:
+        mantissa, exponent = math.frexp(abs(value))  # 0.5 <= mantissa < 1
+        sub = int((mantissa - 0.5) * 2 * self.sub_buckets)
+        return (1 if value > 0 else -1, exponent, sub)
+
+    def _value(self, key: tuple) -> float:
+        sign, exponent, sub = key
+        mantissa = 0.5 + (sub + 0.5) / (2 * self.sub_buckets)  # centro dell'intervallo
+        return sign * math.ldexp(mantissa, exponent)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value == 0 or not math.isfinite(value):
+            self.zero += 1
+            return
+        key = self._key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def _ordered(self):
+        """(valore rappresentativo, conteggio) in ordine crescente."""
+        items = [(self._value(k), n) for k, n in self.buckets.items()]
+        if self.zero:
+            items.append((0.0, self.zero))
+        items.sort()
+        return items
+
+    def percentiles(self, ps=PERCENTILES) -> Dict[int, float]:
+        """Percentili richiesti con una sola scansione degli intervalli."""
+        if not self.count:
+            return {}
+        result = {}
+        wanted = sorted(ps)
+        seen = 0
+        items = self._ordered()
+        index = 0
+        for p in wanted:
+            rank = max(1, math.ceil(p / 100.0 * self.count))
+            while seen + items[index][1] < rank:
+                seen += items[index][1]
+                index += 1
+            result[p] = items[index][0]
+        return result
+
+
+class MetricSeries:
+    """Una metrica: buffer circolare dei valori recenti e istogramma completo."""
+
+    __slots__ = (
+        "_ring", "_pos", "count", "total", "min", "max", "latest",
+        "last_time", "last_tags", "histogram",
+    )
+
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE):
+        self._ring: List[float] = [0.0] * ring_size
+        self._pos = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.latest = 0.0
+        self.last_time = 0.0  # time.time() dell'ultimo valore
+        self.last_tags: Dict[str, Any] = {}
+        self.histogram = LogHistogram()
+
+    def add(self, value: float, tags: Optional[Dict[str, Any]] = None) -> None:
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._ring)
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.latest = value
+        self.last_time = time.time()
+        if tags:
+            self.last_tags = tags
+        self.histogram.add(value)
+
+    def __len__(self) -> int:
+        """Valori recenti disponibili (al più la dimensione del buffer)."""
+        return min(self.count, len(self._ring))
+
+    def recent(self) -> List[float]:
+        """Valori recenti, dal più vecchio."""
+        size = len(self._ring)
+        if self.count < size:
+            return self._ring[: self.count]
+        return self._ring[self._pos:] + self._ring[: self._pos]
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        data = {
+            "count": self.count,
+            "avg": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "latest": self.latest,
+        }
+        # Percentili dall'istogramma, ricondotti all'intervallo osservato
+        for p, value in self.histogram.percentiles().items():
+            data[f"p{p}"] = min(max(value, self.min), self.max)
+        if self.last_tags:
+            data["tags"] = dict(self.last_tags)
+        return data
+
 
 class PerformanceMonitor:
     """Monitor di prestazioni per l'applicazione."""
 
-    def __init__(self):
-        self.metrics = {}
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE):
+        self.ring_size = ring_size
+        self.metrics: Dict[str, MetricSeries] = {}
         self.snapshots = []
         self.lock = threading.Lock()
         self.process = psutil.Process()
@@ -30,14 +172,14 @@ class PerformanceMonitor:
         def decorator(func: Callable):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_ns = time.perf_counter_ns()
                 try:
                     result = func(*args, **kwargs)
-                    execution_time = time.time() - start_time
+                    execution_time = (time.perf_counter_ns() - start_ns) / 1e9
                     self.record_metric(f"{func_name}.execution_time", execution_time)
                     return result
                 except Exception as e:
-                    execution_time = time.time() - start_time
+                    execution_time = (time.perf_counter_ns() - start_ns) / 1e9
                     self.record_metric(f"{func_name}.execution_time", execution_time)
                     self.record_metric(f"{func_name}.error_count", 1)
                     raise e
@@ -46,27 +188,28 @@ class PerformanceMonitor:
 
         return decorator
 
+    @contextmanager
+    def measure(self, name: str):
+        """Misura un blocco di codice: ``with monitor.measure("nome"): ...``."""
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_metric(
+                f"{name}.execution_time", (time.perf_counter_ns() - start_ns) / 1e9
+            )
+
     def record_metric(
         self, name: str, value: float, tags: Optional[Dict[str, Any]] = None
     ):
-        """Registra una metrica."""
+        """Registra una metrica (tempo costante, memoria costante per metrica)."""
         with self.lock:
-            if name not in self.metrics:
-                self.metrics[name] = []
-
-            metric_data = {
-                "timestamp": datetime.now(),
-                "value": value,
-                "tags": tags or {},
-            }
-
-            self.metrics[name].append(metric_data)
-
-            # Mantieni solo le ultime 1000 metriche per metrica
-            if len(self.metrics[name]) > 1000:
-                self.metrics[name] = self.metrics[name][-1000:]
+            series = self.metrics.get(name)
+            if series is None:
+                series = self.metrics[name] = MetricSeries(self.ring_size)
+            series.add(value, tags)
 
-    def get_system_metrics(self) -> Dict[str, Any]:
+    def get_system_metrics(self) -> SystemMetricsType:
         """Ottiene metriche di sistema."""
         try:
             cpu_percent = self.process.cpu_percent()
@@ -83,17 +226,22 @@ class PerformanceMonitor:
                     self.process.num_fds() if hasattr(self.process, "num_fds") else None
                 ),
             }
-        except Exception:
-            logger.error("Error getting system metrics: {e}")
+        except Exception as e:
+            logger.error(f"Error getting system metrics: {e}")
             return {}
 
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Riassunto di ogni metrica (conteggio, media, min, max, percentili)."""
+        with self.lock:
+            return {name: series.summary() for name, series in self.metrics.items()}
+
     def take_snapshot(self, label: str = ""):
-        """Crea uno snapshot delle metriche correnti."""
+        """Crea uno snapshot delle metriche correnti (riassunti, non campioni)."""
         snapshot = {
             "timestamp": datetime.now(),
             "label": label,
             "system_metrics": self.get_system_metrics(),
-            "custom_metrics": dict(self.metrics),
+            "custom_metrics": self.summaries(),
         }
 
         with self.lock:
@@ -101,36 +249,25 @@ class PerformanceMonitor:
 
             # Mantieni solo gli ultimi 100 snapshot
             if len(self.snapshots) > 100:
-                self.snapshots = self.snapshots[-100:]
+                del self.snapshots[0]
 
         return snapshot
 
     def get_performance_report(self) -> Dict[str, Any]:
         """Genera un report delle prestazioni."""
-        with self.lock:
-            report = {
-                "timestamp": datetime.now(),
-                "system_info": {
-                    "cpu_count": psutil.cpu_count(),
-                    "memory_total": psutil.virtual_memory().total,
-                },
-                "current_metrics": self.get_system_metrics(),
-                "custom_metrics_summary": {},
-            }
-
-            # Riassunto metriche custom
-            for name, values in self.metrics.items():
-                if values:
-                    metric_values = [v["value"] for v in values]
-                    report["custom_metrics_summary"][name] = {
-                        "count": len(metric_values),
-                        "avg": sum(metric_values) / len(metric_values),
-                        "min": min(metric_values),
-                        "max": max(metric_values),
-                        "latest": metric_values[-1],
-                    }
-
-            return report
+        return {
+            "timestamp": datetime.now(),
+            "system_info": {
+                "cpu_count": psutil.cpu_count(),
+                "memory_total": psutil.virtual_memory().total,
+            },
+            "current_metrics": self.get_system_metrics(),
+            "custom_metrics_summary": {
+                name: summary
+                for name, summary in self.summaries().items()
+                if summary["count"]
+            },
+        }
 
     def detect_performance_issues(self) -> List[Dict[str, Any]]:
         """Rileva potenziali problemi di prestazioni."""
@@ -144,7 +281,7 @@ class PerformanceMonitor:
                 {
                     "type": "high_cpu_usage",
                     "severity": "warning",
-                    "message": "Uso CPU elevato: {cpu_percent:.1f}%",
+                    "message": f"Uso CPU elevato: {cpu_percent:.1f}%",
                     "suggestion": "Ottimizza operazioni CPU-intensive o considera multiprocessing",
                 }
             )
@@ -156,7 +293,7 @@ class PerformanceMonitor:
                 {
                     "type": "high_memory_usage",
                     "severity": "warning",
-                    "message": "Uso memoria elevato: {memory_percent:.1f}%",
+                    "message": f"Uso memoria elevato: {memory_percent:.1f}%",
                     "suggestion": "Verifica memory leaks o ottimizza strutture dati",
                 }
             )
@@ -168,7 +305,7 @@ class PerformanceMonitor:
                     {
                         "type": "slow_function",
                         "severity": "info",
-                        "message": "Funzione {name} lenta: {summary['avg']:.2f}s media",
+                        "message": f"Funzione {name} lenta: {summary['avg']:.2f}s media",
                         "suggestion": "Ottimizza algoritmo o considera caching",
                     }
                 )
@@ -176,13 +313,16 @@ class PerformanceMonitor:
         return issues
 
     def export_metrics(self, filepath: str):
-        """Esporta metriche in file JSON."""
+        """Esporta metriche in file JSON (riassunti e valori recenti)."""
         import json
 
         with self.lock:
             data = {
                 "export_timestamp": datetime.now().isoformat(),
-                "metrics": self.metrics,
+                "metrics": {
+                    name: {**series.summary(), "recent": series.recent()}
+                    for name, series in self.metrics.items()
+                },
                 "snapshots": [
                     {
                         "timestamp": s["timestamp"].isoformat(),
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Prefix Index - Le migliori parole per prefisso, senza scorrere il vocabolario
+
+Le parole stanno in un array ordinato: le parole che iniziano con un
+prefisso sono un intervallo contiguo, trovato con due ricerche binarie.
+Per i prefissi con molte parole (gli unici costosi) le prime ``k`` per
+punteggio sono precalcolate; i prefissi con poche parole si risolvono
+scorrendo l'intervallo, che è corto per costruzione. Così ``top`` costa
+O(lunghezza del prefisso + k) qualunque sia la dimensione del vocabolario,
+con molta meno memoria di un trie con un nodo per lettera.
+
+I punteggi sono confrontabili qualsiasi (numeri o tuple, es. frequenza e
+ultimo utilizzo); se un punteggio cresce le liste precalcolate vengono
+aggiornate sul posto, se cala vengono ricalcolate alla prima richiesta.
+"""
+
+import bisect
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Quante parole precalcolate per prefisso (più di quelle mostrate: una
+# può essere esclusa perché coincide con il prefisso stesso)
+DEFAULT_TOP_K = 8
+# Sotto questa dimensione l'intervallo viene scorso direttamente
+SCAN_LIMIT = 32
+
+# Carattere più alto: prefisso + _MAX_CHAR segue tutte le parole con quel prefisso
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Parole con punteggio, interrogabili per prefisso."""
+
+    def __init__(self, scores: Optional[Dict[str, Any]] = None, k: int = DEFAULT_TOP_K):
+        self.k = k
+        self._scores: Dict[str, Any] = dict(scores or {})
+        self._words: List[str] = sorted(self._scores)
+        # prefisso -> [(punteggio, parola), ...] in ordine decrescente
+        self._top: Dict[str, List[Tuple[Any, str]]] = {}
+        self._build("", 0, len(self._words))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._scores
+
+    def score(self, word: str, default: Any = None) -> Any:
+        return self._scores.get(word, default)
+
+    # ------------------------------------------------------------------
+    # Costruzione
+    # ------------------------------------------------------------------
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._words, prefix)
+        hi = bisect.bisect_left(self._words, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def _best(self, words: Iterable[str], k: int) -> List[Tuple[Any, str]]:
+        scores = self._scores
+        return heapq.nlargest(k, ((scores[w], w) for w in words))
+
+    def _build(self, prefix: str, lo: int, hi: int) -> List[Tuple[Any, str]]:
+        """Precalcola le liste dei prefissi "grandi" sotto ``prefix``.
+
+        Restituisce le migliori ``k`` dell'intervallo, così il padre le
+        ottiene fondendo quelle dei figli invece di riscorrere tutto.
+        """
+        if hi - lo <= SCAN_LIMIT:
+            return self._best(self._words[lo:hi], self.k)
+
+        candidates = []
+        depth = len(prefix)
+        i = lo
+        # La parola uguale al prefisso (se c'è) viene prima delle altre
+        if self._words[i] == prefix:
+            candidates.append((self._scores[prefix], prefix))
+            i += 1
+        # Un figlio per ogni lettera successiva: intervalli contigui
+        while i < hi:
+            child = self._words[i][: depth + 1]
+            j = bisect.bisect_left(self._words, child + _MAX_CHAR, i, hi)
+            candidates.extend(self._build(child, i, j))
+            i = j
+
+        top = heapq.nlargest(self.k, candidates)
+        self._top[prefix] = top
+        return top
+
+    # ------------------------------------------------------------------
+    # Interrogazione
+    # ------------------------------------------------------------------
+    def top(self, prefix: str, n: int, exclude: Optional[str] = None) -> List[str]:
+        """Fino a ``n`` parole che iniziano con ``prefix``, dalla migliore."""
+        want = n + (1 if exclude is not None else 0)
+        cached = self._top.get(prefix)
+        if cached is None or want > self.k:
+            lo, hi = self._range(prefix)
+            if hi - lo > SCAN_LIMIT and want <= self.k:
+                # Prefisso diventato "grande" dopo degli inserimenti
+                cached = self._best(self._words[lo:hi], self.k)
+                self._top[prefix] = cached
+            else:
+                cached = self._best(self._words[lo:hi], want)
+        out = []
+        for _score, word in cached:
+            if word != exclude:
+                out.append(word)
+                if len(out) >= n:
+                    break
+        return out
+
+    # ------------------------------------------------------------------
+    # Aggiornamento
+    # ------------------------------------------------------------------
+    def set_score(self, word: str, score: Any) -> None:
+        """Inserisce la parola o ne cambia il punteggio."""
+        old = self._scores.get(word)
+        if old is None:
+            bisect.insort(self._words, word)
+        self._scores[word] = score
+        entry = (score, word)
+        for end in range(len(word) + 1):
+            top = self._top.get(word[:end])
+            if top is None:
+                continue
+            position = next((i for i, (_s, w) in enumerate(top) if w == word), None)
+            if old is not None and score < old:
+                if position is not None:
+                    # Punteggio calato: la lista potrebbe aver perso un candidato
+                    del self._top[word[:end]]
+                continue
+            if position is not None:
+                del top[position]
+            elif len(top) >= self.k and entry <= top[-1]:
+                continue
+            top.append(entry)
+            top.sort(reverse=True)
+            del top[self.k:]
+
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Project Index - Indice dei metadati dei progetti salvati
+
+Per mostrare l'elenco dei progetti (nome, data, numero di pensierini) non
+serve aprire e decodificare ogni file: i metadati vengono scritti in un
+piccolo indice (``.project_index`` nella cartella dei progetti) ogni volta
+che un progetto viene salvato. Se i file vengono modificati fuori
+dall'applicazione, ``reconcile`` confronta dimensione e data di modifica e
+rilegge solo i file cambiati; può girare in un thread in background.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".project_index"
+INDEX_VERSION = 1
+PROJECT_EXTENSIONS = (".json",)
+
+
+def is_project_file(filename: str) -> bool:
+    """True per i file di progetto (esclusi i file nascosti come l'indice)."""
+    return not filename.startswith(".") and filename.lower().endswith(PROJECT_EXTENSIONS)
+
+
+def extract_metadata(data: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    """Metadati di un progetto, per entrambi i formati usati dall'app.
+
+    - finestra principale: ``{"metadata": {...}, "pensierini": [...], "workspace": [...]}``
+    - ProjectService: ``{"name": ..., "data": {...}, "created_at": ..., ...}``
+    """
+    stem = os.path.splitext(filename)[0]
+    if not isinstance(data, dict):
+        data = {}
+    if "metadata" in data or "pensierini" in data or "workspace" in data:
+        meta = data.get("metadata") or {}
+        return {
+            "name": meta.get("name") or stem,
+            "created": meta.get("created", ""),
+            "modified": meta.get("modified", meta.get("created", "")),
+            "version": meta.get("version", "1.0"),
+            "pensierini": len(data.get("pensierini") or []),
+            "workspace": len(data.get("workspace") or []),
+            "data_size": 0,
+        }
+    payload = data.get("data") or {}
+    return {
+        "name": data.get("name") or stem,
+        "created": data.get("created_at", ""),
+        "modified": data.get("last_modified", data.get("created_at", "")),
+        "version": data.get("version", "1.0"),
+        "pensierini": len(payload.get("pensierini") or []) if isinstance(payload, dict) else 0,
+        "workspace": len(payload.get("workspace") or []) if isinstance(payload, dict) else 0,
+        "data_size": len(json.dumps(payload)) if payload else 0,
+    }
+
+
+class ProjectIndex:
+    """Indice dei progetti di una cartella, tenuto in memoria e su disco."""
+
+    def __init__(self, projects_dir: str):
+        self.projects_dir = projects_dir
+        self.index_path = os.path.join(projects_dir, INDEX_FILENAME)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded = self._load()
+
+    # ------------------------------------------------------------------
+    # Lettura
+    # ------------------------------------------------------------------
+    def _load(self) -> bool:
+        """Legge l'indice da disco; False se manca o non è valido."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != INDEX_VERSION:
+                return False
+            self._entries = dict(payload.get("entries") or {})
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Indice progetti non valido ({self.index_path}): {e}")
+            return False
+
+    def is_loaded(self) -> bool:
+        """True se l'indice esisteva già su disco (altrimenti serve un reconcile)."""
+        return self._loaded
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """Elenco dei progetti dall'indice, dal più recente (per data di modifica)."""
+        with self._lock:
+            entries = [dict(entry, file=name) for name, entry in self._entries.items()]
+        entries.sort(key=lambda e: e.get("mtime_ns", 0), reverse=True)
+        return entries
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Metadati di un singolo file di progetto (solo il nome, senza cartella)."""
+        with self._lock:
+            entry = self._entries.get(filename)
+            return dict(entry, file=filename) if entry else None
+
+    # ------------------------------------------------------------------
+    # Aggiornamento
+    # ------------------------------------------------------------------
+    def update(self, filepath: str, data: Dict[str, Any]) -> None:
+        """Registra un progetto appena salvato (i dati sono già in memoria)."""
+        filename = os.path.basename(filepath)
+        entry = extract_metadata(data, filename)
+        entry.update(self._stat(filepath))
+        with self._lock:
+            self._entries[filename] = entry
+        self._save()
+
+    def remove(self, filepath: str) -> None:
+        """Toglie un progetto eliminato dall'indice."""
+        with self._lock:
+            removed = self._entries.pop(os.path.basename(filepath), None)
+        if removed is not None:
+            self._save()
+
+    def reconcile(self) -> bool:
+        """Allinea l'indice alla cartella; rilegge solo i file nuovi o cambiati.
+
+        Restituisce True se l'indice è cambiato.
+        """
+        try:
+            with os.scandir(self.projects_dir) as it:
+                found = {
+                    e.name: e.stat() for e in it if e.is_file() and is_project_file(e.name)
+                }
+        except FileNotFoundError:
+            found = {}
+
+        changed = False
+        with self._lock:
+            for name in [n for n in self._entries if n not in found]:
+                del self._entries[name]
+                changed = True
+            stale = [
+                name for name, st in found.items()
+                if (self._entries.get(name) or {}).get("mtime_ns") != st.st_mtime_ns
+                or (self._entries.get(name) or {}).get("size") != st.st_size
+            ]
+
+        for name in stale:
+            path = os.path.join(self.projects_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Progetto illeggibile durante l'indicizzazione {path}: {e}")
+                data = {}
+            entry = extract_metadata(data, name)
+            entry.update(self._stat(path))
+            with self._lock:
+                self._entries[name] = entry
+            changed = True
+
+        if changed or not self._loaded:
+            self._save()
+        return changed
+
+    def reconcile_async(self) -> threading.Thread:
+        """Esegue ``reconcile`` in un thread in background e lo restituisce."""
+        thread = threading.Thread(target=self.reconcile, name="project-index", daemon=True)
+        thread.start()
+        return thread
+
+    # ------------------------------------------------------------------
+    # Disco
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _stat(path: str) -> Dict[str, int]:
+        try:
+            st = os.stat(path)
+            return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        except OSError:
+            return {"size": 0, "mtime_ns": 0}
+
+    def _save(self) -> None:
+        """Scrive l'indice in modo atomico (file temporaneo + rename)."""
+        with self._lock:
+            payload = json.dumps(
+                {"version": INDEX_VERSION, "entries": self._entries}, ensure_ascii=False
+            )
+        try:
+            os.makedirs(self.projects_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".index-", suffix=".tmp", dir=self.projects_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.index_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._loaded = True
+        except Exception as e:
+            logger.error(f"Errore salvataggio indice progetti: {e}")
+
+
+_indexes: Dict[str, ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(projects_dir: str) -> ProjectIndex:
+    """Restituisce l'indice (unico nel processo) della cartella ``projects_dir``."""
+    projects_dir = os.path.abspath(projects_dir)
+    with _indexes_lock:
+        index = _indexes.get(projects_dir)
+        if index is None:
+            index = ProjectIndex(projects_dir)
+            _indexes[projects_dir] = index
+        return index
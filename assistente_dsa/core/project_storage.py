@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Project Storage - Salvataggio dei progetti sicuro, compatto e incrementale
+
+- Scrittura atomica: il progetto viene scritto in un file temporaneo nella
+  stessa cartella, sincronizzato su disco e poi rinominato; un crash a metà
+  scrittura lascia intatta la versione precedente.
+- JSON compatto (senza indentazione), che è molte volte più piccolo.
+- I testi lunghi (immagini incorporate come ``data:``, pagine OCR, ...) sono
+  salvati fuori linea, compressi con gzip, nella cartella ``<nome>.media``
+  e identificati dal loro hash: se non cambiano non vengono riscritti.
+- Journal di autosalvataggio: file append-only con le sole modifiche
+  rispetto all'ultimo stato registrato; costa pochi millisecondi anche per
+  progetti grandi e al caricamento viene rigiocato sul progetto salvato.
+"""
+
+import difflib
+import gzip
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    from core.atomic_io import atomic_write
+except ImportError:
+    from assistente_dsa.core.atomic_io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Colonne del progetto (liste di elementi {"text": ..., "order": ...})
+PROJECT_COLUMNS = ("pensierini", "workspace")
+
+# Testi più lunghi di così vengono salvati fuori linea e compressi
+LONG_TEXT_CHARS = 4096
+
+JOURNAL_SUFFIX = ".journal"
+MEDIA_SUFFIX = ".media"
+
+
+def media_dir_for(path: str) -> str:
+    """Cartella dei contenuti fuori linea di un progetto."""
+    return os.path.splitext(path)[0] + MEDIA_SUFFIX
+
+
+def journal_path_for(path: str) -> str:
+    """File del journal di autosalvataggio di un progetto."""
+    return path + JOURNAL_SUFFIX
+
+
+def _column_containers(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Dizionari che contengono le colonne (formato finestra e ProjectService)."""
+    containers = [data]
+    if isinstance(data.get("data"), dict):
+        containers.append(data["data"])
+    return containers
+
+
+def write_project(path: str, data: Dict[str, Any]) -> Dict[str, int]:
+    """Salva il progetto in modo atomico; restituisce statistiche sulla scrittura."""
+    media_dir = media_dir_for(path)
+    referenced = set()
+    stats = {"bytes": 0, "blobs_written": 0, "blobs_reused": 0}
+
+    out = dict(data)
+    for container in _column_containers(out):
+        for column in PROJECT_COLUMNS:
+            items = container.get(column)
+            if not isinstance(items, list):
+                continue
+            new_items = []
+            for item in items:
+                text = item.get("text") if isinstance(item, dict) else None
+                if isinstance(text, str) and len(text) > LONG_TEXT_CHARS:
+                    raw = text.encode("utf-8")
+                    digest = hashlib.sha1(raw).hexdigest()
+                    blob_path = os.path.join(media_dir, f"{digest}.gz")
+                    if os.path.exists(blob_path):
+                        stats["blobs_reused"] += 1
+                    else:
+                        atomic_write(blob_path, gzip.compress(raw, compresslevel=6))
+                        stats["blobs_written"] += 1
+                    referenced.add(f"{digest}.gz")
+                    item = {k: v for k, v in item.items() if k != "text"}
+                    item["text_ref"] = digest
+                new_items.append(item)
+            if container is out:
+                out[column] = new_items
+            else:
+                container = dict(container)
+                container[column] = new_items
+                out["data"] = container
+
+    payload = json.dumps(out, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    atomic_write(path, payload)
+    stats["bytes"] = len(payload)
+
+    # Rimuove i contenuti non più usati da questo progetto
+    if os.path.isdir(media_dir):
+        for name in os.listdir(media_dir):
+            if name.endswith(".gz") and name not in referenced:
+                try:
+                    os.remove(os.path.join(media_dir, name))
+                except OSError:
+                    pass
+
+    # Il salvataggio completo rende superfluo il journal
+    AutosaveJournal(journal_path_for(path)).reset()
+    return stats
+
+
+def read_project(path: str, replay_journal: bool = True) -> Dict[str, Any]:
+    """Carica un progetto risolvendo i contenuti fuori linea.
+
+    Se esiste un journal di autosalvataggio, le modifiche vengono riapplicate
+    (recupero dopo un crash); ``data["_recovered_edits"]`` indica quante.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("File progetto vuoto o corrotto")
+
+    media_dir = media_dir_for(path)
+    for container in _column_containers(data):
+        for column in PROJECT_COLUMNS:
+            for item in container.get(column) or []:
+                if isinstance(item, dict) and "text_ref" in item:
+                    blob_path = os.path.join(media_dir, f"{item.pop('text_ref')}.gz")
+                    with open(blob_path, "rb") as f:
+                        item["text"] = gzip.decompress(f.read()).decode("utf-8")
+
+    if replay_journal:
+        journal = AutosaveJournal(journal_path_for(path))
+        applied = journal.replay(data)
+        if applied:
+            data["_recovered_edits"] = applied
+    return data
+
+
+def project_texts(data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Stato "essenziale" del progetto: i testi di ogni colonna, in ordine."""
+    state = {}
+    for column in PROJECT_COLUMNS:
+        items = [i for i in data.get(column) or [] if isinstance(i, dict)]
+        items.sort(key=lambda i: i.get("order", 0))
+        state[column] = [i.get("text", "") for i in items]
+    return state
+
+
+class AutosaveJournal:
+    """Journal append-only delle modifiche alle colonne di un progetto.
+
+    Ogni riga è un'operazione ``splice`` (come ``lista[start:end] = items``)
+    calcolata confrontando lo stato attuale con l'ultimo registrato: scrivere
+    costa quanto la modifica, non quanto il progetto.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._last_state: Optional[Dict[str, List[str]]] = None
+
+    def start(self, state: Dict[str, List[str]]) -> None:
+        """Fissa lo stato di partenza (quello salvato su disco)."""
+        self._last_state = {c: list(state.get(c, [])) for c in PROJECT_COLUMNS}
+
+    def is_started(self) -> bool:
+        """True se c'è uno stato di partenza con cui confrontare le modifiche."""
+        return self._last_state is not None
+
+    def record(self, state: Dict[str, List[str]]) -> int:
+        """Aggiunge al journal le differenze rispetto all'ultimo stato.
+
+        Restituisce il numero di operazioni scritte (0 se nulla è cambiato).
+        """
+        if self._last_state is None:
+            self.start({})
+        ops = []
+        for column in PROJECT_COLUMNS:
+            old = self._last_state.get(column, [])
+            new = list(state.get(column, []))
+            if old == new:
+                continue
+            matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+            # Dalla fine all'inizio: gli indici delle operazioni restano validi
+            for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+                if tag != "equal":
+                    ops.append({"col": column, "op": "splice", "start": i1,
+                                "end": i2, "items": new[j1:j2]})
+            self._last_state[column] = new
+        if not ops:
+            return 0
+        lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(ops)
+
+    def replay(self, data: Dict[str, Any]) -> int:
+        """Riapplica le operazioni del journal a ``data``; ne restituisce il numero."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+
+        state = project_texts(data)
+        applied = 0
+        for line in lines:
+            try:
+                op = json.loads(line)
+            except ValueError:
+                break  # ultima riga troncata da un crash: ci si ferma lì
+            column = op.get("col")
+            if column not in state or op.get("op") != "splice":
+                continue
+            state[column][op["start"]:op["end"]] = op["items"]
+            applied += 1
+
+        if applied:
+            for column in PROJECT_COLUMNS:
+                data[column] = [{"text": t, "order": i} for i, t in enumerate(state[column])]
+        self.start(state)
+        return applied
+
+    def has_edits(self) -> bool:
+        """True se il journal contiene modifiche non ancora salvate."""
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def reset(self) -> None:
+        """Svuota il journal (dopo un salvataggio completo)."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._last_state = None
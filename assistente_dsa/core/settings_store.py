@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Settings Store - Impostazioni in memoria condivise da tutto il processo
+
+Il file settings.json viene letto una sola volta: le letture sono semplici
+accessi a dizionario, le scritture aggiornano la memoria, notificano gli
+iscritti (segnale Qt ``setting_changed``) e vengono salvate su disco in modo
+atomico e "raggruppato" dopo un breve ritardo. Le modifiche fatte al file
+da fuori (editor, altra istanza) vengono ricaricate tramite un file watcher.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QCoreApplication, QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Ritardo del salvataggio: più modifiche ravvicinate diventano una sola scrittura
+DEFAULT_SAVE_DELAY_MS = 500
+
+_MISSING = object()
+
+
+def _lookup(data: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """Legge un valore con notazione a punti (es. ``"ai.selected_ai_model"``)."""
+    value: Any = data
+    for k in key.split("."):
+        if isinstance(value, dict) and k in value:
+            value = value[k]
+        else:
+            return default
+    return value
+
+
+def _assign(data: Dict[str, Any], key: str, value: Any) -> None:
+    """Scrive un valore con notazione a punti creando i livelli mancanti."""
+    keys = key.split(".")
+    current = data
+    for k in keys[:-1]:
+        if not isinstance(current.get(k), dict):
+            current[k] = {}
+        current = current[k]
+    current[keys[-1]] = value
+
+
+def _merge_defaults(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia di ``base`` completata con le chiavi di ``extra`` che mancano."""
+    merged = copy.deepcopy(base)
+    for k, v in extra.items():
+        if k not in merged:
+            merged[k] = copy.deepcopy(v)
+        elif isinstance(merged[k], dict) and isinstance(v, dict):
+            merged[k] = _merge_defaults(merged[k], v)
+    return merged
+
+
+def _changed_keys(old: Dict[str, Any], new: Dict[str, Any], prefix: str = "") -> List[str]:
+    """Chiavi (notazione a punti) cambiate tra due versioni: la sezione e le foglie."""
+    changed = []
+    for k in sorted(set(old) | set(new)):
+        before, after = old.get(k, _MISSING), new.get(k, _MISSING)
+        if before == after:
+            continue
+        key = prefix + k
+        changed.append(key)
+        if isinstance(before, dict) and isinstance(after, dict):
+            changed.extend(_changed_keys(before, after, key + "."))
+    return changed
+
+
+class SettingsStore(QObject):
+    """Impostazioni caricate una volta e servite dalla memoria."""
+
+    # chiave (notazione a punti), nuovo valore
+    setting_changed = pyqtSignal(str, object)
+    # il file è stato modificato dall'esterno e ricaricato
+    settings_reloaded = pyqtSignal()
+    # uso interno: avvia il timer di salvataggio nel thread del QObject
+    _save_requested = pyqtSignal()
+
+    def __init__(
+        self,
+        path: str,
+        defaults: Optional[Callable[[], Dict[str, Any]]] = None,
+        save_delay_ms: int = DEFAULT_SAVE_DELAY_MS,
+    ):
+        super().__init__()
+        self.path = path
+        # Insiemi di default registrati (l'ultimo prevale sui precedenti)
+        self._default_providers: List[Callable[[], Dict[str, Any]]] = []
+        # True finché i dati in memoria sono solo default (file assente)
+        self._seeded = False
+        # True se il file esiste ma non è leggibile: si usano i default in
+        # memoria senza riscriverlo (il file resta lì per essere recuperato)
+        self._unreadable = False
+        self._lock = threading.RLock()
+        # Serializza le scritture su disco dal payload fino a os.replace:
+        # senza, due flush concorrenti potrebbero finire in ordine inverso e
+        # un payload vecchio sovrascriverebbe quello nuovo. Si prende sempre
+        # prima di ``_lock``, mai al contrario.
+        self._io_lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._pending: Dict[str, Any] = {}  # modifiche non ancora su disco
+        self._last_mtime: Optional[int] = None
+        # Revisione: cresce a ogni modifica, così le viste possono capire se
+        # i valori derivati che tengono in cache sono ancora validi
+        self.version = 0
+        self.stats = {"reads": 0, "writes": 0, "saves": 0, "reloads": 0}
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay_ms)
+        self._save_timer.timeout.connect(self.flush)
+        self._save_requested.connect(self._save_timer.start)
+
+        self._watcher: Optional[QFileSystemWatcher] = None
+
+        self._data = self._read_file()
+        if defaults is not None:
+            self.add_defaults(defaults)
+
+    # ------------------------------------------------------------------
+    # Letture
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        """Restituisce il valore (copiato se è un dict/list, per sicurezza)."""
+        with self._lock:
+            self.stats["reads"] += 1
+            value = _lookup(self._data, key, _MISSING)
+            if value is _MISSING:
+                return default
+            if isinstance(value, (dict, list)):
+                return copy.deepcopy(value)
+            return value
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Valore intero; se manca o non è convertibile restituisce ``default``."""
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        """Valore decimale; se manca o non è convertibile restituisce ``default``."""
+        try:
+            return float(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """Valore booleano; accetta anche "true"/"false", "1"/"0", "si"/"no"."""
+        value = self.get(key, default)
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in ("true", "1", "si", "sì", "yes", "on"):
+                return True
+            if lowered in ("false", "0", "no", "off", ""):
+                return False
+            return default
+        return bool(value)
+
+    def get_str(self, key: str, default: str = "") -> str:
+        """Valore testuale; ``None`` o valori mancanti diventano ``default``."""
+        value = self.get(key, default)
+        return default if value is None else str(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia completa delle impostazioni (come il vecchio ``load_settings``)."""
+        with self._lock:
+            self.stats["reads"] += 1
+            return copy.deepcopy(self._data)
+
+    # ------------------------------------------------------------------
+    # Default
+    # ------------------------------------------------------------------
+    def _defaults(self) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for provider in self._default_providers:
+            merged = _merge_defaults(provider(), merged)
+        return merged
+
+    def add_defaults(self, defaults: Callable[[], Dict[str, Any]]) -> None:
+        """Registra un insieme di default, che prevale su quelli già noti.
+
+        Alla prima installazione (file assente) i default completi vengono
+        scritti subito su disco, come faceva ``create_default_settings``;
+        se il file esiste già (anche se corrotto) non viene toccato.
+        """
+        key = getattr(defaults, "__func__", defaults)  # un metodo vale per ogni istanza
+        with self._lock:
+            if any(getattr(p, "__func__", p) is key for p in self._default_providers):
+                return
+            self._default_providers.append(defaults)
+            if self._seeded:
+                self._data = self._defaults()
+            elif self._last_mtime is None or self._unreadable:
+                self._data = _merge_defaults(self._data, defaults())
+            else:
+                return
+            self.version += 1
+            if self._unreadable:
+                return
+        self.flush(force=True)
+
+    # ------------------------------------------------------------------
+    # Scritture
+    # ------------------------------------------------------------------
+    def set(self, key: str, value: Any) -> None:
+        """Aggiorna un valore in memoria e pianifica il salvataggio."""
+        with self._lock:
+            if _lookup(self._data, key, _MISSING) == value:
+                return
+            value = copy.deepcopy(value)
+            _assign(self._data, key, value)
+            self._pending[key] = value
+            self._seeded = False
+            self.version += 1
+            self.stats["writes"] += 1
+        self.setting_changed.emit(key, value)
+        self._schedule_save()
+
+    def replace(self, settings: Dict[str, Any]) -> None:
+        """Sostituisce tutte le impostazioni (es. "Salva" nel dialog)."""
+        with self._lock:
+            old = self._data
+            self._data = copy.deepcopy(settings)
+            changed = _changed_keys(old, self._data)
+            for k in changed:
+                if "." not in k:
+                    self._pending[k] = self._data.get(k)
+            if changed:
+                self._seeded = False
+                self.version += 1
+            self.stats["writes"] += 1
+        for k in changed:
+            self.setting_changed.emit(k, self.get(k))
+        if changed:
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        if QCoreApplication.instance() is None:
+            # Nessun event loop (script, test): il timer non scatterebbe mai
+            self.flush()
+            return
+        self._ensure_watcher()
+        self._save_requested.emit()
+
+    def flush(self, force: bool = False) -> bool:
+        """Scrive subito su disco le modifiche in sospeso (scrittura atomica).
+
+        Con ``force=True`` scrive anche se non ci sono modifiche (es. "Salva").
+        """
+        with self._io_lock:
+            with self._lock:
+                if not self._pending and not force:
+                    return True
+                payload = json.dumps(self._data, indent=2, ensure_ascii=False)
+                # Tolte solo a scrittura riuscita; quelle fatte nel frattempo restano
+                written = dict(self._pending)
+            try:
+                directory = os.path.dirname(self.path)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                with self._lock:
+                    for key, value in written.items():
+                        if self._pending.get(key, _MISSING) is value:
+                            del self._pending[key]
+                    self._last_mtime = self._mtime()
+                    self._unreadable = False  # ora il file è di nuovo valido
+                    self.stats["saves"] += 1
+            except Exception as e:
+                logger.error(f"Errore salvataggio impostazioni {self.path}: {e}")
+                return False
+        self._rewatch()
+        return True
+
+    # ------------------------------------------------------------------
+    # File su disco e modifiche esterne
+    # ------------------------------------------------------------------
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_file(self) -> Dict[str, Any]:
+        """Legge il file; se manca o è corrotto usa i default."""
+        self._last_mtime = self._mtime()
+        self._seeded = self._last_mtime is None
+        self._unreadable = False
+        if self._last_mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except Exception as e:
+                logger.warning(f"Impostazioni illeggibili ({self.path}): {e}")
+            self._unreadable = True
+        return self._defaults()
+
+    def reload(self) -> bool:
+        """Rilegge il file se è cambiato; mantiene le modifiche non ancora salvate."""
+        with self._lock:
+            if self._mtime() == self._last_mtime:
+                return False
+            old = self._data
+            self._data = self._read_file()
+            for key, value in self._pending.items():
+                _assign(self._data, key, value)
+            changed = _changed_keys(old, self._data)
+            self.version += 1
+            self.stats["reloads"] += 1
+        for k in changed:
+            self.setting_changed.emit(k, self.get(k))
+        self.settings_reloaded.emit()
+        return True
+
+    def _ensure_watcher(self) -> None:
+        if self._watcher is not None or QCoreApplication.instance() is None:
+            return
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_file_changed)
+        self._rewatch()
+
+    def _rewatch(self) -> None:
+        """Il rename atomico sostituisce il file: va ri-aggiunto al watcher."""
+        if self._watcher is None:
+            return
+        directory = os.path.dirname(self.path)
+        for p in (self.path, directory):
+            if os.path.exists(p) and p not in self._watcher.files() + self._watcher.directories():
+                self._watcher.addPath(p)
+
+    def _on_file_changed(self, _path: str) -> None:
+        self._rewatch()
+        try:
+            self.reload()
+        except Exception as e:
+            logger.warning(f"Ricarica impostazioni fallita: {e}")
+
+
+_stores: Dict[str, SettingsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_settings_store(
+    path: str, defaults: Optional[Callable[[], Dict[str, Any]]] = None
+) -> SettingsStore:
+    """Restituisce lo store (unico nel processo) per il file ``path``.
+
+    Se lo store esiste già, ``defaults`` si aggiunge ai default registrati.
+    """
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SettingsStore(path, defaults)
+            _stores[path] = store
+            # Watcher creato subito se c'è già un'applicazione Qt
+            store._ensure_watcher()
+            return store
+    if defaults is not None:
+        store.add_defaults(defaults)
+    return store
+
+
+@atexit.register
+def flush_all_settings() -> None:
+    """Salva le modifiche in sospeso di tutti gli store (chiamata anche all'uscita)."""
+    for store in list(_stores.values()):
+        store.flush()
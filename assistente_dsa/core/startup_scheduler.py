@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Startup Scheduler - Avvio a stadi della finestra principale
+
+La finestra compare con il solo necessario per scrivere; il resto segue
+per stadi:
+
+1. dopo la prima visualizzazione: compiti leggeri che non servono al
+   primo disegno (filtri degli eventi, tooltip e scorciatoie), eseguiti
+   tutti appena la finestra è comparsa;
+2. inattività: costruzione dei pannelli secondari, un compito per giro
+   del ciclo eventi, così clic e tasti dell'utente passano tra un compito
+   e l'altro;
+3. preriscaldamento: import dei sottosistemi pesanti (video, voce) in un
+   thread separato, solo se richiesto nelle Impostazioni.
+
+Ogni compito registra inizio e durata nella linea temporale dell'avvio
+(stesso orologio di core/startup_timer), salvata in JSON a fine avvio.
+I compiti devono poter essere eseguiti più volte: chi ha bisogno di un
+pannello prima del suo turno lo costruisce da sé, e il compito in coda
+non fa nulla.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+try:
+    from core import startup_timer
+except ImportError:
+    from assistente_dsa.core import startup_timer
+
+STAGE_AFTER_PAINT = "dopo_visualizzazione"
+STAGE_IDLE = "inattivita"
+STAGE_WARMUP = "preriscaldamento"
+STAGES = (STAGE_AFTER_PAINT, STAGE_IDLE, STAGE_WARMUP)
+
+# Pausa tra due compiti di inattività: 0 = al prossimo giro del ciclo eventi
+IDLE_INTERVAL_MS = 0
+
+
+class StartupScheduler(QObject):
+    """Esegue i compiti di avvio per stadi e ne registra la linea temporale."""
+
+    stage_finished = pyqtSignal(str)
+    # Fine dei compiti nel thread dell'interfaccia (il preriscaldamento
+    # può essere ancora in corso)
+    finished = pyqtSignal()
+
+    def __init__(
+        self,
+        trace_path: Optional[str] = None,
+        parent: Optional[QObject] = None,
+        idle_interval_ms: int = IDLE_INTERVAL_MS,
+    ):
+        super().__init__(parent)
+        self.trace_path = trace_path
+        self._queues: Dict[str, Deque[Tuple[str, Callable[[], Any]]]] = {
+            stage: deque() for stage in STAGES
+        }
+        self._timeline: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # scrive anche il preriscaldamento
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.started = False
+        self.done = False
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(idle_interval_ms)
+        self._idle_timer.timeout.connect(self._run_next_idle)
+
+    def add(self, stage: str, name: str, fn: Callable[[], Any]) -> None:
+        """Accoda un compito allo stadio indicato."""
+        if stage not in STAGES:
+            raise ValueError(f"Stadio sconosciuto: {stage}")
+        self._queues[stage].append((name, fn))
+
+    def pending(self, stage: str) -> List[str]:
+        """Nomi dei compiti ancora in coda nello stadio."""
+        return [name for name, _fn in self._queues[stage]]
+
+    # ------------------------------------------------------------------
+    # Esecuzione
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Da chiamare quando la finestra compare (la prima volta)."""
+        if self.started:
+            return
+        self.started = True
+        startup_timer.mark("prima visualizzazione")
+        # Timer a 0 ms: parte dopo il disegno già in coda della finestra
+        QTimer.singleShot(0, self._run_after_paint)
+
+    def stop(self) -> None:
+        """Scarta i compiti non ancora eseguiti (chiusura della finestra)."""
+        self._idle_timer.stop()
+        for queue in self._queues.values():
+            queue.clear()
+
+    def _run_task(self, stage: str, name: str, fn: Callable[[], Any]) -> None:
+        start = startup_timer.elapsed_ms()
+        ok = True
+        try:
+            fn()
+        except Exception as e:
+            ok = False
+            logging.warning(f"Avvio: compito '{name}' fallito: {e}")
+        entry = {
+            "stage": stage,
+            "name": name,
+            "start_ms": round(start, 2),
+            "duration_ms": round(startup_timer.elapsed_ms() - start, 2),
+            "thread": threading.current_thread().name,
+            "ok": ok,
+        }
+        with self._lock:
+            self._timeline.append(entry)
+
+    def _run_after_paint(self) -> None:
+        queue = self._queues[STAGE_AFTER_PAINT]
+        while queue:
+            self._run_task(STAGE_AFTER_PAINT, *queue.popleft())
+        self.stage_finished.emit(STAGE_AFTER_PAINT)
+        self._idle_timer.start()
+
+    def _run_next_idle(self) -> None:
+        queue = self._queues[STAGE_IDLE]
+        if queue:
+            self._run_task(STAGE_IDLE, *queue.popleft())
+            return
+        self._idle_timer.stop()
+        self.stage_finished.emit(STAGE_IDLE)
+        self._start_warmup()
+        self.done = True
+        startup_timer.mark("interfaccia completa")
+        self.write_trace()
+        self.finished.emit()
+
+    def _start_warmup(self) -> None:
+        queue = self._queues[STAGE_WARMUP]
+        tasks = list(queue)
+        queue.clear()
+        if not tasks:
+            return
+        self._warmup_thread = threading.Thread(
+            target=self._run_warmup, args=(tasks,), name="avvio-preriscaldamento",
+            daemon=True,
+        )
+        self._warmup_thread.start()
+
+    def _run_warmup(self, tasks: List[Tuple[str, Callable[[], Any]]]) -> None:
+        for name, fn in tasks:
+            self._run_task(STAGE_WARMUP, name, fn)
+        self.write_trace()
+
+    def wait_warmup(self, timeout: Optional[float] = None) -> bool:
+        """Attende la fine del preriscaldamento; False se ancora in corso."""
+        thread = self._warmup_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Linea temporale
+    # ------------------------------------------------------------------
+    def timeline(self) -> List[Dict[str, Any]]:
+        """Fasi di avvio (core/startup_timer) e compiti, in ms dall'inizio."""
+        events = [
+            {
+                "stage": "avvio",
+                "name": label,
+                "start_ms": round(at - duration, 2),
+                "duration_ms": round(duration, 2),
+            }
+            for (label, at), (_label, duration) in zip(
+                startup_timer.marks(), startup_timer.phases()
+            )
+        ]
+        with self._lock:
+            events.extend(dict(entry) for entry in self._timeline)
+        return events
+
+    def write_trace(self, path: Optional[str] = None) -> Optional[str]:
+        """Salva la linea temporale in JSON; restituisce il percorso."""
+        path = path or self.trace_path
+        if not path:
+            return None
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            data = {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "events": self.timeline(),
+            }
+            tmp = path + ".tmp"
+            with self._write_lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, path)
+            return path
+        except OSError as e:
+            logging.warning(f"Linea temporale dell'avvio non salvata: {e}")
+            return None
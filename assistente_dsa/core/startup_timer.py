@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Startup Timer - Tempi delle fasi di avvio
+
+Le fasi dell'avvio (verifica degli import, caricamento del modulo
+principale, creazione della finestra, ...) segnano il proprio arrivo con
+``mark``. Con la variabile d'ambiente COGNIFLOW_PROFILE impostata, alla
+comparsa della finestra ``report`` stampa la durata di ogni fase e il
+totale: è il modo per confrontare l'avvio prima e dopo una modifica.
+
+L'orologio parte al primo import di questo modulo: il punto di ingresso
+lo importa per primo.
+"""
+
+import os
+import time
+from typing import List, Tuple
+
+_T0 = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+
+def enabled() -> bool:
+    """True se il resoconto dei tempi è richiesto (COGNIFLOW_PROFILE)."""
+    return bool(os.environ.get("COGNIFLOW_PROFILE"))
+
+
+def elapsed_ms() -> float:
+    """Millisecondi dall'inizio dell'avvio."""
+    return (time.perf_counter() - _T0) * 1000.0
+
+
+def mark(label: str) -> float:
+    """Registra la fine di una fase; restituisce i ms dall'inizio dell'avvio."""
+    elapsed = elapsed_ms()
+    _marks.append((label, elapsed))
+    return elapsed
+
+
+def marks() -> List[Tuple[str, float]]:
+    """Fasi registrate: (nome, ms dall'inizio dell'avvio)."""
+    return list(_marks)
+
+
+def phases() -> List[Tuple[str, float]]:
+    """Durata di ogni fase in ms (dalla fase precedente)."""
+    out = []
+    previous = 0.0
+    for label, elapsed in _marks:
+        out.append((label, elapsed - previous))
+        previous = elapsed
+    return out
+
+
+def report(print_fn=print) -> None:
+    """Stampa la durata delle fasi e il totale."""
+    if not _marks:
+        return
+    print_fn("⏱️ Tempi di avvio (COGNIFLOW_PROFILE):")
+    for label, duration in phases():
+        print_fn(f"   {duration:8.1f} ms  {label}")
+    print_fn(f"   {_marks[-1][1]:8.1f} ms  totale")
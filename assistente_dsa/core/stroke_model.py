@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Stroke Model - Il disegno a mano libera come elenco di tratti vettoriali
+
+Ogni tratto è la sequenza dei punti toccati dalla penna (coordinate,
+tempo dall'inizio del tratto e pressione), con strumento, colore e
+spessore. Alla fine del tratto i punti vengono semplificati con
+Ramer-Douglas-Peucker: si tolgono quelli che non spostano la linea di più
+di mezzo pixel circa, di solito la grande maggioranza.
+
+Rispetto all'immagine:
+- annulla/ripristina spostano un tratto da una lista all'altra, e a
+  schermo va ridisegnato solo il rettangolo di quel tratto;
+- nel file di progetto il disegno occupa pochi KB (interi a differenze);
+- i tratti, con i tempi, sono già l'input di un riconoscitore di
+  scrittura a mano, senza ricavarli da un'immagine.
+
+Il modulo non dipende da Qt: il canvas disegna i tratti con i propri
+strumenti.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Punto di un tratto: x, y, millisecondi dall'inizio del tratto, pressione (0..1)
+Point = Tuple[float, float, float, float]
+
+# Scostamento massimo (pixel) tollerato nella semplificazione
+DEFAULT_EPSILON = 0.75
+# Formato dei tratti nel file di progetto
+FORMAT_VERSION = 1
+# Tipi di tratto: mano libera (matita/gomma) e forme definite da due punti
+SHAPE_KINDS = ("line", "rect", "ellipse")
+
+
+def rdp_simplify(points: List[Point], epsilon: float = DEFAULT_EPSILON) -> List[Point]:
+    """Ramer-Douglas-Peucker (iterativo) sulle coordinate x, y dei punti.
+
+    Tiene sempre il primo e l'ultimo punto; un punto intermedio resta solo
+    se dista più di ``epsilon`` dal segmento che lo scavalcherebbe.
+    """
+    n = len(points)
+    if n < 3:
+        return list(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    eps2 = epsilon * epsilon
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = points[first][0], points[first][1]
+        bx, by = points[last][0], points[last][1]
+        dx, dy = bx - ax, by - ay
+        length2 = dx * dx + dy * dy
+        worst, worst_d2 = -1, eps2
+        for i in range(first + 1, last):
+            px, py = points[i][0] - ax, points[i][1] - ay
+            if length2 == 0:
+                d2 = px * px + py * py
+            else:
+                cross = px * dy - py * dx
+                d2 = cross * cross / length2
+            if d2 > worst_d2:
+                worst, worst_d2 = i, d2
+        if worst >= 0:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+class Stroke:
+    """Un tratto: punti, strumento, colore e spessore."""
+
+    __slots__ = ("tool", "color", "width", "pressure", "points")
+
+    def __init__(
+        self,
+        tool: str,
+        color: str,
+        width: float,
+        points: Optional[List[Point]] = None,
+        pressure: bool = False,
+    ):
+        self.tool = tool  # pencil, eraser, line, rect, ellipse
+        self.color = color
+        self.width = width
+        self.pressure = pressure  # True: lo spessore segue la pressione
+        self.points: List[Point] = points or []
+
+    @property
+    def kind(self) -> str:
+        return self.tool if self.tool in SHAPE_KINDS else "free"
+
+    def bounds(self, margin: float = 0.0) -> Tuple[float, float, float, float]:
+        """(x0, y0, x1, y1) dei punti, allargato di ``margin``."""
+        xs = [p[0] for p in self.points]
+        ys = [p[1] for p in self.points]
+        return (min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma compatta: interi a differenze (x, y, tempo) e pressione in %."""
+        flat: List[int] = []
+        px = py = pt = 0
+        for x, y, t, p in self.points:
+            x, y, t = round(x), round(y), round(t)
+            flat.extend((x - px, y - py, t - pt, round(p * 100)))
+            px, py, pt = x, y, t
+        data = {"tool": self.tool, "c": self.color, "w": self.width, "p": flat}
+        if self.pressure:
+            data["pr"] = 1
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Stroke":
+        flat = data.get("p", [])
+        points: List[Point] = []
+        x = y = t = 0
+        for i in range(0, len(flat) - 3, 4):
+            x += flat[i]
+            y += flat[i + 1]
+            t += flat[i + 2]
+            points.append((float(x), float(y), float(t), flat[i + 3] / 100.0))
+        return cls(
+            data.get("tool", "pencil"),
+            data.get("c", "#1a1a1a"),
+            data.get("w", 3),
+            points,
+            bool(data.get("pr")),
+        )
+
+
+class StrokeModel:
+    """Tratti del disegno con annulla/ripristina.
+
+    La cronologia registra operazioni ("add", tratto) e ("clear", tratti):
+    annullare o ripristinare un tratto costa quanto quel tratto, non quanto
+    l'intero disegno.
+    """
+
+    def __init__(self, epsilon: float = DEFAULT_EPSILON):
+        self.epsilon = epsilon
+        self.strokes: List[Stroke] = []
+        self.current: Optional[Stroke] = None  # tratto in corso
+        self._t0 = 0.0
+        self._undo: List[Tuple[str, Any]] = []
+        self._redo: List[Tuple[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.strokes)
+
+    # ------------------------------------------------------------------
+    # Registrazione
+    # ------------------------------------------------------------------
+    def begin(self, tool: str, color: str, width: float, pressure: bool = False) -> Stroke:
+        """Inizia un nuovo tratto (chiude quello eventualmente in corso)."""
+        self.end()
+        self.current = Stroke(tool, color, width, pressure=pressure)
+        self._t0 = time.monotonic()
+        return self.current
+
+    def add_point(self, x: float, y: float, pressure: float = 1.0) -> None:
+        if self.current is None:
+            return
+        t = (time.monotonic() - self._t0) * 1000.0
+        self.current.points.append((float(x), float(y), t, float(pressure)))
+
+    def end(self) -> Optional[Stroke]:
+        """Chiude il tratto in corso, lo semplifica e lo aggiunge al disegno."""
+        stroke, self.current = self.current, None
+        if stroke is None or not stroke.points:
+            return None
+        if stroke.kind == "free":
+            stroke.points = rdp_simplify(stroke.points, self.epsilon)
+        self._push(("add", stroke))
+        self.strokes.append(stroke)
+        return stroke
+
+    def add_stroke(self, stroke: Stroke) -> None:
+        """Aggiunge un tratto già completo (es. una forma)."""
+        self.end()
+        self._push(("add", stroke))
+        self.strokes.append(stroke)
+
+    def clear(self) -> List[Stroke]:
+        """Svuota il disegno (annullabile); restituisce i tratti tolti."""
+        self.current = None
+        removed, self.strokes = self.strokes, []
+        if removed:
+            self._push(("clear", removed))
+        return removed
+
+    def _push(self, op: Tuple[str, Any]) -> None:
+        self._undo.append(op)
+        self._redo.clear()
+
+    # ------------------------------------------------------------------
+    # Annulla / ripristina
+    # ------------------------------------------------------------------
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> Optional[Tuple[str, Any]]:
+        """Annulla l'ultima operazione; restituisce (tipo, tratti toccati)."""
+        self.end()
+        if not self._undo:
+            return None
+        op, payload = self._undo.pop()
+        if op == "add":
+            self.strokes.pop()  # l'ultimo tratto aggiunto è sempre in coda
+        else:
+            self.strokes = payload + self.strokes
+        self._redo.append((op, payload))
+        return op, payload
+
+    def redo(self) -> Optional[Tuple[str, Any]]:
+        """Ripete l'ultima operazione annullata."""
+        self.end()
+        if not self._redo:
+            return None
+        op, payload = self._redo.pop()
+        if op == "add":
+            self.strokes.append(payload)
+        else:
+            self.strokes = self.strokes[len(payload):]
+        self._undo.append((op, payload))
+        return op, payload
+
+    # ------------------------------------------------------------------
+    # Salvataggio e riconoscimento
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {"v": FORMAT_VERSION, "strokes": [s.to_dict() for s in self.strokes]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StrokeModel":
+        model = cls()
+        if isinstance(data, dict) and data.get("v") == FORMAT_VERSION:
+            model.strokes = [Stroke.from_dict(s) for s in data.get("strokes", [])]
+        return model
+
+    def ink(self) -> List[List[Tuple[float, float, float]]]:
+        """Tratti a inchiostro (niente gomma) come liste di (x, y, ms).
+
+        È il formato "online" dei riconoscitori di scrittura a mano.
+        """
+        return [
+            [(x, y, t) for x, y, t, _p in s.points]
+            for s in self.strokes
+            if s.tool != "eraser" and s.kind == "free"
+        ]
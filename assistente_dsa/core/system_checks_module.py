@@ -7,6 +7,7 @@ Include controlli per directory, pacchetti Python e configurazioni di sicurezza.
 
 Funzioni:
     check_package(): Verifica se un pacchetto Python è disponibile
+    check_module_spec(): Verifica che un modulo esista, senza eseguirlo
     check_security_headers(): Controlla configurazioni di sicurezza
     check_directory(): Verifica esistenza directory
     perform_security_checks(): Controllo completo di sicurezza
@@ -17,7 +18,7 @@ Nota:
 """
 
 import os, sys, stat
-from typing import cast, Tuple, List
+from typing import cast, Optional, Tuple, List
 
 # Import della funzione spostata
 try:
@@ -46,6 +47,49 @@ def check_package(package: str) -> Tuple[str, bool]:
     except ImportError:
         return package, False
 
+def check_module_spec(module: str, path: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Verifica che un modulo sia importabile SENZA eseguirlo.
+
+    Cerca solo la specifica del modulo (``importlib.util.find_spec``, o il
+    file indicato da ``path``): a differenza di un import vero non esegue
+    il codice del modulo, quindi costa pochi millisecondi anche per il
+    modulo principale. Gli errori dentro il modulo emergono comunque al
+    suo import vero, all'avvio dell'interfaccia.
+
+    Args:
+        module (str): Nome del modulo (anche puntato, es. "PyQt6.QtWidgets")
+        path (str, optional): File del modulo, se non è nel sys.path
+
+    Returns:
+        Tuple[bool, str]: (trovato, origine del modulo o motivo dell'errore)
+
+    Example:
+        >>> ok, origin = check_module_spec("json")
+        >>> ok
+        True
+    """
+    import importlib.util
+
+    try:
+        if path is not None:
+            if not os.path.isfile(path):
+                return False, f"file non trovato: {path}"
+            spec = importlib.util.spec_from_file_location(module, path)
+        else:
+            spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError) as e:  # pacchetto padre mancante o rotto
+        return False, str(e)
+    if spec is None or (spec.loader is None and not spec.submodule_search_locations):
+        return False, "modulo non trovato"
+    return True, spec.origin or "pacchetto"
+
+
+def full_import_check_requested() -> bool:
+    """True se COGNIFLOW_FULL_IMPORT_CHECK chiede di importare davvero i moduli."""
+    return bool(os.environ.get("COGNIFLOW_FULL_IMPORT_CHECK"))
+
+
 def check_security_headers() -> Tuple[bool, List[str]]:
     """
     Controlla le configurazioni di sicurezza del sistema.
@@ -267,9 +311,11 @@ def test_imports():
        - Lettura tema applicazione
 
     2. **Modulo Principale**:
-       - Import dinamico di main_01_Aircraft.py
-       - Verifica integrità del modulo principale
-       - Controllo dipendenze del modulo
+       - Verifica che main_01_Aircraft.py esista e sia caricabile, SENZA
+         eseguirlo (check_module_spec): eseguirlo qui voleva dire caricare
+         due volte l'intero modulo all'avvio
+       - Con COGNIFLOW_FULL_IMPORT_CHECK=1 il modulo viene invece importato
+         davvero (verifica completa, più lenta)
 
     Impostazioni testate:
         - ui.window_width: Larghezza finestra (default: 1200)
@@ -280,7 +326,7 @@ def test_imports():
         bool: True se tutti gli import riescono, False altrimenti
 
     Note:
-        - Utilizza import dinamico per evitare dipendenze statiche
+        - Verifica le specifiche dei moduli invece di eseguirli
         - Fornisce dettagli specifici su quale import fallisce
         - Include traceback completo per debugging
 
@@ -295,7 +341,7 @@ def test_imports():
         Testing imports with centralized configuration...
         Centralized settings loaded - Window size: 1200x800
         Application theme: Professionale
-        ✅ Main module (main_01_Aircraft) imported successfully
+        ✅ Main module (main_01_Aircraft) found
 
     Error handling:
         - Cattura tutti gli errori di import
@@ -322,18 +368,23 @@ def test_imports():
         print(f"Centralized settings loaded - Window size: {window_width}x{window_height}")
         print(f"Application theme: {get_setting('application.theme', 'Chiaro')}")
 
-        # Test import modulo principale
+        # Test modulo principale: basta la specifica, l'import vero
+        # avviene una volta sola, all'avvio dell'interfaccia
         try:
-            import importlib.util
             aircraft_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main_01_Aircraft.py")
-            spec = importlib.util.spec_from_file_location("main_01_Aircraft", aircraft_path)
+            found, detail = check_module_spec("main_01_Aircraft", aircraft_path)
+            if not found:
+                raise ImportError(f"Could not load main_01_Aircraft module: {detail}")
 
-            if spec is None or spec.loader is None:
-                raise ImportError("Could not load main_01_Aircraft module")
+            if full_import_check_requested():
+                import importlib.util
 
-            main_01_Aircraft = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(main_01_Aircraft)
-            print("✅ Main module (main_01_Aircraft) imported successfully")
+                spec = importlib.util.spec_from_file_location("main_01_Aircraft", aircraft_path)
+                main_01_Aircraft = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(main_01_Aircraft)
+                print("✅ Main module (main_01_Aircraft) imported successfully")
+            else:
+                print("✅ Main module (main_01_Aircraft) found")
 
         except ImportError as e:
             print(f"❌ Critical module import failed: {e}")
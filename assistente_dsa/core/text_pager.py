@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Text Pager - Paginazione "pigra" dei testi lunghi
+
+Il pannello dei dettagli mostra i testi una pagina alla volta. Invece di
+preparare tutte le pagine in anticipo, l'inizio della pagina N si calcola
+direttamente: è il primo confine di parola vicino a ``N * page_size``.
+Saltare a una pagina qualsiasi costa quindi O(1) e non dipende dalle
+pagine precedenti; le parole non vengono mai spezzate a metà (salvo parole
+più lunghe della finestra di ricerca). Vengono tenute pronte solo la pagina
+corrente e le vicine.
+"""
+
+from collections import OrderedDict
+from typing import Dict
+
+DEFAULT_PAGE_SIZE = 250
+# Quanto ci si può spostare da N * page_size per trovare un confine di parola
+MAX_WORD_SHIFT = 40
+# Pagine tenute pronte (corrente e vicine)
+PAGE_CACHE_SIZE = 3
+
+
+class TextPager:
+    """Pagine di un testo calcolate su richiesta."""
+
+    def __init__(self, text: str, page_size: int = DEFAULT_PAGE_SIZE):
+        self.text = text or ""
+        self.page_size = max(1, int(page_size))
+        # Finestra di ricerca sempre minore di mezza pagina: i confini
+        # restano in ordine e nessuna pagina è vuota
+        self._shift = min(MAX_WORD_SHIFT, max(0, (self.page_size - 1) // 2))
+        self._bounds: Dict[int, int] = {}
+        self._pages: "OrderedDict[int, str]" = OrderedDict()
+        self.stats = {"pages_built": 0}
+
+    @property
+    def page_count(self) -> int:
+        """Numero di pagine (almeno 1, anche per un testo vuoto)."""
+        return max(1, -(-len(self.text) // self.page_size))
+
+    def page_start(self, n: int) -> int:
+        """Offset nel testo dell'inizio della pagina ``n``."""
+        if n <= 0:
+            return 0
+        if n >= self.page_count:
+            return len(self.text)
+        start = self._bounds.get(n)
+        if start is None:
+            start = self._snap(n * self.page_size)
+            self._bounds[n] = start
+        return start
+
+    def _snap(self, target: int) -> int:
+        """Sposta ``target`` al confine di parola più vicino (prima in avanti)."""
+        text = self.text
+        if target <= 0 or target >= len(text) or text[target - 1].isspace():
+            return target
+        limit = min(len(text), target + self._shift)
+        for i in range(target, limit):
+            if text[i].isspace():
+                # La nuova pagina parte dopo gli spazi
+                while i < len(text) and text[i].isspace() and i < limit:
+                    i += 1
+                return i
+        for i in range(target - 1, max(0, target - self._shift) - 1, -1):
+            if text[i].isspace():
+                return i + 1
+        return target  # parola più lunga della finestra: taglio netto
+
+    def page(self, n: int) -> str:
+        """Testo della pagina ``n`` (prepara anche le vicine)."""
+        n = min(max(0, n), self.page_count - 1)
+        result = self._build(n)
+        for neighbour in (n + 1, n - 1):
+            if 0 <= neighbour < self.page_count:
+                self._build(neighbour)
+        self._pages.move_to_end(n)
+        return result
+
+    def _build(self, n: int) -> str:
+        page = self._pages.get(n)
+        if page is None:
+            page = self.text[self.page_start(n):self.page_start(n + 1)]
+            self._pages[n] = page
+            self.stats["pages_built"] += 1
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return page
+
+    def page_of_offset(self, offset: int) -> int:
+        """Pagina che contiene il carattere ``offset``."""
+        offset = min(max(0, offset), max(0, len(self.text) - 1))
+        n = min(offset // self.page_size, self.page_count - 1)
+        # Il confine può essere spostato di poco: al massimo una pagina
+        if n > 0 and offset < self.page_start(n):
+            n -= 1
+        elif n + 1 < self.page_count and offset >= self.page_start(n + 1):
+            n += 1
+        return n
@@ -10,12 +10,37 @@ import os
 import sys
 import time
 import importlib.util
+from collections import deque
 from datetime import datetime
 
 # Aggiungi il percorso del progetto ai path di sistema per gli import
 project_root = os.path.dirname(os.path.dirname(__file__))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
+
+# Tempi delle fasi di avvio (stampati con COGNIFLOW_PROFILE=1)
+try:
+    from core import startup_timer
+except ImportError:
+    from assistente_dsa.core import startup_timer
+
+# Scrittura a lotti dei registri JSON Lines, in un thread separato
+try:
+    from core.metrics_sink import get_sink
+except ImportError:
+    from assistente_dsa.core.metrics_sink import get_sink
+
+# Tempi per fase dei frame video (finestra di test webcam)
+try:
+    from core.frame_tracer import get_frame_tracer
+except ImportError:
+    from assistente_dsa.core.frame_tracer import get_frame_tracer
+
+# Sottosistemi pesanti importati al primo uso (core/lazy_loader.py)
+try:
+    from core.lazy_loader import lazy_attr, subsystem_available
+except ImportError:
+    from assistente_dsa.core.lazy_loader import lazy_attr, subsystem_available
 from PyQt6.QtCore import (
     Qt,
     QTimer,
@@ -94,6 +119,7 @@ def safe_import(module_path, attr_name, default_value=None):
 
 # Import delle impostazioni e configurazione
 load_settings = safe_import('core.config_module', 'load_settings', lambda: {})
+_config_get_setting = safe_import('core.config_module', 'get_setting', None)
 get_config = safe_import('core.config_module', 'get_config', lambda: None)
 
 # Import del bridge Ollama per AI
@@ -101,44 +127,42 @@ OllamaBridge = safe_import('Artificial_Intelligence.Ollama.ollama_bridge', 'Olla
 
 # Import dei componenti UI
 DraggableTextWidget = safe_import('UI.draggable_text_widget', 'DraggableTextWidget', None)
+TextColumnView = safe_import('UI.text_column_view', 'TextColumnView', None)
+make_text_column = safe_import('UI.text_column_view', 'make_text_column', None)
+VIRTUAL_THRESHOLD = safe_import('UI.text_column_view', 'VIRTUAL_THRESHOLD', 50)
 SettingsDialog = safe_import('UI.settings_dialog', 'SettingsDialog', None)
+get_theme_engine = safe_import('UI.theme_engine', 'get_theme_engine', None)
 show_user_friendly_error = safe_import('UI.user_friendly_errors', 'show_user_friendly_error', lambda *args, **kwargs: None)
 
-# Import dei thread per riconoscimento vocale
-SpeechRecognitionThread = safe_import('Artificial_Intelligence.Riconoscimento_Vocale.managers.speech_recognition_manager', 'SpeechRecognitionThread', None)
+# Voce, sintesi vocale, OCR e multimedia: importati al primo uso, non
+# all'avvio. I flag *_AVAILABLE cercano le librerie senza importarle.
+# Prima di usarli si controlla ``X.resolve() is None``: il test di verità
+# guarda solo le librerie, e ``X is None`` non è mai vero.
+_SPEECH_MODULE = 'Artificial_Intelligence.Riconoscimento_Vocale.managers.speech_recognition_manager'
+_TTS_MODULE = 'Artificial_Intelligence.Sintesi_Vocale.managers.tts_manager'
 
-# Altre funzioni mancanti
-ensure_vosk_model_available = safe_import('Artificial_Intelligence.Riconoscimento_Vocale.managers.speech_recognition_manager', 'ensure_vosk_model_available', lambda *args, **kwargs: False)
-AudioFileTranscriptionThread = safe_import('Artificial_Intelligence.Riconoscimento_Vocale.managers.speech_recognition_manager', 'AudioFileTranscriptionThread', None)
-TTSThread = safe_import('Artificial_Intelligence.Sintesi_Vocale.managers.tts_manager', 'TTSThread', None)
+SpeechRecognitionThread = lazy_attr(_SPEECH_MODULE, 'SpeechRecognitionThread', subsystem='speech')
+ensure_vosk_model_available = lazy_attr(_SPEECH_MODULE, 'ensure_vosk_model_available', lambda *args, **kwargs: False, subsystem='speech')
+AudioFileTranscriptionThread = lazy_attr(_SPEECH_MODULE, 'AudioFileTranscriptionThread', subsystem='speech')
+TTSThread = lazy_attr(_TTS_MODULE, 'TTSThread', subsystem='tts')
 
 # Import per OCR
-try:
-    import pytesseract
-    from PIL import Image
-    OCR_AVAILABLE = True
-except ImportError:
-    pytesseract = None
-    Image = None
-    OCR_AVAILABLE = False
+pytesseract = lazy_attr('pytesseract', subsystem='ocr')
+Image = lazy_attr('PIL.Image', subsystem='ocr')
+OCR_AVAILABLE = subsystem_available('ocr')
+if not OCR_AVAILABLE:
     print("⚠️  OCR functionality not available")
 
 # Import per funzionalità multimediali
-try:
-    from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-    MULTIMEDIA_AVAILABLE = True
-except ImportError:
-    QMediaPlayer = None
-    QAudioOutput = None
-    MULTIMEDIA_AVAILABLE = False
+QMediaPlayer = lazy_attr('PyQt6.QtMultimedia', 'QMediaPlayer', subsystem='multimedia')
+QAudioOutput = lazy_attr('PyQt6.QtMultimedia', 'QAudioOutput', subsystem='multimedia')
+MULTIMEDIA_AVAILABLE = subsystem_available('multimedia')
+if not MULTIMEDIA_AVAILABLE:
     print("⚠️  Multimedia functionality not available")
 
 # Controllo disponibilità TTS
-try:
-    from Artificial_Intelligence.Sintesi_Vocale.managers.tts_manager import TTSThread
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
+TTS_AVAILABLE = subsystem_available('tts')
+if not TTS_AVAILABLE:
     print("⚠️  TTS functionality not available")
 
 # Funzione di utilità mancante
@@ -152,13 +176,33 @@ def show_success_message(parent, title, message):
 
 # Funzione di fallback per get_setting
 def get_setting(key, default=None):
-    """Ottiene un'impostazione con fallback."""
+    """Ottiene un'impostazione (notazione a punti) dallo store in memoria.
+
+    Viene chiamata anche nei percorsi "caldi" (UI, AI, timer): lo store non
+    rilegge settings.json a ogni chiamata.
+    """
     try:
+        if _config_get_setting is not None:
+            return _config_get_setting(key, default)
         settings = load_settings()
         return settings.get(key, default)
     except:
         return default
 
+
+def set_ui_state(widget, name, value, descendants=False):
+    """Cambia uno stato di stile del widget (proprietà dinamica, UI/theme_engine.py).
+
+    Il foglio di stile dell'applicazione ha già le regole per ogni stato:
+    viene rilucidato solo il widget, senza toccarne lo stylesheet.
+    """
+    if get_theme_engine is not None:
+        return get_theme_engine().set_state(widget, name, value, descendants)
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+    return True
+
 print("✅ Import process completed")
 
 # Rimuovi la definizione di initialize_application da qui - sarà alla fine del file
@@ -175,6 +219,8 @@ class WebcamTestWindow(QMainWindow):
     human_detected_signal = pyqtSignal(list)  # list of human bounding boxes
     human_position_signal = pyqtSignal(int, int)  # center position of primary human
 
+    FRAME_BREAKDOWN_INTERVAL_MS = 500
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_window = parent
@@ -419,82 +465,22 @@ class WebcamTestWindow(QMainWindow):
         self.hands_btn = QPushButton("🤚 Mani OFF")
         self.hands_btn.setMinimumHeight(35)
         self.hands_btn.setEnabled(False)
-        self.hands_btn.setStyleSheet(
-            """
-            QPushButton {
-                background: #17a2b8;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-                padding: 6px 12px;
-            }
-            QPushButton:hover {
-                background: #138496;
-            }
-            QPushButton:pressed {
-                background: #117a8b;
-            }
-            QPushButton:disabled {
-                background: #6c757d;
-            }
-        """
-        )
+        self.hands_btn.setObjectName("hands_btn")  # colori nel tema (UI/theme_engine.py)
+        self.hands_btn.setProperty("toggleState", "off")
         controls_layout.addWidget(self.hands_btn)
 
         self.gestures_btn = QPushButton("👋 Gesti OFF")
         self.gestures_btn.setMinimumHeight(35)
         self.gestures_btn.setEnabled(False)
-        self.gestures_btn.setStyleSheet(
-            """
-            QPushButton {
-                background: #ffc107;
-                color: black;
-                border: none;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-                padding: 6px 12px;
-            }
-            QPushButton:hover {
-                background: #e0a800;
-            }
-            QPushButton:pressed {
-                background: #d39e00;
-            }
-            QPushButton:disabled {
-                background: #6c757d;
-            }
-        """
-        )
+        self.gestures_btn.setObjectName("gestures_btn")  # colori nel tema (UI/theme_engine.py)
+        self.gestures_btn.setProperty("toggleState", "off")
         controls_layout.addWidget(self.gestures_btn)
 
         self.expressions_btn = QPushButton("😊 Espressioni OFF")
         self.expressions_btn.setMinimumHeight(35)
         self.expressions_btn.setEnabled(False)
-        self.expressions_btn.setStyleSheet(
-            """
-            QPushButton {
-                background: #fd7e14;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-                padding: 6px 12px;
-            }
-            QPushButton:hover {
-                background: #e8590c;
-            }
-            QPushButton:pressed {
-                background: #d8430b;
-            }
-            QPushButton:disabled {
-                background: #6c757d;
-            }
-        """
-        )
+        self.expressions_btn.setObjectName("expressions_btn")  # colori nel tema (UI/theme_engine.py)
+        self.expressions_btn.setProperty("toggleState", "off")
         controls_layout.addWidget(self.expressions_btn)
 
 
@@ -655,6 +641,49 @@ class WebcamTestWindow(QMainWindow):
         )
         layout.addWidget(self.status_label)
 
+        # === Tempi per fase dei frame (core/frame_tracer.py) ===
+        trace_layout = QHBoxLayout()
+        trace_layout.setSpacing(8)
+
+        self.frame_trace_btn = QPushButton("⏱️ Tempi frame")
+        self.frame_trace_btn.setCheckable(True)
+        self.frame_trace_btn.setMinimumHeight(30)
+        self.frame_trace_btn.setToolTip(
+            "Misura ogni fase del frame (lettura, rilevamenti, conversione, invio)"
+        )
+        trace_layout.addWidget(self.frame_trace_btn)
+
+        self.export_trace_btn = QPushButton("💾 Esporta traccia")
+        self.export_trace_btn.setMinimumHeight(30)
+        self.export_trace_btn.setEnabled(False)
+        self.export_trace_btn.setToolTip(
+            "Salva gli span in debug_logs/ (formato Chrome, apribile in Perfetto)"
+        )
+        trace_layout.addWidget(self.export_trace_btn)
+        trace_layout.addStretch()
+        layout.addLayout(trace_layout)
+
+        self.frame_breakdown_label = QLabel()
+        self.frame_breakdown_label.setStyleSheet(
+            """
+            QLabel {
+                font-family: "Courier New", monospace;
+                font-size: 11px;
+                color: #495057;
+                padding: 5px;
+                background: #f8f9fa;
+                border-radius: 4px;
+            }
+        """
+        )
+        self.frame_breakdown_label.setVisible(False)
+        layout.addWidget(self.frame_breakdown_label)
+
+        # Ripartizione aggiornata due volte al secondo, non a ogni frame
+        self.frame_breakdown_timer = QTimer(self)
+        self.frame_breakdown_timer.setInterval(self.FRAME_BREAKDOWN_INTERVAL_MS)
+        self.frame_breakdown_timer.timeout.connect(self.refresh_frame_breakdown)
+
         # Pulsante chiudi
         close_btn = QPushButton("❌ Chiudi Finestra")
         close_btn.setMinimumHeight(35)
@@ -698,6 +727,12 @@ class WebcamTestWindow(QMainWindow):
         self.gestures_btn.clicked.connect(self.toggle_gestures)
         self.expressions_btn.clicked.connect(self.toggle_expressions)
 
+        # Tempi per fase dei frame (accesi da subito con COGNIFLOW_PROFILE)
+        self.frame_trace_btn.toggled.connect(self.toggle_frame_tracing)
+        self.export_trace_btn.clicked.connect(self.export_frame_trace)
+        if startup_timer.enabled():
+            self.frame_trace_btn.setChecked(True)
+
 
 
     def on_hand_position_update(self, webcam_x, webcam_y):
@@ -1103,7 +1138,7 @@ class WebcamTestWindow(QMainWindow):
         """Avvia il test della webcam con VideoThread per gesture recognition."""
         try:
             # Check if VideoThread is available
-            if not VIDEO_THREAD_AVAILABLE or VideoThread is None:
+            if not VIDEO_THREAD_AVAILABLE or VideoThread.resolve() is None:
                 self.status_label.setText("Status: VideoThread non disponibile")
                 self.video_area.setText(
                     "❌ VideoThread non disponibile\n\nFunzionalità avanzate webcam limitate"
@@ -1411,9 +1446,46 @@ class WebcamTestWindow(QMainWindow):
         drag_layout.addWidget(self.drag_area)
         self.main_splitter.addWidget(self.drag_container)
 
+    def toggle_frame_tracing(self, enabled):
+        """Attiva/disattiva i tempi per fase dei frame del VideoThread."""
+        tracer = get_frame_tracer()
+        if enabled:
+            # Riparte da zero solo se le metriche locali non lo stanno usando
+            tracer.acquire("webcam_test", fresh=True)
+        else:
+            tracer.release("webcam_test")
+        self.export_trace_btn.setEnabled(enabled)
+        self.frame_breakdown_label.setVisible(enabled)
+        if enabled:
+            self.refresh_frame_breakdown()
+            self.frame_breakdown_timer.start()
+        else:
+            self.frame_breakdown_timer.stop()
+
+    def refresh_frame_breakdown(self):
+        """Mostra media e p95 di ogni fase sugli ultimi frame."""
+        self.frame_breakdown_label.setText(get_frame_tracer().format_breakdown())
+
+    def export_frame_trace(self):
+        """Esporta gli span registrati in formato Chrome trace (Perfetto)."""
+        path = os.path.join(
+            os.path.dirname(__file__),
+            "debug_logs",
+            f"frame_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        )
+        try:
+            count = get_frame_tracer().export_chrome_trace(path)
+            self.status_label.setText(
+                f"Status: {count} span esportati in {os.path.basename(path)}"
+            )
+        except OSError as e:
+            self.status_label.setText(f"Status: Errore esportazione traccia - {e}")
+
     def closeEvent(self, a0):
         """Gestisce la chiusura della finestra."""
         self.stop_webcam_test()
+        if self.frame_trace_btn.isChecked():
+            self.frame_trace_btn.setChecked(False)
         print("🧪 Finestra test webcam chiusa")
         if a0:
             a0.accept()
@@ -1426,47 +1498,11 @@ class WebcamTestWindow(QMainWindow):
         self.hands_enabled = not self.hands_enabled
         if self.hands_enabled:
             self.hands_btn.setText("🤚 Mani ON")
-            self.hands_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #17a2b8;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #138496;
-                }
-                QPushButton:pressed {
-                    background: #117a8b;
-                }
-            """
-            )
+            set_ui_state(self.hands_btn, "toggleState", "on")
             print("🤚 Rilevamento mani attivato")
         else:
             self.hands_btn.setText("🤚 Mani OFF")
-            self.hands_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #6c757d;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #5a6268;
-                }
-                QPushButton:pressed {
-                    background: #545b62;
-                }
-            """
-            )
+            set_ui_state(self.hands_btn, "toggleState", "off")
             print("🤚 Rilevamento mani disattivato")
 
         # TODO: Integrazione con VideoThread per toggle mani
@@ -1481,47 +1517,11 @@ class WebcamTestWindow(QMainWindow):
         self.gestures_enabled = not self.gestures_enabled
         if self.gestures_enabled:
             self.gestures_btn.setText("👋 Gesti ON")
-            self.gestures_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #ffc107;
-                    color: black;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #e0a800;
-                }
-                QPushButton:pressed {
-                    background: #d39e00;
-                }
-            """
-            )
+            set_ui_state(self.gestures_btn, "toggleState", "on")
             print("👋 Rilevamento gesti attivato")
         else:
             self.gestures_btn.setText("👋 Gesti OFF")
-            self.gestures_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #6c757d;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #5a6268;
-                }
-                QPushButton:pressed {
-                    background: #545b62;
-                }
-            """
-            )
+            set_ui_state(self.gestures_btn, "toggleState", "off")
             print("👋 Rilevamento gesti disattivato")
 
         # TODO: Integrazione con VideoThread per toggle gesti
@@ -1536,47 +1536,11 @@ class WebcamTestWindow(QMainWindow):
         self.expressions_enabled = not self.expressions_enabled
         if self.expressions_enabled:
             self.expressions_btn.setText("😊 Espressioni ON")
-            self.expressions_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #fd7e14;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #e8590c;
-                }
-                QPushButton:pressed {
-                    background: #d8430b;
-                }
-            """
-            )
+            set_ui_state(self.expressions_btn, "toggleState", "on")
             print("😊 Rilevamento espressioni attivato")
         else:
             self.expressions_btn.setText("😊 Espressioni OFF")
-            self.expressions_btn.setStyleSheet(
-                """
-                QPushButton {
-                    background: #6c757d;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 6px 12px;
-                }
-                QPushButton:hover {
-                    background: #5a6268;
-                }
-                QPushButton:pressed {
-                    background: #545b62;
-                }
-            """
-            )
+            set_ui_state(self.expressions_btn, "toggleState", "off")
             print("😊 Rilevamento espressioni disattivato")
 
         # TODO: Integrazione con VideoThread per toggle espressioni
@@ -1588,25 +1552,12 @@ class WebcamTestWindow(QMainWindow):
 
 
 
-# Import per OCR
-try:
-    import pytesseract
-    from PIL import Image
-
-    OCR_AVAILABLE = True
-except ImportError:
-    pytesseract = None
-    Image = None
-    OCR_AVAILABLE = False
-
-# Import VideoThread for advanced webcam features
-try:
-    from Artificial_Intelligence.Video.visual_background import VideoThread
-
-    VIDEO_THREAD_AVAILABLE = True
-except ImportError:
-    VideoThread = None
-    VIDEO_THREAD_AVAILABLE = False
+# VideoThread (webcam, gesti, sfondo video): importato al primo uso
+VideoThread = lazy_attr(
+    'Artificial_Intelligence.Video.visual_background', 'VideoThread', subsystem='vision'
+)
+VIDEO_THREAD_AVAILABLE = subsystem_available('vision')
+if not VIDEO_THREAD_AVAILABLE:
     logging.warning(
         "VideoThread non disponibile - funzionalità avanzate webcam limitate"
     )
@@ -2305,8 +2256,22 @@ class HandwritingCanvas(QWidget):
     Supporta pennelli di vario spessore, colori e forme (matita a mano libera,
     linea, rettangolo, ellisse, gomma). Con la tavoletta grafica lo spessore
     della matita segue la pressione.
+
+    I segmenti in arrivo (mouse, tavoletta, penna in aria: anche 60 punti al
+    secondo) non vengono disegnati uno per uno: si accumulano e vengono
+    tracciati una volta per fotogramma con un solo QPainter, aggiornando a
+    schermo solo il rettangolo che li contiene; paintEvent ricopia solo la
+    parte esposta dell'immagine.
+
+    Oltre all'immagine il disegno è tenuto come tratti vettoriali
+    (core/stroke_model.py): annulla/ripristina ridisegnano solo il
+    rettangolo del tratto toccato, e il disegno si salva nel progetto in
+    forma compatta.
     """
 
+    FRAME_MS = 16  # un passaggio di disegno per fotogramma (~60 Hz)
+    AIR_CURSOR_RADIUS = 8
+
     def __init__(self, parent=None, width=720, height=300):
         super().__init__(parent)
         self.setMinimumSize(width, height)
@@ -2315,8 +2280,19 @@ class HandwritingCanvas(QWidget):
         # Tracciamento del mouse: con 'D' premuto si disegna anche solo muovendo
         # il cursore (utile col touchpad, senza dover tenere premuto un pulsante).
         self.setMouseTracking(True)
-        self.image = QImage(width, height, QImage.Format.Format_RGB32)
-        self.image.fill(Qt.GlobalColor.white)
+        self._image = QImage(width, height, QImage.Format.Format_RGB32)
+        self._image.fill(Qt.GlobalColor.white)
+
+        # Segmenti in attesa del prossimo fotogramma: (da, a, penna)
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FRAME_MS)
+        self._flush_timer.timeout.connect(self.flush_strokes)
+        self.paint_stats = {"segments": 0, "flushes": 0}
+        from core.stroke_model import StrokeModel
+
+        self.strokes = StrokeModel()
 
         self.pen_color = QColor("#1a1a1a")
         self.pen_width = 3
@@ -2337,6 +2313,129 @@ class HandwritingCanvas(QWidget):
         self._air_pos = None
         self._air_inking = False
 
+    @property
+    def image(self):
+        """Immagine del disegno, con tutti i segmenti già tracciati."""
+        self.flush_strokes()
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._pending.clear()
+        self._image = value
+        self.update()
+
+    # --- Disegno a fotogrammi ---
+    def _queue_segment(self, a, b, pen):
+        """Accoda un segmento: verrà tracciato al prossimo fotogramma."""
+        self._pending.append((a, b, pen))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush_strokes(self):
+        """Traccia i segmenti accodati con un solo passaggio di disegno."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        dirty = QRect()
+        painter = QPainter(self._image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for a, b, pen in pending:
+            painter.setPen(pen)
+            painter.drawLine(a, b)
+            margin = int(pen.widthF() / 2) + 2  # spessore e antialiasing
+            dirty = dirty.united(
+                QRect(a, b).normalized().adjusted(-margin, -margin, margin, margin)
+            )
+        painter.end()
+        self.paint_stats["segments"] += len(pending)
+        self.paint_stats["flushes"] += 1
+        self.update(dirty)
+
+    def _air_cursor_rect(self, point):
+        r = self.AIR_CURSOR_RADIUS + 3  # raggio, bordo e antialiasing
+        return QRect(point.x() - r, point.y() - r, 2 * r + 1, 2 * r + 1)
+
+    def _shape_rect(self, a, b):
+        margin = self._make_pen().width() + 2
+        return QRect(a, b).normalized().adjusted(-margin, -margin, margin, margin)
+
+    # --- Tratti vettoriali ---
+    def _stroke_begin(self, point, pressure=False):
+        self.strokes.begin(self.tool, self.pen_color.name(), self.pen_width, pressure)
+        self.strokes.add_point(point.x(), point.y())
+
+    def _stroke_end(self):
+        self.strokes.end()
+
+    def _stroke_rect(self, stroke):
+        width = stroke.width * (4 if stroke.tool == "eraser" else 1)
+        if stroke.pressure:
+            width = max(width, 6.0 * (4 if stroke.tool == "eraser" else 1))
+        x0, y0, x1, y1 = stroke.bounds(width / 2 + 2)
+        return QRect(QPoint(int(x0), int(y0)), QPoint(int(x1) + 1, int(y1) + 1))
+
+    def _render_strokes(self, rect=None):
+        """Ridisegna sull'immagine i tratti che toccano ``rect`` (tutti se None)."""
+        self.flush_strokes()
+        rect = self._image.rect() if rect is None else rect.intersected(self._image.rect())
+        if rect.isEmpty():
+            return
+        painter = QPainter(self._image)
+        painter.setClipRect(rect)
+        painter.fillRect(rect, Qt.GlobalColor.white)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for stroke in self.strokes.strokes:
+            if len(stroke.points) < 2 or not self._stroke_rect(stroke).intersects(rect):
+                continue
+            if stroke.kind != "free":
+                painter.setPen(self._pen_for(stroke.tool, stroke.color, stroke.width))
+                a, b = stroke.points[0], stroke.points[-1]
+                self._paint_shape(
+                    painter, QPoint(int(a[0]), int(a[1])), QPoint(int(b[0]), int(b[1])),
+                    stroke.tool,
+                )
+                continue
+            prev = stroke.points[0]
+            for pt in stroke.points[1:]:
+                width = max(1.0, pt[3] * 6.0) if stroke.pressure else None
+                painter.setPen(self._pen_for(stroke.tool, stroke.color, stroke.width, width))
+                painter.drawLine(QPointF(prev[0], prev[1]), QPointF(pt[0], pt[1]))
+                prev = pt
+        painter.end()
+        self.update(rect)
+
+    def undo(self):
+        """Annulla l'ultimo tratto (o l'ultima pulizia del foglio)."""
+        self.flush_strokes()
+        self._last = None
+        self._air_last = None
+        self._apply_history(self.strokes.undo())
+
+    def redo(self):
+        """Ripristina l'ultimo tratto annullato."""
+        self.flush_strokes()
+        self._apply_history(self.strokes.redo())
+
+    def _apply_history(self, result):
+        if result is None:
+            return
+        op, payload = result
+        if op == "add":
+            self._render_strokes(self._stroke_rect(payload))
+        else:
+            self._render_strokes()
+
+    def load_strokes(self, data):
+        """Sostituisce il disegno con i tratti salvati (dict di StrokeModel)."""
+        from core.stroke_model import StrokeModel
+
+        self._pending.clear()
+        self.strokes = StrokeModel.from_dict(data or {})
+        self._render_strokes()
+
     # --- Configurazione strumenti ---
     def set_color(self, color):
         self.pen_color = QColor(color)
@@ -2363,36 +2462,45 @@ class HandwritingCanvas(QWidget):
         Non richiede il tasto 'D': la penna fisica È il comando.
         """
         if not visible:
+            if self._air_last is not None:
+                self._stroke_end()
             self._air_last = None
             if self._air_pos is not None:
+                self.update(self._air_cursor_rect(self._air_pos))
                 self._air_pos = None
-                self.update()
             return
         point = QPoint(
             int(nx * max(1, self.width() - 1)),
             int(ny * max(1, self.height() - 1)),
         )
+        # Il cursore si ridisegna solo dov'era e dove va
+        if self._air_pos is not None:
+            self.update(self._air_cursor_rect(self._air_pos))
+        self.update(self._air_cursor_rect(point))
         self._air_pos = point
         self._air_inking = bool(inking)
         if not inking:
             # Rubinetto chiuso: la punta si vede ma non lascia inchiostro
+            if self._air_last is not None:
+                self._stroke_end()
             self._air_last = None
         elif self._air_last is None:
             self._air_last = point
+            self._stroke_begin(point)
         else:
-            painter = QPainter(self.image)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            painter.setPen(self._make_pen())
-            painter.drawLine(self._air_last, point)
-            painter.end()
+            self._queue_segment(self._air_last, point, self._make_pen())
+            self.strokes.add_point(point.x(), point.y())
             self._air_last = point
-        self.update()
 
     def _make_pen(self, width=None):
-        colore = QColor("#ffffff") if self.tool == "eraser" else self.pen_color
-        spessore = width if width is not None else self.pen_width
-        if self.tool == "eraser":
-            spessore = max(spessore, self.pen_width) * 4
+        return self._pen_for(self.tool, self.pen_color, self.pen_width, width)
+
+    @staticmethod
+    def _pen_for(tool, color, base_width, width=None):
+        colore = QColor("#ffffff") if tool == "eraser" else QColor(color)
+        spessore = width if width is not None else base_width
+        if tool == "eraser":
+            spessore = max(spessore, base_width) * 4
         return QPen(
             colore, spessore,
             Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin,
@@ -2404,11 +2512,18 @@ class HandwritingCanvas(QWidget):
         super().enterEvent(event)
 
     def keyPressEvent(self, event):
-        if event.key() == Qt.Key.Key_D:
+        ctrl = event.modifiers() & Qt.KeyboardModifier.ControlModifier
+        shift = event.modifiers() & Qt.KeyboardModifier.ShiftModifier
+        if ctrl and event.key() == Qt.Key.Key_Z:
+            self.redo() if shift else self.undo()
+        elif ctrl and event.key() == Qt.Key.Key_Y:
+            self.redo()
+        elif event.key() == Qt.Key.Key_D:
             # Ignora l'auto-repeat: resettare _last a ogni ripetizione
             # spezzerebbe il tratto (effetto tratteggio).
             if not event.isAutoRepeat():
                 self._last = None  # nuovo tratto pulito al primo press
+                self._stroke_end()
             self._draw_enabled = True
         else:
             super().keyPressEvent(event)
@@ -2416,12 +2531,14 @@ class HandwritingCanvas(QWidget):
     def leaveEvent(self, event):
         # Interrompe il tratto quando il cursore esce dall'area
         self._last = None
+        self._stroke_end()
         super().leaveEvent(event)
 
     def keyReleaseEvent(self, event):
         if event.key() == Qt.Key.Key_D and not event.isAutoRepeat():
             self._draw_enabled = False
             self._last = None
+            self._stroke_end()
             self._start = None
             self._preview_end = None
             self.update()
@@ -2433,7 +2550,9 @@ class HandwritingCanvas(QWidget):
         painter = QPainter(self)
         if self.visual_opacity < 1.0:
             painter.setOpacity(self.visual_opacity)
-        painter.drawImage(0, 0, self.image)
+        # Solo la parte esposta: il resto dello schermo è già giusto
+        exposed = event.rect().intersected(self._image.rect())
+        painter.drawImage(exposed, self._image, exposed)
         painter.setOpacity(1.0)
         # Foglio trasparente: bordo tratteggiato per vedere dove finisce
         if self.visual_opacity < 1.0:
@@ -2459,39 +2578,40 @@ class HandwritingCanvas(QWidget):
                 painter.setBrush(Qt.BrushStyle.NoBrush)
             painter.drawEllipse(self._air_pos, 8, 8)
 
-    def _paint_shape(self, painter, a, b):
-        if self.tool == "line":
+    def _paint_shape(self, painter, a, b, tool=None):
+        tool = tool or self.tool
+        if tool == "line":
             painter.drawLine(a, b)
-        elif self.tool == "rect":
+        elif tool == "rect":
             painter.drawRect(QRect(a, b).normalized())
-        elif self.tool == "ellipse":
+        elif tool == "ellipse":
             painter.drawEllipse(QRect(a, b).normalized())
 
     def resizeEvent(self, event):
-        if self.width() > self.image.width() or self.height() > self.image.height():
+        if self.width() > self._image.width() or self.height() > self._image.height():
+            corrente = self.image  # con i segmenti in attesa
             nuova = QImage(
-                max(self.width(), self.image.width()),
-                max(self.height(), self.image.height()),
+                max(self.width(), corrente.width()),
+                max(self.height(), corrente.height()),
                 QImage.Format.Format_RGB32,
             )
             nuova.fill(Qt.GlobalColor.white)
             painter = QPainter(nuova)
-            painter.drawImage(0, 0, self.image)
+            painter.drawImage(0, 0, corrente)
             painter.end()
-            self.image = nuova
+            self._image = nuova
         super().resizeEvent(event)
 
-    def _draw_to(self, point, width=None):
+    def _draw_to(self, point, pressure=None):
+        """Prosegue il tratto fino a ``point`` (con la pressione, dalla tavoletta)."""
         if self._last is None:
             self._last = point
+            self._stroke_begin(point, pressure is not None)
             return
-        painter = QPainter(self.image)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setPen(self._make_pen(width))
-        painter.drawLine(self._last, point)
-        painter.end()
+        width = max(1.0, pressure * 6.0) if pressure is not None else None
+        self._queue_segment(self._last, point, self._make_pen(width))
+        self.strokes.add_point(point.x(), point.y(), 1.0 if pressure is None else pressure)
         self._last = point
-        self.update()
 
     def mousePressEvent(self, event):
         if not self._draw_enabled:
@@ -2499,6 +2619,7 @@ class HandwritingCanvas(QWidget):
         point = event.position().toPoint()
         if self.tool in ("pencil", "eraser"):
             self._last = point
+            self._stroke_begin(point)
         else:
             self._start = point
             self._preview_end = point
@@ -2512,8 +2633,10 @@ class HandwritingCanvas(QWidget):
             # (mouse/touchpad) sia semplicemente muovendo il cursore.
             self._draw_to(point)
         elif self._start is not None:
+            # Anteprima: si ridisegnano solo la forma vecchia e la nuova
+            vecchia = self._shape_rect(self._start, self._preview_end or self._start)
             self._preview_end = point
-            self.update()
+            self.update(vecchia.united(self._shape_rect(self._start, point)))
 
     def mouseReleaseEvent(self, event):
         if not self._draw_enabled:
@@ -2521,16 +2644,32 @@ class HandwritingCanvas(QWidget):
         point = event.position().toPoint()
         if self.tool in ("pencil", "eraser"):
             self._last = None
+            self._stroke_end()
         elif self._start is not None:
+            from core.stroke_model import Stroke
+
+            self.strokes.add_stroke(
+                Stroke(
+                    self.tool,
+                    self.pen_color.name(),
+                    self.pen_width,
+                    [(self._start.x(), self._start.y(), 0.0, 1.0),
+                     (point.x(), point.y(), 0.0, 1.0)],
+                )
+            )
             painter = QPainter(self.image)
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
             painter.setPen(self._make_pen())
             painter.setBrush(Qt.BrushStyle.NoBrush)
             self._paint_shape(painter, self._start, point)
             painter.end()
+            self.update(
+                self._shape_rect(self._start, point).united(
+                    self._shape_rect(self._start, self._preview_end or point)
+                )
+            )
             self._start = None
             self._preview_end = None
-            self.update()
 
     def tabletEvent(self, event):
         # Con la tavoletta la matita segue la pressione; richiede sempre 'D'
@@ -2541,14 +2680,21 @@ class HandwritingCanvas(QWidget):
         t = event.type()
         if t == QEvent.Type.TabletPress:
             self._last = point
+            self._stroke_begin(point, pressure=True)
         elif t == QEvent.Type.TabletMove:
-            self._draw_to(point, width=max(1.0, event.pressure() * 6.0))
+            self._draw_to(point, pressure=event.pressure())
         elif t == QEvent.Type.TabletRelease:
             self._last = None
+            self._stroke_end()
         event.accept()
 
     def clear(self):
-        self.image.fill(Qt.GlobalColor.white)
+        self._pending.clear()
+        self._flush_timer.stop()
+        self._last = None
+        self._air_last = None
+        self.strokes.clear()  # annullabile
+        self._image.fill(Qt.GlobalColor.white)
         self.update()
 
 
@@ -2613,6 +2759,17 @@ class DrawingWidget(QWidget):
             b.clicked.connect(lambda _=False, t=tool: self.canvas.set_tool(t))
             toolbar.addWidget(b)
 
+        for label, slot, tip in (
+            ("↶", self.canvas.undo, "Annulla l'ultimo tratto (Ctrl+Z)"),
+            ("↷", self.canvas.redo, "Ripristina il tratto annullato (Ctrl+Y)"),
+        ):
+            b = QPushButton(label)
+            b.setFixedWidth(30)
+            b.setStyleSheet(tool_btn_style)
+            b.setToolTip(tip)
+            b.clicked.connect(lambda _=False, f=slot: f())
+            toolbar.addWidget(b)
+
         toolbar.addSpacing(8)
 
         # Spessore pennello
@@ -3100,6 +3257,17 @@ class TreeGraphWidget(QWidget):
 
 
 class MainWindow(QMainWindow):
+    # Barra di stato dei clic: al massimo un aggiornamento ogni
+    # CLICK_STATUS_INTERVAL_MS, con l'ultimo degli eventi registrati
+    CLICK_STATUS_INTERVAL_MS = 250
+    MOUSE_EVENT_RING = 64
+    _MOUSE_EVENT_KINDS = {
+        QEvent.Type.MouseButtonPress: "PRESS",
+        QEvent.Type.MouseButtonRelease: "RELEASE",
+        QEvent.Type.MouseButtonDblClick: "DOUBLE_CLICK",
+        QEvent.Type.Wheel: "WHEEL",
+    }
+
     def __init__(self):
         super().__init__()
         self.settings = load_settings()
@@ -3115,6 +3283,16 @@ class MainWindow(QMainWindow):
         # Variabili di stato per l'interfaccia
         self.tools_expanded = True  # Stato espansione dei sottogruppi
 
+        # Eventi del mouse per la barra di stato: il filtro li registra
+        # soltanto, il timer aggiorna l'etichetta (vedi eventFilter)
+        self._mouse_events = deque(maxlen=self.MOUSE_EVENT_RING)
+        self._mouse_event_stats = {"events": 0, "filter_ns": 0, "label_updates": 0}
+        self._mouse_stats_reported = (0, 0)
+        self._click_status_timer = QTimer(self)
+        self._click_status_timer.setSingleShot(True)
+        self._click_status_timer.setInterval(self.CLICK_STATUS_INTERVAL_MS)
+        self._click_status_timer.timeout.connect(self._refresh_click_status)
+
         # Inizializza il bridge Ollama per l'integrazione AI
         self.ollama_bridge = OllamaBridge() if OllamaBridge else None
         if self.ollama_bridge:
@@ -3127,13 +3305,17 @@ class MainWindow(QMainWindow):
         # Imposta un font sicuro e standard per evitare artefatti
         self.set_safe_font()
 
+        # Foglio di stile unico dell'applicazione, impostato prima di creare
+        # i widget: ognuno viene lucidato una volta sola. Vedi UI/theme_engine.py.
+        if get_theme_engine is not None and startup_timer.enabled():
+            get_theme_engine().enable_counter()
+        self.apply_theme()
+
         self.setup_ui()
 
         # Tools panel always visible
 
         # Timer per aggiornare l'orario nel footer ogni minuto
-        from PyQt6.QtCore import QTimer
-
         self.footer_timer = QTimer()
         self.footer_timer.timeout.connect(self._update_time_labels)
         self.footer_timer.start(60000)  # Aggiorna ogni 60 secondi
@@ -3143,13 +3325,74 @@ class MainWindow(QMainWindow):
 
         # Osservazione dei momenti di difficoltà (per genitori/clinici):
         # spenta se non esplicitamente abilitata e acconsentita nelle
-        # Impostazioni. Vedi core/difficulty_observer.py.
-        self._setup_difficulty_observer()
+        # Impostazioni. Creata dall'avvio a stadi. Vedi core/difficulty_observer.py.
+        self.difficulty_observer = None
+
+        # Autosalvataggio: solo le modifiche, nel journal del progetto aperto
+        # (o in quello del lavoro non ancora salvato). Vedi core/project_storage.py.
+        self._setup_autosave()
+
+        # Avvio a stadi: pannelli secondari e preriscaldamento dopo la prima
+        # visualizzazione. Vedi core/startup_scheduler.py.
+        self._setup_startup_scheduler()
 
         logging.info("Applicazione avviata")
 
-        # Log delle metriche iniziali dopo che l'UI è stata configurata
-        QTimer.singleShot(1000, lambda: self.log_ui_metrics("INITIAL_SETUP"))
+    def _setup_startup_scheduler(self):
+        """Accoda i compiti dell'avvio a stadi (partono alla prima showEvent).
+
+        Subito dopo la prima visualizzazione: filtri degli eventi e stili.
+        Nei momenti di inattività: tastiera virtuale, osservazione delle
+        difficoltà, metriche iniziali. Preriscaldamento (in un thread, solo
+        se abilitato nelle Impostazioni): import di video e voce, così il
+        primo clic su webcam o microfono non attende il caricamento.
+        La linea temporale finisce in debug_logs/startup_timeline.json.
+        """
+        try:
+            from core.startup_scheduler import (
+                StartupScheduler,
+                STAGE_AFTER_PAINT,
+                STAGE_IDLE,
+                STAGE_WARMUP,
+            )
+        except ImportError:
+            from assistente_dsa.core.startup_scheduler import (
+                StartupScheduler,
+                STAGE_AFTER_PAINT,
+                STAGE_IDLE,
+                STAGE_WARMUP,
+            )
+
+        scheduler = StartupScheduler(
+            trace_path=os.path.join(
+                os.path.dirname(__file__), "debug_logs", "startup_timeline.json"
+            ),
+            parent=self,
+        )
+        scheduler.add(STAGE_AFTER_PAINT, "filtri eventi", self._install_event_filters)
+        scheduler.add(STAGE_AFTER_PAINT, "tooltip e scorciatoie", self._apply_modern_ui_styles)
+        scheduler.add(STAGE_IDLE, "tastiera virtuale", self._build_virtual_keyboard)
+        scheduler.add(
+            STAGE_IDLE, "osservazione difficoltà", self.refresh_difficulty_observer
+        )
+        scheduler.add(
+            STAGE_IDLE, "metriche iniziali", lambda: self.log_ui_metrics("INITIAL_SETUP")
+        )
+        if get_setting("diagnostics.metrics_exporter_enabled", False):
+            scheduler.add(STAGE_IDLE, "metriche locali", self.refresh_metrics_exporter)
+        if get_setting("diagnostics.memory_watch_enabled", False):
+            scheduler.add(STAGE_IDLE, "osservazione memoria", self.refresh_memory_watch)
+        if get_setting("startup.warmup_vision", False) and VIDEO_THREAD_AVAILABLE:
+            scheduler.add(STAGE_WARMUP, "video", VideoThread.resolve)
+        if get_setting("startup.warmup_speech", False) and SpeechRecognitionThread:
+            scheduler.add(STAGE_WARMUP, "voce", SpeechRecognitionThread.resolve)
+        self.startup_scheduler = scheduler
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        scheduler = getattr(self, "startup_scheduler", None)
+        if scheduler is not None:
+            scheduler.start()
 
     def update_project_name_input_style(self):
         """Deprecato: il campo nome progetto è stato rimosso."""
@@ -3434,6 +3677,7 @@ class MainWindow(QMainWindow):
             <li><b>Ctrl+Z:</b> Annulla ultima azione</li>
             <li><b>Invio:</b> Invia pensierino dal campo footer</li>
             <li><b>F11:</b> Schermo intero</li>
+            <li><b>Alt+← / Alt+→:</b> Frase precedente/successiva nella lettura di un pensierino</li>
         </ul>
 
         <p><b>💡 Suggerimento:</b> Usa il trascinamento per organizzare i tuoi pensierini!</p>
@@ -3499,6 +3743,14 @@ class MainWindow(QMainWindow):
 
         dialog.exec()
 
+    def _ui_metrics_sink(self):
+        """Sink di debug_logs/ui_metrics.jsonl (rotazione e campionamento dalle impostazioni)."""
+        return get_sink(
+            os.path.join(os.path.dirname(__file__), "debug_logs", "ui_metrics.jsonl"),
+            max_bytes=int(get_setting("diagnostics.ui_metrics_max_kb", 1024)) * 1024,
+            sample_rate=float(get_setting("diagnostics.ui_metrics_sample_rate", 1.0)),
+        )
+
     def log_ui_metrics(self, context=""):
         """Registra le metriche dell'interfaccia per il debug."""
         try:
@@ -3588,26 +3840,15 @@ class MainWindow(QMainWindow):
                 "splitter_sizes": splitter_sizes,
             }
 
-            # Salva in un file di log per analisi
-            import json
-            import os
-
-            log_dir = os.path.join(os.path.dirname(__file__), "debug_logs")
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, "ui_metrics.jsonl")
-
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(metrics, ensure_ascii=False) + "\n")
+            # Fogli di stile applicati e rilucidature (UI/theme_engine.py);
+            # con COGNIFLOW_PROFILE anche gli eventi Polish/StyleChange/Paint
+            if get_theme_engine is not None:
+                metrics["style"] = get_theme_engine().metrics()
 
-            print(f"📊 UI Metrics logged - Context: {context}")
-            print(f"   Window size: {window_size.width()}x{window_size.height()}")
-            print(f"   Window pos: {window_pos.x()}, {window_pos.y()}")
-
-            for btn_name, btn_data in buttons_info.items():
-                print(f"   {btn_name}: pos={btn_data['pos']}, size={btn_data['size']}")
-
-            if splitter_sizes:
-                print(f"   Splitter sizes: {splitter_sizes}")
+            # Salva in un file di log per analisi: il record va in coda e il
+            # thread del sink scrive a lotti (core/metrics_sink.py)
+            self._ui_metrics_sink().write(metrics)
+            logging.debug(f"📊 UI Metrics - Context: {context}: {metrics}")
 
         except Exception as e:
             print(f"❌ Error logging UI metrics: {e}")
@@ -4153,9 +4394,48 @@ class MainWindow(QMainWindow):
                 self.keyboard_button.setChecked(False)
             self.set_status_message("🔧 Strumenti nell'area comune")
 
+    def _build_virtual_keyboard(self):
+        """Costruisce la tastiera virtuale (una volta sola) nell'area comune.
+
+        Tastiera a schermo: per chi scrive solo col puntatore (mouse,
+        mano-mouse, domani BCI). Condivide il documento del campo
+        pensierini, quindi scrive davvero lì anche se lo copre.
+        """
+        if self.virtual_keyboard is not None or not hasattr(self, "footer_input_stack"):
+            return self.virtual_keyboard
+        try:
+            from UI.virtual_keyboard import VirtualKeyboardWidget
+
+            self.virtual_keyboard = VirtualKeyboardWidget(
+                target_edit=self.footer_pensierini_input,
+                speak=self._speak,
+                pointer_provider=self._hand_pointer_global,
+                learned_words_path=os.path.join(
+                    os.path.dirname(os.path.abspath(__file__)),
+                    "Save",
+                    "SETUP_TOOLS_&_Data",
+                    "tastiera_parole_apprese.json",
+                ),
+                # Raffinamento 🤖 AI: stesso modello Ollama delle Impostazioni
+                ai_model_provider=lambda: get_setting(
+                    "ai.selected_ai_model", "gemma:2b"
+                ),
+            )
+            self.virtual_keyboard.send_requested.connect(
+                self.send_footer_pensierino
+            )
+            self._keyboard_page_index = self.footer_input_stack.addWidget(
+                self.virtual_keyboard
+            )
+        except Exception as e:
+            logging.warning(f"Tastiera virtuale non disponibile: {e}")
+            self.virtual_keyboard = None
+        return self.virtual_keyboard
+
     def toggle_virtual_keyboard(self):
         """Mostra la tastiera virtuale nell'area comune del footer
         (al posto di Testo/Canvas/Strumenti); premuta di nuovo torna al testo."""
+        self._build_virtual_keyboard()
         if (
             not hasattr(self, "footer_input_stack")
             or getattr(self, "_keyboard_page_index", None) is None
@@ -4458,7 +4738,7 @@ class MainWindow(QMainWindow):
 
     def _start_hand_mouse(self):
         """Avvia la webcam come sfondo con controllo gesti (mano = mouse)."""
-        if not VIDEO_THREAD_AVAILABLE or VideoThread is None:
+        if not VIDEO_THREAD_AVAILABLE or VideoThread.resolve() is None:
             QMessageBox.warning(
                 self,
                 "Webcam",
@@ -4699,10 +4979,10 @@ class MainWindow(QMainWindow):
     def _set_webcam_panels_transparent(self, enabled):
         """Rende i pannelli semitrasparenti per vedere il video di sfondo.
 
-        Lo stile globale (_apply_modern_ui_styles) dipinge OGNI QWidget con un
-        gradiente opaco: anche gli splitter e i contenitori intermedi coprono
-        il video. La trasparenza va quindi impostata widget per widget (lo
-        stylesheet proprio vince su quello ereditato dalla finestra), salvando
+        Il foglio di stile dell'applicazione (UI/theme_engine.py) dipinge OGNI
+        QWidget con un gradiente opaco: anche gli splitter e i contenitori
+        intermedi coprono il video. La trasparenza va quindi impostata widget
+        per widget (lo stylesheet proprio vince su quello dell'applicazione), salvando
         gli stili originali per ripristinarli alla disattivazione.
         """
         saved = getattr(self, "_webcam_saved_styles", None)
@@ -5835,37 +6115,10 @@ class MainWindow(QMainWindow):
         else:
             self._tools_page_index = None
 
-        # Tastiera virtuale a schermo: per chi scrive solo col puntatore
-        # (mouse, mano-mouse, domani BCI). Condivide il documento del campo
-        # pensierini, quindi scrive davvero lì anche se lo copre.
+        # Tastiera virtuale a schermo: costruita a finestra già visibile
+        # (vedi _setup_startup_scheduler) o al primo clic sul pulsante
+        self.virtual_keyboard = None
         self._keyboard_page_index = None
-        try:
-            from UI.virtual_keyboard import VirtualKeyboardWidget
-
-            self.virtual_keyboard = VirtualKeyboardWidget(
-                target_edit=self.footer_pensierini_input,
-                speak=self._speak,
-                pointer_provider=self._hand_pointer_global,
-                learned_words_path=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    "Save",
-                    "SETUP_TOOLS_&_Data",
-                    "tastiera_parole_apprese.json",
-                ),
-                # Raffinamento 🤖 AI: stesso modello Ollama delle Impostazioni
-                ai_model_provider=lambda: get_setting(
-                    "ai.selected_ai_model", "gemma:2b"
-                ),
-            )
-            self.virtual_keyboard.send_requested.connect(
-                self.send_footer_pensierino
-            )
-            self._keyboard_page_index = self.footer_input_stack.addWidget(
-                self.virtual_keyboard
-            )
-        except Exception as e:
-            logging.warning(f"Tastiera virtuale non disponibile: {e}")
-            self.virtual_keyboard = None
         # Riempie tutto lo spazio libero del footer (orizzontale e verticale)
         self.footer_input_stack.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
@@ -6000,368 +6253,99 @@ class MainWindow(QMainWindow):
             }
             QPushButton:hover { border-color: #4a90e2; background: #f1f7ff; }
             QPushButton:pressed { background: #e2ecff; }
-        """
-        )
-        self.toggle_input_mode_button.clicked.connect(self.toggle_input_mode)
-
-        # Riga superiore: Invia + graffetta; sotto: Canvas e Cancella pensierini
-        send_top_row = QHBoxLayout()
-        send_top_row.setSpacing(4)
-        send_top_row.addWidget(self.footer_send_pensierino_button)
-        send_top_row.addWidget(self.attach_button)
-
-        # Pulsante per mostrare la tastiera virtuale nell'area comune
-        self.keyboard_button = QPushButton("⌨️ Tastiera")
-        self.keyboard_button.setCheckable(True)
-        self.keyboard_button.setMinimumHeight(28)
-        self.keyboard_button.setToolTip(
-            "Tastiera a schermo: scrivi con il solo puntatore (mouse o "
-            "mano-mouse), con predizione delle parole, dwell click (sosta "
-            "sul tasto = pressione) e scansione a singolo segnale."
-        )
-        self.keyboard_button.setStyleSheet(
-            self.toggle_input_mode_button.styleSheet()
-        )
-        self.keyboard_button.clicked.connect(self.toggle_virtual_keyboard)
-        if self._keyboard_page_index is None:
-            self.keyboard_button.setEnabled(False)
-
-        send_column_layout = QVBoxLayout()
-        send_column_layout.setSpacing(4)
-        send_column_layout.addLayout(send_top_row)
-        send_column_layout.addWidget(self.toggle_input_mode_button)
-        send_column_layout.addWidget(self.toggle_tools_button)  # Strumenti sotto Canvas
-        send_column_layout.addWidget(self.keyboard_button)
-        send_column_layout.addWidget(self.clear_all_button)
-        pensierini_footer_layout.addLayout(send_column_layout)
-
-        # Aggiungi il layout pensierini (espandibile) al footer
-        footer_layout.addLayout(pensierini_footer_layout, 1)
-
-        # Orologio analogico in alto, e SOTTO l'orario numerico con data breve
-        # ed estesa e la forma discorsiva. "Clicca su un elemento" è nel piè
-        # di pagina in fondo.
-        self.analog_clock = AnalogClock(size=66)
-        # Click sull'orologio: dice l'ora ad alta voce
-        self.analog_clock.clicked.connect(self.speak_current_time)
-        self.left_time_label.setAlignment(Qt.AlignmentFlag.AlignHCenter)
-        # Click sulla data/orario: dice la data ad alta voce
-        self.left_time_label.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.left_time_label.setToolTip("Clicca per sentire la data")
-        self.left_time_label.mousePressEvent = (
-            lambda event: self.speak_current_date()
-        )
-        time_column_layout = QVBoxLayout()
-        time_column_layout.setSpacing(2)
-        time_column_layout.addWidget(
-            self.analog_clock, 0, Qt.AlignmentFlag.AlignHCenter
-        )
-        time_column_layout.addWidget(self.left_time_label)
-        footer_layout.addLayout(time_column_layout)
-
-        main_layout.addLayout(footer_layout)
-
-        # === PIÈ DI PAGINA: barra di stato a tutta larghezza ===
-        # Mostra messaggi veloci (caricamenti, cosa si è cliccato o premuto, ecc.)
-        footer_status_bar = QHBoxLayout()
-        footer_status_bar.setContentsMargins(6, 2, 6, 2)
-        footer_status_bar.addWidget(self.click_status_label, 1)
-        main_layout.addLayout(footer_status_bar)
-
-        # Install event filter to capture mouse clicks
-        QTimer.singleShot(100, self._install_event_filters)
-
-        # Apply modern UI improvements
-        QTimer.singleShot(200, self._apply_modern_ui_styles)
-
-    def _apply_modern_ui_styles(self):
-        """Applica stili moderni e miglioramenti all'interfaccia utente."""
-        try:
-            # Stili moderni per l'intera applicazione
-            modern_css = """
-                /* Stili base moderni */
-                QWidget {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #f8f9fa, stop:1 #e9ecef);
-                    color: #212529;
-                }
-
-                /* Miglioramenti per i GroupBox */
-                QGroupBox {
-                    font-weight: bold;
-                    font-size: 14px;
-                    color: #495057;
-                    border: 2px solid #dee2e6;
-                    border-radius: 8px;
-                    margin-top: 12px;
-                    padding-top: 20px;
-                    background: rgba(255, 255, 255, 0.8);
-                }
-
-                QGroupBox::title {
-                    subcontrol-origin: margin;
-                    left: 12px;
-                    padding: 4px 8px;
-                    color: #495057;
-                    font-weight: bold;
-                    background: rgba(255, 255, 255, 0.9);
-                    border-radius: 4px;
-                }
-
-                /* Stili specifici per il nuovo layout con schede */
-                QGroupBox#pensierini_group {
-                    font-size: 12px;
-                    font-weight: bold;
-                    margin-top: 6px;
-                    padding-top: 12px;
-                    min-height: 80px;
-                    border: 1px solid #dee2e6;
-                    border-radius: 6px;
-                }
-
-                /* Area risultati */
-                QGroupBox#results_group {
-                    font-size: 13px;
-                    font-weight: bold;
-                    margin-top: 6px;
-                    padding-top: 12px;
-                    border: 2px solid #28a745;
-                    border-radius: 6px;
-                    background: rgba(255, 255, 255, 0.95);
-                }
-
-                QGroupBox#results_group QTextEdit {
-                    background: rgba(240, 255, 240, 0.9);
-                    border: 1px solid #28a745;
-                    border-radius: 4px;
-                    font-family: 'Segoe UI', Arial, sans-serif;
-                }
-
-                /* Pulsanti compatti negli strumenti */
-                QTabWidget QPushButton {
-                    min-height: 32px;
-                    font-size: 11px;
-                    padding: 6px 12px;
-                    margin: 2px;
-                    border-radius: 4px;
-                }
-
-                /* Griglia delle materie nelle schede */
-                QScrollArea QPushButton {
-                    min-width: 90px;
-                    max-width: 130px;
-                    font-size: 10px;
-                    padding: 4px 6px;
-                    margin: 1px;
-                }
-
-                /* Miglioramenti per la lista verticale */
-                QListWidget {
-                    background: rgba(255, 255, 255, 0.95);
-                    border-radius: 6px;
-                }
-
-                QListWidget::item {
-                    border-bottom: 1px solid #eee;
-                }
-
-                QListWidget::item:selected {
-                    border-left: 3px solid #2196f3;
-                }
-
-                /* Splitter migliorato per il layout unificato */
-                QSplitter::handle:vertical {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(74, 144, 226, 0.3),
-                        stop:1 rgba(74, 144, 226, 0.5));
-                    border: 1px solid rgba(74, 144, 226, 0.6);
-                    border-radius: 2px;
-                }
-
-                QSplitter::handle:vertical:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(74, 144, 226, 0.6),
-                        stop:1 rgba(74, 144, 226, 0.8));
-                    border-color: rgba(74, 144, 226, 0.8);
-                }
-
-                QSplitter::handle:horizontal {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 rgba(74, 144, 226, 0.3),
-                        stop:1 rgba(74, 144, 226, 0.5));
-                    border: 1px solid rgba(74, 144, 226, 0.6);
-                    border-radius: 2px;
-                }
-
-                QSplitter::handle:horizontal:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 rgba(74, 144, 226, 0.6),
-                        stop:1 rgba(74, 144, 226, 0.8));
-                    border-color: rgba(74, 144, 226, 0.8);
-                }
-
-                /* Stili moderni per tutti i pulsanti */
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #ffffff, stop:1 #f8f9fa);
-                    border: 2px solid #dee2e6;
-                    border-radius: 6px;
-                    padding: 8px 16px;
-                    font-weight: 500;
-                    font-size: 13px;
-                    color: #495057;
-                    min-height: 32px;
-                    transition: all 0.3s ease;
-                }
-
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #e3f2fd, stop:1 #bbdefb);
-                    border-color: #2196f3;
-                    color: #1976d2;
-                    transform: translateY(-1px);
-                    box-shadow: 0 4px 8px rgba(33, 150, 243, 0.2);
-                }
-
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #bbdefb, stop:1 #90caf9);
-                    transform: translateY(0px);
-                    box-shadow: 0 2px 4px rgba(33, 150, 243, 0.3);
-                }
-
-                QPushButton:disabled {
-                    background: #f5f5f5;
-                    color: #9e9e9e;
-                    border-color: #e0e0e0;
-                    opacity: 0.6;
-                }
-
-                /* Pulsanti speciali nella top bar */
-                QPushButton#options_button, QPushButton#toggle_tools_button,
-                QPushButton#save_button, QPushButton#load_button {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #ffffff, stop:1 #f8f9fa);
-                    border: 2px solid #6c757d;
-                    font-weight: bold;
-                    min-width: 100px;
-                }
-
-                QPushButton#options_button:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #fff3cd, stop:1 #ffeaa7);
-                    border-color: #ffc107;
-                    color: #856404;
-                }
-
-                QPushButton#toggle_tools_button:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #d1ecf1, stop:1 #bee5eb);
-                    border-color: #17a2b8;
-                    color: #0c5460;
-                }
-
-                QPushButton#save_button:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #d4edda, stop:1 #c3e6cb);
-                    border-color: #28a745;
-                    color: #155724;
-                }
-
-                QPushButton#load_button:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #f8d7da, stop:1 #f5c6cb);
-                    border-color: #dc3545;
-                    color: #721c24;
-                }
-
-                /* Miglioramenti per le aree di testo */
-                QTextEdit, QLineEdit {
-                    border: 2px solid #ced4da;
-                    border-radius: 6px;
-                    padding: 8px 12px;
-                    background: #ffffff;
-                    font-size: 13px;
-                    selection-background-color: #007bff;
-                    transition: border-color 0.3s ease;
-                }
-
-                QTextEdit:focus, QLineEdit:focus {
-                    border-color: #007bff;
-                    box-shadow: 0 0 0 3px rgba(0, 123, 255, 0.1);
-                }
+        """
+        )
+        self.toggle_input_mode_button.clicked.connect(self.toggle_input_mode)
 
-                /* Miglioramenti per gli scroll area */
-                QScrollArea {
-                    border: 1px solid #dee2e6;
-                    border-radius: 6px;
-                    background: rgba(255, 255, 255, 0.8);
-                }
+        # Riga superiore: Invia + graffetta; sotto: Canvas e Cancella pensierini
+        send_top_row = QHBoxLayout()
+        send_top_row.setSpacing(4)
+        send_top_row.addWidget(self.footer_send_pensierino_button)
+        send_top_row.addWidget(self.attach_button)
 
-                QScrollBar:vertical {
-                    background: #f8f9fa;
-                    width: 12px;
-                    border-radius: 6px;
-                    margin: 2px;
-                }
+        # Pulsante per mostrare la tastiera virtuale nell'area comune
+        self.keyboard_button = QPushButton("⌨️ Tastiera")
+        self.keyboard_button.setCheckable(True)
+        self.keyboard_button.setMinimumHeight(28)
+        self.keyboard_button.setToolTip(
+            "Tastiera a schermo: scrivi con il solo puntatore (mouse o "
+            "mano-mouse), con predizione delle parole, dwell click (sosta "
+            "sul tasto = pressione) e scansione a singolo segnale."
+        )
+        self.keyboard_button.setStyleSheet(
+            self.toggle_input_mode_button.styleSheet()
+        )
+        self.keyboard_button.clicked.connect(self.toggle_virtual_keyboard)
+        if self._keyboard_page_index is None:
+            self.keyboard_button.setEnabled(False)
 
-                QScrollBar::handle:vertical {
-                    background: #dee2e6;
-                    border-radius: 6px;
-                    min-height: 30px;
-                    transition: background 0.3s ease;
-                }
+        send_column_layout = QVBoxLayout()
+        send_column_layout.setSpacing(4)
+        send_column_layout.addLayout(send_top_row)
+        send_column_layout.addWidget(self.toggle_input_mode_button)
+        send_column_layout.addWidget(self.toggle_tools_button)  # Strumenti sotto Canvas
+        send_column_layout.addWidget(self.keyboard_button)
+        send_column_layout.addWidget(self.clear_all_button)
+        pensierini_footer_layout.addLayout(send_column_layout)
 
-                QScrollBar::handle:vertical:hover {
-                    background: #adb5bd;
-                }
+        # Aggiungi il layout pensierini (espandibile) al footer
+        footer_layout.addLayout(pensierini_footer_layout, 1)
 
-                QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                    border: none;
-                    background: none;
-                }
+        # Orologio analogico in alto, e SOTTO l'orario numerico con data breve
+        # ed estesa e la forma discorsiva. "Clicca su un elemento" è nel piè
+        # di pagina in fondo.
+        self.analog_clock = AnalogClock(size=66)
+        # Click sull'orologio: dice l'ora ad alta voce
+        self.analog_clock.clicked.connect(self.speak_current_time)
+        self.left_time_label.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        # Click sulla data/orario: dice la data ad alta voce
+        self.left_time_label.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.left_time_label.setToolTip("Clicca per sentire la data")
+        self.left_time_label.mousePressEvent = (
+            lambda event: self.speak_current_date()
+        )
+        time_column_layout = QVBoxLayout()
+        time_column_layout.setSpacing(2)
+        time_column_layout.addWidget(
+            self.analog_clock, 0, Qt.AlignmentFlag.AlignHCenter
+        )
+        time_column_layout.addWidget(self.left_time_label)
+        footer_layout.addLayout(time_column_layout)
 
-                /* Miglioramenti per i splitter */
-                QSplitter::handle {
-                    background: rgba(108, 117, 125, 0.3);
-                    border-radius: 3px;
-                    transition: background 0.3s ease;
-                }
+        main_layout.addLayout(footer_layout)
 
-                QSplitter::handle:hover {
-                    background: rgba(108, 117, 125, 0.6);
-                }
+        # === PIÈ DI PAGINA: barra di stato a tutta larghezza ===
+        # Mostra messaggi veloci (caricamenti, cosa si è cliccato o premuto, ecc.)
+        footer_status_bar = QHBoxLayout()
+        footer_status_bar.setContentsMargins(6, 2, 6, 2)
+        footer_status_bar.addWidget(self.click_status_label, 1)
+        main_layout.addLayout(footer_status_bar)
 
-                /* Stili per il footer */
-                QLabel#status_footer_label {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(255, 255, 255, 0.95), stop:1 rgba(248, 249, 250, 0.95));
-                    border: 1px solid #dee2e6;
-                    border-radius: 8px;
-                    font-weight: 500;
-                    color: #495057;
-                }
+        # Filtri degli eventi (clic) e stili moderni: applicati appena la
+        # finestra compare, vedi _setup_startup_scheduler
 
-                QLabel#click_status_label {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(255, 255, 255, 0.9), stop:1 rgba(248, 249, 250, 0.9));
-                    border: 1px solid #dee2e6;
-                    border-radius: 6px;
-                    font-weight: 500;
-                    color: #495057;
-                    transition: all 0.3s ease;
-                }
+    def apply_theme(self, theme=None):
+        """Imposta sull'applicazione il foglio di stile del tema scelto.
 
-                QLabel#click_status_label:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(220, 237, 255, 0.9), stop:1 rgba(187, 222, 251, 0.9));
-                    border-color: #2196f3;
-                }
-            """
+        Senza argomento usa l'impostazione application.theme; se il tema
+        effettivo non cambia non rilucida nulla.
+        """
+        if get_theme_engine is None:
+            return None
+        theme = theme or get_setting("application.theme", "Chiaro")
+        try:
+            return get_theme_engine().apply(theme)
+        except Exception as e:
+            logging.error(f"❌ Errore nell'applicazione del tema: {e}")
+            return None
 
-            # Applica gli stili moderni
-            self.setStyleSheet(self.styleSheet() + modern_css)
+    def _apply_modern_ui_styles(self):
+        """Applica animazioni, tooltip e scorciatoie all'interfaccia utente.
 
+        Gli stili sono nel foglio dell'applicazione (apply_theme), già
+        impostato prima della costruzione dei widget.
+        """
+        try:
             # Aggiungi animazioni per alcuni elementi
             self._add_animations()
 
@@ -6371,10 +6355,10 @@ class MainWindow(QMainWindow):
             # Aggiungi scorciatoie da tastiera
             self._add_keyboard_shortcuts()
 
-            logging.info("✅ Stili moderni applicati con successo")
+            logging.info("✅ Tooltip e scorciatoie applicati con successo")
 
         except Exception as e:
-            logging.error(f"❌ Errore nell'applicazione degli stili moderni: {e}")
+            logging.error(f"❌ Errore nell'applicazione di tooltip e scorciatoie: {e}")
 
     def _add_animations(self):
         """Aggiunge animazioni fluide per migliorare l'esperienza utente."""
@@ -6604,11 +6588,27 @@ class MainWindow(QMainWindow):
                 self.undo_last_action
             )
 
+            # Lettura ad alta voce di un pensierino: frase precedente/successiva
+            QShortcut(QKeySequence("Alt+Left"), self).activated.connect(
+                lambda: self._skip_reading_sentence(-1)
+            )
+            QShortcut(QKeySequence("Alt+Right"), self).activated.connect(
+                lambda: self._skip_reading_sentence(1)
+            )
+
             logging.info("✅ Scorciatoie da tastiera aggiunte con successo")
 
         except Exception as e:
             logging.error(f"❌ Errore nell'aggiunta delle scorciatoie: {e}")
 
+    def _skip_reading_sentence(self, step):
+        """Salta di una frase nella lettura del pensierino in corso (se a frasi)."""
+        if DraggableTextWidget is None:
+            return
+        for widget in self.findChildren(DraggableTextWidget):
+            if widget.skip_sentence(step):
+                return
+
     def _new_project(self):
         """Crea un nuovo progetto (resetta tutto)."""
         try:
@@ -7049,115 +7049,85 @@ class MainWindow(QMainWindow):
         )
 
     def eventFilter(self, a0, a1):
-        """Event filter per intercettare eventi della tastiera e del mouse."""
-        from PyQt6.QtCore import Qt, QEvent
-        from PyQt6.QtGui import QMouseEvent
-
-        # Handle all mouse events for tracking
-        try:
-            if a1 and hasattr(a1, "type"):
-                event_type = getattr(a1, "type", lambda: None)()
-
-                # Handle mouse button press events
-                if event_type == QEvent.Type.MouseButtonPress:
-                    event_button = getattr(a1, "button", lambda: None)()
-                    self._handle_mouse_event(a0, "PRESS", event_button)
-
-                # Handle mouse button release events
-                elif event_type == QEvent.Type.MouseButtonRelease:
-                    event_button = getattr(a1, "button", lambda: None)()
-                    self._handle_mouse_event(a0, "RELEASE", event_button)
-
-                # Handle mouse double click events
-                elif event_type == QEvent.Type.MouseButtonDblClick:
-                    event_button = getattr(a1, "button", lambda: None)()
-                    self._handle_mouse_event(a0, "DOUBLE_CLICK", event_button)
-
-                # Handle mouse wheel events
-                elif event_type == QEvent.Type.Wheel:
-                    delta = getattr(a1, "angleDelta", lambda: None)()
-                    if delta:
-                        if hasattr(delta, "y"):
-                            direction = "SU" if delta.y() > 0 else "GIÙ"
-                            self._handle_mouse_wheel(a0, direction)
-
-        except Exception:
-            logging.error("Errore in eventFilter mouse handling: {e}")
+        """Registra gli eventi del mouse per la barra di stato.
 
-        # Gestisci solo eventi della tastiera - sezione pensierini rimossa
+        Lavoro costante per evento (anche con gli eventi sintetici della
+        mano a 30 Hz): tipo, widget e pulsante finiscono nell'anello
+        _mouse_events e il tempo speso nel filtro nelle statistiche.
+        L'etichetta viene aggiornata da _refresh_click_status.
+        """
+        kind = self._MOUSE_EVENT_KINDS.get(a1.type()) if a1 is not None else None
+        if kind is not None:
+            start = time.perf_counter_ns()
+            try:
+                if kind == "WHEEL":
+                    direction = "SU" if a1.angleDelta().y() > 0 else "GIÙ"
+                    self._handle_mouse_wheel(a0, direction)
+                else:
+                    self._handle_mouse_event(a0, kind, a1.button())
+            except Exception as e:
+                logging.error(f"Errore in eventFilter mouse handling: {e}")
+            self._mouse_event_stats["filter_ns"] += time.perf_counter_ns() - start
 
         # Per tutti gli altri casi, lascia che l'evento venga gestito normalmente
         return super().eventFilter(a0, a1)
 
     def _handle_mouse_event(self, widget, event_type, button):
-        """Gestisce tutti gli eventi del mouse per identificare l'elemento e il tipo di evento."""
-        try:
-            if not hasattr(self, "click_status_label"):
-                return
-
-            # Get widget information
-            widget_name = ""
-            widget_type = ""
-
-            if hasattr(widget, "objectName") and widget.objectName():
-                widget_name = widget.objectName()
-
-            widget_type = type(widget).__name__
-
-            # Identify the mouse button
-            button_name = self._get_button_name(button)
-
-            # Identify the type of widget
-            widget_icon = self._get_widget_icon(widget_name, widget_type)
-
-            # Create event description
-            event_icon = self._get_event_icon(event_type)
-
-            # Format the display text
-            if widget_name:
-                info = f"{event_icon} {button_name} su {widget_icon} {widget_name}"
-            else:
-                info = f"{event_icon} {button_name} su {widget_icon} {widget_type}"
-
-            # Update the status label with animation
-            self.click_status_label.setText(info)
-
-            # Trigger animation if available
-            if hasattr(self, "click_label_animation"):
-                self.click_label_animation.start()
-
-        except Exception as e:
-            logging.error(f"Errore in _handle_mouse_event: {e}")
-            if hasattr(self, "click_status_label"):
-                self.click_status_label.setText("❌ Errore evento mouse")
+        """Registra un evento del mouse; l'etichetta segue col timer."""
+        self._mouse_events.append(
+            (event_type, widget.objectName(), type(widget).__name__, button)
+        )
+        self._mouse_event_stats["events"] += 1
+        if not self._click_status_timer.isActive():
+            self._click_status_timer.start()
 
     def _handle_mouse_wheel(self, widget, direction):
-        """Gestisce gli eventi della rotella del mouse."""
-        try:
-            if not hasattr(self, "click_status_label"):
-                return
+        """Registra un evento della rotella del mouse."""
+        self._handle_mouse_event(widget, "WHEEL", direction)
 
-            # Get widget information
-            widget_name = ""
-            if hasattr(widget, "objectName") and widget.objectName():
-                widget_name = widget.objectName()
-
-            widget_type = type(widget).__name__
+    def _refresh_click_status(self):
+        """Mostra nella barra di stato l'ultimo evento del mouse registrato."""
+        if not self._mouse_events or not hasattr(self, "click_status_label"):
+            return
+        event_type, widget_name, widget_type, detail = self._mouse_events[-1]
+        try:
             widget_icon = self._get_widget_icon(widget_name, widget_type)
-
-            # Create wheel event description
-            if widget_name:
-                info = f"🌀 Rotella {direction} su {widget_icon} {widget_name}"
+            target = widget_name or widget_type
+            if event_type == "WHEEL":
+                info = f"🌀 Rotella {detail} su {widget_icon} {target}"
             else:
-                info = f"🌀 Rotella {direction} su {widget_icon} {widget_type}"
-
-            # Update the status label
-            self.click_status_label.setText(info)
-
+                event_icon = self._get_event_icon(event_type)
+                button_name = self._get_button_name(detail)
+                info = f"{event_icon} {button_name} su {widget_icon} {target}"
+
+            # Stesso testo: niente nuovo layout della barra
+            if info != self.click_status_label.text():
+                self.click_status_label.setText(info)
+                self._mouse_event_stats["label_updates"] += 1
+                if hasattr(self, "click_label_animation"):
+                    self.click_label_animation.start()
         except Exception as e:
-            logging.error(f"Errore in _handle_mouse_wheel: {e}")
-            if hasattr(self, "click_status_label"):
-                self.click_status_label.setText("❌ Errore rotella mouse")
+            logging.error(f"Errore in _refresh_click_status: {e}")
+            self.click_status_label.setText("❌ Errore evento mouse")
+        self._report_event_filter_overhead()
+
+    def _report_event_filter_overhead(self):
+        """Registra nel monitor prestazioni il costo medio del filtro per evento."""
+        events = self._mouse_event_stats["events"]
+        filter_ns = self._mouse_event_stats["filter_ns"]
+        prev_events, prev_ns = self._mouse_stats_reported
+        if events == prev_events:
+            return
+        self._mouse_stats_reported = (events, filter_ns)
+        try:
+            from core.performance_monitor import performance_monitor
+        except ImportError:
+            return
+        performance_monitor.record_metric(
+            "ui.event_filter.ns_per_event",
+            (filter_ns - prev_ns) / (events - prev_events),
+            {"events": events - prev_events},
+        )
 
     def _get_button_name(self, button):
         """Restituisce il nome del pulsante del mouse."""
@@ -7304,14 +7274,11 @@ class MainWindow(QMainWindow):
             )
             return
 
-        # Evidenzia i widget selezionati (lo stile originale viene salvato
-        # per il ripristino quando la selezione si chiude)
+        # Evidenzia i widget selezionati (stato di stile, vedi UI/theme_engine.py)
         self._two_hand_selected = []
         for w in selected:
-            self._two_hand_selected.append((w, w.styleSheet()))
-            w.setStyleSheet(
-                w.styleSheet() + "\nborder: 3px solid #00c8ff; border-radius: 8px;"
-            )
+            self._two_hand_selected.append(w)
+            set_ui_state(w, "twoHandSelected", True)
 
         self._two_hand_text = "\n".join(texts)
         self.set_status_message(
@@ -7321,9 +7288,9 @@ class MainWindow(QMainWindow):
 
     def _clear_two_hand_selection(self):
         """Toglie l'evidenziazione della selezione a due mani e la barra."""
-        for w, style in getattr(self, "_two_hand_selected", []):
+        for w in getattr(self, "_two_hand_selected", []):
             try:
-                w.setStyleSheet(style)
+                set_ui_state(w, "twoHandSelected", False)
             except RuntimeError:
                 pass  # widget già distrutto
         self._two_hand_selected = []
@@ -7535,11 +7502,15 @@ class MainWindow(QMainWindow):
         container = QWidget()
         layout = QVBoxLayout(container)
 
-        # Testo corrente
+        # Testo corrente: le pagine (senza spezzare le parole) sono calcolate
+        # solo quando vengono mostrate, vedi core/text_pager.py
+        from core.text_pager import TextPager
+
         self.current_page = 0
         self.page_size = 250
         self.full_text = full_text
-        self.total_pages = (len(full_text) + self.page_size - 1) // self.page_size
+        self.text_pager = TextPager(full_text, self.page_size)
+        self.total_pages = self.text_pager.page_count
 
         # TextEdit per il testo (permette navigazione con cursore)
         self.details_text_label = QTextEdit()
@@ -7822,25 +7793,18 @@ class MainWindow(QMainWindow):
             self.current_page = 0
         self.update_page_display()
 
+    def show_page(self, page_number):
+        """Salta direttamente alla pagina indicata (0 = prima)."""
+        self.current_page = min(max(0, page_number), self.total_pages - 1)
+        self.update_page_display()
+
     def update_page_display(self):
         """Aggiorna la visualizzazione della pagina corrente."""
-        start = self.current_page * self.page_size
-        end = min(start + self.page_size, len(self.full_text))
-        current_text = self.full_text[start:end]
-
-        # Rimuovi l'indicatore di pagina dal testo (ora mostrato nei controlli)
-        display_text = current_text
-        self.details_text_label.setPlainText(display_text)
+        self.details_text_label.setPlainText(self.text_pager.page(self.current_page))
 
         # Aggiorna etichetta pagina corrente (massimo 11 caratteri)
         current_page_num = self.current_page + 1
-        self.page_info_label.setText("Pag. {current_page_num}")
-
-        # Aggiorna testi dei pulsanti
-        if self.current_page < self.total_pages - 1:
-            pass
-        else:
-            pass
+        self.page_info_label.setText(f"Pag. {current_page_num}")
 
         # Aggiorna stato pulsanti navigazione
         self.back_button.setEnabled(self.current_page > 0)
@@ -7872,7 +7836,7 @@ class MainWindow(QMainWindow):
 
     def handle_voice_button(self):
         """Avvia il riconoscimento vocale utilizzando il modulo Riconoscimento_Vocale."""
-        if not SpeechRecognitionThread:
+        if SpeechRecognitionThread.resolve() is None:
             QMessageBox.critical(
                 self,
                 "Errore",
@@ -8225,7 +8189,7 @@ Riformulazione intensa:"""
             audio_layout.addWidget(spectrum_label)
 
             # Inizializza media player
-            if QMediaPlayer and QAudioOutput:
+            if QMediaPlayer.resolve() is not None and QAudioOutput.resolve() is not None:
                 self.media_player = QMediaPlayer()
                 self.audio_output = QAudioOutput()
                 self.media_player.setAudioOutput(self.audio_output)
@@ -8470,7 +8434,7 @@ Riformulazione intensa:"""
                     logging.warning(f"VLM OCR fallito, uso fallback: {e}")
 
             # Fallback a pytesseract tradizionale
-            if not Image or not pytesseract:
+            if Image.resolve() is None or pytesseract.resolve() is None:
                 raise ImportError("PIL o pytesseract non disponibili")
 
             # Apri l'immagine
@@ -8546,7 +8510,7 @@ Riformulazione intensa:"""
     def handle_audio_transcription_button(self):
         """Gestisce la trascrizione di file audio in testo."""
         try:
-            if not AudioFileTranscriptionThread:
+            if AudioFileTranscriptionThread.resolve() is None:
                 QMessageBox.critical(
                     self,
                     "Errore",
@@ -9217,6 +9181,28 @@ Riformulazione intensa:"""
                 QPushButton.clipboard_btn:hover {
                     background-color: #218838;
                 }
+                /* Stato del pulsante TTS (proprietà ttsState, vedi toggle_tts) */
+                QPushButton[ttsState="on"], QPushButton[ttsState="off"] {
+                    color: white;
+                    border: none;
+                    border-radius: 6px;
+                    padding: 10px 18px;
+                    font-weight: bold;
+                    min-width: 120px;
+                    font-size: 14px;
+                }
+                QPushButton[ttsState="on"] {
+                    background-color: #28a745;
+                }
+                QPushButton[ttsState="on"]:hover {
+                    background-color: #218838;
+                }
+                QPushButton[ttsState="off"] {
+                    background-color: #dc3545;
+                }
+                QPushButton[ttsState="off"]:hover {
+                    background-color: #c82333;
+                }
 
                 QScrollArea {
                     border: 1px solid #dee2e6;
@@ -9503,6 +9489,7 @@ Riformulazione intensa:"""
             self.tts_enabled = True  # Stato iniziale: TTS abilitato
             tts_toggle_btn = QPushButton("🔊 TTS ON")
             tts_toggle_btn.setObjectName("control")
+            tts_toggle_btn.setProperty("ttsState", "on")
             tts_toggle_btn.clicked.connect(lambda: self.toggle_tts(tts_toggle_btn))
             all_buttons_layout.addWidget(tts_toggle_btn)
 
@@ -9558,7 +9545,7 @@ Riformulazione intensa:"""
                     # Converti il simbolo IPA in testo pronunciabile
                     pronunciation_text = self._ipa_to_pronunciation_text(symbol)
 
-                    if pronunciation_text and TTS_AVAILABLE and TTSThread:
+                    if pronunciation_text and TTS_AVAILABLE and TTSThread.resolve() is not None:
                         # Crea e avvia il thread TTS
                         tts_thread = TTSThread(
                             text=pronunciation_text,
@@ -9673,7 +9660,7 @@ Riformulazione intensa:"""
                 )
                 return
 
-            if not TTS_AVAILABLE or not TTSThread:
+            if not TTS_AVAILABLE or TTSThread.resolve() is None:
                 QMessageBox.warning(
                     self,
                     "TTS Non Disponibile",
@@ -9805,23 +9792,7 @@ ESEMPI:
 
             if self.tts_enabled:
                 button.setText("🔊 TTS ON")
-                button.setStyleSheet(
-                    """
-                    QPushButton {
-                        background-color: #28a745;
-                        color: white;
-                        border: none;
-                        border-radius: 6px;
-                        padding: 10px 18px;
-                        font-weight: bold;
-                        min-width: 120px;
-                        font-size: 14px;
-                    }
-                    QPushButton:hover {
-                        background-color: #218838;
-                    }
-                """
-                )
+                set_ui_state(button, "ttsState", "on")
                 QMessageBox.information(
                     self,
                     "TTS Abilitato",
@@ -9830,23 +9801,7 @@ ESEMPI:
                 )
             else:
                 button.setText("🔇 TTS OFF")
-                button.setStyleSheet(
-                    """
-                    QPushButton {
-                        background-color: #dc3545;
-                        color: white;
-                        border: none;
-                        border-radius: 6px;
-                        padding: 10px 18px;
-                        font-weight: bold;
-                        min-width: 120px;
-                        font-size: 14px;
-                    }
-                    QPushButton:hover {
-                        background-color: #c82333;
-                    }
-                """
-                )
+                set_ui_state(button, "ttsState", "off")
                 QMessageBox.information(
                     self,
                     "TTS Disabilitato",
@@ -9943,27 +9898,12 @@ ESEMPI:
                     "created": datetime.now().isoformat(),
                     "version": "1.0",
                 },
-                "pensierini": [],
-                "workspace": [],
             }
-
-            for i in range(self.pensierini_layout.count()):
-                item = self.pensierini_layout.itemAt(i)
-                widget = item.widget() if item else None
-                text_label = getattr(widget, "text_label", None) if widget else None
-                if text_label is not None and text_label.text().strip():
-                    project_data["pensierini"].append(
-                        {"text": text_label.text(), "order": i}
-                    )
-
-            for i in range(self.work_area_layout.count()):
-                item = self.work_area_layout.itemAt(i)
-                widget = item.widget() if item else None
-                text_label = getattr(widget, "text_label", None) if widget else None
-                if text_label is not None and text_label.text().strip():
-                    project_data["workspace"].append(
-                        {"text": text_label.text(), "order": i}
-                    )
+            project_data.update(self._collect_project_columns())
+            # Disegno del canvas come tratti vettoriali (pochi KB, non un PNG)
+            footer_canvas = getattr(self, "footer_canvas", None)
+            if footer_canvas is not None and len(footer_canvas.strokes):
+                project_data["drawing"] = footer_canvas.strokes.to_dict()
 
             # Nome dedotto dal contenuto (proposto come nome file predefinito)
             nome_suggerito = self._suggest_project_name(project_data)
@@ -9988,8 +9928,12 @@ ESEMPI:
             project_name = os.path.splitext(os.path.basename(filepath))[0]
             project_data["metadata"]["name"] = project_name
 
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(project_data, f, indent=2, ensure_ascii=False)
+            # Scrittura atomica e compatta; i contenuti lunghi vanno fuori linea
+            from core.project_storage import write_project
+
+            write_project(filepath, project_data)
+            self._index_saved_project(filepath, project_data)
+            self._set_autosave_target(filepath, project_data)
 
             QMessageBox.information(
                 self,
@@ -10024,10 +9968,15 @@ ESEMPI:
                 )
                 return
 
-            # Ottieni lista file progetti
-            project_files = [f for f in os.listdir(projects_dir) if f.endswith(".json")]
+            # Elenco dall'indice dei metadati: nessun file di progetto viene
+            # aperto; alla prima apertura (indice assente) lo si costruisce.
+            from core.project_index import get_project_index
+
+            index = get_project_index(projects_dir)
+            if not index.is_loaded():
+                index.reconcile()
 
-            if not project_files:
+            if not index.list_projects():
                 QMessageBox.information(
                     self, "Nessun Progetto", "Non ci sono progetti salvati."
                 )
@@ -10050,44 +9999,24 @@ ESEMPI:
 
             # Lista progetti
             list_widget = QListWidget()
-            for filename in sorted(project_files, reverse=True):
-                try:
-                    filepath = os.path.join(projects_dir, filename)
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    if data:
-                        name = data.get("metadata", {}).get("name", filename)
-                        created = data.get("metadata", {}).get("created", "")
-                        pens_count = len(data.get("pensierini", []))
-                        work_count = len(data.get("workspace", []))
-
-                        display_text = (
-                            "{name} - {pens_count} pensierini, {work_count} workspace"
-                        )
-                        if created:
-                            display_text += " ({created[:19]})"
+            shown_entries = index.list_projects()
+            self._fill_project_list(list_widget, projects_dir, shown_entries)
 
-                        list_widget.addItem(display_text)
-                        item = list_widget.item(list_widget.count() - 1)
-                        if item and hasattr(item, "setData"):
-                            item.setData(Qt.ItemDataRole.UserRole, filepath)
-                    else:
-                        list_widget.addItem(filename)
-                        item = list_widget.item(list_widget.count() - 1)
-                        if item and hasattr(item, "setData"):
-                            item.setData(
-                                Qt.ItemDataRole.UserRole,
-                                os.path.join(projects_dir, filename),
-                            )
+            # Riallinea l'indice in background (file modificati fuori dall'app)
+            # e aggiorna la lista se qualcosa è cambiato
+            reconcile_thread = index.reconcile_async()
+            reconcile_timer = QTimer(dialog)
 
-                except Exception:
-                    list_widget.addItem(filename)
-                    item = list_widget.item(list_widget.count() - 1)
-                    if item and hasattr(item, "setData"):
-                        item.setData(
-                            Qt.ItemDataRole.UserRole,
-                            os.path.join(projects_dir, filename),
-                        )
+            def _check_reconcile():
+                if reconcile_thread.is_alive():
+                    return
+                reconcile_timer.stop()
+                entries = index.list_projects()
+                if entries != shown_entries:
+                    self._fill_project_list(list_widget, projects_dir, entries)
+
+            reconcile_timer.timeout.connect(_check_reconcile)
+            reconcile_timer.start(100)
 
             layout.addWidget(list_widget)
 
@@ -10139,14 +10068,44 @@ ESEMPI:
             )
             logging.error("Errore caricamento progetto: {e}")
 
+    def _index_saved_project(self, filepath, project_data):
+        """Aggiorna l'indice dei progetti della cartella in cui è stato salvato."""
+        try:
+            from core.project_index import get_project_index
+
+            get_project_index(os.path.dirname(os.path.abspath(filepath))).update(
+                filepath, project_data
+            )
+        except Exception as e:
+            logging.warning(f"Indice progetti non aggiornato: {e}")
+
+    def _fill_project_list(self, list_widget, projects_dir, entries):
+        """Riempie la lista dei progetti con i metadati dell'indice."""
+        list_widget.clear()
+        for entry in entries:
+            display_text = (
+                f"{entry['name']} - {entry.get('pensierini', 0)} pensierini, "
+                f"{entry.get('workspace', 0)} workspace"
+            )
+            created = entry.get("created") or ""
+            if created:
+                display_text += f" ({created[:19]})"
+            list_widget.addItem(display_text)
+            item = list_widget.item(list_widget.count() - 1)
+            if item and hasattr(item, "setData"):
+                item.setData(
+                    Qt.ItemDataRole.UserRole, os.path.join(projects_dir, entry["file"])
+                )
+
     def _load_project_from_file(self, filepath):
         """Carica progetto da file specifico."""
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                project_data = json.load(f)
+            # Risolve i contenuti fuori linea e riapplica l'eventuale journal
+            # di autosalvataggio (modifiche non salvate prima di un crash)
+            from core.project_storage import read_project
 
-            if not project_data:
-                raise ValueError("File progetto vuoto o corrotto")
+            project_data = read_project(filepath)
+            recovered = project_data.pop("_recovered_edits", 0)
 
             # Nome progetto (mostrato nello stato, il campo dedicato è stato rimosso)
             project_name = project_data.get("metadata", {}).get(
@@ -10154,44 +10113,151 @@ ESEMPI:
             )
             self.set_status_message(f"📂 Progetto caricato: {project_name}")
 
-            # Pulisci colonne esistenti
-            self._clear_columns()
-
-            # Carica pensierini (colonna 1)
-            pensierini_data = project_data.get("pensierini", [])
-            for pensierino in pensierini_data:
-                if isinstance(pensierino, dict):
-                    text = pensierino.get("text", "")
-                    if text.strip() and DraggableTextWidget:
-                        widget = DraggableTextWidget(text, self.settings)
-                        self.pensierini_layout.addWidget(widget)
-
-            # Carica workspace (colonna 2)
-            workspace_data = project_data.get("workspace", [])
-            for work_item in workspace_data:
-                if isinstance(work_item, dict):
-                    text = work_item.get("text", "")
-                    if text.strip() and DraggableTextWidget:
-                        widget = DraggableTextWidget(text, self.settings)
-                        self.work_area_layout.addWidget(widget)
+            pensierini_data, workspace_data = self._populate_columns(project_data)
+            footer_canvas = getattr(self, "footer_canvas", None)
+            if footer_canvas is not None:
+                footer_canvas.load_strokes(project_data.get("drawing"))
+            self._set_autosave_target(filepath, project_data)
 
-            QMessageBox.information(
-                self,
-                "Caricamento Completato",
-                "Progetto '{project_name}' caricato con successo!\n\n"
-                "Pensierini: {len(pensierini_data)}\n"
-                "Workspace: {len(workspace_data)}",
+            message = (
+                f"Progetto '{project_name}' caricato con successo!\n\n"
+                f"Pensierini: {len(pensierini_data)}\n"
+                f"Workspace: {len(workspace_data)}"
             )
+            if recovered:
+                message += f"\n\nRecuperate {recovered} modifiche non salvate."
+            QMessageBox.information(self, "Caricamento Completato", message)
 
-            logging.info("Progetto caricato: {filepath}")
+            logging.info(f"Progetto caricato: {filepath}")
 
-        except Exception:
+        except Exception as e:
             QMessageBox.critical(
                 self,
                 "Errore Caricamento",
-                "Errore durante il caricamento del file:\n{str(e)}",
+                f"Errore durante il caricamento del file:\n{e}",
             )
-            logging.error("Errore caricamento file progetto: {e}")
+            logging.error(f"Errore caricamento file progetto: {e}")
+
+    def _populate_columns(self, project_data):
+        """Sostituisce il contenuto delle colonne 1 e 2 con quello del progetto.
+
+        Le colonne con molti elementi vengono caricate in una vista
+        virtualizzata (UI/text_column_view.py): un solo widget disegna tutti
+        i testi invece di un DraggableTextWidget per ciascuno.
+        """
+        self._clear_columns()
+
+        pensierini_data = project_data.get("pensierini", [])
+        workspace_data = project_data.get("workspace", [])
+        for items, layout, scroll in (
+            (pensierini_data, self.pensierini_layout, getattr(self, "pensierini_scroll", None)),
+            (workspace_data, self.work_area_layout, getattr(self, "work_area_scroll", None)),
+        ):
+            texts = [
+                item.get("text", "")
+                for item in items
+                if isinstance(item, dict) and item.get("text", "").strip()
+            ]
+            if not DraggableTextWidget:
+                continue
+            if len(texts) >= VIRTUAL_THRESHOLD and make_text_column:
+                layout.addWidget(
+                    make_text_column(self.settings, texts, DraggableTextWidget, scroll)
+                )
+                continue
+            for text in texts:
+                layout.addWidget(DraggableTextWidget(text, self.settings))
+
+        return pensierini_data, workspace_data
+
+    def _collect_project_columns(self):
+        """Testi delle colonne 1 e 2 nel formato dei file di progetto."""
+        columns = {"pensierini": [], "workspace": []}
+        for key, layout in (
+            ("pensierini", getattr(self, "pensierini_layout", None)),
+            ("workspace", getattr(self, "work_area_layout", None)),
+        ):
+            if layout is None:
+                continue
+            texts = []
+            for i in range(layout.count()):
+                item = layout.itemAt(i)
+                widget = item.widget() if item else None
+                if TextColumnView and isinstance(widget, TextColumnView):
+                    texts.extend(widget.texts())  # colonna virtualizzata
+                    continue
+                text_label = getattr(widget, "text_label", None) if widget else None
+                if text_label is not None:
+                    texts.append(text_label.text())
+            columns[key] = [
+                {"text": text, "order": order}
+                for order, text in enumerate(t for t in texts if t.strip())
+            ]
+        return columns
+
+    # ------------------------------------------------------------------
+    # Autosalvataggio (journal delle modifiche)
+    # ------------------------------------------------------------------
+    AUTOSAVE_INTERVAL_MS = 10000
+    UNTITLED_JOURNAL = os.path.join("Save", "mia_dispenda_progetti", ".autosave.journal")
+
+    def _setup_autosave(self):
+        """Avvia il timer di autosalvataggio e propone il recupero del lavoro."""
+        from core.project_storage import AutosaveJournal
+
+        self._current_project_path = None
+        self._autosave_journal = AutosaveJournal(self.UNTITLED_JOURNAL)
+        if self._autosave_journal.has_edits():
+            # Lavoro non salvato rimasto da una sessione precedente
+            QTimer.singleShot(1500, self._offer_autosave_recovery)
+        else:
+            self._autosave_journal.start({})
+
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self._autosave_tick)
+        self.autosave_timer.start(self.AUTOSAVE_INTERVAL_MS)
+
+    def _autosave_tick(self):
+        """Aggiunge al journal le modifiche dall'ultimo autosalvataggio."""
+        journal = getattr(self, "_autosave_journal", None)
+        if journal is None or not journal.is_started():
+            return  # recupero in attesa di risposta: non sovrascrivere
+        try:
+            from core.project_storage import project_texts
+
+            os.makedirs(os.path.dirname(os.path.abspath(journal.path)), exist_ok=True)
+            journal.record(project_texts(self._collect_project_columns()))
+        except Exception as e:
+            logging.warning(f"Autosalvataggio non riuscito: {e}")
+
+    def _set_autosave_target(self, filepath, project_data):
+        """Dopo salvataggio/caricamento il journal segue il file del progetto."""
+        from core.project_storage import AutosaveJournal, journal_path_for, project_texts
+
+        # Il lavoro senza nome ora è in un file: il suo journal non serve più
+        AutosaveJournal(self.UNTITLED_JOURNAL).reset()
+        self._current_project_path = filepath
+        self._autosave_journal = AutosaveJournal(journal_path_for(filepath))
+        self._autosave_journal.start(project_texts(project_data))
+
+    def _offer_autosave_recovery(self):
+        """Propone di ripristinare il lavoro non salvato della sessione precedente."""
+        journal = self._autosave_journal
+        reply = QMessageBox.question(
+            self,
+            "Recupero Lavoro",
+            "È stato trovato del lavoro non salvato dalla sessione precedente.\n"
+            "Vuoi ripristinarlo?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            project_data = {"pensierini": [], "workspace": []}
+            recovered = journal.replay(project_data)
+            self._populate_columns(project_data)
+            self.set_status_message(f"♻️ Recuperate {recovered} modifiche non salvate")
+        else:
+            journal.reset()
+            journal.start({})
 
     def _clear_columns(self):
         """Pulisce entrambe le colonne prima del caricamento."""
@@ -10277,6 +10343,9 @@ ESEMPI:
 
     def _setup_difficulty_observer(self):
         """Crea l'osservatore leggendo le impostazioni (spento di default)."""
+        previous = getattr(self, "difficulty_observer", None)
+        if previous is not None:
+            previous.close()  # completa le catture ancora in salvataggio
         self.difficulty_observer = None
         try:
             from core.difficulty_observer import DifficultyObserver
@@ -10293,6 +10362,9 @@ ESEMPI:
             cooldown_s=float(get_setting("observation.cooldown_s", 20.0)),
             retention_days=int(get_setting("observation.retention_days", 30)),
             context_provider=self._difficulty_context,
+            image_format=str(get_setting("observation.image_format", "webp")),
+            image_quality=int(get_setting("observation.image_quality", 80)),
+            max_bytes=int(get_setting("observation.max_mb", 200)) * 1024 * 1024,
         )
         if enabled and consent:
             logging.info("Osservazione dei momenti di difficoltà: attiva")
@@ -10313,6 +10385,61 @@ ESEMPI:
             if active:
                 vt.difficulty_signal.connect(self._on_difficulty_score)
 
+    def refresh_metrics_exporter(self):
+        """Avvia, riavvia o ferma le metriche locali secondo le impostazioni.
+
+        Da accese tracciano anche i frame del video (core/frame_tracer.py),
+        per esportare fps e tempi per fase.
+        """
+        try:
+            from core.metrics_exporter import get_metrics_exporter
+        except ImportError:
+            from assistente_dsa.core.metrics_exporter import get_metrics_exporter
+
+        exporter = get_metrics_exporter()
+        if not get_setting("diagnostics.metrics_exporter_enabled", False):
+            if exporter.running:
+                exporter.stop()
+            get_frame_tracer().release("metrics_exporter")
+            return
+        dump_path = None
+        if get_setting("diagnostics.metrics_exporter_file", True):
+            dump_path = os.path.join(
+                os.path.dirname(__file__), "debug_logs", "metrics.prom"
+            )
+        config = (
+            int(get_setting("diagnostics.metrics_exporter_port", 9464)),
+            float(get_setting("diagnostics.metrics_exporter_interval_s", 15)),
+            dump_path,
+        )
+        if exporter.running:
+            if config == (exporter.port, exporter.interval, exporter.dump_path):
+                return
+            exporter.stop()
+        exporter.port, exporter.interval, exporter.dump_path = config
+        if exporter.start():
+            get_frame_tracer().acquire("metrics_exporter")
+        else:
+            get_frame_tracer().release("metrics_exporter")
+
+    def refresh_memory_watch(self):
+        """Avvia o ferma la ricerca delle crescite di memoria (impostazioni)."""
+        try:
+            from core.memory_watch import get_memory_watcher
+        except ImportError:
+            from assistente_dsa.core.memory_watch import get_memory_watcher
+
+        watcher = get_memory_watcher()
+        if not get_setting("diagnostics.memory_watch_enabled", False):
+            watcher.stop()
+            return
+        watcher.interval = float(get_setting("diagnostics.memory_watch_interval_s", 60))
+        watcher.threshold_mb = float(
+            get_setting("diagnostics.memory_watch_threshold_mb", 50)
+        )
+        watcher.report_dir = os.path.join(os.path.dirname(__file__), "debug_logs")
+        watcher.start()
+
     def _on_difficulty_score(self, score):
         obs = getattr(self, "difficulty_observer", None)
         if obs is not None:
@@ -10337,6 +10464,8 @@ ESEMPI:
     def set_status_message(self, text):
         """Mostra un messaggio veloce nel footer (es. caricamento, click)."""
         if hasattr(self, "click_status_label") and self.click_status_label is not None:
+            # Il messaggio è più recente dei clic in attesa di essere mostrati
+            self._click_status_timer.stop()
             self.click_status_label.setText(text)
 
     def add_message(self, text, level="info"):
@@ -10634,6 +10763,30 @@ ESEMPI:
         if hasattr(self, "footer_timer"):
             self.footer_timer.stop()
 
+        # Compiti dell'avvio a stadi non ancora eseguiti: non servono più
+        if getattr(self, "startup_scheduler", None) is not None:
+            self.startup_scheduler.stop()
+
+        # Metriche locali: chiude il server HTTP
+        if get_setting("diagnostics.metrics_exporter_enabled", False):
+            try:
+                from core.metrics_exporter import get_metrics_exporter
+            except ImportError:
+                from assistente_dsa.core.metrics_exporter import get_metrics_exporter
+            get_metrics_exporter().stop()
+            get_frame_tracer().release("metrics_exporter")
+        if get_setting("diagnostics.memory_watch_enabled", False):
+            try:
+                from core.memory_watch import get_memory_watcher
+            except ImportError:
+                from assistente_dsa.core.memory_watch import get_memory_watcher
+            get_memory_watcher().stop()
+
+        # Ultimo autosalvataggio: le modifiche non salvate restano nel journal
+        if hasattr(self, "autosave_timer"):
+            self.autosave_timer.stop()
+            self._autosave_tick()
+
         # Ferma l'ascolto vocale continuo se attivo
         if getattr(self, "wake_listener", None) is not None:
             try:
@@ -10778,10 +10931,19 @@ def _run_event_loop(app):
     Esempio:
         COGNIFLOW_PROFILE=1 ./avvia_cogniflow.sh
     Poi apri il report con:  snakeviz profilo_*.prof
+
+    All'avvio vengono stampati anche i tempi delle fasi (core/startup_timer.py).
     """
     if not os.environ.get("COGNIFLOW_PROFILE"):
         return app.exec()
 
+    # Primo giro dell'event loop: la finestra è comparsa, avvio concluso
+    def _startup_done():
+        startup_timer.mark("finestra mostrata")
+        startup_timer.report()
+
+    QTimer.singleShot(0, _startup_done)
+
     import cProfile
     import pstats
     from datetime import datetime
@@ -10822,6 +10984,7 @@ def main():
     if not test_imports():
         print("❌ Impossibile avviare Aircraft a causa di errori di import")
         sys.exit(1)
+    startup_timer.mark("logging e verifica import")
 
     try:
         # Carica configurazione
@@ -10834,6 +10997,7 @@ def main():
         app.setApplicationName(settings.get("application", {}).get("app_name", "CogniFlow"))
         app.setOrganizationName("DSA Aircraft")
         print("QApplication created successfully")
+        startup_timer.mark("QApplication")
 
         # Imposta icona se disponibile
         icon_path = "ICO-fonts-wallpaper/ICONA.ico"
@@ -10867,9 +11031,11 @@ def main():
                 )
 
             print("About to create MainWindow...")
+            startup_timer.mark("accesso")
             # Crea e mostra finestra principale (Aircraft) a schermo intero
             window = MainWindow()
             print("MainWindow created successfully")
+            startup_timer.mark("creazione MainWindow")
             window.showMaximized()
 
             logger.info("✓ Aircraft avviata con successo")
@@ -19,6 +19,14 @@ except ImportError:
     cache_manager = None
     CACHE_AVAILABLE = False
 
+# Backend unico delle impostazioni (cache in memoria + unico scrittore su disco)
+try:
+    from core import config_module
+    from core.settings_store import get_settings_store
+except ImportError:
+    from .core import config_module
+    from .core.settings_store import get_settings_store
+
 # Configurazione logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,16 +37,20 @@ class ConfigManager:
 
     def __init__(self, config_dir: str | None = None):
         if config_dir is None:
-            # Usa il percorso assoluto della cartella Save principale
-            self.config_dir: str = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), "Save", "SETUP_TOOLS_&_Data"
-            )
+            # Cartella Save principale: la stessa del backend condiviso
+            self.config_dir: str = os.path.dirname(config_module.SETTINGS_FILE)
         else:
             self.config_dir = config_dir
         self.settings_file: str = os.path.join(self.config_dir, "settings.json")
         self.ensure_config_dir()
-        self._cached_settings: dict[str, Any] | None = None
-        self._settings_loaded = False
+        # Vista sullo store condiviso: lo stesso file ha un solo store per processo
+        if config_dir is None:
+            # I default completi prevalgono su quelli minimi di config_module
+            # e, alla prima installazione, vengono scritti su disco
+            self.store = config_module.get_settings_backend()
+            self.store.add_defaults(self.get_default_settings)
+        else:
+            self.store = get_settings_store(self.settings_file, self.get_default_settings)
 
     def ensure_config_dir(self):
         """Assicura che la directory di configurazione esista."""
@@ -266,59 +278,52 @@ class ConfigManager:
                     "mia_dispenda_progetti",
                 ),
             },
-            "startup": {"bypass_login": False, "auto_start_main_app": False},
+            "startup": {
+                "bypass_login": False,
+                "auto_start_main_app": False,
+                # Preriscaldamento di webcam e voce dopo l'apertura (opt-in)
+                "warmup_vision": False,
+                "warmup_speech": False,
+            },
+            "diagnostics": {
+                # debug_logs/ui_metrics.jsonl: frazione dei record tenuti e
+                # dimensione oltre la quale il file ruota
+                "ui_metrics_sample_rate": 1.0,
+                "ui_metrics_max_kb": 1024,
+                # Metriche locali (core/metrics_exporter.py): endpoint
+                # Prometheus su 127.0.0.1 e file debug_logs/metrics.prom
+                "metrics_exporter_enabled": False,
+                "metrics_exporter_port": 9464,
+                "metrics_exporter_interval_s": 15,
+                "metrics_exporter_file": True,
+                # Ricerca delle crescite di memoria (core/memory_watch.py):
+                # snapshot tracemalloc e resoconti in debug_logs/
+                "memory_watch_enabled": False,
+                "memory_watch_interval_s": 60,
+                "memory_watch_threshold_mb": 50,
+            },
 
         }
 
     def load_settings(self) -> dict[str, Any]:
-        """Carica le impostazioni dal file JSON."""
-        if self._settings_loaded and self._cached_settings is not None:
-            return self._cached_settings
-
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, "r", encoding="utf-8") as f:
-                    settings = json.load(f)
-                logger.info(f"✓ Impostazioni caricate da: {self.settings_file}")
-                self._cached_settings = settings
-                self._settings_loaded = True
-                return settings
-            else:
-                logger.warning(f"File impostazioni non trovato: {self.settings_file}")
-                default_settings = self.create_default_settings()
-                self._cached_settings = default_settings
-                self._settings_loaded = True
-                return default_settings
-        except json.JSONDecodeError as e:
-            logger.error(f"Errore parsing JSON: {e}")
-            default_settings = self.create_default_settings()
-            self._cached_settings = default_settings
-            self._settings_loaded = True
-            return default_settings
-        except Exception as e:
-            logger.error(f"Errore caricamento impostazioni: {e}")
-            default_settings = self.create_default_settings()
-            self._cached_settings = default_settings
-            self._settings_loaded = True
-            return default_settings
+        """Restituisce una copia delle impostazioni (dalla memoria, non dal disco)."""
+        return self.store.snapshot()
 
     def create_default_settings(self) -> dict[str, Any]:
-        """Crea e salva le impostazioni di default."""
+        """Ripristina e salva le impostazioni di default."""
         default_settings = self.get_default_settings()
         self.save_settings(default_settings)
         logger.info(f"✓ Impostazioni di default create: {self.settings_file}")
         return default_settings
 
     def save_settings(self, settings: dict[str, Any]) -> bool:
-        """Salva le impostazioni su file."""
+        """Salva le impostazioni su file (scrittura atomica tramite lo store)."""
         try:
-            with open(self.settings_file, "w", encoding="utf-8") as f:
-                json.dump(settings, f, indent=4, ensure_ascii=False)
-            logger.info("✓ Impostazioni salvate con successo")
-            # Clear cache so next load_settings() will reload from disk
-            self._cached_settings = None
-            self._settings_loaded = False
-            return True
+            self.store.replace(settings)
+            if self.store.flush(force=True):
+                logger.info("✓ Impostazioni salvate con successo")
+                return True
+            return False
         except Exception as e:
             logger.error(f"Errore salvataggio impostazioni: {e}")
             return False
@@ -335,22 +340,7 @@ class ConfigManager:
             logger.error(f"Security violation: Suspicious key_path: {key_path}")
             return default
 
-        settings = self.load_settings()
-        keys = key_path.split(".")
-        value: Any = settings
-
-        try:
-            for key in keys:
-                if not isinstance(value, dict):
-                    logger.warning(
-                        f"Invalid path structure at key '{key}' in path '{key_path}'"
-                    )
-                    return default
-                value = value[key]
-            return value
-        except (KeyError, TypeError) as e:
-            logger.debug(f"Setting not found: {key_path}, returning default: {default}")
-            return default
+        return self.store.get(key_path, default)
 
     def set_setting(self, key_path: str, value: Any) -> bool:
         """Imposta un'impostazione specifica usando la notazione con punti."""
@@ -366,25 +356,10 @@ class ConfigManager:
             )
             return False
 
-        settings = self.load_settings()
-        keys = key_path.split(".")
-        target: Any = settings
-
         try:
-            # Naviga fino all'ultimo livello
-            for key in keys[:-1]:
-                if not isinstance(target, dict):
-                    logger.error(
-                        f"Invalid path structure at key '{key}' in path '{key_path}'"
-                    )
-                    return False
-                if key not in target:
-                    target[key] = {}
-                target = target[key]
-
-            # Imposta il valore
-            target[keys[-1]] = value
-            return self.save_settings(settings)
+            # Aggiorna la memoria; il file viene scritto poco dopo (raggruppato)
+            self.store.set(key_path, value)
+            return True
         except Exception as e:
             logger.error(f"Errore impostazione {key_path}: {e}")
             return False
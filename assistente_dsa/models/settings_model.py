@@ -3,26 +3,19 @@
 Settings Model - Modello per gestire le impostazioni dell'applicazione
 """
 
-import json
-import os
 from typing import Dict, Any, Optional
-from main_03_configurazione_e_opzioni import load_settings, save_settings
+from main_03_configurazione_e_opzioni import get_config
 
 
 class SettingsModel:
-    """Modello per gestire le impostazioni dell'applicazione"""
+    """Modello per gestire le impostazioni dell'applicazione.
 
-    def __init__(self):
-        self._settings = {}
-        self._load_settings()
+    È una vista sullo store condiviso delle impostazioni: letture e
+    scritture passano dalla stessa cache usata dal resto dell'applicazione.
+    """
 
-    def _load_settings(self):
-        """Carica le impostazioni"""
-        try:
-            self._settings = load_settings()
-        except Exception:
-            # Fallback alle impostazioni di default
-            self._settings = self._get_default_settings()
+    def __init__(self):
+        self._store = get_config().store
 
     def _get_default_settings(self) -> Dict[str, Any]:
         """Restituisce le impostazioni di default"""
@@ -57,46 +50,28 @@ class SettingsModel:
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting using dot notation."""
-        keys = key.split(".")
-        value = self._settings
-
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._store.get(key, default)
 
     def set(self, key: str, value: Any):
         """Set a setting using dot notation."""
-        keys = key.split(".")
-        settings = self._settings
-
-        # Naviga fino all'ultimo livello
-        for k in keys[:-1]:
-            if k not in settings:
-                settings[k] = {}
-            settings = settings[k]
-
-        # Imposta il valore
-        settings[keys[-1]] = value
+        self._store.set(key, value)
 
     def save(self) -> bool:
         """Save the settings."""
         try:
-            return save_settings(self._settings)
+            return self._store.flush()
         except Exception:
             return False
 
     def reload(self):
-        """Reload the settings."""
-        self._load_settings()
+        """Reload the settings (only if the file changed on disk)."""
+        self._store.reload()
 
     def get_all(self) -> Dict[str, Any]:
         """Return all settings."""
-        return self._settings.copy()
+        return self._store.snapshot()
 
     def reset_to_defaults(self):
         """Reset to default settings."""
-        self._settings = self._get_default_settings()
+        self._store.replace(self._get_default_settings())
         self.save()
@@ -3,14 +3,21 @@
 Project Service - Gestione dei progetti
 """
 
-import json
 import os
 import logging
+import shutil
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from PyQt6.QtCore import QObject, pyqtSignal
 from models.project_model import ProjectModel
+from core.project_index import get_project_index
+from core.project_storage import (
+    journal_path_for,
+    media_dir_for,
+    read_project,
+    write_project,
+)
 
 
 class ProjectService(QObject):
@@ -23,6 +30,7 @@ class ProjectService(QObject):
     project_loaded = pyqtSignal(str)  # project_name
 
     def __init__(self, projects_dir: Optional[str] = None):
+        super().__init__()
         self.logger = logging.getLogger(__name__)
 
         if projects_dir is None:
@@ -37,6 +45,14 @@ class ProjectService(QObject):
 
         # Assicura che la directory esista
         os.makedirs(self.projects_dir, exist_ok=True)
+        # Indice dei metadati: elenco e info senza aprire ogni progetto
+        self.index = get_project_index(self.projects_dir)
+        # mtime della cartella all'ultimo riallineamento: se cambia (file
+        # aggiunti, tolti o rinominati fuori dall'app) l'elenco va riallineato
+        self._seen_dir_mtime: Optional[int] = None
+        if not self.index.is_loaded():
+            self.index.reconcile()
+            self._seen_dir_mtime = self._dir_mtime()
         self.logger.info(
             f"Project Service inizializzato - Directory: {self.projects_dir}"
         )
@@ -55,9 +71,9 @@ class ProjectService(QObject):
             # Converte il progetto in dizionario
             project_data = project.to_dict()
 
-            # Salva su file
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(project_data, f, indent=2, ensure_ascii=False)
+            # Salva su file (scrittura atomica, contenuti lunghi fuori linea)
+            write_project(file_path, project_data)
+            self.index.update(file_path, project_data)
 
             self.logger.info(f"Progetto salvato: {file_path}")
             self.project_saved.emit(project.name)
@@ -78,8 +94,9 @@ class ProjectService(QObject):
                 return None
 
             # Carica il progetto
-            with open(file_path, "r", encoding="utf-8") as f:
-                project_data = json.load(f)
+            project_data = read_project(file_path, replay_journal=False)
+            if self.index.get(os.path.basename(file_path)) is None:
+                self.refresh_index()  # file arrivato da fuori: non ancora indicizzato
 
             # Crea l'oggetto progetto
             project = ProjectModel.from_dict(project_data)
@@ -99,6 +116,10 @@ class ProjectService(QObject):
 
             if os.path.exists(file_path):
                 os.remove(file_path)
+                self.index.remove(file_path)
+                shutil.rmtree(media_dir_for(file_path), ignore_errors=True)
+                if os.path.exists(journal_path_for(file_path)):
+                    os.remove(journal_path_for(file_path))
                 self.logger.info(f"Progetto eliminato: {file_path}")
                 return True
             else:
@@ -112,13 +133,11 @@ class ProjectService(QObject):
     def get_project_list(self) -> List[str]:
         """Restituisce la lista dei progetti disponibili"""
         try:
-            projects = []
-            if os.path.exists(self.projects_dir):
-                for file_name in os.listdir(self.projects_dir):
-                    if file_name.endswith(".json"):
-                        # Rimuovi l'estensione .json per ottenere il nome del progetto
-                        project_name = file_name[:-5]  # Rimuove '.json'
-                        projects.append(project_name)
+            self._refresh_if_dir_changed()
+            # Rimuovi l'estensione .json per ottenere il nome del progetto
+            projects = [
+                os.path.splitext(entry["file"])[0] for entry in self.index.list_projects()
+            ]
 
             projects.sort()  # Ordina alfabeticamente
             return projects
@@ -145,17 +164,46 @@ class ProjectService(QObject):
         sanitized = sanitized.strip("_")
         return sanitized
 
+    def refresh_index(self):
+        """Riallinea l'indice in background (file cambiati fuori dall'app)."""
+        return self.index.reconcile_async()
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.projects_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_if_dir_changed(self) -> None:
+        """Avvia il riallineamento se la cartella è cambiata dall'ultimo controllo.
+
+        L'elenco restituito è quello già in memoria: il riallineamento in
+        background vale per le richieste successive.
+        """
+        mtime = self._dir_mtime()
+        if mtime != self._seen_dir_mtime:
+            self._seen_dir_mtime = mtime
+            self.refresh_index()
+
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
     def get_project_info(self, project_name: str) -> Optional[Dict[str, Any]]:
         """Restituisce informazioni su un progetto"""
         try:
-            project = self.load_project(project_name)
-            if project:
+            safe_name = self._sanitize_filename(project_name)
+            entry = self.index.get(f"{safe_name}.json")
+            if entry:
                 return {
-                    "name": project.name,
-                    "created_at": project.created_at,
-                    "last_modified": project.last_modified,
-                    "version": project.version,
-                    "data_size": len(json.dumps(project.data)) if project.data else 0,
+                    "name": entry["name"],
+                    "created_at": self._parse_date(entry.get("created")),
+                    "last_modified": self._parse_date(entry.get("modified")),
+                    "version": entry.get("version", "1.0"),
+                    "data_size": entry.get("data_size", 0),
                 }
             return None
         except Exception as e:
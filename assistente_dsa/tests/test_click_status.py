@@ -0,0 +1,86 @@
+"""Test della barra di stato dei clic (MainWindow.eventFilter).
+
+Verifica: il filtro degli eventi registra soltanto (anello e contatori),
+senza toccare l'etichetta; una raffica di eventi produce un solo
+aggiornamento dell'etichetta, con l'ultimo evento; un messaggio di stato
+esplicito non viene sovrascritto da clic precedenti; il costo medio del
+filtro per evento finisce nel monitor prestazioni.
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QEvent, QPoint, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+import main_01_Aircraft as m
+
+_finestre = []  # tenute in vita: niente distruzione durante il disegno
+
+
+def _finestra():
+    window = m.MainWindow()
+    _finestre.append(window)
+    window.startup_scheduler.stop()
+    window._install_event_filters()
+    return window
+
+
+def _clic(widget, tipo=QEvent.Type.MouseButtonPress):
+    event = QMouseEvent(
+        tipo,
+        QPointF(5, 5),
+        QPointF(widget.mapToGlobal(QPoint(5, 5))),
+        Qt.MouseButton.LeftButton,
+        Qt.MouseButton.LeftButton,
+        Qt.KeyboardModifier.NoModifier,
+    )
+    QApplication.sendEvent(widget, event)
+
+
+def _attendi_timer(window):
+    limite = time.monotonic() + 5
+    while window._click_status_timer.isActive() and time.monotonic() < limite:
+        app.processEvents()
+        time.sleep(0.005)
+    app.processEvents()
+
+
+def test_raffica_di_eventi_un_solo_aggiornamento():
+    from core.performance_monitor import performance_monitor
+
+    window = _finestra()
+    central = window.centralWidget()
+    central.setObjectName("area_centrale")
+    label = window.click_status_label
+    testo_iniziale = label.text()
+
+    for _ in range(100):
+        _clic(central)
+    _clic(central, QEvent.Type.MouseButtonRelease)
+
+    assert label.text() == testo_iniziale  # il filtro non tocca l'etichetta
+    assert window._mouse_event_stats["events"] == 101
+    assert len(window._mouse_events) == window.MOUSE_EVENT_RING
+
+    _attendi_timer(window)
+    assert label.text() == "👇 SINISTRO su 📦 area_centrale"
+    assert window._mouse_event_stats["label_updates"] == 1
+    costi = performance_monitor.metrics["ui.event_filter.ns_per_event"]
+    assert costi.last_tags == {"events": 101} and costi.latest > 0
+
+
+def test_messaggio_esplicito_vince_sui_clic_in_attesa():
+    window = _finestra()
+    _clic(window.centralWidget())
+    window.set_status_message("💾 Progetto salvato")
+    _attendi_timer(window)
+    app.processEvents()
+    assert window.click_status_label.text() == "💾 Progetto salvato"
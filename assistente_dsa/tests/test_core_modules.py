@@ -191,6 +191,30 @@ class TestPerformanceMonitor:
             assert cpu_issue is not None
             assert "CPU elevato" in cpu_issue["message"]
 
+    def test_memoria_costante_e_percentili(self):
+        """Buffer circolare limitato e percentili dall'istogramma."""
+        for i in range(1, 10001):
+            self.monitor.record_metric("frame_ms", float(i))
+
+        series = self.monitor.metrics["frame_ms"]
+        assert len(series) == self.monitor.ring_size
+        assert series.recent()[-1] == 10000.0
+        assert series.recent()[0] == 10001.0 - self.monitor.ring_size
+
+        summary = series.summary()
+        assert summary["count"] == 10000
+        for p in (50, 95, 99):
+            assert abs(summary[f"p{p}"] - p * 100) / (p * 100) < 0.03
+
+    def test_snapshot_senza_campioni(self):
+        """Lo snapshot contiene i riassunti, non la storia dei valori."""
+        with self.monitor.measure("blocco"):
+            time.sleep(0.001)
+        snapshot = self.monitor.take_snapshot("riassunti")
+        summary = snapshot["custom_metrics"]["blocco.execution_time"]
+        assert summary["count"] == 1 and summary["latest"] >= 0.001
+        assert "recent" not in summary
+
     def test_metrics_export(self):
         """Test esportazione metriche."""
         self.monitor.record_metric("export_test", 123.45)
@@ -2,7 +2,8 @@
 
 Verifica: spento non cattura nulla; acceso cattura solo dopo una smorfia
 tenuta abbastanza a lungo; rispetta il cooldown; salva screenshot + registro;
-applica la ritenzione. Il "punteggio di difficoltà" derivato dai blendshape
+applica la ritenzione (età e spazio) senza riscandire la cartella; il
+salvataggio avviene fuori dal thread chiamante. Il "punteggio di difficoltà" derivato dai blendshape
 è testato a parte con blendshape sintetici.
 """
 
@@ -14,7 +15,7 @@ from collections import namedtuple
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.difficulty_observer import DifficultyObserver
+from core.difficulty_observer import IMAGE_EXTENSIONS, DifficultyObserver
 
 
 class FakePixmap:
@@ -26,7 +27,7 @@ class FakePixmap:
     def isNull(self):
         return self._null
 
-    def save(self, path, fmt="PNG"):
+    def save(self, path, fmt="PNG", quality=-1):
         if self._null:
             return False
         with open(path, "wb") as f:
@@ -49,7 +50,7 @@ def make_observer(tmp, **kw):
 def _pngs(tmp):
     if not os.path.isdir(tmp):
         return []
-    return [n for n in os.listdir(tmp) if n.endswith(".png")]
+    return [n for n in os.listdir(tmp) if n.endswith(IMAGE_EXTENSIONS)]
 
 
 def test_spento_non_cattura(tmp="/tmp/obs_off"):
@@ -60,6 +61,7 @@ def test_spento_non_cattura(tmp="/tmp/obs_off"):
     for _ in range(10):
         obs.on_difficulty(0.9)
         time.sleep(0.05)
+    obs.flush()
     assert not os.path.isdir(tmp) or not _pngs(tmp)
 
 
@@ -74,6 +76,7 @@ def test_cattura_dopo_smorfia_sostenuta(tmp="/tmp/obs_on"):
     assert not _pngs(tmp)
     time.sleep(0.3)
     obs.on_difficulty(0.8)  # ora supera sustain_s -> cattura
+    obs.flush()
     imgs = _pngs(tmp)
     assert len(imgs) == 1
     # registro coerente
@@ -93,6 +96,7 @@ def test_sotto_soglia_azzera(tmp="/tmp/obs_reset"):
     obs.on_difficulty(0.1)  # rilassa il viso: l'episodio si azzera
     time.sleep(0.2)
     obs.on_difficulty(0.8)  # riparte da capo, non abbastanza per catturare
+    obs.flush()
     assert not _pngs(tmp)
 
 
@@ -106,6 +110,7 @@ def test_cooldown(tmp="/tmp/obs_cool"):
         obs.on_difficulty(0.9)
         time.sleep(0.15)
         obs.on_difficulty(0.9)
+        obs.flush()
 
     episodio()
     assert len(_pngs(tmp)) == 1
@@ -126,6 +131,7 @@ def test_pixmap_nullo_non_salva(tmp="/tmp/obs_null"):
     obs.on_difficulty(0.9)
     time.sleep(0.15)
     obs.on_difficulty(0.9)
+    obs.flush()
     assert not os.path.isdir(tmp) or not _pngs(tmp)
 
 
@@ -144,6 +150,58 @@ def test_ritenzione(tmp="/tmp/obs_ret"):
     assert not os.path.exists(vecchio)
 
 
+class SlowPixmap(FakePixmap):
+    """Codifica lenta: il chiamante non deve aspettarla."""
+
+    def save(self, path, fmt="PNG", quality=-1):
+        time.sleep(0.3)
+        return super().save(path, fmt, quality)
+
+
+def test_salvataggio_fuori_dal_thread_chiamante(tmp="/tmp/obs_async"):
+    import shutil
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    obs = make_observer(tmp, sustain_s=0.05)
+    obs._screenshot = lambda: SlowPixmap()
+    obs.on_difficulty(0.9)
+    time.sleep(0.1)
+    t = time.perf_counter()
+    obs.on_difficulty(0.9)  # cattura
+    assert time.perf_counter() - t < 0.1
+    assert not _pngs(tmp)
+    obs.flush()
+    assert len(_pngs(tmp)) == 1
+    obs.close()
+
+
+def test_ritenzione_per_spazio_senza_scansioni(tmp="/tmp/obs_budget"):
+    import shutil
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp, exist_ok=True)
+    for i in range(5):
+        path = os.path.join(tmp, f"difficolta_2024010{i}_000000.png")
+        with open(path, "wb") as f:
+            f.write(b"x" * 1000)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    obs = make_observer(tmp, max_bytes=3500)
+    obs.purge_old()  # prima lettura della cartella: restano le 3 più recenti
+    assert sorted(_pngs(tmp)) == [f"difficolta_2024010{i}_000000.png" for i in (2, 3, 4)]
+
+    scansioni = []
+    originale = os.listdir
+    os.listdir = lambda p=".": scansioni.append(p) or originale(p)
+    try:
+        obs._add_to_index(time.time(), "difficolta_nuova.png", 1000)
+        obs.purge_old()
+    finally:
+        os.listdir = originale
+    assert scansioni == []
+    assert obs.index_summary() == {"captures": 3, "bytes": 3000}
+    assert "difficolta_20240102_000000.png" not in _pngs(tmp)
+
+
 def test_punteggio_da_blendshape():
     from Artificial_Intelligence.Video.visual_background import VideoThread
 
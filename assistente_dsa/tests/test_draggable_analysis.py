@@ -0,0 +1,100 @@
+"""Test dell'analisi del contenuto dei pensierini (UI/draggable_text_widget.py).
+
+Verifica: nessuna analisi alla creazione dei widget; risultato memorizzato
+per testo e riusato da widget diversi; testi lunghi analizzati in
+background senza bloccare la UI; il risultato in background di un
+pensierino non sovrascrive i dettagli di quello cliccato dopo.
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QWidget
+
+app = QApplication.instance() or QApplication([])
+
+from UI import draggable_text_widget as dtw
+from UI.draggable_text_widget import DraggableTextWidget
+
+
+class _FakeMainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.shown = []
+
+    def show_text_in_details(self, text):
+        self.shown.append(text)
+
+
+def _reset():
+    dtw._analysis_cache.clear()
+    for k in dtw.analysis_stats:
+        dtw.analysis_stats[k] = 0
+
+
+def test_nessuna_analisi_alla_creazione(monkeypatch):
+    _reset()
+    chiamate = []
+    monkeypatch.setattr(DraggableTextWidget, "_analyze_content",
+                        lambda self, t: chiamate.append(t) or "")
+    window = _FakeMainWindow()
+    for i in range(50):
+        DraggableTextWidget(f"Il gatto dorme {i}", {}, window)
+    assert chiamate == []
+
+
+def test_analisi_memorizzata_tra_widget():
+    _reset()
+    window = _FakeMainWindow()
+    a = DraggableTextWidget("Il gatto mangia la pappa", {}, window)
+    b = DraggableTextWidget("Il gatto mangia la pappa", {}, window)
+    a.show_metadata_in_details()
+    b.show_metadata_in_details()
+    assert dtw.analysis_stats["computed"] == 1
+    assert dtw.analysis_stats["hits"] == 1
+    assert window.shown[0] == window.shown[1]
+
+
+def test_testo_lungo_in_background():
+    _reset()
+    window = _FakeMainWindow()
+    testo = " ".join(["la casa rossa"] * 400)
+    widget = DraggableTextWidget(testo, {}, window)
+    widget.show_metadata_in_details()
+    assert window.shown == ["⏳ Analisi del contenuto in corso..."]
+    assert dtw.analysis_stats["background"] == 1
+
+    end = time.monotonic() + 5
+    while len(window.shown) < 2 and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    assert window.shown[1].startswith("📝 Analisi Frase Completa")
+
+    # Seconda richiesta: dalla cache, subito
+    widget.show_metadata_in_details()
+    assert window.shown[2] == window.shown[1]
+    assert dtw.analysis_stats["computed"] == 1
+
+
+def test_risultato_superato_scartato():
+    _reset()
+    window = _FakeMainWindow()
+    lungo = DraggableTextWidget(" ".join(["la casa rossa"] * 400), {}, window)
+    corto = DraggableTextWidget("Il gatto dorme", {}, window)
+    lungo.show_metadata_in_details()
+    corto.show_metadata_in_details()  # il pannello passa al secondo pensierino
+    atteso = window.shown[-1]
+    assert atteso.startswith("📝")
+
+    dtw._get_analysis_executor().submit(lambda: None).result(timeout=5)
+    end = time.monotonic() + 0.3
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    assert window.shown[-1] == atteso
+    assert lungo._analysis_future is None
+    assert not lungo._analysis_timer.isActive()
@@ -0,0 +1,64 @@
+"""Test dell'avvio veloce: verifica degli import senza eseguire i moduli.
+
+Verifica: i controlli all'avvio (__main__ e core.system_checks_module) non
+caricano main_01_Aircraft, che verrà importato una volta sola per avviare
+l'interfaccia; check_module_spec riconosce moduli presenti e mancanti; i
+tempi delle fasi di avvio (core/startup_timer.py).
+"""
+
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+from core import startup_timer
+from core.system_checks_module import check_module_spec
+
+
+def _run(code):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env.pop("COGNIFLOW_FULL_IMPORT_CHECK", None)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(PACKAGE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_controlli_di_avvio_non_eseguono_il_modulo_principale():
+    out = _run(
+        "import sys\n"
+        "import assistente_dsa.__main__ as m\n"
+        "from core.system_checks_module import test_imports\n"
+        "ok = m.test_critical_imports() and test_imports()\n"
+        "print(ok, sorted(k for k in sys.modules if 'main_01' in k))\n"
+    )
+    assert out == "True []"
+
+
+def test_check_module_spec():
+    assert check_module_spec("json")[0]
+    assert check_module_spec("core.startup_timer")[0]
+    assert not check_module_spec("modulo_che_non_esiste_xyz")[0]
+    assert not check_module_spec("pacchetto_mancante_xyz.sotto")[0]
+    path = os.path.join(PACKAGE_DIR, "main_01_Aircraft.py")
+    assert check_module_spec("main_01_Aircraft", path) == (True, path)
+    assert not check_module_spec("x", path + ".mancante")[0]
+
+
+def test_tempi_delle_fasi():
+    startup_timer._marks.clear()
+    startup_timer.mark("a")
+    startup_timer.mark("b")
+    (la, da), (lb, db) = startup_timer.phases()
+    assert (la, lb) == ("a", "b") and da >= 0 and db >= 0
+    righe = []
+    startup_timer.report(righe.append)
+    assert len(righe) == 4 and "totale" in righe[-1]
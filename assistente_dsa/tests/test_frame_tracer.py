@@ -0,0 +1,174 @@
+"""Test dei tempi per fase dei frame (core/frame_tracer.py).
+
+Verifica: da spento non registra nulla e span restituisce sempre lo
+stesso contesto vuoto; da acceso la ripartizione mobile ha una voce per
+fase più il totale "frame"; l'esportazione produce eventi "X" del formato
+Chrome trace con tempi in microsecondi e numero di frame; il ciclo di
+VideoThread.run, con una webcam finta, apre gli span delle sue fasi; due
+thread con frame aperti insieme non si mescolano gli span; gli span figli
+sono rientrati e fuori dalle percentuali; con più utenti (acquire/release)
+il tracer resta acceso finché uno lo tiene e non svuota i dati altrui.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+from core.frame_tracer import FRAME_SPAN, FrameTracer, get_frame_tracer
+
+
+def _frame(tracer, *stages):
+    tracer.begin_frame()
+    for stage in stages:
+        with tracer.span(stage):
+            time.sleep(0.001)
+    tracer.end_frame()
+
+
+def test_spento_non_registra():
+    tracer = FrameTracer()
+    assert tracer.span("capture") is tracer.span("flip")
+    _frame(tracer, "capture", "flip")
+    assert tracer.breakdown() == {}
+    assert tracer.chrome_trace()["traceEvents"] == []
+
+
+def test_ripartizione_ed_esportazione(tmp_path):
+    tracer = FrameTracer(rolling_frames=3)
+    tracer.enable()
+    for _ in range(5):
+        _frame(tracer, "capture", "convert")
+
+    breakdown = tracer.breakdown()
+    assert list(breakdown) == ["capture", "convert", FRAME_SPAN]
+    assert breakdown["capture"]["frames"] == 3  # finestra mobile
+    assert breakdown["capture"]["avg_ms"] >= 1.0
+    assert breakdown[FRAME_SPAN]["avg_ms"] >= breakdown["capture"]["avg_ms"]
+    assert "capture" in tracer.format_breakdown()
+
+    path = str(tmp_path / "traccia.json")
+    assert tracer.export_chrome_trace(path) == 15
+    with open(path, encoding="utf-8") as f:
+        eventi = [e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+    capture = [e for e in eventi if e["name"] == "capture"]
+    assert [e["args"]["frame"] for e in capture] == [1, 2, 3, 4, 5]
+    assert all(e["dur"] >= 1000 for e in capture)  # µs
+    frame = next(e for e in eventi if e["name"] == FRAME_SPAN)
+    assert frame["ts"] <= capture[0]["ts"] and frame["dur"] >= capture[0]["dur"]
+
+
+def test_frame_aperti_da_thread_diversi():
+    tracer = FrameTracer()
+    tracer.enable()
+    aperto = threading.Event()
+    chiudi = threading.Event()
+
+    def altro_thread():
+        tracer.begin_frame()
+        with tracer.span("hands"):
+            aperto.set()
+            chiudi.wait(5)
+        tracer.end_frame()
+
+    worker = threading.Thread(target=altro_thread)
+    tracer.begin_frame()
+    worker.start()
+    assert aperto.wait(5)
+    with tracer.span("faces"):
+        pass
+    tracer.end_frame()  # chiude solo il frame di questo thread
+    chiudi.set()
+    worker.join(5)
+
+    assert tracer.stats == {"frames": 2, "spans": 4}
+    per_thread = {}
+    for e in tracer.chrome_trace()["traceEvents"]:
+        if e["ph"] == "X" and e["name"] != FRAME_SPAN:
+            per_thread[e["name"]] = e["tid"]
+    assert per_thread["faces"] == threading.get_ident()
+    assert per_thread["hands"] == worker.ident
+
+
+def test_span_figli_fuori_dalle_percentuali():
+    tracer = FrameTracer()
+    tracer.enable()
+    tracer.begin_frame()
+    with tracer.span("faces"):
+        with tracer.span("faces.model"):
+            time.sleep(0.002)
+    tracer.end_frame()
+
+    righe = tracer.format_breakdown().splitlines()
+    assert righe[0].startswith("faces") and righe[0].endswith("%")
+    assert righe[1].startswith("  └ model") and not righe[1].endswith("%")
+    assert righe[2].startswith("frame")
+
+
+def test_video_thread_traccia_le_fasi(monkeypatch):
+    from Artificial_Intelligence.Video import visual_background as vb
+
+    class WebcamFinta:
+        letture = 0
+
+        def isOpened(self):
+            return True
+
+        def read(self):
+            WebcamFinta.letture += 1
+            if WebcamFinta.letture >= 3:
+                thread._run_flag = False
+            return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+        def release(self):
+            pass
+
+    monkeypatch.setattr(vb.cv2, "VideoCapture", lambda *_: WebcamFinta())
+    thread = vb.VideoThread()
+    thread.vlm_manager = None
+    tracer = get_frame_tracer()
+    tracer.reset()
+    tracer.enable()
+    try:
+        thread._run_flag = True
+        thread.run()
+    finally:
+        tracer.enable(False)
+
+    breakdown = tracer.breakdown()
+    for fase in ("capture", "flip", "convert", "emit", FRAME_SPAN):
+        assert breakdown[fase]["frames"] == 3
+    tracer.reset()
+
+
+def test_utenti_condivisi():
+    tracer = FrameTracer()
+    tracer.acquire("metrics_exporter")
+    _frame(tracer, "capture")
+
+    # La finestra di test non cancella i dati delle metriche
+    tracer.acquire("webcam_test", fresh=True)
+    assert tracer.stats["frames"] == 1
+    tracer.release("webcam_test")
+    assert tracer.enabled  # le metriche lo tengono ancora acceso
+
+    tracer.acquire("webcam_test")
+    tracer.release("metrics_exporter")
+    assert tracer.enabled  # e viceversa
+    tracer.release("webcam_test")
+    assert not tracer.enabled
+
+    # Da solo riparte da zero
+    tracer.acquire("webcam_test", fresh=True)
+    assert tracer.stats["frames"] == 0
+    tracer.release("webcam_test")
@@ -28,6 +28,11 @@ from UI.global_dwell import GlobalDwellClicker
 
 DWELL_MS = 60  # sosta accorciata per i test
 
+# Le finestre dei test precedenti restano vive (chiuse): finestra e clicker
+# formano un ciclo, e il garbage collector non deve distruggerle a metà di
+# un paintEvent
+_finestre = []
+
 
 class _RecordingEdit(QLineEdit):
     def __init__(self, parent=None):
@@ -40,7 +45,10 @@ class _RecordingEdit(QLineEdit):
 
 
 def _make_window():
+    for old in _finestre:
+        old.close()
     win = QMainWindow()
+    _finestre.append(win)
     central = QWidget()
     win.setCentralWidget(central)
     win.setGeometry(0, 0, 400, 300)
@@ -140,6 +148,62 @@ def test_spegnimento_azzera_tutto():
     assert win.clicks == 0
 
 
+def test_tremolio_non_rifa_la_ricerca():
+    win, clicker = _make_window()
+    win.pointer = QPoint(50, 30)
+    clicker._tick()
+    cercati = clicker.stats["hit_tests"]
+    for dx in (1, -1, 2, 0, -2, 1) * 5:  # il mano-mouse trema di un pixel
+        win.pointer = QPoint(50 + dx, 30)
+        clicker._tick()
+    assert clicker.stats["hit_tests"] == cercati
+    assert clicker.stats["jitter_skips"] == 30
+    report = clicker.tick_report()
+    assert report["ticks"] == 31 and report["max_ms"] >= report["mean_ms"] > 0
+
+
+def test_rettangolo_ricordato_e_invalidato_dal_layout():
+    win, clicker = _make_window()
+    win.pointer = QPoint(20, 20)
+    clicker._tick()
+    win.pointer = QPoint(110, 40)  # stesso pulsante, lontano dal primo punto
+    clicker._tick()
+    assert clicker.stats["cache_hits"] == 1
+    assert clicker._anchor is win.button
+
+    # Il pulsante si sposta: la cache non deve indicare il posto vecchio
+    win.button.move(200, 200)
+    app.processEvents()
+    win.pointer = QPoint(20, 20)
+    clicker._tick()
+    assert clicker._anchor is None
+    win.pointer = QPoint(250, 220)
+    _dwell(clicker)
+    assert win.clicks == 1
+
+
+def test_bersaglio_spostato_sotto_il_puntatore_fermo():
+    win, clicker = _make_window()
+    pannello = QWidget(win.centralWidget())  # pannello interno: nessun evento al filtro
+    pannello.setGeometry(200, 150, 150, 100)
+    pulsante = QPushButton("interno", pannello)
+    pulsante.setGeometry(0, 0, 100, 40)
+    premuto = []
+    pulsante.clicked.connect(lambda: premuto.append(True))
+    pannello.show()
+    app.processEvents()
+
+    win.pointer = QPoint(220, 160)
+    for _ in range(2):  # il primo tick mostra l'anello (cambio di layout)
+        clicker._tick()
+        app.processEvents()
+    assert clicker._anchor is pulsante
+    pulsante.move(0, 60)  # come uno scorrimento: il pulsante se ne va
+    app.processEvents()
+    _dwell(clicker)
+    assert premuto == [] and clicker._anchor is None
+
+
 if __name__ == "__main__":
     failed = 0
     for name, fn in sorted(globals().items()):
@@ -0,0 +1,113 @@
+"""Test del disegno a fotogrammi di HandwritingCanvas (main_01_Aircraft).
+
+Verifica: i punti della penna in aria vengono tracciati insieme in un solo
+passaggio per fotogramma; lo schermo viene aggiornato solo nel rettangolo
+del tratto; chi legge ``image`` (salvataggio, OCR, invio) vede anche i
+segmenti non ancora tracciati.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+import main_01_Aircraft as m
+
+
+class _RecordingCanvas(m.HandwritingCanvas):
+    """Canvas che registra le aree passate a update()."""
+
+    def __init__(self):
+        super().__init__(width=800, height=600)
+        self.resize(800, 600)
+        self.updates = []
+
+    def update(self, *args):
+        self.updates.append(args[0] if args else self.rect())
+        super().update(*args)
+
+
+def _traccia(canvas, punti):
+    for x, y in punti:
+        canvas.air_pen_point(x / 800, y / 600, True, True)
+
+
+def test_punti_tracciati_in_un_solo_passaggio():
+    canvas = _RecordingCanvas()
+    _traccia(canvas, [(100 + i, 100) for i in range(30)])
+    assert canvas.paint_stats["flushes"] == 0  # ancora in attesa del fotogramma
+    canvas.flush_strokes()
+    assert canvas.paint_stats == {"segments": 29, "flushes": 1}
+
+
+def test_aggiornamento_solo_del_rettangolo_del_tratto():
+    canvas = _RecordingCanvas()
+    _traccia(canvas, [(100 + i, 100) for i in range(30)])
+    canvas.updates.clear()
+    canvas.flush_strokes()
+    (area,) = canvas.updates
+    assert area.contains(QRect(100, 100, 28, 1))
+    assert area.width() < 50 and area.height() < 20
+    # Cursore della penna: solo dov'era e dove va, mai tutto il foglio
+    canvas.updates.clear()
+    _traccia(canvas, [(400, 300)])
+    assert canvas.updates and all(r.width() < 40 for r in canvas.updates)
+
+
+def test_immagine_letta_con_i_segmenti_in_attesa():
+    canvas = _RecordingCanvas()
+    canvas.set_color("#ff0000")
+    _traccia(canvas, [(200, 200), (260, 200)])
+    colore = QColor(canvas.image.pixel(230, 199))
+    assert colore.red() > 200 and colore.green() < 80
+    assert not canvas._pending
+
+
+def test_cancella_scarta_i_segmenti_in_attesa():
+    canvas = _RecordingCanvas()
+    _traccia(canvas, [(200, 200), (260, 200)])
+    canvas.clear()
+    assert QColor(canvas.image.pixel(230, 199)) == QColor("#ffffff")
+
+
+def test_annulla_ridisegna_solo_il_tratto():
+    canvas = _RecordingCanvas()
+    canvas.set_color("#ff0000")
+    _traccia(canvas, [(100, 100), (160, 100)])
+    canvas.air_pen_point(0, 0, False)  # punta sollevata: fine del tratto
+    canvas.set_color("#0000ff")
+    _traccia(canvas, [(100, 300), (160, 300)])
+    canvas.air_pen_point(0, 0, False)
+    assert len(canvas.strokes) == 2
+
+    canvas.flush_strokes()
+    canvas.updates.clear()
+    canvas.undo()
+    assert QColor(canvas.image.pixel(130, 299)) == QColor("#ffffff")
+    assert QColor(canvas.image.pixel(130, 99)).red() > 200  # il primo resta
+    (area,) = canvas.updates
+    assert area.height() < 20  # solo il rettangolo del tratto annullato
+
+    canvas.redo()
+    assert QColor(canvas.image.pixel(130, 299)).blue() > 200
+
+
+def test_pulizia_annullabile_e_disegno_ricaricabile():
+    canvas = _RecordingCanvas()
+    _traccia(canvas, [(100, 100), (160, 100)])
+    canvas.air_pen_point(0, 0, False)
+    dati = canvas.strokes.to_dict()
+    canvas.clear()
+    canvas.undo()
+    assert QColor(canvas.image.pixel(130, 99)) != QColor("#ffffff")
+
+    altro = _RecordingCanvas()
+    altro.load_strokes(dati)
+    assert altro.image.pixel(130, 99) == canvas.image.pixel(130, 99)
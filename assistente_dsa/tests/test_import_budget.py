@@ -0,0 +1,120 @@
+"""Budget dei tempi di import della finestra principale (-X importtime).
+
+Verifica: ``import main_01_Aircraft`` non importa nessun sottosistema
+pesante (video, voce, sintesi vocale, OCR, PDF, traduzione, multimedia,
+sicurezza: core/lazy_loader.SUBSYSTEMS) e resta nel budget totale;
+``import assistente_dsa`` non carica l'autenticazione; i riferimenti
+pigri di core/lazy_loader importano il modulo solo al primo uso.
+
+Il budget totale si può cambiare con COGNIFLOW_IMPORT_BUDGET_MS (es. su
+macchine lente). Con ``pytest -s`` viene stampato il tempo per sottosistema.
+"""
+
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+from core.lazy_loader import SUBSYSTEMS, LazyAttribute, lazy_attr
+
+# Budget in ms per sottosistema: quelli pesanti non devono essere importati
+BUDGET_MS = {name: 0.0 for name in SUBSYSTEMS}
+TOTAL_BUDGET_MS = float(os.environ.get("COGNIFLOW_IMPORT_BUDGET_MS", 1500))
+
+
+def _importtime(code, cwd=PACKAGE_DIR):
+    """Esegue ``code`` con -X importtime: {modulo: (self µs, cumulativo µs)}."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _per_subsystem(times):
+    """ms per sottosistema (somma dei tempi propri dei suoi moduli) e moduli trovati."""
+    out = {}
+    for name, spec in SUBSYSTEMS.items():
+        found = [
+            m for m in times
+            if any(m == p or m.startswith(p + ".") for p in spec["modules"])
+        ]
+        out[name] = (sum(times[m][0] for m in found) / 1000.0, found)
+    return out
+
+
+def test_budget_import_finestra_principale():
+    times = _importtime("import main_01_Aircraft")
+    total_ms = times["main_01_Aircraft"][1] / 1000.0
+    report = _per_subsystem(times)
+    print(f"\nimport main_01_Aircraft: {total_ms:.1f} ms (budget {TOTAL_BUDGET_MS:.0f})")
+    for name, (ms, found) in sorted(report.items()):
+        print(f"   {name:12s} {ms:7.1f} ms  {len(found)} moduli")
+
+    over = {
+        name: found[:5]
+        for name, (ms, found) in report.items()
+        if found and ms >= BUDGET_MS[name]
+    }
+    assert not over, f"sottosistemi importati all'avvio: {over}"
+    assert total_ms <= TOTAL_BUDGET_MS
+
+
+def test_pacchetto_non_carica_l_autenticazione():
+    times = _importtime("import assistente_dsa", cwd=os.path.dirname(PACKAGE_DIR))
+    assert "assistente_dsa" in times
+    assert not [m for m in times if "Autenticazione" in m]
+
+
+def test_riferimento_pigro_importa_al_primo_uso(tmp_path, monkeypatch):
+    (tmp_path / "modulo_pigro_xyz.py").write_text(
+        "CHIAMATE = []\n"
+        "def saluta(nome):\n"
+        "    CHIAMATE.append(nome)\n"
+        "    return 'ciao ' + nome\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    saluta = LazyAttribute("modulo_pigro_xyz", "saluta", requires=("json",))
+
+    assert saluta  # disponibilità dalle librerie richieste, senza import
+    assert "modulo_pigro_xyz" not in sys.modules and not saluta.loaded
+    assert saluta("Anna") == "ciao Anna"
+    assert sys.modules["modulo_pigro_xyz"].CHIAMATE == ["Anna"]
+    modulo = lazy_attr("modulo_pigro_xyz")
+    assert modulo.CHIAMATE == ["Anna"]
+
+
+def test_riferimento_pigro_a_modulo_mancante():
+    mancante = lazy_attr("modulo_mancante_xyz", "Classe", default=None)
+    assert not mancante
+    try:
+        mancante()
+    except ImportError:
+        pass
+    else:
+        raise AssertionError("ImportError atteso")
+    assert lazy_attr("modulo_mancante_xyz", "f", lambda: "default")() == "default"
+
+
+def test_librerie_presenti_ma_modulo_rotto(tmp_path, monkeypatch):
+    # Come VideoThread con cv2/numpy installati ma visual_background rotto:
+    # il test di verità guarda le librerie, resolve() dice se si può usare
+    (tmp_path / "modulo_rotto_xyz.py").write_text("import libreria_assente_xyz\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    rotto = LazyAttribute("modulo_rotto_xyz", "Classe", requires=("json",))
+    assert rotto and rotto is not None
+    assert rotto.resolve() is None
@@ -0,0 +1,64 @@
+"""Test della ricerca delle crescite di memoria (core/memory_watch.py).
+
+Verifica: oltre la soglia il resoconto indica la riga che ha allocato e
+la crescita delle istanze e dei contenitori tracciati; sotto la soglia
+(misurata dall'ultimo resoconto) non scrive nulla; fermandosi spegne
+tracemalloc se l'aveva acceso.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import memory_watch
+from core.memory_watch import MemoryWatcher
+
+
+class Zavorra:
+    pass
+
+
+def _alloca():
+    return [bytearray(1024) for _ in range(3000)]  # ~3 MB
+
+
+def test_resoconto_oltre_soglia(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_watch, "_rss_bytes", lambda: None)  # solo tracemalloc
+    cache = {}
+    watcher = MemoryWatcher(
+        interval=3600,
+        threshold_mb=2,
+        report_dir=str(tmp_path),
+        tracked_classes=("Zavorra",),
+        probes={"cache": lambda: len(cache)},
+    )
+    assert not tracemalloc.is_tracing()
+    watcher.start()
+    try:
+        limite = time.monotonic() + 5
+        while watcher._baseline is None and time.monotonic() < limite:
+            time.sleep(0.01)
+
+        istanze = [Zavorra() for _ in range(40)]
+        blocchi = _alloca()
+        cache.update((i, i) for i in range(7))
+
+        path = watcher.check()
+        assert path and os.path.dirname(path) == str(tmp_path)
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        assert report["growth_mb"] >= 2
+        assert "test_memory_watch.py" in report["top_growth"][0]["site"]
+        assert report["objects"]["Zavorra"] == {"count": 40, "delta": 40}
+        assert report["objects"]["cache"]["delta"] == 7
+
+        assert watcher.check() is None  # nessuna nuova crescita oltre soglia
+        assert watcher.last_check["objects"]["Zavorra"] == 40
+        del istanze, blocchi
+    finally:
+        watcher.stop()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,94 @@
+"""Test dell'esportatore di metriche locali (core/metrics_exporter.py).
+
+Verifica: il testo Prometheus e quello OpenMetrics rispettano i due
+formati (contatori, etichette, ``# EOF``); l'endpoint su localhost serve
+l'ultima raccolta senza raccogliere a ogni richiesta; il file OpenMetrics
+viene riscritto; una fonte in errore non ferma le altre; la latenza delle
+richieste all'AI ha una serie per modello.
+"""
+
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics_exporter import MetricFamily, MetricsExporter, render
+from core.performance_monitor import performance_monitor
+
+
+def test_formati_prometheus_e_openmetrics():
+    famiglie = [
+        MetricFamily("richieste", "counter", "Richieste servite").add(3, file='a"b'),
+        MetricFamily("memoria_bytes", "gauge", "RSS").add(1.5e6),
+    ]
+    prometheus = render(famiglie)
+    assert "# TYPE cogniflow_richieste_total counter" in prometheus
+    assert 'cogniflow_richieste_total{file="a\\"b"} 3' in prometheus
+    assert "cogniflow_memoria_bytes 1500000.0" in prometheus
+    assert "# EOF" not in prometheus
+
+    openmetrics = render(famiglie, openmetrics=True)
+    assert "# TYPE cogniflow_richieste counter" in openmetrics
+    assert openmetrics.endswith("# EOF\n")
+
+
+def _attendi(condizione, limite=5.0):
+    fine = time.monotonic() + limite
+    while not condizione() and time.monotonic() < fine:
+        time.sleep(0.01)
+    assert condizione()
+
+
+def test_endpoint_e_file(tmp_path):
+    def fonte_rotta():
+        raise RuntimeError("non disponibile")
+
+    from core.metrics_exporter import collect_performance_monitor, collect_process
+
+    performance_monitor.record_metric("ai.request.execution_time", 0.25)
+    dump = str(tmp_path / "metrics.prom")
+    exporter = MetricsExporter(
+        port=0,
+        interval=60,
+        dump_path=dump,
+        collectors=(collect_process, fonte_rotta, collect_performance_monitor),
+    )
+    assert exporter.start()
+    try:
+        _attendi(lambda: exporter.stats["dumps"] == 1)
+        url = "http://%s:%d/metrics" % exporter.address
+        for _ in range(3):
+            with urllib.request.urlopen(url, timeout=5) as risposta:
+                testo = risposta.read().decode("utf-8")
+                assert risposta.headers["Content-Type"].startswith("text/plain")
+        assert "cogniflow_process_resident_memory_bytes" in testo
+        assert 'cogniflow_monitor_count{metric="ai.request.execution_time"}' in testo
+        assert exporter.stats["collections"] == 1  # le richieste non raccolgono
+        assert exporter.stats["scrapes"] == 3
+        assert exporter.stats["errors"] == 1
+
+        richiesta = urllib.request.Request(
+            url, headers={"Accept": "application/openmetrics-text"}
+        )
+        with urllib.request.urlopen(richiesta, timeout=5) as risposta:
+            assert "openmetrics" in risposta.headers["Content-Type"]
+            assert risposta.read().decode("utf-8").endswith("# EOF\n")
+        with open(dump, encoding="utf-8") as f:
+            assert f.read() == exporter.text(openmetrics=True)
+    finally:
+        exporter.stop()
+    assert not exporter.running and exporter.address is None
+
+
+def test_latenza_ai_per_modello(monkeypatch):
+    from Artificial_Intelligence.Ollama.ollama_manager import OllamaThread
+
+    monkeypatch.setattr(OllamaThread, "_request", lambda self: None)
+    for model in ("gemma:2b", "llava:7b", "llava:7b"):
+        OllamaThread("ciao", model=model).run()
+    summaries = performance_monitor.summaries()
+    assert summaries["ai.request.gemma:2b.execution_time"]["count"] == 1
+    assert summaries["ai.request.llava:7b.execution_time"]["count"] == 2
+    assert summaries["ai.request.execution_time"]["count"] >= 3
@@ -0,0 +1,73 @@
+"""Test del sink JSON Lines asincrono (core/metrics_sink.py).
+
+Verifica: i record arrivano sul file in ordine e a lotti, non uno per
+scrittura; il file ruota oltre la dimensione massima mantenendo i backup;
+il campionamento scarta la frazione richiesta tranne i record obbligatori;
+la coda piena scarta e conta invece di crescere; la chiusura scrive
+quanto resta in coda.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics_sink import JsonlSink, get_sink
+
+
+def _righe(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(riga) for riga in f]
+
+
+def test_scrittura_a_lotti_in_ordine(tmp_path):
+    path = str(tmp_path / "metriche.jsonl")
+    sink = JsonlSink(path, flush_interval=10)
+    for i in range(500):
+        assert sink.write({"n": i, "testo": "è"})
+    assert sink.flush(5)
+    assert [r["n"] for r in _righe(path)] == list(range(500))
+    assert sink.stats["written"] == 500
+    assert sink.stats["batches"] < 10  # non una scrittura per record
+    sink.close()
+    assert not sink.write({"n": 500})  # chiuso
+
+
+def test_rotazione_per_dimensione(tmp_path):
+    path = str(tmp_path / "metriche.jsonl")
+    sink = JsonlSink(path, max_bytes=200, backups=2, batch_size=1)
+    for i in range(40):
+        sink.write({"n": i, "pad": "x" * 20})
+        sink.flush(5)
+    sink.close()
+    assert sink.stats["rotations"] > 2
+    assert os.path.exists(path + ".1") and os.path.exists(path + ".2")
+    assert not os.path.exists(path + ".3")
+    scritti = _righe(path + ".2") + _righe(path + ".1")
+    if os.path.exists(path):
+        scritti += _righe(path)
+    numeri = [r["n"] for r in scritti]
+    assert numeri == sorted(numeri) and numeri[-1] == 39
+
+
+def test_campionamento_e_coda_piena(tmp_path):
+    sink = JsonlSink(str(tmp_path / "c.jsonl"), sample_rate=0.0)
+    assert not sink.write({"tipo": "metrica"})
+    assert sink.write({"tipo": "audit"}, sample=False)
+    sink.close()
+    assert sink.stats["sampled_out"] == 1
+    assert [r["tipo"] for r in _righe(sink.path)] == ["audit"]
+
+    piena = JsonlSink(str(tmp_path / "p.jsonl"), max_queue=0)
+    assert not piena.write({"n": 1})
+    assert piena.stats["dropped"] == 1
+
+
+def test_sink_condiviso_per_percorso(tmp_path):
+    path = str(tmp_path / "condiviso.jsonl")
+    a = get_sink(path)
+    assert get_sink(os.path.join(str(tmp_path), ".", "condiviso.jsonl")) is a
+    a.close()
+    assert get_sink(path) is not a  # un sink chiuso viene sostituito
+    get_sink(path).close()
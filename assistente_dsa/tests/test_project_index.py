@@ -0,0 +1,125 @@
+"""Test dell'indice dei progetti (core/project_index.py).
+
+Verifica: i metadati di entrambi i formati di progetto; l'elenco letto
+dall'indice senza aprire i file; il riallineamento che rilegge solo i
+file nuovi o modificati fuori dall'app; l'integrazione con ProjectService,
+che riallinea l'elenco quando la cartella cambia.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import project_index
+from core.project_index import INDEX_FILENAME, ProjectIndex, extract_metadata
+
+
+def _save(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _main_window_project(name, n_pens=2, n_work=1):
+    return {
+        "metadata": {"name": name, "created": "2026-01-02T10:00:00", "version": "1.0"},
+        "pensierini": [{"text": f"p{i}", "order": i} for i in range(n_pens)],
+        "workspace": [{"text": f"w{i}", "order": i} for i in range(n_work)],
+    }
+
+
+def test_metadati_dei_due_formati():
+    meta = extract_metadata(_main_window_project("Lezione"), "Lezione.json")
+    assert meta["name"] == "Lezione"
+    assert (meta["pensierini"], meta["workspace"]) == (2, 1)
+
+    service_format = {"name": "Storia", "data": {"pensierini": [1, 2, 3]},
+                      "created_at": "2026-01-01T08:00:00", "version": "1.0"}
+    meta = extract_metadata(service_format, "Storia.json")
+    assert meta["name"] == "Storia"
+    assert meta["pensierini"] == 3
+    assert meta["data_size"] == len(json.dumps(service_format["data"]))
+
+
+def test_elenco_senza_aprire_i_progetti(tmp_path, monkeypatch):
+    index = ProjectIndex(str(tmp_path))
+    for name in ("a", "b"):
+        path = str(tmp_path / f"{name}.json")
+        _save(path, _main_window_project(name))
+        index.update(path, _main_window_project(name))
+
+    # Un nuovo indice (nuova sessione) legge solo il file dell'indice
+    aperti = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda p, *a, **k: aperti.append(p) or real_open(p, *a, **k))
+    fresh = ProjectIndex(str(tmp_path))
+    names = sorted(e["name"] for e in fresh.list_projects())
+    assert names == ["a", "b"]
+    assert aperti == [str(tmp_path / INDEX_FILENAME)]
+
+
+def test_riallineamento_rilegge_solo_i_cambiati(tmp_path, monkeypatch):
+    for name in ("a", "b", "c"):
+        _save(str(tmp_path / f"{name}.json"), _main_window_project(name))
+    index = ProjectIndex(str(tmp_path))
+    assert not index.is_loaded()
+    assert index.reconcile()
+    assert len(index.list_projects()) == 3
+
+    # Modifiche fuori dall'app: uno cambiato, uno eliminato, uno nuovo
+    time.sleep(0.01)
+    _save(str(tmp_path / "a.json"), _main_window_project("a", n_pens=9))
+    os.remove(str(tmp_path / "b.json"))
+    _save(str(tmp_path / "d.json"), _main_window_project("d"))
+
+    letti = []
+    real_load = json.load
+    monkeypatch.setattr(project_index.json, "load",
+                        lambda f, *a, **k: letti.append(os.path.basename(f.name)) or real_load(f, *a, **k))
+    assert index.reconcile()
+    assert sorted(letti) == ["a.json", "d.json"]
+    entries = {e["file"]: e for e in index.list_projects()}
+    assert sorted(entries) == ["a.json", "c.json", "d.json"]
+    assert entries["a.json"]["pensierini"] == 9
+
+    letti.clear()
+    assert not index.reconcile()  # nulla di cambiato: nessuna lettura
+    assert letti == []
+
+
+def test_file_indice_escluso_e_riallineamento_async(tmp_path):
+    _save(str(tmp_path / "x.json"), _main_window_project("x"))
+    _save(str(tmp_path / "note.txt"), {})
+    index = ProjectIndex(str(tmp_path))
+    index.reconcile_async().join(5)
+    assert [e["file"] for e in index.list_projects()] == ["x.json"]
+    assert os.path.exists(str(tmp_path / INDEX_FILENAME))
+
+
+def test_project_service_usa_l_indice(tmp_path):
+    from models.project_model import ProjectModel
+    from services.project_service import ProjectService
+
+    service = ProjectService(str(tmp_path))
+    assert service.save_project(ProjectModel("Scienze", {"pensierini": [1, 2]}))
+    assert service.get_project_list() == ["Scienze"]
+    info = service.get_project_info("Scienze")
+    assert info["name"] == "Scienze"
+    assert info["data_size"] == len(json.dumps({"pensierini": [1, 2]}))
+    assert service.delete_project("Scienze")
+    assert service.get_project_list() == []
+
+
+def test_project_service_vede_i_file_aggiunti_da_fuori(tmp_path):
+    from services.project_service import ProjectService
+
+    service = ProjectService(str(tmp_path))
+    assert service.get_project_list() == []
+    _save(str(tmp_path / "Storia.json"), {"name": "Storia", "data": {}})
+
+    end = time.monotonic() + 5
+    while service.get_project_list() != ["Storia"] and time.monotonic() < end:
+        time.sleep(0.01)
+    assert service.get_project_list() == ["Storia"]
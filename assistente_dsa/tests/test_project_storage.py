@@ -0,0 +1,127 @@
+"""Test del salvataggio dei progetti (core/project_storage.py).
+
+Verifica: la scrittura atomica e compatta; i testi lunghi salvati fuori
+linea, compressi e riscritti solo se cambiano; il journal di
+autosalvataggio che registra solo le differenze e viene rigiocato al
+caricamento (anche con l'ultima riga troncata da un crash).
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import project_storage
+from core.project_storage import (
+    AutosaveJournal,
+    journal_path_for,
+    media_dir_for,
+    project_texts,
+    read_project,
+    write_project,
+)
+
+
+def _project(texts, work=()):
+    return {
+        "metadata": {"name": "Lezione", "version": "1.0"},
+        "pensierini": [{"text": t, "order": i} for i, t in enumerate(texts)],
+        "workspace": [{"text": t, "order": i} for i, t in enumerate(work)],
+    }
+
+
+def test_scrittura_compatta_e_rilettura(tmp_path):
+    path = str(tmp_path / "lezione.json")
+    data = _project(["uno", "due"], ["tre"])
+    stats = write_project(path, data)
+    assert read_project(path) == data
+    assert stats["bytes"] == os.path.getsize(path)
+    assert stats["bytes"] < len(json.dumps(data, indent=2))
+    assert os.listdir(tmp_path) == ["lezione.json"]  # nessun temporaneo
+
+
+def test_crash_durante_la_scrittura_non_corrompe(tmp_path, monkeypatch):
+    path = str(tmp_path / "lezione.json")
+    write_project(path, _project(["originale"]))
+
+    def _crash(src, dst):
+        raise OSError("disco pieno")
+
+    monkeypatch.setattr(project_storage.os, "replace", _crash)
+    try:
+        write_project(path, _project(["nuovo"]))
+    except OSError:
+        pass
+    assert project_texts(read_project(path))["pensierini"] == ["originale"]
+    assert os.listdir(tmp_path) == ["lezione.json"]
+
+
+def test_contenuti_lunghi_fuori_linea_e_incrementali(tmp_path):
+    path = str(tmp_path / "lezione.json")
+    immagine = "data:image/png;base64," + "A" * 200000
+    data = _project(["breve", immagine])
+    stats = write_project(path, data)
+    assert stats["blobs_written"] == 1
+    assert os.path.getsize(path) < 1000
+    assert read_project(path) == data
+
+    # Risalvataggio: il contenuto lungo non viene riscritto
+    stats = write_project(path, _project(["breve modificato", immagine]))
+    assert (stats["blobs_written"], stats["blobs_reused"]) == (0, 1)
+
+    # Rimosso dal progetto: il file fuori linea viene eliminato
+    write_project(path, _project(["breve"]))
+    assert os.listdir(media_dir_for(path)) == []
+
+
+def test_formato_project_service(tmp_path):
+    path = str(tmp_path / "storia.json")
+    lungo = "x" * 10000
+    data = {"name": "Storia", "data": {"pensierini": [{"text": lungo}]}, "version": "1.0"}
+    write_project(path, data)
+    assert read_project(path) == data
+
+
+def test_journal_registra_solo_le_differenze(tmp_path):
+    path = str(tmp_path / "lezione.json")
+    testi = [f"pensierino {i} " + "x" * 500 for i in range(2000)]
+    write_project(path, _project(testi))
+
+    journal = AutosaveJournal(journal_path_for(path))
+    journal.start(project_texts(_project(testi)))
+    assert journal.record({"pensierini": testi}) == 0  # nulla di cambiato
+    assert not journal.has_edits()
+
+    modificati = list(testi)
+    modificati[10] = "corretto"
+    modificati.insert(0, "nuovo in cima")
+    del modificati[-1]
+    t = time.perf_counter()
+    assert journal.record({"pensierini": modificati, "workspace": ["appunto"]}) > 0
+    elapsed = time.perf_counter() - t
+    print(f"autosalvataggio di {len(testi)} pensierini: {elapsed * 1000:.1f} ms, "
+          f"journal {os.path.getsize(journal.path)} byte")
+    assert os.path.getsize(journal.path) < 2000  # solo le modifiche, non il progetto
+
+    recuperato = read_project(path)
+    assert recuperato["_recovered_edits"] > 0
+    assert project_texts(recuperato) == {"pensierini": modificati, "workspace": ["appunto"]}
+
+    # Un salvataggio completo svuota il journal
+    write_project(path, _project(modificati))
+    assert not journal.has_edits()
+
+
+def test_journal_con_ultima_riga_troncata(tmp_path):
+    journal = AutosaveJournal(str(tmp_path / "lavoro.journal"))
+    journal.start({})
+    journal.record({"pensierini": ["a"]})
+    journal.record({"pensierini": ["a", "b"]})
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"col": "pensierini", "op": "spl')  # crash a metà riga
+
+    data = {"pensierini": [], "workspace": []}
+    assert AutosaveJournal(journal.path).replay(data) == 2
+    assert project_texts(data)["pensierini"] == ["a", "b"]
@@ -0,0 +1,171 @@
+"""Test della lettura a frasi (Sintesi_Vocale/managers/sentence_stream.py).
+
+La sintesi e la riproduzione sono finte: ``render`` registra le frasi
+sintetizzate, ``play`` quelle riprodotte. Si verifica la divisione in
+frasi con gli offset, la pipeline (la frase successiva è già pronta),
+la cache per i salti indietro e l'interruzione. Con un TTSThread finto,
+il pensierino di più frasi evidenzia la frase letta, inoltra i salti e
+alla fine ripristina il testo.
+"""
+
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Artificial_Intelligence.Sintesi_Vocale.managers.sentence_stream import (
+    SentencePipeline,
+    split_into_sentences,
+)
+
+
+def test_divisione_con_offset():
+    testo = "Ciao a tutti. Come state?  Bene!\nNuova riga"
+    frasi = split_into_sentences(testo)
+    assert [f.text for f in frasi] == [
+        "Ciao a tutti.",
+        "Come state?",
+        "Bene!",
+        "Nuova riga",
+    ]
+    for f in frasi:
+        assert testo[f.start:f.end] == f.text
+    assert [f.index for f in frasi] == [0, 1, 2, 3]
+
+
+def test_frase_lunga_spezzata():
+    testo = ", ".join(["parola"] * 200)
+    frasi = split_into_sentences(testo, max_chars=100)
+    assert len(frasi) > 1
+    assert all(len(f.text) <= 100 for f in frasi)
+    assert all(testo[f.start:f.end] == f.text for f in frasi)
+
+
+def test_testo_vuoto_o_solo_punteggiatura():
+    assert split_into_sentences("") == []
+    assert split_into_sentences(" ... !! ") == []
+
+
+def test_pipeline_legge_tutto_in_ordine():
+    frasi = split_into_sentences("Uno. Due. Tre.")
+    suonate, iniziate = [], []
+    pipe = SentencePipeline(
+        frasi,
+        render=lambda t: t.upper(),
+        play=suonate.append,
+        on_sentence=lambda s: iniziate.append(s.index),
+    )
+    pipe.run()
+    assert suonate == ["UNO.", "DUE.", "TRE."]
+    assert iniziate == [0, 1, 2]
+
+
+def test_frase_successiva_sintetizzata_durante_la_riproduzione():
+    frasi = split_into_sentences("Uno. Due.")
+    resi = []
+    pronta_durante_play = []
+
+    def play(audio):
+        if audio == "Uno.":
+            time.sleep(0.1)
+            pronta_durante_play.append("Due." in resi)
+
+    pipe = SentencePipeline(frasi, render=lambda t: resi.append(t) or t, play=play)
+    pipe.run()
+    assert pronta_durante_play == [True]
+
+
+def test_salto_indietro_riusa_la_cache():
+    frasi = split_into_sentences("Uno. Due. Tre.")
+    resi = []
+    suonate = []
+    pipe = None
+
+    def play(audio):
+        suonate.append(audio)
+        if len(suonate) == 2:
+            pipe.skip(-1)  # dalla frase 1 torna alla 0
+
+    pipe = SentencePipeline(frasi, render=lambda t: resi.append(t) or t, play=play)
+    pipe.run()
+    assert suonate == ["Uno.", "Due.", "Uno.", "Due.", "Tre."]
+    assert resi.count("Uno.") == 1
+
+
+def test_stop_interrompe_la_frase_in_corso():
+    frasi = split_into_sentences("Uno. Due. Tre.")
+    interrotta = threading.Event()
+    suonate = []
+
+    def play(audio):
+        suonate.append(audio)
+        interrotta.wait(2)
+
+    pipe = SentencePipeline(
+        frasi, render=lambda t: t, play=play, interrupt=interrotta.set
+    )
+    worker = threading.Thread(target=pipe.run)
+    worker.start()
+    time.sleep(0.05)
+    pipe.stop()
+    worker.join(2)
+    assert not worker.is_alive()
+    assert suonate == ["Uno."]
+    assert pipe.is_stopped()
+
+
+def test_pensierino_letto_a_frasi(monkeypatch):
+    from PyQt6.QtCore import QObject, pyqtSignal
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    from Artificial_Intelligence.Sintesi_Vocale.managers import tts_manager
+    from UI.draggable_text_widget import DraggableTextWidget
+
+    class TTSThreadFinto(QObject):
+        sentence_started = pyqtSignal(int, int, int)
+        finished_reading = pyqtSignal()
+        error_occurred = pyqtSignal(str)
+
+        def __init__(self, text, **kwargs):
+            super().__init__()
+            self.sentences = split_into_sentences(text)
+            self.salti = []
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def isRunning(self):
+            return False
+
+        def skip_forward(self):
+            self.salti.append(1)
+
+        def skip_back(self):
+            self.salti.append(-1)
+
+    monkeypatch.setattr(tts_manager, "TTSThread", TTSThreadFinto)
+    testo = "Il gatto dorme. Il cane abbaia."
+    widget = DraggableTextWidget(testo, {})
+    assert not widget.skip_sentence(1)
+    widget.toggle_reading()
+    thread = widget._tts_thread
+    assert widget.is_reading and thread is not None
+
+    thread.sentence_started.emit(1, 16, 31)
+    assert '<span style="background-color: #fff59d;">Il cane abbaia.</span>' in (
+        widget.text_label.text()
+    )
+    assert widget.skip_sentence(1) and widget.skip_sentence(-1)
+    assert thread.salti == [1, -1]
+
+    thread.finished_reading.emit()
+    app.processEvents()
+    assert not widget.is_reading
+    assert widget.text_label.text() == testo
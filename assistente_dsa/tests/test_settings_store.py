@@ -0,0 +1,274 @@
+"""Test dello store delle impostazioni in memoria (core/settings_store.py).
+
+Verifica: il file viene letto una volta sola; le scritture notificano
+gli iscritti e vengono raggruppate in un unico salvataggio atomico; le
+modifiche esterne al file vengono ricaricate senza perdere quelle locali
+non ancora salvate; le viste (ConfigManager, ...) usano lo stesso backend
+e alla prima installazione scrivono i default completi.
+Il benchmark confronta il parse del file con il lookup in memoria.
+"""
+
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+from core.settings_store import SettingsStore
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _make(tmp_path, data=None, delay_ms=30):
+    path = str(tmp_path / "settings.json")
+    if data is not None:
+        _write(path, data)
+    return path, SettingsStore(path, defaults=lambda: {"ui": {"theme": "Chiaro"}},
+                               save_delay_ms=delay_ms)
+
+
+def _process_events(ms):
+    end = time.monotonic() + ms / 1000.0
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_letture_dalla_memoria(tmp_path):
+    path, store = _make(tmp_path, {"ai": {"selected_ai_model": "gemma:2b"}})
+    os.remove(path)  # se rileggesse il file a ogni get, fallirebbe
+    assert store.get("ai.selected_ai_model") == "gemma:2b"
+    assert store.get("ai.missing", "x") == "x"
+    assert store.get("ai.selected_ai_model.deeper", 1) == 1
+
+
+def test_default_se_file_mancante(tmp_path):
+    _, store = _make(tmp_path)
+    assert store.get("ui.theme") == "Chiaro"
+
+
+def test_default_se_file_corrotto(tmp_path):
+    path = str(tmp_path / "settings.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{corrotto")
+    store = SettingsStore(path, defaults=lambda: {"a": 1})
+    assert store.snapshot() == {"a": 1}
+    store.add_defaults(lambda: {"b": 2})
+    assert store.get("b") == 2
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "{corrotto"  # non riscritto dai soli default
+
+
+def test_valori_mutabili_copiati(tmp_path):
+    _, store = _make(tmp_path, {"ui": {"colors": ["red"]}})
+    store.get("ui.colors").append("blue")
+    store.snapshot()["ui"]["colors"].append("green")
+    assert store.get("ui.colors") == ["red"]
+
+
+def test_set_notifica_e_salvataggio_raggruppato(tmp_path):
+    path, store = _make(tmp_path, {"ui": {}})
+    ricevuti = []
+    store.setting_changed.connect(lambda k, v: ricevuti.append((k, v)))
+
+    for size in (10, 11, 12):
+        store.set("fonts.main_font_size", size)
+    store.set("fonts.main_font_size", 12)  # invariato: nessuna notifica
+
+    assert ricevuti == [("fonts.main_font_size", 10),
+                        ("fonts.main_font_size", 11),
+                        ("fonts.main_font_size", 12)]
+    assert _read(path) == {"ui": {}}  # non ancora su disco
+
+    _process_events(150)
+    assert _read(path)["fonts"]["main_font_size"] == 12
+    assert store.stats["saves"] == 1
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+
+
+def test_flush_esplicito(tmp_path):
+    path, store = _make(tmp_path, {}, delay_ms=60000)
+    store.set("tts.tts_engine", "gTTS")
+    assert store.flush()
+    assert _read(path)["tts"]["tts_engine"] == "gTTS"
+
+
+def test_modifica_esterna_ricaricata(tmp_path):
+    path, store = _make(tmp_path, {"a": 1, "b": 1}, delay_ms=60000)
+    store.set("b", 2)  # modifica locale non ancora salvata
+    ricaricato = []
+    store.settings_reloaded.connect(lambda: ricaricato.append(True))
+
+    time.sleep(0.01)
+    _write(path, {"a": 5, "b": 1, "c": 3})
+    assert store.reload()
+    assert ricaricato == [True]
+    assert store.get("a") == 5
+    assert store.get("c") == 3
+    assert store.get("b") == 2  # la modifica locale non va persa
+    assert not store.reload()  # file invariato: niente rilettura
+
+
+def test_ricarica_notifica_le_foglie(tmp_path):
+    path, store = _make(tmp_path, {"ai": {"selected_ai_model": "a", "temp": 1}},
+                        delay_ms=60000)
+    ricevuti = []
+    store.setting_changed.connect(lambda k, v: ricevuti.append((k, v)))
+    time.sleep(0.01)
+    _write(path, {"ai": {"selected_ai_model": "b", "temp": 1}})
+    assert store.reload()
+    assert ricevuti == [("ai", {"selected_ai_model": "b", "temp": 1}),
+                        ("ai.selected_ai_model", "b")]
+
+
+def test_scrittura_fallita_non_perde_le_modifiche(tmp_path, monkeypatch):
+    from core import settings_store
+
+    path, store = _make(tmp_path, {}, delay_ms=60000)
+    store.set("tts.tts_engine", "gTTS")
+
+    def disco_pieno(*args, **kwargs):
+        raise OSError("disco pieno")
+
+    monkeypatch.setattr(settings_store.tempfile, "mkstemp", disco_pieno)
+    assert not store.flush()
+    monkeypatch.undo()
+    assert store.flush()  # ancora in sospeso: riprova senza force
+    assert _read(path)["tts"]["tts_engine"] == "gTTS"
+    assert not store._pending
+
+
+def test_flush_concorrenti_non_invertono_l_ordine(tmp_path, monkeypatch):
+    import threading
+
+    from core import settings_store
+
+    path, store = _make(tmp_path, {}, delay_ms=60000)
+    store.set("tts.tts_engine", "vecchio")
+
+    real_replace = os.replace
+    in_replace = threading.Event()
+    release = threading.Event()
+
+    def replace_lento(src, dst):
+        if not in_replace.is_set():
+            in_replace.set()
+            release.wait(5)  # il primo flush resta fermo su os.replace
+        real_replace(src, dst)
+
+    monkeypatch.setattr(settings_store.os, "replace", replace_lento)
+    primo = threading.Thread(target=store.flush)
+    primo.start()
+    assert in_replace.wait(5)
+    store.set("tts.tts_engine", "nuovo")
+    secondo = threading.Thread(target=store.flush)
+    secondo.start()
+    time.sleep(0.05)
+    release.set()
+    primo.join(5)
+    secondo.join(5)
+    assert _read(path)["tts"]["tts_engine"] == "nuovo"
+    assert not store._pending
+
+
+def test_accessori_tipizzati(tmp_path):
+    _, store = _make(tmp_path, {"ui": {"w": "1200", "ratio": "0.5", "on": "sì",
+                                       "off": "0", "name": None, "bad": "x"}})
+    assert store.get_int("ui.w") == 1200
+    assert store.get_int("ui.bad", 7) == 7
+    assert store.get_float("ui.ratio") == 0.5
+    assert store.get_bool("ui.on") is True
+    assert store.get_bool("ui.off", True) is False
+    assert store.get_str("ui.name", "anonimo") == "anonimo"
+
+
+def test_versione_cresce_solo_con_modifiche(tmp_path):
+    _, store = _make(tmp_path, {"a": 1}, delay_ms=60000)
+    v0 = store.version
+    store.set("a", 1)
+    assert store.version == v0
+    store.set("a", 2)
+    store.replace({"a": 2, "b": 3})
+    assert store.version == v0 + 2
+
+
+def test_viste_condividono_lo_stesso_backend(tmp_path):
+    from core.settings_store import get_settings_store
+    from main_03_configurazione_e_opzioni import ConfigManager
+
+    config = ConfigManager(config_dir=str(tmp_path))
+    store = get_settings_store(str(tmp_path / "settings.json"))
+    assert config.store is store
+
+    config.set_setting("ai.selected_ai_model", "llava")
+    assert store.get("ai.selected_ai_model") == "llava"
+
+    store.set("tts.tts_engine", "gTTS")
+    assert config.get_setting("tts.tts_engine") == "gTTS"
+
+    assert config.save_settings(config.load_settings())
+    assert _read(str(tmp_path / "settings.json"))["tts"]["tts_engine"] == "gTTS"
+
+
+def test_prima_installazione_cartella_predefinita(tmp_path, monkeypatch):
+    from core import config_module, settings_store
+    from main_03_configurazione_e_opzioni import ConfigManager
+
+    path = str(tmp_path / "SETUP_TOOLS_&_Data" / "settings.json")
+    monkeypatch.setattr(config_module, "SETTINGS_FILE", path)
+    monkeypatch.setattr(settings_store, "_stores", {})
+
+    minimi = config_module.load_settings()  # lo store nasce con i default minimi
+    config = ConfigManager()
+    assert config.store is config_module.get_settings_backend()
+    assert config.settings_file == path
+
+    completi = config.get_default_settings()
+    salvate = _read(path)
+    assert salvate == config.load_settings()
+    assert salvate["application"] == completi["application"]  # prevalgono i completi
+    assert set(completi) | set(minimi) == set(salvate)
+
+    # Un file già esistente non viene riscritto con i default
+    config.set_setting("application.theme", "Scuro")
+    assert config.store.flush()
+    ConfigManager()
+    assert _read(path)["application"]["theme"] == "Scuro"
+
+
+def _benchmark_lettura(path, store, n=2000):
+    """Tempo medio (s) di una lettura: parse del file contro lookup in memoria."""
+    t = time.perf_counter()
+    for _ in range(n):
+        with open(path, encoding="utf-8") as f:
+            json.load(f)["ai"]["selected_ai_model"]
+    parse = (time.perf_counter() - t) / n
+
+    t = time.perf_counter()
+    for _ in range(n):
+        store.get("ai.selected_ai_model")
+    lookup = (time.perf_counter() - t) / n
+    return parse, lookup
+
+
+def test_benchmark_lettura_da_memoria(tmp_path):
+    data = {"ai": {"selected_ai_model": "gemma:2b"}}
+    data.update({f"sezione_{i}": {f"chiave_{j}": j for j in range(20)} for i in range(20)})
+    path, store = _make(tmp_path, data)
+    parse, lookup = _benchmark_lettura(path, store)
+    print(f"lettura: parse file {parse * 1e6:.1f} µs, store {lookup * 1e6:.2f} µs")
+    assert lookup * 5 < parse
@@ -0,0 +1,119 @@
+"""Test dell'avvio a stadi (core/startup_scheduler.py e MainWindow).
+
+Verifica: i compiti dopo la prima visualizzazione partono insieme, quelli
+di inattività uno per giro del ciclo eventi (gli eventi dell'utente
+passano in mezzo), il preriscaldamento in un thread separato; un compito
+che fallisce non ferma gli altri; la linea temporale viene salvata in
+JSON. La finestra principale compare senza tastiera virtuale, che viene
+costruita a finestra visibile o al primo clic sul pulsante.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+from core.startup_scheduler import (
+    STAGE_AFTER_PAINT,
+    STAGE_IDLE,
+    STAGE_WARMUP,
+    StartupScheduler,
+)
+
+_finestre = []  # tenute in vita: niente distruzione durante il disegno
+
+
+def _attendi(condizione, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while not condizione() and time.monotonic() < limite:
+        app.processEvents()
+        time.sleep(0.001)
+    return condizione()
+
+
+def test_stadi_in_ordine_e_linea_temporale(tmp_path):
+    ordine = []
+    scheduler = StartupScheduler(trace_path=str(tmp_path / "timeline.json"))
+
+    def primo_inattivo():
+        ordine.append("inattivo 1")
+        # Un "evento dell'utente" accodato ora passa prima del compito successivo
+        QTimer.singleShot(0, lambda: ordine.append("evento utente"))
+
+    scheduler.add(STAGE_IDLE, "primo", primo_inattivo)
+    scheduler.add(STAGE_IDLE, "secondo", lambda: ordine.append("inattivo 2"))
+    scheduler.add(STAGE_AFTER_PAINT, "filtri", lambda: ordine.append("dopo 1"))
+    scheduler.add(STAGE_AFTER_PAINT, "stili", lambda: ordine.append("dopo 2"))
+    scheduler.add(
+        STAGE_WARMUP, "modelli", lambda: ordine.append(threading.current_thread().name)
+    )
+
+    scheduler.start()
+    assert ordine == []  # niente durante la showEvent
+    assert _attendi(lambda: scheduler.done)
+    assert scheduler.wait_warmup(5)
+    assert ordine == [
+        "dopo 1", "dopo 2", "inattivo 1", "evento utente", "inattivo 2",
+        "avvio-preriscaldamento",
+    ]
+
+    with open(tmp_path / "timeline.json", encoding="utf-8") as f:
+        eventi = json.load(f)["events"]
+    compiti = [(e["stage"], e["name"]) for e in eventi if e["stage"] != "avvio"]
+    assert compiti == [
+        (STAGE_AFTER_PAINT, "filtri"),
+        (STAGE_AFTER_PAINT, "stili"),
+        (STAGE_IDLE, "primo"),
+        (STAGE_IDLE, "secondo"),
+        (STAGE_WARMUP, "modelli"),
+    ]
+    assert all(e["duration_ms"] >= 0 for e in eventi)
+
+
+def test_compito_fallito_non_ferma_gli_altri():
+    fatti = []
+    scheduler = StartupScheduler()
+    scheduler.add(STAGE_IDLE, "rotto", lambda: 1 / 0)
+    scheduler.add(STAGE_IDLE, "buono", lambda: fatti.append(True))
+    scheduler.start()
+    assert _attendi(lambda: scheduler.done)
+    assert fatti == [True]
+    esiti = {e["name"]: e["ok"] for e in scheduler.timeline() if "ok" in e}
+    assert esiti == {"rotto": False, "buono": True}
+
+
+def test_finestra_principale_costruisce_la_tastiera_dopo(tmp_path):
+    import main_01_Aircraft as m
+
+    window = m.MainWindow()
+    _finestre.append(window)
+    window.log_ui_metrics = lambda *args: None  # niente scritture in debug_logs
+    window.startup_scheduler.trace_path = str(tmp_path / "timeline.json")
+    assert window.virtual_keyboard is None
+    assert "tastiera virtuale" in window.startup_scheduler.pending(STAGE_IDLE)
+
+    window.show()
+    assert _attendi(lambda: window.startup_scheduler.done)
+    assert window.virtual_keyboard is not None
+    assert (tmp_path / "timeline.json").exists()
+    window.hide()
+
+
+def test_tastiera_costruita_al_primo_clic():
+    import main_01_Aircraft as m
+
+    window = m.MainWindow()
+    _finestre.append(window)
+    window.startup_scheduler.stop()  # l'avvio a stadi non è ancora arrivato
+    window.toggle_virtual_keyboard()
+    assert window.virtual_keyboard is not None
+    assert window.footer_input_stack.currentIndex() == window._keyboard_page_index
@@ -0,0 +1,87 @@
+"""Test dei tratti vettoriali del disegno (core/stroke_model.py).
+
+Verifica: semplificazione Ramer-Douglas-Peucker; annulla/ripristina di
+tratti e pulizie; salvataggio compatto e ricaricamento; tratti per il
+riconoscimento della scrittura.
+"""
+
+import json
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.stroke_model import Stroke, StrokeModel, rdp_simplify
+
+
+def _tratto(model, punti, tool="pencil"):
+    model.begin(tool, "#1a1a1a", 3)
+    for x, y in punti:
+        model.add_point(x, y)
+    return model.end()
+
+
+def test_rdp_toglie_i_punti_allineati():
+    retta = [(float(x), 2.0 * x, 0.0, 1.0) for x in range(100)]
+    assert rdp_simplify(retta) == [retta[0], retta[-1]]
+    # Un angolo resta: è il punto che sposta di più la linea
+    angolo = [(float(x), 0.0, 0.0, 1.0) for x in range(50)] + [
+        (49.0, float(y), 0.0, 1.0) for y in range(1, 50)
+    ]
+    assert [p[:2] for p in rdp_simplify(angolo)] == [(0.0, 0.0), (49.0, 0.0), (49.0, 49.0)]
+
+
+def test_curva_semplificata_entro_la_tolleranza():
+    cerchio = [(100 + 50 * math.cos(a / 100), 100 + 50 * math.sin(a / 100), 0.0, 1.0)
+               for a in range(629)]
+    ridotto = rdp_simplify(cerchio, 0.75)
+    assert len(ridotto) < len(cerchio) // 5
+    assert ridotto[0] == cerchio[0] and ridotto[-1] == cerchio[-1]
+
+
+def test_annulla_e_ripristina():
+    model = StrokeModel()
+    a = _tratto(model, [(0, 0), (10, 10)])
+    b = _tratto(model, [(20, 20), (30, 30)])
+    assert model.undo() == ("add", b)
+    assert model.strokes == [a]
+    assert model.redo() == ("add", b)
+    assert model.strokes == [a, b]
+
+    model.clear()
+    assert model.strokes == []
+    model.undo()  # la pulizia si annulla
+    assert model.strokes == [a, b]
+    model.redo()
+    assert model.strokes == []
+    model.undo()
+
+    # Un tratto nuovo cancella i ripristini in sospeso
+    model.undo()
+    _tratto(model, [(5, 5), (6, 9)])
+    assert not model.can_redo()
+    assert len(model) == 2
+
+
+def test_salvataggio_compatto_e_ricaricamento():
+    model = StrokeModel()
+    for i in range(20):
+        _tratto(model, [(i * 10 + k, 50 + (k % 7), ) for k in range(200)])
+    data = json.loads(json.dumps(model.to_dict()))
+    again = StrokeModel.from_dict(data)
+    assert len(again) == 20
+    for s1, s2 in zip(model.strokes, again.strokes):
+        assert [p[:2] for p in s1.points] == [p[:2] for p in s2.points]
+    assert len(json.dumps(data)) < 20 * 200 * 4 * 4  # molto meno dei punti grezzi
+    # Versione sconosciuta: disegno vuoto invece di un errore
+    assert len(StrokeModel.from_dict({"v": 99, "strokes": [{}]})) == 0
+
+
+def test_inchiostro_per_il_riconoscimento():
+    model = StrokeModel()
+    _tratto(model, [(0, 0), (5, 9), (10, 0)])
+    _tratto(model, [(0, 0), (50, 50)], tool="eraser")
+    model.add_stroke(Stroke("line", "#000000", 3, [(0, 0, 0, 1), (9, 9, 0, 1)]))
+    ink = model.ink()
+    assert len(ink) == 1 and [p[:2] for p in ink[0]] == [(0, 0), (5, 9), (10, 0)]
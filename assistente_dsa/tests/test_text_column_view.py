@@ -0,0 +1,81 @@
+"""Test della colonna di testi virtualizzata (UI/text_column_view.py).
+
+Verifica: molti testi senza un widget per elemento; il widget completo
+creato solo per l'elemento selezionato e le sue modifiche riportate nel
+modello; "Elimina" che toglie la riga; il confronto dei tempi di
+caricamento con un DraggableTextWidget per elemento.
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QWidget
+
+app = QApplication.instance() or QApplication([])
+
+from UI.draggable_text_widget import DraggableTextWidget
+from UI.text_column_view import TextColumnView
+
+SETTINGS = {"fonts": {"pensierini_font_size": 12}}
+
+
+def _view(n):
+    view = TextColumnView(SETTINGS, [f"pensierino {i}" for i in range(n)], DraggableTextWidget)
+    view.resize(300, 400)
+    view.show()
+    app.processEvents()
+    return view
+
+
+def test_nessun_widget_per_elemento():
+    view = _view(2000)
+    assert view.count() == 2000
+    assert len(view.findChildren(DraggableTextWidget)) <= 1  # al più quello corrente
+    assert len(view.findChildren(QWidget)) < 30
+
+
+def test_widget_solo_per_l_elemento_selezionato():
+    view = _view(100)
+    view.setCurrentIndex(view.model().index(3, 0))
+    app.processEvents()
+    editors = [w for w in view.findChildren(DraggableTextWidget) if not w.isHidden()]
+    assert len(editors) == 1
+    assert view.active_editor().text_label.text() == "pensierino 3"
+
+    # La modifica nel widget aperto finisce nel modello
+    view.active_editor().text_label.setText("modificato")
+    assert view.texts()[3] == "modificato"
+
+    view.setCurrentIndex(view.model().index(7, 0))
+    app.processEvents()
+    assert view.model().texts()[3] == "modificato"
+    assert view.active_editor().text_label.text() == "pensierino 7"
+
+
+def test_elimina_toglie_la_riga():
+    view = _view(10)
+    view.setCurrentIndex(view.model().index(4, 0))
+    app.processEvents()
+    view.active_editor().delete_button.click()
+    app.processEvents()
+    assert view.count() == 9
+    assert "pensierino 4" not in view.texts()
+
+
+def test_benchmark_caricamento():
+    testi = [f"pensierino numero {i} con un po' di testo" for i in range(300)]
+    t = time.perf_counter()
+    container = QWidget()
+    for testo in testi:
+        DraggableTextWidget(testo, SETTINGS, container)
+    widgets = time.perf_counter() - t
+
+    t = time.perf_counter()
+    TextColumnView(SETTINGS, testi, DraggableTextWidget)
+    virtual = time.perf_counter() - t
+    print(f"300 elementi: widget {widgets * 1000:.1f} ms, vista {virtual * 1000:.1f} ms")
+    assert virtual < widgets
@@ -0,0 +1,58 @@
+"""Test della paginazione pigra dei testi lunghi (core/text_pager.py).
+
+Verifica: le pagine ricompongono il testo senza spezzare le parole; il
+salto a una pagina qualsiasi non costruisce le pagine precedenti; la
+ricerca della pagina di un carattere.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.text_pager import TextPager
+
+PAROLE = "il gatto dorme sul divano mentre fuori piove forte".split()
+
+
+def _testo(n_parole):
+    return " ".join(PAROLE[i % len(PAROLE)] for i in range(n_parole))
+
+
+def test_pagine_ricompongono_il_testo_senza_spezzare_parole():
+    testo = _testo(3000)
+    pager = TextPager(testo, 250)
+    pagine = [pager.page(n) for n in range(pager.page_count)]
+    assert "".join(pagine) == testo
+    assert all(pagine)
+    for pagina in pagine[:-1]:
+        assert pagina.endswith(" ")  # la parola successiva inizia nella pagina dopo
+
+
+def test_testo_vuoto_e_parole_lunghissime():
+    assert TextPager("").page(0) == ""
+    assert TextPager("").page_count == 1
+    blocco = "x" * 1000  # nessuno spazio: taglio netto
+    pager = TextPager(blocco, 250)
+    assert [len(pager.page(n)) for n in range(pager.page_count)] == [250] * 4
+
+
+def test_salto_in_tempo_costante():
+    testo = _testo(400000)  # circa 2,5 milioni di caratteri, ~10.000 pagine
+    pager = TextPager(testo, 250)
+    t = time.perf_counter()
+    ultima = pager.page(pager.page_count - 1)
+    metà = pager.page(pager.page_count // 2)
+    elapsed = time.perf_counter() - t
+    assert testo.endswith(ultima) and metà
+    assert pager.stats["pages_built"] <= 6  # solo pagine richieste e vicine
+    assert elapsed < 0.01
+
+
+def test_pagina_di_un_carattere():
+    testo = _testo(2000)
+    pager = TextPager(testo, 250)
+    for offset in (0, 249, 250, 251, 5000, len(testo) - 1):
+        n = pager.page_of_offset(offset)
+        assert pager.page_start(n) <= offset < pager.page_start(n + 1)
@@ -0,0 +1,108 @@
+"""Test del foglio di stile unico (UI/theme_engine.py).
+
+Verifica: il foglio di ogni tema viene costruito una volta e impostato
+sull'applicazione solo quando il tema cambia; Chiaro e Scuro producono
+fogli diversi; uno stato (proprietà dinamica) rilucida solo il widget
+interessato, senza toccarne lo stylesheet né applicare un tema; la
+selezione di un pensierino non cambia lo stylesheet del widget.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QPushButton, QVBoxLayout, QWidget
+
+app = QApplication.instance() or QApplication([])
+
+from UI.theme_engine import ThemeEngine, build_stylesheet, get_theme_engine, resolve_theme
+
+_finestre = []  # tenute in vita: niente distruzione durante il disegno
+
+
+def test_foglio_costruito_e_applicato_una_volta():
+    engine = ThemeEngine()
+    engine.apply("Chiaro", app)
+    engine.apply("Chiaro", app)
+    assert engine.stats["builds"] == 1
+    assert engine.stats["app_sets"] == 1
+    assert app.styleSheet() == engine.stylesheet
+
+    engine.apply("Scuro", app)
+    assert engine.stats["builds"] == 2
+    assert engine.stats["app_sets"] == 2
+    assert build_stylesheet("Chiaro") != build_stylesheet("Scuro")
+    assert resolve_theme("Automatico", app) in ("Chiaro", "Scuro")
+    assert resolve_theme("inesistente") == "Chiaro"
+    get_theme_engine().apply("Chiaro", app)  # ripristina per gli altri test
+
+
+def _azzera(counter):
+    for nome in counter.counts:
+        counter.counts[nome] = 0
+
+
+def test_stato_rilucida_solo_il_widget():
+    engine = ThemeEngine()
+    engine.apply("Chiaro", app)
+    counter = engine.enable_counter(app)
+
+    finestra = QWidget()
+    _finestre.append(finestra)
+    layout = QVBoxLayout(finestra)
+    pulsanti = [QPushButton(f"pulsante {i}") for i in range(20)]
+    for pulsante in pulsanti:
+        layout.addWidget(pulsante)
+    pulsante = pulsanti[0]
+    pulsante.setObjectName("hands_btn")
+    pulsante.setProperty("toggleState", "off")
+    finestra.show()
+    app.processEvents()
+
+    _azzera(counter)
+    assert engine.set_state(pulsante, "toggleState", "on")
+    assert not engine.set_state(pulsante, "toggleState", "on")  # già in quello stato
+    app.processEvents()
+    assert pulsante.styleSheet() == ""
+    assert engine.stats["state_polish"] == 1
+    assert counter.counts["style_change"] == 0
+    assert counter.counts["paint"] < len(pulsanti)
+    assert engine.metrics()["events"] == counter.counts
+
+    # Confronto: aggiungere regole allo stylesheet della finestra
+    # ricalcola lo stile di tutti i figli
+    _azzera(counter)
+    finestra.setStyleSheet('QPushButton[toggleState="on"] { background: #28a745; }')
+    app.processEvents()
+    assert counter.counts["style_change"] >= len(pulsanti)
+    app.removeEventFilter(counter)
+
+
+def test_stato_senza_tema_non_applica_il_foglio():
+    engine = ThemeEngine()
+    foglio = app.styleSheet()
+    pulsante = QPushButton("stato")
+    _finestre.append(pulsante)
+    assert engine.set_state(pulsante, "toggleState", "on")
+    assert pulsante.property("toggleState") == "on"
+    assert engine.theme is None
+    assert engine.stats["app_sets"] == 0
+    assert app.styleSheet() == foglio
+
+
+def test_selezione_pensierino_senza_stylesheet():
+    from UI.draggable_text_widget import DraggableTextWidget
+
+    get_theme_engine().apply("Chiaro", app)
+    widget = DraggableTextWidget("Ciao", {})
+    _finestre.append(widget)
+    widget.toggle_selection()
+    assert widget.property("selected") is True
+    assert widget.text_label.text() == "⭐ Ciao"
+    assert widget.styleSheet() == ""
+
+    widget.toggle_selection()
+    assert widget.property("selected") is False
+    assert widget.text_label.text() == "Ciao"
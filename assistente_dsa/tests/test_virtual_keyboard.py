@@ -2,7 +2,8 @@
 
 Girano offscreen (QT_QPA_PLATFORM=offscreen): verificano scrittura nel
 documento condiviso, maiuscola singola, cambio pagina, predizione delle
-parole, apprendimento e scansione a singolo segnale.
+parole, apprendimento e scansione a singolo segnale; una richiesta AI
+annullata finisce da sola anche se la tastiera viene distrutta.
 """
 
 import os
@@ -13,7 +14,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PyQt6.QtWidgets import QApplication, QTextEdit
 
+import time
+
+from UI import virtual_keyboard as vk
 from UI.virtual_keyboard import (
+    AiSuggestionService,
     VirtualKeyboardWidget,
     WordPredictor,
     merge_ai_suggestions,
@@ -78,11 +83,117 @@ def test_apprendimento_parole(tmp_path=None):
         p = WordPredictor(learned_path=path)
         p.learn("zampirone")
         assert "zampirone" in p.suggest("zam")
+        p.flush()  # il salvataggio è raggruppato: lo forziamo
         # Ricaricando da file, la parola resta
         p2 = WordPredictor(learned_path=path)
         assert "zampirone" in p2.suggest("zamp")
 
 
+def test_salvataggio_raggruppato_e_compattato(tmp_path):
+    path = str(tmp_path / "apprese.json")
+    p = WordPredictor(learned_path=path)
+    p.SAVE_DELAY_S = 60
+    for i in range(200):
+        p.learn("parola" + "abcdefghil"[i % 10])
+    # In memoria subito, su disco ancora niente
+    assert p.learned["parolaa"] == 20 and "parolal" in p.suggest("parol")
+    assert not os.path.exists(path) and not os.path.exists(path + ".log")
+
+    p.flush()
+    assert p.stats["saves"] == 1
+    with open(path + ".log", encoding="utf-8") as f:
+        assert len(f.readlines()) == 10  # solo le parole cambiate, una volta
+    assert WordPredictor(learned_path=path).learned["parolaa"] == 20
+
+    # Oltre la soglia il registro viene riassorbito nel file completo
+    p.COMPACT_AFTER = 15
+    for i in range(10):
+        p.learn("altra" + "abcdefghil"[i])
+    p.flush()
+    assert p.stats["compactions"] == 1
+    assert not os.path.exists(path + ".log")
+    ricaricato = WordPredictor(learned_path=path)
+    assert ricaricato.learned == p.learned
+
+
+def test_registro_con_riga_troncata(tmp_path):
+    path = str(tmp_path / "apprese.json")
+    with open(path + ".log", "w", encoding="utf-8") as f:
+        f.write('{"w": "zampogna", "n": 3}\n{"w": "zamp')
+    assert WordPredictor(learned_path=path).learned == {"zampogna": 3}
+
+
+def _vocabolario(n, seed=7):
+    import random
+
+    rnd = random.Random(seed)
+    lettere = "abcdefghilmnoprstuvz"
+    return {
+        "".join(rnd.choice(lettere) for _ in range(rnd.randint(3, 10))): rnd.randint(1, 500)
+        for _ in range(n)
+    }
+
+
+def test_indice_prefissi_come_scansione_lineare():
+    from core.prefix_index import PrefixIndex
+
+    parole = _vocabolario(20000)
+    index = PrefixIndex(parole)
+    for prefisso in ("", "a", "ab", "zu", "mar", "pet", "lmno", "x"):
+        attese = sorted(
+            ((v, w) for w, v in parole.items() if w.startswith(prefisso) and w != prefisso),
+            reverse=True,
+        )[:5]
+        assert index.top(prefisso, 5, exclude=prefisso) == [w for _v, w in attese]
+
+    # Punteggi aggiornati (in su e in giù) e parole nuove
+    index.set_score("abzzz", 10_000)
+    index.set_score("abbbb", 9_999)
+    assert index.top("ab", 2) == ["abzzz", "abbbb"]
+    index.set_score("abzzz", 0)
+    assert index.top("ab", 1) == ["abbbb"]
+
+
+def test_parole_recenti_prima_a_parita_di_uso():
+    p = WordPredictor()
+    p.learn("zampogna")
+    p.learn("zampirone")
+    assert p.suggest("zamp")[:2] == ["zampirone", "zampogna"]
+    p.learn("zampogna")  # ora più usata
+    assert p.suggest("zamp")[0] == "zampogna"
+
+
+def test_benchmark_suggerimenti_100k_parole():
+    import time
+
+    p = WordPredictor()
+    parole = _vocabolario(100_000)
+    p.learned.update(parole)
+    t = time.perf_counter()
+    from core.prefix_index import PrefixIndex
+
+    p.index = PrefixIndex({w: p._score(w) for w in set(p.frequent) | set(p.learned)})
+    costruzione = time.perf_counter() - t
+
+    prefissi = ["a", "ca", "mar", "s", "pet", "z", "lo", "ti"] * 50
+    t = time.perf_counter()
+    for prefisso in prefissi:
+        p.suggest(prefisso)
+    indice = (time.perf_counter() - t) / len(prefissi)
+
+    # Il vecchio metodo: scansione di tutte le parole a ogni tasto
+    t = time.perf_counter()
+    for prefisso in prefissi[:40]:
+        sorted(
+            ((v, w) for w, v in p.learned.items() if w.startswith(prefisso)), reverse=True
+        )[:5]
+    lineare = (time.perf_counter() - t) / 40
+
+    print(f"100k parole: costruzione {costruzione * 1000:.0f} ms, suggest "
+          f"{indice * 1e6:.1f} µs, scansione lineare {lineare * 1e6:.0f} µs")
+    assert indice * 20 < lineare
+
+
 def test_suggerimento_completa_la_parola():
     kb, editor = make_kb()
     for k in ("c", "a", "s"):
@@ -211,6 +322,115 @@ def test_ai_spenta_niente_richieste():
     assert not kb._ai_timer.isActive()
 
 
+class _FakeAiThread(vk._AiSuggestThread):
+    """Risponde senza rete: il testo dipende dal prefisso chiesto."""
+
+    risposte = {}
+    avviati = []
+
+    def run(self):
+        _FakeAiThread.avviati.append(self.prefix)
+        time.sleep(0.05)
+        if not self.is_cancelled():
+            self.reply.emit(self.generation, self.prefix, self.risposte.get(self.prefix, ""))
+
+
+def _service_finto(risposte):
+    _FakeAiThread.risposte = risposte
+    _FakeAiThread.avviati = []
+    service = AiSuggestionService()
+    service.timer.setInterval(0)
+    ricevute = []
+    service.reply.connect(lambda p, t, s: ricevute.append((p, t, s)))
+    return service, ricevute
+
+
+def _attendi(service, ricevute, n=1):
+    end = time.monotonic() + 3
+    while len(ricevute) < n and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    service.wait_idle()
+    app.processEvents()
+
+
+def test_servizio_ai_annulla_le_richieste_superate():
+    originale = vk._AiSuggestThread
+    vk._AiSuggestThread = _FakeAiThread
+    try:
+        service, ricevute = _service_finto({"ca": "casa cane", "cav": "cavallo"})
+        service.request("il", "ca")
+        app.processEvents()  # parte la richiesta per "ca"
+        service.request("il", "cav")  # superata prima della risposta
+        _attendi(service, ricevute)
+        assert ricevute == [("cav", "cavallo", "ai")]
+        assert service.stats["cancelled"] >= 1
+    finally:
+        vk._AiSuggestThread = originale
+
+
+def test_servizio_ai_riusa_cache_e_prefissi():
+    originale = vk._AiSuggestThread
+    vk._AiSuggestThread = _FakeAiThread
+    try:
+        service, ricevute = _service_finto({"cas": "casa casetta castello"})
+        service.request("la mia", "cas")
+        _attendi(service, ricevute)
+        assert ricevute[-1] == ("cas", "casa casetta castello", "ai")
+
+        # Stesso prefisso e stessa frase: dalla cache, subito
+        service.request("la mia", "cas")
+        assert ricevute[-1] == ("cas", "casa casetta castello", "cache")
+        # Prefisso che allunga "cas": si filtrano le parole già avute
+        service.request("la mia", "case")
+        assert ricevute[-1] == ("case", "casetta", "prefisso")
+        assert not service.timer.isActive()
+        # Altra frase di contesto: nuova richiesta
+        service.request("il tuo", "cas")
+        assert service.timer.isActive()
+        service.cancel()
+        assert _FakeAiThread.avviati == ["cas"]
+        assert service.stats["cache_hits"] == 1 and service.stats["prefix_reuse"] == 1
+    finally:
+        vk._AiSuggestThread = originale
+
+
+def test_richiesta_annullata_sopravvive_alla_tastiera():
+    originale = vk._AiSuggestThread
+    vk._AiSuggestThread = _FakeAiThread
+    try:
+        service, ricevute = _service_finto({"ca": "casa"})
+        service.request("il", "ca")
+        end = time.monotonic() + 3
+        while service.active_thread is None and time.monotonic() < end:
+            app.processEvents()
+        thread = service.active_thread
+        assert thread is not None and thread.parent() is None
+        service.cancel()
+        service.deleteLater()  # la tastiera se ne va con il thread in corso
+        app.processEvents()
+        assert thread in vk._running_threads
+        assert thread.wait(3000)
+        app.processEvents()
+        assert thread not in vk._running_threads
+        assert ricevute == []
+    finally:
+        vk._AiSuggestThread = originale
+
+
+def test_latenza_dal_tasto_ai_suggerimenti():
+    kb, editor = make_kb()
+    kb.show()
+    app.processEvents()
+    for k in ("c", "a"):
+        kb._on_key(k)
+    kb._on_ai_reply("ca", "cavallo", "cache")
+    summary = kb.ai_service.latency_summary()
+    assert summary["dizionario"]["count"] >= 2  # uno per tasto
+    assert summary["cache"]["count"] == 1
+    assert summary["cache"]["p50"] >= 0
+
+
 if __name__ == "__main__":
     failed = 0
     for name, fn in sorted(globals().items()):